@@ -0,0 +1,238 @@
+# Copyright 2026 Snowflake Inc.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Local stand-in for the OpenFlow connector side of ``ACTIVATION.ACTIVATE_AUDIENCE``.
+
+Download an export written by the procedure, then replay it against a fake ad
+platform API:
+
+    snow sql -q "GET @AME_AD_SALES_DEMO.ACTIVATION.AUDIENCE_EXPORTS/meta_ads/<run_id>/ file:///tmp/export/"
+    python scripts/activation/local_connector.py /tmp/export --workers 8 --failure-rate 0.05
+
+Reader threads split chunk files into request-sized batches and put them on a
+bounded queue; uploader threads drain it. A full queue blocks the readers, so
+memory stays flat however large the audience is and slow uploads apply
+backpressure instead of piling up. Failed requests are retried with exponential
+backoff and jitter. The run fails (non-zero exit) if any batch exhausts its
+retries or if the uploaded row count does not match the manifest.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import gzip
+import json
+import queue
+import random
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+
+# Identifiers per upload request, per the platforms' audience APIs.
+CHANNEL_BATCH_SIZE: Dict[str, int] = {
+    "Google Ads": 10000,
+    "Amazon Ads": 10000,
+    "Linkedin Ads": 5000,
+    "Meta Ads": 10000,
+}
+DEFAULT_BATCH_SIZE = 5000
+BACKOFF_BASE_SECONDS = 0.05
+BACKOFF_MAX_SECONDS = 2.0
+_DONE = object()
+
+
+class TransientApiError(Exception):
+    """Retryable failure (HTTP 429/5xx) from the audience API."""
+
+
+class FakeAudienceApi:
+    """Simulated ad platform endpoint with fixed latency and random transient failures."""
+
+    def __init__(self, latency_ms: float, failure_rate: float, seed: Optional[int] = None):
+        self.latency = latency_ms / 1000.0
+        self.failure_rate = failure_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.received_rows = 0
+        self.requests = 0
+
+    def upload(self, channel: str, identifiers: List[Dict[str, str]]) -> None:
+        time.sleep(self.latency)
+        with self._lock:
+            self.requests += 1
+            if self._rng.random() < self.failure_rate:
+                raise TransientApiError(f"{channel}: 503 Service Unavailable")
+            self.received_rows += len(identifiers)
+
+
+@dataclass
+class Batch:
+    file: str
+    index: int
+    rows: List[Dict[str, str]]
+
+
+@dataclass
+class RunStats:
+    uploaded_rows: int = 0
+    batches: int = 0
+    retries: int = 0
+    failed: List[str] = field(default_factory=list)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+def read_manifest(export_dir: Path) -> dict:
+    with open(export_dir / "manifest.json", encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def _read_rows(path: Path, file_format: str) -> Iterator[Dict[str, str]]:
+    if file_format == "PARQUET":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as exc:
+            raise SystemExit("Reading PARQUET exports requires pyarrow (pip install pyarrow).") from exc
+        for record_batch in pq.ParquetFile(path).iter_batches():
+            yield from record_batch.to_pylist()
+        return
+    with gzip.open(path, "rt", encoding="utf-8", newline="") as fh:
+        yield from csv.DictReader(fh)
+
+
+def _reader(files: "queue.Queue[str]", export_dir: Path, file_format: str, batch_size: int,
+            batches: "queue.Queue", stats: RunStats) -> None:
+    while True:
+        try:
+            name = files.get_nowait()
+        except queue.Empty:
+            return
+        try:
+            rows: List[Dict[str, str]] = []
+            index = 0
+            for row in _read_rows(export_dir / name, file_format):
+                rows.append(row)
+                if len(rows) == batch_size:
+                    batches.put(Batch(name, index, rows))  # blocks while the queue is full
+                    rows, index = [], index + 1
+            if rows:
+                batches.put(Batch(name, index, rows))
+        except (OSError, ValueError) as exc:
+            with stats.lock:
+                stats.failed.append(f"{name}: unreadable ({exc})")
+
+
+def _uploader(api: FakeAudienceApi, channel: str, batches: "queue.Queue", stats: RunStats,
+              max_attempts: int, rng: random.Random) -> None:
+    while True:
+        batch = batches.get()
+        if batch is _DONE:
+            return
+        for attempt in range(1, max_attempts + 1):
+            try:
+                api.upload(channel, batch.rows)
+            except TransientApiError as exc:
+                if attempt == max_attempts:
+                    with stats.lock:
+                        stats.failed.append(f"{batch.file}#{batch.index}: {exc} after {attempt} attempts")
+                    break
+                with stats.lock:
+                    stats.retries += 1
+                # Full jitter keeps retries from many workers from synchronising.
+                delay = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** (attempt - 1))
+                time.sleep(rng.uniform(0, delay))
+            else:
+                with stats.lock:
+                    stats.uploaded_rows += len(batch.rows)
+                    stats.batches += 1
+                break
+
+
+def run_export(export_dir: Path, workers: int, readers: int, queue_size: int, api: FakeAudienceApi,
+               max_attempts: int, seed: Optional[int] = None) -> dict:
+    manifest = read_manifest(export_dir)
+    channel = manifest["channel"]
+    batch_size = CHANNEL_BATCH_SIZE.get(channel, DEFAULT_BATCH_SIZE)
+
+    files: "queue.Queue[str]" = queue.Queue()
+    for entry in manifest["files"]:
+        files.put(entry["file"])
+    batches: "queue.Queue" = queue.Queue(maxsize=queue_size)
+    stats = RunStats()
+    rng = random.Random(seed)
+
+    started = time.perf_counter()
+    uploaders = [
+        threading.Thread(target=_uploader, args=(api, channel, batches, stats, max_attempts, random.Random(rng.random())))
+        for _ in range(workers)
+    ]
+    reader_threads = [
+        threading.Thread(target=_reader, args=(files, export_dir, manifest["format"], batch_size, batches, stats))
+        for _ in range(readers)
+    ]
+    for thread in uploaders + reader_threads:
+        thread.start()
+    for thread in reader_threads:
+        thread.join()
+    for _ in uploaders:
+        batches.put(_DONE)
+    for thread in uploaders:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    expected = int(manifest["total_rows"])
+    return {
+        "run_id": manifest["run_id"],
+        "channel": channel,
+        "files": len(manifest["files"]),
+        "expected_rows": expected,
+        "uploaded_rows": stats.uploaded_rows,
+        "requests": api.requests,
+        "batches": stats.batches,
+        "retries": stats.retries,
+        "failed_batches": stats.failed,
+        "elapsed_seconds": round(elapsed, 3),
+        "rows_per_second": round(stats.uploaded_rows / elapsed) if elapsed else None,
+        "complete": not stats.failed and stats.uploaded_rows == expected,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("export_dir", type=Path, help="Directory holding manifest.json and the chunk files")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent upload requests")
+    parser.add_argument("--readers", type=int, default=2, help="Threads reading chunk files")
+    parser.add_argument("--queue-size", type=int, default=32, help="Batches buffered between readers and uploaders")
+    parser.add_argument("--failure-rate", type=float, default=0.02, help="Probability a request fails transiently")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Simulated latency per request")
+    parser.add_argument("--max-attempts", type=int, default=5, help="Attempts per batch before giving up")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    api = FakeAudienceApi(args.latency_ms, args.failure_rate, seed=args.seed)
+    report = run_export(
+        args.export_dir, args.workers, args.readers, args.queue_size, api, args.max_attempts, seed=args.seed
+    )
+    print(json.dumps(report, indent=2))
+    return 0 if report["complete"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,212 @@
+# Copyright 2026 Snowflake Inc.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""DuckDB-backed stand-in for the session the Streamlit apps get from
+``get_active_session()``.
+
+The apps run their statements through ``streamlit/query_telemetry.py``, which goes
+below Snowpark to the connector cursor (``execute`` with ``_statement_params``,
+``sfqid``, ``fetch_arrow_batches``, ``description``). ``AppSession``
+provides that cursor over a ``LocalSession`` database and delegates the Snowpark
+calls (``sql``, ``write_pandas``, the current database) to it. Results follow the
+connector's conventions where the apps depend on them: unquoted identifiers come
+back upper-cased and ARRAY/OBJECT values as JSON text. Every statement is logged
+on ``AppSession.statements`` so the benchmark can count round trips.
+
+On top of ``local_session.SQL_REWRITES`` it translates the Snowflake SQL the apps
+send: per-database ``INFORMATION_SCHEMA`` views (served from DuckDB's catalog),
+``SHOW STAGES``, ``SAMPLE (n ROWS)``, ``LATERAL FLATTEN``, ``ARRAY_CONTAINS``,
+``DIV0`` and the HLL sketch functions. Sketches are held as lists of subscriber ids,
+so merged reach is exact rather than estimated.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from collections import namedtuple
+from typing import Any, Iterator, List, Optional, Sequence, Tuple
+from uuid import uuid4
+
+import pandas as pd
+import pyarrow as pa
+
+from local_session import LocalDataFrame, LocalSession, translate
+
+
+CATALOG_SCHEMA = "_INFORMATION_SCHEMA"
+SHOW_SCHEMA = "_SHOW"
+ARROW_BATCH_ROWS = 100_000
+
+# (pattern, replacement) pairs applied after local_session.translate.
+APP_SQL_REWRITES = [
+    (re.compile(r'\b(\w+)\.INFORMATION_SCHEMA\.', re.I), rf'"\1".{CATALOG_SCHEMA}.'),
+    (re.compile(r'\bSHOW STAGES IN SCHEMA (\w+)\.(\w+)', re.I),
+     rf'SELECT * FROM "\1".{SHOW_SCHEMA}.STAGES WHERE schema_name = \'\2\''),
+    (re.compile(r'\bSAMPLE \((\d+) ROWS\)', re.I), r'USING SAMPLE \1 ROWS'),
+    (re.compile(r'\bLATERAL FLATTEN\(input => (\w+)\)', re.I), r'LATERAL (SELECT UNNEST(\1) AS value)'),
+    (re.compile(r"\bARRAY_CONTAINS\(('(?:[^']|'')*')::(?:VARIANT|JSON), (\w+)\)", re.I), r'list_contains(\2, \1)'),
+]
+
+# Snowflake functions without a DuckDB spelling. Created in the database's main schema,
+# which every cursor has on its search path (temporary macros are per cursor).
+MACROS = (
+    "DIV0(a, b) AS CASE WHEN b = 0 THEN 0 ELSE a / b END",
+    "HLL_IMPORT(sketch) AS sketch",
+    "HLL_EXPORT(sketch) AS sketch",
+    "HLL_COMBINE(sketch) AS list_distinct(flatten(list(sketch)))",
+    "HLL_ESTIMATE(sketch) AS len(sketch)",
+)
+
+# Snowflake names for the DuckDB types the fixtures use, as INFORMATION_SCHEMA reports them.
+SNOWFLAKE_TYPE = """
+    CASE
+        WHEN data_type LIKE '%[]' THEN 'ARRAY'
+        WHEN data_type LIKE 'STRUCT%' OR data_type LIKE 'MAP%' THEN 'OBJECT'
+        WHEN data_type = 'JSON' THEN 'VARIANT'
+        WHEN data_type = 'VARCHAR' THEN 'TEXT'
+        WHEN data_type IN ('DOUBLE', 'FLOAT') THEN 'FLOAT'
+        WHEN data_type IN ('TINYINT', 'SMALLINT', 'INTEGER', 'BIGINT', 'HUGEINT') OR data_type LIKE 'DECIMAL%' THEN 'NUMBER'
+        WHEN data_type = 'TIMESTAMP' THEN 'TIMESTAMP_NTZ'
+        WHEN data_type = 'TIMESTAMP WITH TIME ZONE' THEN 'TIMESTAMP_TZ'
+        ELSE data_type
+    END
+"""
+
+ResultMetadata = namedtuple("ResultMetadata", ["name", "type_code"])
+
+
+def translate_app_sql(sql: str) -> str:
+    sql = translate(sql)
+    for pattern, replacement in APP_SQL_REWRITES:
+        sql = pattern.sub(replacement, sql)
+    return sql
+
+
+def _connector_batch(batch: pa.RecordBatch) -> pa.Table:
+    """Upper-cased column names, NUMBER as int64/float64 and nested values as JSON text,
+    as the connector returns them."""
+    columns = []
+    for column in batch.columns:
+        if pa.types.is_nested(column.type):
+            column = pa.array(
+                [None if v is None else json.dumps(v, default=str) for v in column.to_pylist()], pa.string()
+            )
+        elif pa.types.is_decimal(column.type):
+            column = column.cast(pa.int64() if column.type.scale == 0 else pa.float64(), safe=False)
+        columns.append(column)
+    return pa.table(columns, names=[name.upper() for name in batch.schema.names])
+
+
+class LocalCursor:
+    """The connector cursor methods ``query_telemetry`` calls."""
+
+    def __init__(self, session: "AppSession"):
+        self._session = session
+        self._cursor = session.local.connection.cursor()
+        self._cursor.execute(f'USE "{session.local.database}"')
+        self.sfqid: Optional[str] = None
+        self.description: Optional[List[ResultMetadata]] = None
+
+    def execute(self, sql: str, params: Optional[Sequence[Any]] = None,
+                _statement_params: Optional[dict] = None) -> "LocalCursor":
+        self.sfqid = str(uuid4())
+        self._session.statements.append((sql, (_statement_params or {}).get("QUERY_TAG")))
+        self._cursor.execute(translate_app_sql(sql), params)
+        self.description = [ResultMetadata(d[0].upper(), d[1]) for d in self._cursor.description or []]
+        return self
+
+    def fetch_arrow_batches(self) -> Iterator[pa.Table]:
+        # Like the connector, an empty result yields no batches at all.
+        for batch in self._cursor.fetch_record_batch(ARROW_BATCH_ROWS):
+            if batch.num_rows:
+                yield _connector_batch(batch)
+
+    def close(self) -> None:
+        self._cursor.close()
+
+
+class LocalConnection:
+    def __init__(self, session: "AppSession"):
+        self._session = session
+
+    def cursor(self) -> LocalCursor:
+        return LocalCursor(self._session)
+
+
+class AppSession:
+    """Session for ``get_active_session()`` in the apps, over a ``LocalSession`` database."""
+
+    def __init__(self, local: LocalSession):
+        self.local = local
+        self.connection = LocalConnection(self)
+        self.statements: List[Tuple[str, Optional[str]]] = []
+        for macro in MACROS:
+            local.connection.execute(f'CREATE OR REPLACE MACRO "{local.database}".main.{macro}')
+        local.connection.execute(f'CREATE SCHEMA IF NOT EXISTS "{local.database}".{SHOW_SCHEMA}')
+        local.connection.execute(f"""
+            CREATE TABLE IF NOT EXISTS "{local.database}".{SHOW_SCHEMA}.STAGES (
+                created_on TIMESTAMP, name VARCHAR, database_name VARCHAR, schema_name VARCHAR,
+                url VARCHAR, type VARCHAR, comment VARCHAR
+            )
+        """)
+        self._create_catalog_views()
+
+    def _create_catalog_views(self) -> None:
+        db = self.local.database
+        hidden = f"('{CATALOG_SCHEMA}', '{SHOW_SCHEMA}')"
+        self.local.connection.execute(f'CREATE SCHEMA IF NOT EXISTS "{db}".{CATALOG_SCHEMA}')
+        self.local.connection.execute(f"""
+            CREATE OR REPLACE VIEW "{db}".{CATALOG_SCHEMA}.TABLES AS
+            SELECT
+                database_name AS table_catalog,
+                schema_name AS table_schema,
+                table_name,
+                'BASE TABLE' AS table_type,
+                estimated_size AS row_count,
+                estimated_size * column_count * 8 AS bytes,
+                CURRENT_TIMESTAMP AS created,
+                CURRENT_TIMESTAMP AS last_altered,
+                comment
+            FROM duckdb_tables()
+            WHERE database_name = '{db}' AND schema_name NOT IN {hidden}
+        """)
+        self.local.connection.execute(f"""
+            CREATE OR REPLACE VIEW "{db}".{CATALOG_SCHEMA}.COLUMNS AS
+            SELECT
+                database_name AS table_catalog,
+                schema_name AS table_schema,
+                table_name,
+                column_name,
+                column_index AS ordinal_position,
+                {SNOWFLAKE_TYPE} AS data_type,
+                CASE WHEN is_nullable THEN 'YES' ELSE 'NO' END AS is_nullable,
+                comment
+            FROM duckdb_columns()
+            WHERE database_name = '{db}' AND schema_name NOT IN {hidden}
+        """)
+
+    def sql(self, query: str, params: Optional[Sequence[Any]] = None) -> LocalDataFrame:
+        return self.local.sql(translate_app_sql(query), params)
+
+    def get_current_database(self) -> str:
+        return self.local.get_current_database()
+
+    def get_current_schema(self) -> str:
+        return self.local.get_current_schema()
+
+    def write_pandas(self, df: pd.DataFrame, table_name: str, **kwargs: Any) -> None:
+        self.local.write_pandas(df, table_name, **kwargs)
@@ -0,0 +1,572 @@
+# Copyright 2026 Snowflake Inc.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Rerun-latency harness for the Streamlit apps.
+
+Each app in ``streamlit/`` is driven headless through ``streamlit.testing.v1.AppTest``
+with ``get_active_session()`` patched to return a DuckDB-backed stand-in (see
+``app_session.py``) over synthesised fixture tables: subscribers, ad delivery events
+with their daily/monthly aggregates and rollups, clickstream, INGEST tables, the
+lineage view and current data watermarks (so no refresh is started). A scripted set
+of interactions is replayed per app, the same way a user would:
+
+- dashboard: search and filter subscribers, switch views, filter campaigns,
+  categories, personas and date windows;
+- segment builder: add 50 conditions one click at a time, edit the last one,
+  filter the palette with the full canvas on screen;
+- dataset explorer: click lineage nodes (the graph component is replaced by one
+  that returns the scripted click, since AppTest cannot drive the browser widget);
+- ingest explorer: pick tables to profile.
+
+The dashboard's Analytics Assistant view is not driven: it needs Cortex Analyst.
+
+For every interaction it reports the wall time of the rerun(s) it triggered, the
+statements sent to the session, the Streamlit cache hits of the final rerun and the
+peak process RSS. Caches are cleared between apps, so each app's first step is a
+cold start. With ``--baseline`` it fails on slower reruns beyond ``--tolerance`` and
+on any interaction that now sends more statements. The report goes to stdout; the
+apps' own Streamlit logging goes to stderr.
+
+    pip install -r scripts/benchmarks/requirements.txt
+    python scripts/benchmarks/bench_apps.py --subscribers 10k 100k --output apps.json
+    python scripts/benchmarks/bench_apps.py --subscribers 10k --baseline apps.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+from app_session import SHOW_SCHEMA, AppSession
+from bench_models import REPO_ROOT, SETUP_SQL, PeakRss, parse_rows
+from local_session import LocalSession
+
+STREAMLIT_DIR = REPO_ROOT / "streamlit"
+sys.path.append(str(STREAMLIT_DIR))
+
+import query_telemetry as telemetry  # noqa: E402
+from data_freshness import WATERMARK_TABLES  # noqa: E402
+
+
+APPS = {
+    "dashboard": "streamlit_dashboard.py",
+    "segment_builder": "streamlit_segment_builder.py",
+    "dataset_explorer": "streamlit_dataset_explorer.py",
+    "ingest_explorer": "streamlit_ingest_explorer.py",
+}
+DEFAULT_SUBSCRIBERS = ("10k", "100k")
+AD_EVENTS_PER_SUBSCRIBER = 4
+CLICKSTREAM_PER_SUBSCRIBER = 5
+CAMPAIGNS = 24
+DAYS = 90
+SEGMENT_CONDITIONS = 50
+
+TIERS = ["Ad-supported", "Premium", "Standard"]
+PERSONAS = [
+    "SPORTS_ENGAGED", "LIVE_EVENT_FOLLOWER", "FAMILY_HOUSEHOLD", "KNOWLEDGE_SEEKER",
+    "LIFESTYLE_MINDED", "REALITY_FAN", "PREMIUM_DRAMA", "GENERAL_STREAMER",
+]
+CONTENT_TYPES = ["series", "movie", "live", "short_form"]
+CONTENT_CATEGORIES = ["Sports", "Drama", "News", "Kids", "Reality", "Documentary"]
+DEVICES = ["Smart TV", "Mobile", "Web", "Tablet"]
+INCOME_LEVELS = ["Lower", "Mid", "Upper"]
+SEGMENTS = ["Low", "Medium", "High"]
+
+# Target -> source tables, as APPS.ACCOUNT_USAGE_CREATE_TABLE_AS_SELECT_VW reports them.
+LINEAGE = {
+    "HARMONIZED.AD_PERFORMANCE_DAILY_AGG": ["INGEST.ADS_EVENTS", "INGEST.AD_CAMPAIGNS"],
+    "HARMONIZED.AD_PERFORMANCE": ["HARMONIZED.AD_PERFORMANCE_DAILY_AGG"],
+    "HARMONIZED.AD_REACH_PERSONA_DAILY": ["INGEST.ADS_EVENTS", "ANALYSE.SUBSCRIBER_ATTRIBUTES"],
+    "ANALYSE.SUBSCRIBER_ATTRIBUTES": ["INGEST.SUBSCRIBER_PROFILES", "ANALYSE.FE_SUBSCRIBER_HISTORY"],
+    "ANALYSE.FE_SUBSCRIBER_HISTORY": ["INGEST.CLICKSTREAM_EVENTS"],
+    "ANALYSE.FE_CONTENT_VIEWS_DAILY": ["INGEST.CLICKSTREAM_EVENTS"],
+    "ANALYSE.ROLLUP_JOURNEYS": ["ANALYSE.FE_SUBSCRIBER_HISTORY", "ANALYSE.SUBSCRIBER_ATTRIBUTES"],
+    "ANALYSE.ROLLUP_AD_CATEGORY_DAILY": ["HARMONIZED.AD_PERFORMANCE_DAILY_AGG"],
+    "ANALYSE.ROLLUP_AD_CATEGORY_MONTHLY": ["HARMONIZED.AD_PERFORMANCE_DAILY_AGG"],
+}
+
+# SQL run after the frames are loaded, in order; derived tables follow their setup.sql definitions.
+DERIVED_TABLES = (
+    """CREATE OR REPLACE TABLE HARMONIZED.AD_PERFORMANCE_DAILY_AGG AS
+    SELECT
+        e.EVENT_DATE AS REPORT_DATE, c.CAMPAIGN_ID, c.ADVERTISER_NAME, c.VERTICAL, c.CONTENT_CATEGORY, c.RATE_TYPE,
+        COUNT(*) FILTER (WHERE e.EVENT_TYPE = 'impression') AS IMPRESSIONS,
+        COUNT(*) FILTER (WHERE e.EVENT_TYPE = 'click') AS CLICKS,
+        ROUND(COUNT(*) FILTER (WHERE e.EVENT_TYPE = 'click') / COUNT(*), 6) AS CTR,
+        ROUND(COUNT(*) FILTER (WHERE e.EVENT_TYPE = 'impression') * ANY_VALUE(c.BOOKED_CPM) / 1000, 4) AS SPEND,
+        ANY_VALUE(c.BOOKED_CPM) AS EFFECTIVE_CPM,
+        SUM(e.EVENT_WEIGHT) AS IMPRESSION_WEIGHT,
+        COUNT(DISTINCT e.UNIQUE_ID) AS OBSERVED_UNIQUE_SUBSCRIBERS,
+        ANY_VALUE(c.TARGET_PERSONAS) AS TARGET_PERSONAS,
+        ANY_VALUE(c.TARGET_DEVICES) AS TARGET_DEVICES,
+        HLL_EXPORT(LIST(DISTINCT e.UNIQUE_ID)) AS REACH_SKETCH
+    FROM INGEST.ADS_EVENTS e
+    JOIN INGEST.AD_CAMPAIGNS c ON c.CAMPAIGN_ID = e.CAMPAIGN_ID
+    GROUP BY 1, 2, 3, 4, 5, 6""",
+    """CREATE OR REPLACE TABLE HARMONIZED.AD_PERFORMANCE AS
+    SELECT
+        DATE_TRUNC('MONTH', REPORT_DATE)::DATE AS REPORT_MONTH, CAMPAIGN_ID, ADVERTISER_NAME, VERTICAL, CONTENT_CATEGORY, RATE_TYPE,
+        SUM(IMPRESSIONS) AS IMPRESSIONS, SUM(CLICKS) AS CLICKS, SUM(SPEND) AS SPEND,
+        COUNT(DISTINCT REPORT_DATE) AS ACTIVE_DAYS,
+        SUM(OBSERVED_UNIQUE_SUBSCRIBERS) AS OBSERVED_UNIQUE_SUBSCRIBERS,
+        HLL_EXPORT(HLL_COMBINE(HLL_IMPORT(REACH_SKETCH))) AS REACH_SKETCH
+    FROM HARMONIZED.AD_PERFORMANCE_DAILY_AGG
+    GROUP BY 1, 2, 3, 4, 5, 6""",
+    """CREATE OR REPLACE TABLE HARMONIZED.AD_REACH_PERSONA_DAILY AS
+    SELECT
+        e.EVENT_DATE AS REPORT_DATE, COALESCE(s.PERSONA, 'GENERAL_STREAMER') AS PERSONA,
+        COUNT(DISTINCT e.CAMPAIGN_ID) AS CAMPAIGN_COUNT,
+        COUNT(DISTINCT e.UNIQUE_ID) AS OBSERVED_UNIQUE_SUBSCRIBERS,
+        HLL_EXPORT(LIST(DISTINCT e.UNIQUE_ID)) AS REACH_SKETCH
+    FROM INGEST.ADS_EVENTS e
+    LEFT JOIN ANALYSE.SUBSCRIBER_ATTRIBUTES s ON s.UNIQUE_ID = e.UNIQUE_ID
+    GROUP BY 1, 2""",
+    """CREATE OR REPLACE TABLE ANALYSE.ROLLUP_AD_CATEGORY_DAILY AS
+    SELECT
+        REPORT_DATE, CONTENT_CATEGORY, COUNT(DISTINCT CAMPAIGN_ID) AS CAMPAIGN_COUNT,
+        SUM(IMPRESSIONS) AS IMPRESSIONS, SUM(CLICKS) AS CLICKS, SUM(SPEND) AS SPEND,
+        HLL_EXPORT(HLL_COMBINE(HLL_IMPORT(REACH_SKETCH))) AS REACH_SKETCH
+    FROM HARMONIZED.AD_PERFORMANCE_DAILY_AGG
+    GROUP BY 1, 2""",
+    """CREATE OR REPLACE TABLE ANALYSE.ROLLUP_AD_CATEGORY_MONTHLY AS
+    SELECT
+        DATE_TRUNC('MONTH', REPORT_DATE)::DATE AS REPORT_MONTH, CONTENT_CATEGORY, COUNT(DISTINCT CAMPAIGN_ID) AS CAMPAIGN_COUNT,
+        SUM(IMPRESSIONS) AS IMPRESSIONS, SUM(CLICKS) AS CLICKS, SUM(SPEND) AS SPEND,
+        HLL_EXPORT(HLL_COMBINE(HLL_IMPORT(REACH_SKETCH))) AS REACH_SKETCH
+    FROM HARMONIZED.AD_PERFORMANCE_DAILY_AGG
+    GROUP BY 1, 2""",
+    """CREATE OR REPLACE TABLE ANALYSE.ROLLUP_JOURNEYS AS
+    SELECT
+        s.PERSONA, s.TIER, COALESCE(s.PRIMARY_CONTENT_TYPE, 'unknown') AS PRIMARY_CONTENT_TYPE,
+        COUNT(*) AS SUBSCRIBERS,
+        SUM(h.CLICKSTREAM_EVENTS) AS CLICKSTREAM_EVENTS,
+        SUM(h.CLICKSTREAM_ACTIVE_DAYS) AS ACTIVE_DAYS,
+        SUM(h.BEHAVIOURAL_EVENTS) AS BEHAVIOURAL_EVENTS,
+        SUM(CASE WHEN h.CLICKSTREAM_ACTIVE_DAYS > 0 THEN h.CLICKSTREAM_EVENTS / h.CLICKSTREAM_ACTIVE_DAYS END) AS EVENTS_PER_ACTIVE_DAY_SUM,
+        COUNT(CASE WHEN h.CLICKSTREAM_ACTIVE_DAYS > 0 THEN 1 END) AS EVENTS_PER_ACTIVE_DAY_COUNT
+    FROM ANALYSE.FE_SUBSCRIBER_HISTORY h
+    JOIN ANALYSE.SUBSCRIBER_ATTRIBUTES s ON s.UNIQUE_ID = h.UNIQUE_ID
+    GROUP BY 1, 2, 3""",
+    """CREATE OR REPLACE TABLE ANALYSE.FE_CONTENT_VIEWS_DAILY AS
+    SELECT
+        EVENT_TS::DATE AS VIEW_DATE, CONTENT_TYPE, CONTENT_CATEGORY,
+        COUNT(*) AS VIEW_EVENTS, COUNT(DISTINCT UNIQUE_ID) AS VIEWERS
+    FROM INGEST.CLICKSTREAM_EVENTS
+    WHERE EVENT_TYPE = 'content_view'
+    GROUP BY 1, 2, 3""",
+)
+
+
+def _ddl(table: str) -> str:
+    """A table's column list from its CREATE TABLE in setup.sql."""
+    sql = SETUP_SQL.read_text()
+    start = sql.index(f"CREATE TABLE IF NOT EXISTS AME_AD_SALES_DEMO.{table} (")
+    return sql[sql.index("(", start):sql.index("\n)", start) + 2]
+
+
+def _load(local: LocalSession, schema: str, table: str, frame: pd.DataFrame) -> None:
+    local.connection.execute(f'CREATE SCHEMA IF NOT EXISTS "{schema}"')
+    local.connection.register("_fixture", frame)
+    local.connection.execute(f'CREATE OR REPLACE TABLE "{schema}".{table} AS SELECT * FROM _fixture')
+    local.connection.unregister("_fixture")
+
+
+def load_fixtures(local: LocalSession, subscribers: int, seed: int) -> None:
+    """Every table the scripted interactions read, synthesised at ``subscribers`` scale."""
+    rng = np.random.default_rng(seed)
+    today = date.today()
+    n = subscribers
+    ids = np.array([f"U{i:08d}" for i in range(n)])
+    tiers = rng.choice(TIERS, n, p=[0.5, 0.2, 0.3])
+    income = rng.choice(INCOME_LEVELS, n, p=[0.4, 0.45, 0.15])
+    churn = rng.beta(2.0, 6.0, n)
+    ltv = rng.gamma(2.0, 60.0, n)
+    age = rng.integers(18, 80, n)
+    profiles = pd.DataFrame({
+        "UNIQUE_ID": ids,
+        "PROFILE_ID": [f"SUB-{i:09d}" for i in range(n)],
+        "TIER": tiers,
+        "FULL_NAME": [f"Subscriber {i}" for i in range(n)],
+        "EMAIL": [f"subscriber{i}@example.com" for i in range(n)],
+        "SIGNUP_DATE": pd.to_datetime(today) - pd.to_timedelta(rng.integers(30, 1500, n), unit="D"),
+    })
+    history = pd.DataFrame({
+        "UNIQUE_ID": ids,
+        "CLICKSTREAM_EVENTS": rng.poisson(CLICKSTREAM_PER_SUBSCRIBER * 6, n),
+        "CLICKSTREAM_ACTIVE_DAYS": rng.integers(0, 30, n),
+        "BEHAVIOURAL_EVENTS": rng.poisson(12, n),
+    })
+    attributes = profiles.drop(columns=["SIGNUP_DATE"]).assign(
+        LAD_CODE=[f"E0600{i % 300:04d}" for i in range(n)],
+        AREA_NAME=[f"Area {i % 300}" for i in range(n)],
+        AGE=age,
+        AGE_BAND=pd.cut(age, [17, 24, 34, 44, 54, 64, 80], labels=["18-24", "25-34", "35-44", "45-54", "55-64", "65+"]).astype(str),
+        INCOME_LEVEL=income,
+        EDUCATION_LEVEL=rng.choice(["Secondary", "Degree", "Postgraduate"], n),
+        MARITAL_STATUS=rng.choice(["Single", "Married", "Divorced"], n),
+        FAMILY_STATUS=rng.choice(["No children", "Young children", "Older children"], n),
+        BEHAVIORAL_DIGITAL_MEDIA_CONSUMPTION_INDEX=rng.random(n),
+        BEHAVIORAL_FINANCIAL_INVESTMENT_INTEREST=rng.random(n),
+        PERSONA=rng.choice(PERSONAS, n),
+        PRIMARY_CONTENT_TAG=rng.choice(CONTENT_CATEGORIES, n),
+        CONTENT_VIEWS_COUNT=rng.poisson(40, n),
+        AVG_SITE_VISITS_PER_MONTH=rng.gamma(2.0, 5.0, n),
+        LOGIN_FREQUENCY_PER_WEEK=rng.gamma(2.0, 1.5, n),
+        TOTAL_EVENTS=history["CLICKSTREAM_EVENTS"] + history["BEHAVIOURAL_EVENTS"],
+        PRIMARY_CONTENT_TYPE=rng.choice(CONTENT_TYPES, n, p=[0.5, 0.22, 0.1, 0.18]),
+        WATCH_TIME_30=rng.gamma(2.0, 4.0 * 3600, n),
+        PREDICTED_CHURN_PROB=churn,
+        CHURN_RISK_SEGMENT=np.select([churn >= 0.5, churn >= 0.25], ["High", "Medium"], "Low"),
+        PREDICTED_LTV=ltv,
+        LTV_TARGET=ltv * rng.uniform(0.8, 1.2, n),
+        LTV_SEGMENT=rng.choice(SEGMENTS, n, p=[0.5, 0.35, 0.15]),
+    )
+    campaigns = pd.DataFrame({
+        "CAMPAIGN_ID": [f"CMP-{i:03d}" for i in range(CAMPAIGNS)],
+        "ADVERTISER_NAME": [f"Advertiser {i % 9}" for i in range(CAMPAIGNS)],
+        "VERTICAL": rng.choice(["Retail", "Auto", "Finance", "Travel", "FMCG"], CAMPAIGNS),
+        "CONTENT_CATEGORY": rng.choice(CONTENT_CATEGORIES, CAMPAIGNS),
+        "RATE_TYPE": rng.choice(["CPM", "CPC"], CAMPAIGNS, p=[0.8, 0.2]),
+        "BOOKED_CPM": rng.uniform(8.0, 30.0, CAMPAIGNS).round(2),
+        "TARGET_PERSONAS": [sorted(rng.choice(PERSONAS, rng.integers(1, 4), replace=False)) for _ in range(CAMPAIGNS)],
+        "TARGET_DEVICES": [sorted(rng.choice(DEVICES, rng.integers(1, 3), replace=False)) for _ in range(CAMPAIGNS)],
+    })
+    events = n * AD_EVENTS_PER_SUBSCRIBER
+    event_campaigns = rng.integers(0, CAMPAIGNS, events)
+    event_ts = pd.to_datetime(today) - pd.to_timedelta(rng.integers(0, DAYS * 86400, events), unit="s")
+    ads_events = pd.DataFrame({
+        "EVENT_ID": [f"AE{i:010d}" for i in range(events)],
+        "EVENT_TS": event_ts,
+        "EVENT_DATE": event_ts.date,
+        "CAMPAIGN_ID": campaigns["CAMPAIGN_ID"].to_numpy()[event_campaigns],
+        "CONTENT_CATEGORY": campaigns["CONTENT_CATEGORY"].to_numpy()[event_campaigns],
+        "EVENT_TYPE": rng.choice(["impression", "click"], events, p=[0.97, 0.03]),
+        "EVENT_WEIGHT": 1.0,
+        "UNIQUE_ID": ids[rng.integers(0, n, events)],
+        "DEVICE": rng.choice(DEVICES, events),
+    })
+    clicks = n * CLICKSTREAM_PER_SUBSCRIBER
+    clickstream = pd.DataFrame({
+        "UNIQUE_ID": ids[rng.integers(0, n, clicks)],
+        "EVENT_ID": [f"CE{i:010d}" for i in range(clicks)],
+        "SESSION_ID": [f"S{i:09d}" for i in rng.integers(0, clicks // 4 + 1, clicks)],
+        "EVENT_TS": pd.to_datetime(today) - pd.to_timedelta(rng.integers(0, DAYS * 86400, clicks), unit="s"),
+        "EVENT_TYPE": rng.choice(["page_view", "content_view", "search", "login"], clicks, p=[0.4, 0.4, 0.1, 0.1]),
+        "DEVICE": rng.choice(DEVICES, clicks),
+        "PAGE_PATH": rng.choice(["/home", "/browse", "/watch", "/search", "/account"], clicks),
+        "CONTENT_ID": [f"C{i:05d}" for i in rng.integers(0, 5000, clicks)],
+        "CONTENT_TYPE": rng.choice(CONTENT_TYPES, clicks),
+        "CONTENT_CATEGORY": rng.choice(CONTENT_CATEGORIES, clicks),
+        "ATTRIBUTES": [json.dumps({"position": int(p)}) for p in rng.integers(0, 20, clicks)],
+    })
+    lineage = pd.DataFrame({
+        "TARGET_TABLE_NAME": [f"{local.database}.{target}" for target in LINEAGE],
+        "SOURCE_TABLES": [[f"{local.database}.{s}" for s in sources] for sources in LINEAGE.values()],
+    })
+    watermarks = pd.DataFrame({
+        "FEED_NAME": [table.split(".")[1] for table in WATERMARK_TABLES],
+        "TARGET_TABLE": list(WATERMARK_TABLES),
+        "DATA_THROUGH": today,
+        "ANCHOR_DATE": today - timedelta(days=DAYS),
+        "UPDATED_TS": pd.Timestamp.now(),
+    })
+
+    for schema, table, frame in (
+        ("INGEST", "SUBSCRIBER_PROFILES", profiles),
+        ("INGEST", "AD_CAMPAIGNS", campaigns),
+        ("INGEST", "ADS_EVENTS", ads_events),
+        ("INGEST", "CLICKSTREAM_EVENTS", clickstream),
+        ("ANALYSE", "SUBSCRIBER_ATTRIBUTES", attributes),
+        ("ANALYSE", "FE_SUBSCRIBER_HISTORY", history),
+        ("ANALYSE", "DAILY_DATA_WATERMARKS", watermarks),
+        ("APPS", "ACCOUNT_USAGE_CREATE_TABLE_AS_SELECT_VW", lineage),
+    ):
+        _load(local, schema, table, frame)
+    local.connection.execute('ALTER TABLE "INGEST".CLICKSTREAM_EVENTS ALTER ATTRIBUTES TYPE JSON')
+    local.connection.execute('CREATE SCHEMA IF NOT EXISTS "HARMONIZED"')
+    for sql in DERIVED_TABLES:
+        local.sql(sql).collect()
+    local.sql(f"CREATE OR REPLACE TABLE APPS.APP_QUERY_TELEMETRY {_ddl('APPS.APP_QUERY_TELEMETRY')}").collect()
+    local.connection.execute(
+        f"INSERT INTO \"{local.database}\".{SHOW_SCHEMA}.STAGES VALUES (CURRENT_TIMESTAMP, 'S3_DATA', '{local.database}',"
+        " 'INGEST', 's3://sfquickstarts/sfguide_mea_subscriber_analytics/', 'EXTERNAL', 'Demo extracts')"
+    )
+
+
+# --- Scripted interactions ---------------------------------------------------
+
+@dataclass
+class Step:
+    name: str
+    action: Callable[[AppTest], int]  # drives the app and returns the reruns it triggered
+
+
+class ScriptedLineageGraph:
+    """Stands in for ``streamlit_agraph.agraph``: returns the node the script 'clicked'."""
+
+    def __init__(self) -> None:
+        self.clicked: Optional[str] = None
+        self.nodes: List[str] = []
+
+    def __call__(self, nodes, edges, config):
+        self.nodes = [node.id for node in nodes]
+        return self.clicked
+
+    def click(self, node: Optional[str]) -> Callable[[AppTest], int]:
+        def action(at: AppTest) -> int:
+            if node is not None and node not in self.nodes:
+                raise RuntimeError(f"{node} is not on the lineage graph ({len(self.nodes)} nodes)")
+            self.clicked = node
+            at.run()
+            return 1
+        return action
+
+
+def _widget(at: AppTest, kind: str, label: str):
+    for element in getattr(at, kind):
+        if element.label == label:
+            return element
+    raise RuntimeError(f"No {kind} labelled {label!r}")
+
+
+def _run(at: AppTest) -> int:
+    at.run()
+    return 1
+
+
+def _select(kind: str, label: str, pick: Callable[[List[Any]], Any]) -> Callable[[AppTest], int]:
+    def action(at: AppTest) -> int:
+        widget = _widget(at, kind, label)
+        widget.set_value(pick(widget.options)).run()
+        return 1
+    return action
+
+
+def _type(label: str, text: str) -> Callable[[AppTest], int]:
+    def action(at: AppTest) -> int:
+        _widget(at, "text_input", label).input(text).run()
+        return 1
+    return action
+
+
+def _pick_dates(kind: str, label: str, days: int) -> Callable[[AppTest], int]:
+    def action(at: AppTest) -> int:
+        _widget(at, kind, label).set_value((date.today() - timedelta(days=days), date.today())).run()
+        return 1
+    return action
+
+
+def _view(name: str) -> Callable[[AppTest], int]:
+    def action(at: AppTest) -> int:
+        at.sidebar.radio[0].set_value(name).run()
+        return 1
+    return action
+
+
+def dashboard_steps() -> List[Step]:
+    return [
+        Step("open Subscribers", _run),
+        Step("search subscribers", _type("Search (name, email, persona)", "subscriber1")),
+        Step("filter tier", _select("multiselect", "Subscription Tier", lambda options: options[:1])),
+        Step("filter persona", _select("multiselect", "Persona", lambda options: options[:2])),
+        Step("open Ad Performance", _view("Ad Performance")),
+        Step("filter campaigns", _select("multiselect", "Campaign", lambda options: options[:3])),
+        Step("filter content category", _select("multiselect", "Content Category", lambda options: options[:1])),
+        Step("set reporting window", _pick_dates("date_input", "Reporting Window", 60)),
+        Step("open Journeys & Ads", _view("Journeys & Ads")),
+        Step("filter journey persona", _select("multiselect", "Persona", lambda options: options[:2])),
+        Step("filter target persona", _select("multiselect", "Target Persona", lambda options: options[:2])),
+        Step("set delivery window", _pick_dates("date_input", "Delivery Window", 30)),
+        Step("rerun unchanged", _run),
+    ]
+
+
+def _segment_root(at: AppTest) -> str:
+    return at.session_state["segment_tree"]["id"]
+
+
+def _last_condition(at: AppTest) -> str:
+    return at.session_state["segment_tree"]["children"][-1]["id"]
+
+
+def _add_conditions(count: int) -> Callable[[AppTest], int]:
+    def action(at: AppTest) -> int:
+        for _ in range(count):
+            at.button(key=f"group-add-cond-{_segment_root(at)}").click().run()
+        added = len(at.session_state["segment_tree"]["children"])
+        if added != count:
+            raise RuntimeError(f"Expected {count} conditions on the canvas, found {added}")
+        return count
+    return action
+
+
+def segment_builder_steps() -> List[Step]:
+    def edit_value(at: AppTest) -> int:
+        at.text_input(key=f"val-{_last_condition(at)}").input("Premium").run()
+        return 1
+
+    def change_operator(at: AppTest) -> int:
+        operator = at.selectbox(key=f"op-{_last_condition(at)}")
+        operator.set_value(operator.options[1]).run()
+        return 1
+
+    def clear(at: AppTest) -> int:
+        at.button(key="clear-tree").click().run()
+        return 1
+
+    return [
+        Step("open builder", _run),
+        Step(f"add {SEGMENT_CONDITIONS} conditions", _add_conditions(SEGMENT_CONDITIONS)),
+        Step("edit last condition value", edit_value),
+        Step("change last condition operator", change_operator),
+        Step("filter palette", _type("Filter attributes", "income")),
+        Step("rerun unchanged", _run),
+        Step("clear conditions", clear),
+    ]
+
+
+def dataset_explorer_steps(graph: ScriptedLineageGraph) -> List[Step]:
+    return [
+        Step("open lineage graph", graph.click(None)),
+        Step("click AD_PERFORMANCE_DAILY_AGG", graph.click("HARMONIZED.AD_PERFORMANCE_DAILY_AGG")),
+        Step("click SUBSCRIBER_ATTRIBUTES", graph.click("ANALYSE.SUBSCRIBER_ATTRIBUTES")),
+        Step("click CLICKSTREAM_EVENTS", graph.click("INGEST.CLICKSTREAM_EVENTS")),
+        Step("click AD_PERFORMANCE_DAILY_AGG again", graph.click("HARMONIZED.AD_PERFORMANCE_DAILY_AGG")),
+        Step("deselect", graph.click(None)),
+    ]
+
+
+def ingest_explorer_steps() -> List[Step]:
+    table = lambda name: _select("selectbox", "Select a table to inspect", lambda options: name)
+    return [
+        Step("open INGEST overview", _run),
+        Step("select CLICKSTREAM_EVENTS", table("CLICKSTREAM_EVENTS")),
+        Step("rerun unchanged", _run),
+        Step("select SUBSCRIBER_PROFILES", table("SUBSCRIBER_PROFILES")),
+    ]
+
+
+# --- Measurement -------------------------------------------------------------
+
+def run_step(at: AppTest, session: AppSession, app: str, subscribers: int, step: Step) -> Dict[str, Any]:
+    before = len(session.statements)
+    with PeakRss() as rss:
+        started = time.perf_counter()
+        reruns = step.action(at)
+        wall = time.perf_counter() - started
+    if at.exception:
+        raise RuntimeError(f"{app} / {step.name}: {at.exception[0].message}")
+    rerun = at.session_state[telemetry.RERUN_STATE_KEY]
+    cache_calls = [r for r in rerun.records if r.kind == "cache"]
+    return {
+        "app": app,
+        "subscribers": subscribers,
+        "step": step.name,
+        "reruns": reruns,
+        "wall_s": round(wall, 3),
+        "ms_per_rerun": round(wall * 1000 / reruns, 1),
+        "statements": len(session.statements) - before,
+        "cache_hits": f"{sum(1 for r in cache_calls if r.cache_hit)}/{len(cache_calls)}",
+        "peak_rss_mb": round(rss.peak / 2 ** 20, 1),
+        "rss_growth_mb": round((rss.peak - rss.start) / 2 ** 20, 1),
+    }
+
+
+def run_app(app: str, session: AppSession, subscribers: int, timeout: float) -> List[Dict[str, Any]]:
+    # Every app starts cold, with the cached session pointing at this run's database.
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    graph = ScriptedLineageGraph()
+    steps = {
+        "dashboard": dashboard_steps,
+        "segment_builder": segment_builder_steps,
+        "dataset_explorer": lambda: dataset_explorer_steps(graph),
+        "ingest_explorer": ingest_explorer_steps,
+    }[app]()
+    at = AppTest.from_file(str(STREAMLIT_DIR / APPS[app]), default_timeout=timeout)
+    with mock.patch("snowflake.snowpark.context.get_active_session", return_value=session), \
+            mock.patch("streamlit_agraph.agraph", graph):
+        return [run_step(at, session, app, subscribers, step) for step in steps]
+
+
+def compare(cases: List[Dict[str, Any]], baseline: List[Dict[str, Any]], tolerance: float) -> List[str]:
+    """Flags slower reruns beyond tolerance and any interaction that sends more statements."""
+    key = lambda c: (c["app"], c["subscribers"], c["step"])
+    previous = {key(c): c for c in baseline}
+    regressions = []
+    for case in cases:
+        before = previous.get(key(case))
+        if not before:
+            continue
+        label = "/".join(str(p) for p in key(case))
+        if case["ms_per_rerun"] > before["ms_per_rerun"] * (1 + tolerance):
+            regressions.append(f"{label}: {before['ms_per_rerun']}ms -> {case['ms_per_rerun']}ms per rerun")
+        if case["statements"] > before["statements"]:
+            regressions.append(f"{label}: statements {before['statements']} -> {case['statements']}")
+        if case["peak_rss_mb"] > before["peak_rss_mb"] * (1 + tolerance):
+            regressions.append(f"{label}: peak RSS {before['peak_rss_mb']}MB -> {case['peak_rss_mb']}MB")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--subscribers", nargs="+", default=list(DEFAULT_SUBSCRIBERS), help="Fixture sizes, e.g. 10k 100k")
+    parser.add_argument("--apps", nargs="+", default=list(APPS), choices=list(APPS))
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--timeout", type=float, default=120.0, help="Seconds allowed per rerun")
+    parser.add_argument("--output", type=Path, help="Write results as JSON")
+    parser.add_argument("--baseline", type=Path, help="Previous --output file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative slowdown / RSS growth vs. baseline")
+    args = parser.parse_args(argv)
+
+    cases: List[Dict[str, Any]] = []
+    for subscribers in (parse_rows(s) for s in args.subscribers):
+        with tempfile.TemporaryDirectory() as workdir:
+            local = LocalSession(path=str(Path(workdir) / "bench.duckdb"))
+            session = AppSession(local)
+            started = time.perf_counter()
+            load_fixtures(local, subscribers, args.seed)
+            print(f"-- {subscribers:,} subscribers synthesised in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+            for app in args.apps:
+                cases.extend(run_app(app, session, subscribers, args.timeout))
+            local.close()
+
+    print(pd.DataFrame(cases).to_string(index=False))
+    if args.output:
+        args.output.write_text(json.dumps(cases, indent=2))
+    if args.baseline:
+        regressions = compare(cases, json.loads(args.baseline.read_text()), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,353 @@
+# Copyright 2026 Snowflake Inc.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Benchmark and evaluation harness for TRAIN_LINEAR_LTV_MODEL / TRAIN_LINEAR_CHURN_MODEL.
+
+Both wrap TRAIN_SUBSCRIBER_MODEL. Its body is extracted from ``scripts/sql/setup.sql``
+and its ``run(session, model_name, ...)`` handler is executed against a DuckDB-backed
+stand-in session (see ``local_session.py``). Feature tables are synthesised from the
+LAD distributions in ``scripts/data/lad_code_distributions.csv`` following the column
+definitions in FEATURE_ENGINEER_SUBSCRIBER_METRICS.
+
+For every table size and FIT_MODE the harness times a forced retrain and a follow-up
+incremental rescore. Before the rescore it changes one feature for a fixed fraction of
+subscribers (``--rescore-fraction``), which changes their feature hashes, and checks
+that exactly those rows are rescored. It reports wall time, peak RSS, rows/sec, the
+training metric and an independent quality metric computed from the scores table
+(RMSE for LTV, AUC for churn).
+
+    pip install -r scripts/benchmarks/requirements.txt
+    python scripts/benchmarks/bench_models.py --rows 10k 1m 10m --output results.json
+    python scripts/benchmarks/bench_models.py --rows 1m --baseline results.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import functools
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+import psutil
+
+from local_session import LocalSession
+
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+SETUP_SQL = REPO_ROOT / "scripts" / "sql" / "setup.sql"
+LAD_DISTRIBUTIONS = REPO_ROOT / "scripts" / "data" / "lad_code_distributions.csv"
+
+TRAINER = "TRAIN_SUBSCRIBER_MODEL"
+# "model" is the MODEL_NAME each wrapper passes to TRAINER; "touch" is the feature
+# bumped on the subscribers changed before each rescore.
+PROCEDURES = {
+    "TRAIN_LINEAR_LTV_MODEL": {
+        "model": "LTV",
+        "features": "FE_SUBSCRIBER_LTV_FEATURES",
+        "scores": "FE_SUBSCRIBER_LTV_SCORES",
+        "touch": "AVG_SITE_VISITS_PER_MONTH",
+    },
+    "TRAIN_LINEAR_CHURN_MODEL": {
+        "model": "CHURN",
+        "features": "FE_SUBSCRIBER_CHURN_FEATURES",
+        "scores": "FE_SUBSCRIBER_CHURN_RISK",
+        "touch": "VISIT_FREQUENCY",
+    },
+}
+FIT_MODES = ("SERVER", "BATCH")
+DEFAULT_ROWS = ("10k", "1m", "10m")
+DEFAULT_RESCORE_FRACTION = 0.01
+CHUNK_ROWS = 1_000_000
+RSS_SAMPLE_SECONDS = 0.02
+
+# Tier order follows the DENSE_RANK() encoding in FEATURE_ENGINEER_SUBSCRIBER_METRICS:
+# Ad-supported, Premium, Standard.
+TIER_MIX = {"Lower": [0.55, 0.15, 0.30], "Mid": [0.35, 0.30, 0.35]}
+TIER_MONTHLY_VALUE = np.array([5.0, 15.0, 10.0])
+
+
+def parse_rows(value: str) -> int:
+    value = value.strip().lower()
+    multiplier = {"k": 1_000, "m": 1_000_000}.get(value[-1], 1)
+    return int(float(value.rstrip("km")) * multiplier)
+
+
+def load_procedure(name: str) -> Callable[..., Dict[str, Any]]:
+    """Exec the Python body of a CREATE PROCEDURE statement and return its handler."""
+    sql = SETUP_SQL.read_text()
+    start = sql.index(f"CREATE OR REPLACE PROCEDURE ANALYSE.{name}(")
+    body_start = sql.index("$$\n", start) + 3
+    body_end = sql.index("$$;", body_start)
+    namespace: Dict[str, Any] = {"__name__": f"procedure_{name.lower()}"}
+    exec(compile(sql[body_start:body_end], f"{SETUP_SQL}:{name}", "exec"), namespace)
+    return namespace["run"]
+
+
+def synthesise_features(lad: pd.DataFrame, n: int, rng: np.random.Generator):
+    """Returns (ltv, churn) feature frames for n subscribers drawn from the LAD mix."""
+    weights = lad["TOTAL_POPULATION"].to_numpy(dtype=float)
+    area = lad.iloc[rng.choice(len(lad), size=n, p=weights / weights.sum())]
+
+    income = area["INCOME_LEVEL"].to_numpy()
+    income_index = (income == "Mid").astype(float)
+    tier_index = np.where(
+        income == "Mid",
+        rng.choice(3, size=n, p=TIER_MIX["Mid"]),
+        rng.choice(3, size=n, p=TIER_MIX["Lower"]),
+    )
+    youth = (area["ADOLESCENSE_TEEN_YEARS"] + area["YOUNG_ADULTS_EARLY"]).to_numpy()
+    digital = np.clip(area["BEHAVIORAL_DIGITAL_MEDIA_CONSUMPTION_INDEX"].to_numpy() + rng.normal(0, 1, n), 0, None)
+
+    visits = rng.gamma(2.0, 1.5 * digital * (1 + youth))
+    logins = rng.poisson(visits / 4 * 0.8).astype(float)
+    active_p = np.clip(visits / 30, 0.05, 0.95)
+    mau = rng.binomial(6, active_p)
+    mav = rng.binomial(6, active_p * 0.8)
+    ad_load = np.where(tier_index == 0, 25.0, 5.0)
+    impressions = rng.poisson(visits * 6 * ad_load)
+    clicks = rng.binomial(impressions, rng.beta(2, 150, n))
+    monetization = impressions * 0.012 + clicks * 0.35
+    engagement = np.divide(clicks, impressions, out=np.zeros(n), where=impressions > 0)
+    watch_seconds = rng.gamma(2.0, visits * 900)
+    sessions = rng.poisson(visits * 3.6)
+
+    ltv_target = (
+        TIER_MONTHLY_VALUE[tier_index] * np.maximum(mau, 1)
+        + monetization
+        + np.minimum(watch_seconds / 7200.0, 50.0)
+        + np.minimum(sessions * 0.25, 25.0)
+        + mav
+    )
+    ltv = pd.DataFrame({
+        "TIER_INDEX": tier_index.astype(float),
+        "INCOME_INDEX": income_index,
+        "DIGITAL_MEDIA_INDEX": digital,
+        "AVG_SITE_VISITS_PER_MONTH": visits,
+        "LOGIN_FREQUENCY_PER_WEEK": logins,
+        "AD_IMPRESSIONS_180": impressions.astype(float),
+        "AD_CLICKS_180": clicks.astype(float),
+        "MONETIZATION_180": monetization,
+        "ENGAGEMENT_RATIO": engagement,
+        "LTV_TARGET": ltv_target,
+    })
+
+    # Inactivity is driven by engagement; the label is recency > 30 days as in the warehouse,
+    # but RECENCY_DAYS is observed with reporting lag so the classes are not trivially separable.
+    recency = rng.exponential(90 / (1 + logins + 0.1 * visits))
+    impressions_30 = rng.poisson(impressions / 6)
+    churn = pd.DataFrame({
+        "TIER_INDEX": tier_index.astype(float),
+        "INCOME_INDEX": income_index,
+        "DIGITAL_MEDIA_INDEX": digital,
+        "VISIT_FREQUENCY": visits,
+        "LOGIN_FREQUENCY": logins,
+        "AD_IMPRESSIONS_30": impressions_30.astype(float),
+        "AD_CLICKS_30": rng.binomial(impressions_30, np.divide(clicks, np.maximum(impressions, 1))).astype(float),
+        "NEGATIVE_EVENT_RATE": rng.beta(1, 20, n),
+        "RECENCY_DAYS": np.floor(np.clip(recency + rng.normal(0, 10, n), 0, None)),
+        "MONETIZATION_90": monetization / 2,
+        "CHURN_LABEL": (recency > 30).astype(float),
+    })
+    return ltv, churn
+
+
+def load_feature_tables(session: LocalSession, rows: int, seed: int) -> None:
+    lad = pd.read_csv(LAD_DISTRIBUTIONS)
+    rng = np.random.default_rng(seed)
+    created = set()
+    for offset in range(0, rows, CHUNK_ROWS):
+        size = min(CHUNK_ROWS, rows - offset)
+        frames = dict(zip(("FE_SUBSCRIBER_LTV_FEATURES", "FE_SUBSCRIBER_CHURN_FEATURES"), synthesise_features(lad, size, rng)))
+        for table, frame in frames.items():
+            frame.insert(0, "ROW_ID", np.arange(offset, offset + size))
+            session.connection.register("_chunk", frame)
+            select = "SELECT 'U' || ROW_ID AS UNIQUE_ID, 'P' || ROW_ID AS PROFILE_ID, * EXCLUDE (ROW_ID) FROM _chunk"
+            if table in created:
+                session.connection.execute(f'INSERT INTO "ANALYSE".{table} {select}')
+            else:
+                session.connection.execute(f'CREATE OR REPLACE TABLE "ANALYSE".{table} AS {select}')
+                created.add(table)
+            session.connection.unregister("_chunk")
+
+
+class PeakRss:
+    """Samples the process RSS on a background thread while the block runs."""
+
+    def __enter__(self) -> "PeakRss":
+        self._process = psutil.Process(os.getpid())
+        self.start = self.peak = self._process.memory_info().rss
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def _sample(self) -> None:
+        while not self._stop.wait(RSS_SAMPLE_SECONDS):
+            self.peak = max(self.peak, self._process.memory_info().rss)
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self._process.memory_info().rss)
+
+
+def evaluate(session: LocalSession, procedure: str) -> Dict[str, float]:
+    """Quality metrics recomputed from the scores table rather than trusted from run()."""
+    scores = f"ANALYSE.{PROCEDURES[procedure]['scores']}"
+    if procedure == "TRAIN_LINEAR_LTV_MODEL":
+        row = session.sql(f"SELECT SQRT(AVG(RESIDUAL * RESIDUAL)) AS RMSE FROM {scores}").collect()[0]
+        return {"rmse": float(row["RMSE"])}
+    # Rank-sum (Mann-Whitney) AUC with average ranks for ties.
+    row = session.sql(f"""
+        WITH ranked AS (
+            SELECT Y, AVG(RN) OVER (PARTITION BY P) AS R
+            FROM (
+                SELECT CHURN_LABEL AS Y, PREDICTED_CHURN_PROB AS P,
+                       ROW_NUMBER() OVER (ORDER BY PREDICTED_CHURN_PROB) AS RN
+                FROM {scores}
+            )
+        )
+        SELECT
+            (SUM(CASE WHEN Y = 1 THEN R END) - SUM(Y) * (SUM(Y) + 1) / 2) / NULLIF(SUM(Y) * (COUNT(*) - SUM(Y)), 0) AS AUC,
+            AVG(Y) AS POSITIVE_RATE
+        FROM ranked
+    """).collect()[0]
+    return {"auc": float(row["AUC"] or 0.0), "positive_rate": float(row["POSITIVE_RATE"])}
+
+
+def touch_features(session: LocalSession, procedure: str, fraction: float) -> int:
+    """Changes one feature of every 1/fraction-th subscriber; returns the rows updated.
+
+    The procedures detect changed subscribers by a hash of their features, so this is
+    what an upstream feature refresh looks like to the incremental rescore.
+    """
+    spec = PROCEDURES[procedure]
+    stride = max(1, round(1 / fraction))
+    return session.connection.execute(f"""
+        UPDATE "ANALYSE".{spec['features']}
+        SET {spec['touch']} = {spec['touch']} + 1
+        WHERE CAST(SUBSTR(UNIQUE_ID, 2) AS BIGINT) % {stride} = 0
+    """).fetchone()[0]
+
+
+def run_case(session: LocalSession, run: Callable, procedure: str, rows: int, fit_mode: str, refresh_mode: str,
+             rescore_fraction: float = DEFAULT_RESCORE_FRACTION) -> Dict[str, Any]:
+    changed = touch_features(session, procedure, rescore_fraction) if refresh_mode == "AUTO" else None
+    with PeakRss() as rss:
+        started = time.perf_counter()
+        result = run(session, fit_mode=fit_mode, refresh_mode=refresh_mode)
+        wall = time.perf_counter() - started
+    if changed is not None and (result.get("retrain_reason") or result.get("rows_rescored") != changed):
+        raise RuntimeError(
+            f"{procedure}/{fit_mode}: changed {changed:,} subscribers but rescored {result.get('rows_rescored')} "
+            f"(retrain_reason={result.get('retrain_reason')})"
+        )
+    metric_key = next((k for k in result if k.startswith("training_")), None)
+    case = {
+        "procedure": procedure,
+        "rows": rows,
+        "fit_mode": fit_mode,
+        "phase": "retrain" if refresh_mode == "RETRAIN" else "rescore",
+        "wall_s": round(wall, 3),
+        "peak_rss_mb": round(rss.peak / 2 ** 20, 1),
+        "rss_growth_mb": round((rss.peak - rss.start) / 2 ** 20, 1),
+        "rows_per_s": round(rows / wall) if wall else None,
+        "iterations": result.get("iterations"),
+        "rows_changed": changed,
+        "rows_rescored": result.get("rows_rescored"),
+        "training_metric": result.get(metric_key),
+    }
+    case.update(evaluate(session, procedure))
+    return case
+
+
+def compare(cases: List[Dict[str, Any]], baseline: List[Dict[str, Any]], tolerance: float) -> List[str]:
+    """Flags slowdowns beyond tolerance and quality regressions against a previous run."""
+    key = lambda c: (c["procedure"], c["rows"], c["fit_mode"], c["phase"])
+    previous = {key(c): c for c in baseline}
+    regressions = []
+    for case in cases:
+        before = previous.get(key(case))
+        if not before:
+            continue
+        label = "/".join(str(p) for p in key(case))
+        if case["wall_s"] > before["wall_s"] * (1 + tolerance):
+            regressions.append(f"{label}: wall time {before['wall_s']}s -> {case['wall_s']}s")
+        if case["peak_rss_mb"] > before["peak_rss_mb"] * (1 + tolerance):
+            regressions.append(f"{label}: peak RSS {before['peak_rss_mb']}MB -> {case['peak_rss_mb']}MB")
+        if "rmse" in case and case["rmse"] > before.get("rmse", float("inf")) * 1.01:
+            regressions.append(f"{label}: RMSE {before['rmse']:.4f} -> {case['rmse']:.4f}")
+        if "auc" in case and case["auc"] < before.get("auc", 0.0) - 0.01:
+            regressions.append(f"{label}: AUC {before['auc']:.4f} -> {case['auc']:.4f}")
+    return regressions
+
+
+def print_table(cases: List[Dict[str, Any]]) -> None:
+    columns = ["procedure", "rows", "fit_mode", "phase", "wall_s", "peak_rss_mb", "rows_per_s", "iterations", "rows_changed", "rows_rescored", "training_metric", "rmse", "auc"]
+    frame = pd.DataFrame(cases).reindex(columns=columns)
+    print(frame.to_string(index=False, na_rep="", float_format=lambda v: f"{v:.4f}"))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", nargs="+", default=list(DEFAULT_ROWS), help="Feature table sizes, e.g. 10k 1m 10m")
+    parser.add_argument("--fit-modes", nargs="+", default=list(FIT_MODES), choices=FIT_MODES)
+    parser.add_argument("--procedures", nargs="+", default=list(PROCEDURES), choices=list(PROCEDURES))
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--rescore-fraction", type=float, default=DEFAULT_RESCORE_FRACTION,
+                        help="Fraction of subscribers whose features change before each rescore")
+    parser.add_argument("--memory-limit", default=None, help="DuckDB memory_limit, e.g. 2GB")
+    parser.add_argument("--output", type=Path, help="Write results as JSON")
+    parser.add_argument("--baseline", type=Path, help="Previous --output file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative slowdown / RSS growth vs. baseline")
+    args = parser.parse_args(argv)
+
+    trainer = load_procedure(TRAINER)
+    handlers = {name: functools.partial(trainer, model_name=PROCEDURES[name]["model"]) for name in args.procedures}
+    cases: List[Dict[str, Any]] = []
+    for rows in (parse_rows(r) for r in args.rows):
+        with tempfile.TemporaryDirectory() as workdir:
+            session = LocalSession(path=str(Path(workdir) / "bench.duckdb"), memory_limit=args.memory_limit)
+            started = time.perf_counter()
+            load_feature_tables(session, rows, args.seed)
+            print(f"-- {rows:,} rows synthesised in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+            for procedure, run in handlers.items():
+                for fit_mode in args.fit_modes:
+                    for refresh_mode in ("RETRAIN", "AUTO"):
+                        cases.append(run_case(session, run, procedure, rows, fit_mode, refresh_mode, args.rescore_fraction))
+            session.close()
+
+    print_table(cases)
+    if args.output:
+        args.output.write_text(json.dumps(cases, indent=2))
+    if args.baseline:
+        regressions = compare(cases, json.loads(args.baseline.read_text()), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,190 @@
+# Copyright 2026 Snowflake Inc.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Throughput harness for the SEGMENT_RECOMMENDATIONS procedure.
+
+The procedure body is extracted from ``scripts/sql/setup.sql`` and run against the
+DuckDB-backed stand-in session (see ``local_session.py``) in its STUB LLM mode, with
+the stub response routed through a DuckDB Python function that sleeps
+``--latency-ms`` per call, so LLM time is simulated rather than billed.
+SUBSCRIBER_ATTRIBUTES is synthesised with the tier, persona, content, income,
+watch-time, churn and LTV mix the buckets are drawn from.
+
+For every segment size the harness runs a cold call (empty cache), a warm call
+(same segment, every bucket cached) and an overlapping segment (half new members),
+and reports wall time, members/sec, buckets, LLM calls, cache hits and the calls a
+per-subscriber GET_SUBSCRIBER_RECOMMENDATIONS loop would have made. It fails if the
+STUB runs left any cache rows keyed on the Cortex model.
+
+    pip install -r scripts/benchmarks/requirements.txt
+    python scripts/benchmarks/bench_recommendations.py --members 10k 100k --latency-ms 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from bench_models import SETUP_SQL, PeakRss, load_procedure, parse_rows
+from local_session import LocalSession
+
+
+PROCEDURE = "SEGMENT_RECOMMENDATIONS"
+TABLES = ("RECOMMENDATION_CACHE", "SEGMENT_RECOMMENDATIONS")
+DEFAULT_MEMBERS = ("10k", "100k")
+AS_OF_DATE = "2026-03-31"
+
+TIERS = ["Ad-supported", "Premium", "Standard"]
+PERSONAS = [
+    "SPORTS_ENGAGED", "LIVE_EVENT_FOLLOWER", "FAMILY_HOUSEHOLD", "KNOWLEDGE_SEEKER",
+    "LIFESTYLE_MINDED", "REALITY_FAN", "PREMIUM_DRAMA", "GENERAL_STREAMER",
+]
+CONTENT_TYPES = ["series", "movie", "live", "short_form"]
+INCOME_LEVELS = ["Lower", "Mid"]
+SEGMENTS = ["Low", "Medium", "High"]
+
+
+def create_tables(session: LocalSession) -> None:
+    """The procedure's tables, from their DDL in setup.sql (minus CLUSTER BY)."""
+    sql = SETUP_SQL.read_text()
+    for table in TABLES:
+        start = sql.index(f"CREATE TABLE IF NOT EXISTS AME_AD_SALES_DEMO.ANALYSE.{table} (")
+        end = sql.index("\n)", start) + 2
+        session.sql(f"CREATE OR REPLACE TABLE ANALYSE.{table} {sql[sql.index('(', start):end]}").collect()
+
+
+def load_fixtures(session: LocalSession, members: int, seed: int) -> None:
+    """SUBSCRIBER_ATTRIBUTES for 1.5x members, and two segments sharing half their members."""
+    rng = np.random.default_rng(seed)
+    n = members + members // 2
+    attributes = pd.DataFrame({
+        "UNIQUE_ID": [f"U{i}" for i in range(n)],
+        "PROFILE_ID": [f"SUB-{i:09d}" for i in range(n)],
+        "TIER": rng.choice(TIERS, n, p=[0.5, 0.2, 0.3]),
+        "PERSONA": rng.choice(PERSONAS, n),
+        "PRIMARY_CONTENT_TYPE": rng.choice(CONTENT_TYPES, n, p=[0.5, 0.22, 0.1, 0.18]),
+        "INCOME_LEVEL": rng.choice(INCOME_LEVELS, n),
+        "WATCH_TIME_30": rng.gamma(2.0, 4.0 * 3600, n),
+        "CHURN_RISK_SEGMENT": rng.choice(SEGMENTS, n, p=[0.6, 0.25, 0.15]),
+        "LTV_SEGMENT": rng.choice(SEGMENTS, n, p=[0.5, 0.35, 0.15]),
+    })
+    ids = attributes["UNIQUE_ID"]
+    membership = pd.concat([
+        pd.DataFrame({"SEGMENT_ID": "bench-a", "UNIQUE_ID": ids[:members]}),
+        pd.DataFrame({"SEGMENT_ID": "bench-b", "UNIQUE_ID": ids[members // 2:n]}),
+    ])
+    membership["AS_OF_DATE"] = pd.Timestamp(AS_OF_DATE).date()
+    for table, frame in (("SUBSCRIBER_ATTRIBUTES", attributes), ("SEGMENT_MEMBERS", membership)):
+        session.connection.register("_fixture", frame)
+        session.connection.execute(f'CREATE OR REPLACE TABLE "ANALYSE".{table} AS SELECT * FROM _fixture')
+        session.connection.unregister("_fixture")
+
+
+def stub_llm(session: LocalSession, run: Callable, latency_ms: float) -> Dict[str, int]:
+    """Points the procedure's STUB mode at a DuckDB function that sleeps per call."""
+    calls = {"count": 0}
+
+    def complete(model: str, prompt: str) -> str:
+        calls["count"] += 1
+        time.sleep(latency_ms / 1000.0)
+        return f"[{model}] {len(prompt)}-character prompt answered"
+
+    session.connection.create_function("STUB_COMPLETE", complete, ["VARCHAR", "VARCHAR"], "VARCHAR", side_effects=True)
+    run.__globals__["LLM_SQL"]["STUB"] = "STUB_COMPLETE('{model}', PROMPT)"
+    return calls
+
+
+def cortex_cache_rows(session: LocalSession, run: Callable) -> int:
+    """Cache rows a CORTEX-mode run would serve; STUB runs must not write any."""
+    return int(session.sql(
+        "SELECT COUNT(*) AS C FROM ANALYSE.RECOMMENDATION_CACHE WHERE MODEL = ?",
+        params=[run.__globals__["CACHE_MODEL"]["CORTEX"]],
+    ).collect()[0]["C"])
+
+
+def run_case(session: LocalSession, run: Callable, calls: Dict[str, int], segment_id: str, phase: str,
+             members: int, latency_ms: float) -> Dict[str, Any]:
+    before = calls["count"]
+    with PeakRss() as rss:
+        started = time.perf_counter()
+        result = run(session, segment_id, None, "retention", "STUB")
+        wall = time.perf_counter() - started
+    written = session.sql(f"""
+        SELECT COUNT(*) AS C FROM ANALYSE.SEGMENT_RECOMMENDATIONS
+        WHERE SEGMENT_ID = '{segment_id}' AND RECOMMENDATION IS NOT NULL
+    """).collect()[0]["C"]
+    return {
+        "members": members,
+        "phase": phase,
+        "wall_s": round(wall, 3),
+        "members_per_s": round(result["members"] / wall) if wall else None,
+        "peak_rss_mb": round(rss.peak / 2 ** 20, 1),
+        "buckets": result["buckets"],
+        "llm_calls": result["llm_calls"],
+        "stub_calls": calls["count"] - before,
+        "cache_hits": result["cache_hits"],
+        "per_subscriber_calls": result["members"],
+        "simulated_llm_s": round((calls["count"] - before) * latency_ms / 1000.0, 3),
+        "rows_written": int(written),
+        "cortex_cache_rows": cortex_cache_rows(session, run),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--members", nargs="+", default=list(DEFAULT_MEMBERS), help="Segment sizes, e.g. 10k 100k")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Simulated latency per LLM call")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", type=Path, help="Write results as JSON")
+    args = parser.parse_args(argv)
+
+    run = load_procedure(PROCEDURE)
+    cases: List[Dict[str, Any]] = []
+    for members in (parse_rows(m) for m in args.members):
+        with tempfile.TemporaryDirectory() as workdir:
+            session = LocalSession(path=str(Path(workdir) / "bench.duckdb"))
+            load_fixtures(session, members, args.seed)
+            create_tables(session)
+            calls = stub_llm(session, run, args.latency_ms)
+            for segment_id, phase in (("bench-a", "cold"), ("bench-a", "warm"), ("bench-b", "overlap")):
+                cases.append(run_case(session, run, calls, segment_id, phase, members, args.latency_ms))
+            session.close()
+
+    frame = pd.DataFrame(cases)
+    print(frame.to_string(index=False))
+    failed = frame[
+        (frame["stub_calls"] != frame["llm_calls"])
+        | (frame["rows_written"] != frame["per_subscriber_calls"])
+        | (frame["cortex_cache_rows"] != 0)
+    ]
+    if args.output:
+        args.output.write_text(json.dumps(cases, indent=2))
+    if not failed.empty:
+        print("Stub calls or written rows do not match the procedure's report, or STUB wrote CORTEX cache rows.", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+# Copyright 2026 Snowflake Inc.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""DuckDB-backed stand-in for the subset of the Snowpark Session API used by the
+Python stored procedures in ``scripts/sql/setup.sql``.
+
+It covers ``sql(...)`` (with qmark ``params``), ``table(...)``, ``select``,
+``collect``, ``to_pandas``, ``to_pandas_batches``, ``write_pandas`` and the current
+database/schema getters, and rewrites the handful of Snowflake SQL spellings the
+procedures rely on into their DuckDB equivalents. It is a benchmarking aid, not a
+Snowflake emulator.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import duckdb
+import pandas as pd
+
+
+# (pattern, replacement) pairs applied in order to every statement.
+SQL_REWRITES = [
+    # ANALYSE is a reserved word in DuckDB.
+    (re.compile(r'(?<!["\w])ANALYSE\.'), '"ANALYSE".'),
+    (re.compile(r'\bCURRENT_TIMESTAMP\(\)', re.I), 'CURRENT_TIMESTAMP'),
+    (re.compile(r'\bCURRENT_DATE\(\)', re.I), 'CURRENT_DATE'),
+    (re.compile(r'\bTIMESTAMP_NTZ\b', re.I), 'TIMESTAMP'),
+    (re.compile(r'\bTIMESTAMP_TZ\b', re.I), 'TIMESTAMPTZ'),
+    # Snowflake FLOAT is double precision; DuckDB FLOAT is single.
+    (re.compile(r'\bFLOAT\b'), 'DOUBLE'),
+    (re.compile(r'\bNUMBER\b(?!\s*\()'), 'DECIMAL(38,0)'),
+    (re.compile(r'\bVARIANT\b'), 'JSON'),
+    (re.compile(r'\bPARSE_JSON\('), 'json('),
+    # Every statement runs on its own cursor, which cannot see another cursor's temp tables.
+    (re.compile(r'\bTEMPORARY TABLE\b', re.I), 'TABLE'),
+]
+
+
+def translate(sql: str) -> str:
+    for pattern, replacement in SQL_REWRITES:
+        sql = pattern.sub(replacement, sql)
+    return sql
+
+
+class Row(tuple):
+    """Tuple with Snowpark-style access by position, column name or attribute."""
+
+    def __new__(cls, names: Sequence[str], values: Sequence[Any]):
+        row = super().__new__(cls, values)
+        row._names = [n.upper() for n in names]
+        return row
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return tuple.__getitem__(self, self._names.index(key.upper()))
+        return tuple.__getitem__(self, key)
+
+    def __getattr__(self, key):
+        try:
+            return self[key]
+        except ValueError:
+            raise AttributeError(key) from None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return dict(zip(self._names, self))
+
+
+class LocalDataFrame:
+    """Lazy query; every action opens its own cursor so results can be streamed
+    while the procedure issues other statements."""
+
+    def __init__(self, session: "LocalSession", sql: str, params: Optional[Sequence[Any]] = None):
+        self._session = session
+        self._sql = sql
+        self._params = params
+
+    def _execute(self) -> duckdb.DuckDBPyConnection:
+        cursor = self._session.connection.cursor()
+        cursor.execute(f'USE "{self._session.database}"')
+        return cursor.execute(translate(self._sql), self._params)
+
+    def select(self, columns: Sequence[str]) -> "LocalDataFrame":
+        projection = ", ".join(f'"{c}"' for c in columns)
+        return LocalDataFrame(self._session, f"SELECT {projection} FROM ({self._sql})", self._params)
+
+    def collect(self) -> List[Row]:
+        cursor = self._execute()
+        names = [d[0] for d in cursor.description] if cursor.description else []
+        return [Row(names, values) for values in cursor.fetchall()]
+
+    def to_pandas(self) -> pd.DataFrame:
+        pdf = self._execute().df()
+        pdf.columns = [c.upper() for c in pdf.columns]
+        return pdf
+
+    def to_pandas_batches(self, batch_size: int = 100_000) -> Iterator[pd.DataFrame]:
+        cursor = self._execute()
+        vectors = max(1, batch_size // duckdb.__standard_vector_size__)
+        while True:
+            batch = cursor.fetch_df_chunk(vectors)
+            if batch is None or batch.empty:
+                return
+            batch.columns = [c.upper() for c in batch.columns]
+            yield batch
+
+
+class LocalSession:
+    """In-process session over a DuckDB database (in memory, or on disk for large runs)."""
+
+    def __init__(
+        self,
+        database: str = "AME_AD_SALES_DEMO",
+        schema: str = "ANALYSE",
+        path: str = ":memory:",
+        memory_limit: Optional[str] = None,
+    ):
+        self.database = database
+        self.schema = schema
+        self.connection = duckdb.connect()
+        if memory_limit:
+            self.connection.execute(f"SET memory_limit = '{memory_limit}'")
+        self.connection.execute(f"ATTACH '{path}' AS \"{database}\"")
+        self.connection.execute(f'USE "{database}"')
+        self.connection.execute(f'CREATE SCHEMA IF NOT EXISTS "{schema}"')
+
+    def sql(self, query: str, params: Optional[Sequence[Any]] = None) -> LocalDataFrame:
+        return LocalDataFrame(self, query, params)
+
+    def table(self, name: str) -> LocalDataFrame:
+        return LocalDataFrame(self, f"SELECT * FROM {name}")
+
+    def get_current_database(self) -> str:
+        return f'"{self.database}"'
+
+    def get_current_schema(self) -> str:
+        return f'"{self.schema}"'
+
+    def write_pandas(
+        self,
+        df: pd.DataFrame,
+        table_name: str,
+        database: Optional[str] = None,
+        schema: Optional[str] = None,
+        auto_create_table: bool = False,
+        overwrite: bool = False,
+        **_: Any,
+    ) -> None:
+        target = f'"{database or self.database}"."{schema or self.schema}"."{table_name}"'
+        self.connection.register("_write_pandas_df", df)
+        try:
+            if auto_create_table:
+                verb = "CREATE OR REPLACE TABLE" if overwrite else "CREATE TABLE IF NOT EXISTS"
+                self.connection.execute(f"{verb} {target} AS SELECT * FROM _write_pandas_df LIMIT 0")
+            elif overwrite:
+                self.connection.execute(f"DELETE FROM {target}")
+            self.connection.execute(f"INSERT INTO {target} BY NAME SELECT * FROM _write_pandas_df")
+        finally:
+            self.connection.unregister("_write_pandas_df")
+
+    def close(self) -> None:
+        self.connection.close()
@@ -0,0 +1,649 @@
+# Copyright 2026 Snowflake Inc.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Scale-factor data generator for load and performance testing.
+
+Expands the INGEST-layer source tables to a TPC-style scale factor (SF1 = 100,000
+subscribers; every other table scales linearly with it) from the LAD distributions in
+``scripts/data/lad_code_distributions.csv`` and ``lad_sample_areas.csv``:
+
+    INGEST.SUBSCRIBER_PROFILES        one row per subscriber
+    DATA_SHARING.DEMOGRAPHICS_PROFILES joined to profiles on EMAIL (partial match rate)
+    INGEST.CLICKSTREAM_EVENTS          paired PLAY_START/PLAY_STOP plus browse/engagement events
+    INGEST.AD_CAMPAIGNS                campaign catalogue
+    INGEST.AD_PERFORMANCE_EVENTS       daily delivery per campaign and content category
+    INGEST.ADS_EVENTS                  sampled impressions and clicks of that delivery, per subscriber
+
+Relationships and skew are preserved by construction. Subscribers are placed in LADs in
+proportion to population and inherit the LAD's age, marital, family, income and
+behavioural mix. Tier follows income (as in bench_models.py), and activity is
+heavy-tailed and driven by the digital-media index and youth share. Content
+popularity is Zipfian, and every event belongs to a generated subscriber. Ad events
+are a weighted sample of each campaign day's delivery, exposing active subscribers and
+fans of the campaign's category most, so their weights add up to the delivered totals. Each
+subscriber block uses its own seed, so a given --seed and scale factor always
+produce the same data.
+
+Local Parquet (one directory per table, one file per block):
+
+    python scripts/benchmarks/scale_data.py --sf 1 10 --output-dir /tmp/scale
+
+In-warehouse, into a dedicated database whose INGEST/DATA_SHARING tables are truncated
+and reloaded in place, keeping their clustering keys and the streams on them (the
+harmonization SQL references AME_AD_SALES_DEMO, so swap the database in to run it):
+
+    CREATE DATABASE AME_AD_SALES_DEMO_SF10 CLONE AME_AD_SALES_DEMO;
+    python scripts/benchmarks/scale_data.py --sf 10 --target warehouse \\
+        --database AME_AD_SALES_DEMO_SF10 --connection my_connection
+    ALTER DATABASE AME_AD_SALES_DEMO SWAP WITH AME_AD_SALES_DEMO_SF10;
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from bench_models import LAD_DISTRIBUTIONS, REPO_ROOT, TIER_MIX
+
+
+LAD_SAMPLE_AREAS = REPO_ROOT / "scripts" / "data" / "lad_sample_areas.csv"
+
+SUBSCRIBERS_PER_SF = 100_000
+CAMPAIGNS_PER_SF = 40
+CONTENT_TITLES_PER_SF = 2_000
+BLOCK_SUBSCRIBERS = 50_000
+DEMOGRAPHICS_MATCH_RATE = 0.92
+# Share of delivered impressions and clicks logged in ADS_EVENTS; each event weighs 1 / rate.
+AD_EVENT_SAMPLE_RATE = 0.05
+
+# Column order and types as declared in setup.sql, grouped by target schema.
+TABLES: Dict[str, Tuple[str, List[Tuple[str, str]]]] = {
+    "SUBSCRIBER_PROFILES": ("INGEST", [
+        ("UNIQUE_ID", "TEXT"), ("PROFILE_ID", "TEXT"), ("TIER", "TEXT"), ("FULL_NAME", "TEXT"),
+        ("EMAIL", "TEXT"), ("USERNAME", "TEXT"), ("PRIMARY_MOBILE", "TEXT"), ("IP_ADDRESS", "TEXT"),
+        ("SIGNUP_DATE", "DATE"),
+    ]),
+    "DEMOGRAPHICS_PROFILES": ("DATA_SHARING", [
+        ("EMAIL", "TEXT"), ("PRIMARY_MOBILE", "TEXT"), ("IP_ADDRESS", "TEXT"), ("FULL_NAME", "TEXT"),
+        ("LAD_CODE", "TEXT"), ("AREA_NAME", "TEXT"), ("LATITUDE", "FLOAT"), ("LONGITUDE", "FLOAT"),
+        ("AGE", "NUMBER"), ("AGE_BAND", "TEXT"), ("INCOME_LEVEL", "TEXT"), ("EDUCATION_LEVEL", "TEXT"),
+        ("MARITAL_STATUS", "TEXT"), ("FAMILY_STATUS", "TEXT"),
+        ("BEHAVIORAL_DIGITAL_MEDIA_CONSUMPTION_INDEX", "FLOAT"),
+        ("BEHAVIORAL_FAST_FASHION_RETAIL_PROPENSITY", "FLOAT"),
+        ("BEHAVIORAL_GROCERY_ONLINE_DELIVERY_USE", "FLOAT"),
+        ("BEHAVIORAL_FINANCIAL_INVESTMENT_INTEREST", "FLOAT"),
+    ]),
+    "CLICKSTREAM_EVENTS": ("INGEST", [
+        ("UNIQUE_ID", "TEXT"), ("EVENT_ID", "TEXT"), ("SESSION_ID", "TEXT"), ("EVENT_TS", "TIMESTAMP_NTZ"),
+        ("EVENT_TYPE", "TEXT"), ("DEVICE", "TEXT"), ("PAGE_PATH", "TEXT"), ("CONTENT_ID", "TEXT"),
+        ("CONTENT_TYPE", "TEXT"), ("CONTENT_CATEGORY", "TEXT"), ("ATTRIBUTES", "VARIANT"),
+    ]),
+    "AD_CAMPAIGNS": ("INGEST", [
+        ("CAMPAIGN_ID", "TEXT"), ("ADVERTISER_NAME", "TEXT"), ("VERTICAL", "TEXT"), ("CONTENT_CATEGORY", "TEXT"),
+        ("RATE_TYPE", "TEXT"), ("BOOKING_START", "DATE"), ("BOOKING_END", "DATE"),
+        ("DAILY_IMPRESSION_CAP", "NUMBER"), ("RATE_TYPE_DETAIL", "TEXT"), ("BOOKED_CPM", "FLOAT"),
+        ("BOOKED_CTR", "FLOAT"), ("CREATIVE_COUNT", "NUMBER"),
+    ]),
+    "AD_PERFORMANCE_EVENTS": ("INGEST", [
+        ("METRIC_DATE", "DATE"), ("CAMPAIGN_ID", "TEXT"), ("ADVERTISER_NAME", "TEXT"), ("VERTICAL", "TEXT"),
+        ("CONTENT_CATEGORY", "TEXT"), ("RATE_TYPE", "TEXT"), ("IMPRESSIONS", "FLOAT"), ("CLICKS", "FLOAT"),
+        ("CTR", "FLOAT"), ("CPM", "FLOAT"), ("SPEND", "FLOAT"), ("CREATIVE_COUNT", "NUMBER"),
+        ("BOOKED_CPM", "FLOAT"), ("BOOKED_CTR", "FLOAT"), ("DAILY_IMPRESSION_CAP", "NUMBER"),
+    ]),
+    "ADS_EVENTS": ("INGEST", [
+        ("EVENT_ID", "TEXT"), ("EVENT_TS", "TIMESTAMP_NTZ"), ("EVENT_DATE", "DATE"), ("CAMPAIGN_ID", "TEXT"),
+        ("CONTENT_CATEGORY", "TEXT"), ("EVENT_TYPE", "TEXT"), ("EVENT_WEIGHT", "FLOAT"), ("UNIQUE_ID", "TEXT"),
+        ("DEVICE", "TEXT"),
+    ]),
+}
+
+TIERS = np.array(["Ad-supported", "Premium", "Standard"])
+DEVICES = np.array(["Mobile", "Smart TV", "Web", "Tablet"])
+DEVICE_MIX = [0.38, 0.34, 0.18, 0.10]
+# Category names map onto the persona rules in HARMONIZED.AGGREGATED_BEHAVIORAL_LOGS.
+CATEGORIES = np.array([
+    "Sports", "Live Events", "Kids & Family", "Documentary", "Lifestyle",
+    "Reality", "Premium Drama", "Originals", "Comedy", "News",
+])
+CATEGORY_MIX = np.array([0.16, 0.06, 0.12, 0.08, 0.09, 0.10, 0.14, 0.11, 0.09, 0.05])
+CONTENT_TYPES = np.array(["series", "movie", "live", "short_form"])
+CONTENT_TYPE_MIX = [0.50, 0.22, 0.10, 0.18]
+PREFERRED_CATEGORY_SHARE = 0.6
+# Non-playback events: (event type, share, page path template)
+OTHER_EVENTS = [
+    ("BROWSE_PAGE", 0.34, "/browse/{category}"),
+    ("CLICK_CONTENT", 0.22, "/title/{content}"),
+    ("LOGIN", 0.12, "/account/login"),
+    ("SEARCH", 0.08, "/search"),
+    ("PAUSE", 0.07, "/watch/{content}"),
+    ("PLAY_RESUME", 0.06, "/watch/{content}"),
+    ("ADD_TO_MY_LIST", 0.04, "/title/{content}"),
+    ("SKIP_INTRO", 0.04, "/watch/{content}"),
+    ("REBUFFER_EVENT", 0.02, "/watch/{content}"),
+    ("ERROR_EVENT", 0.008, "/watch/{content}"),
+    ("CANCELLATION_SURVEY_SUBMIT", 0.002, "/account/cancel"),
+]
+STOP_REASONS = np.array(["completed_episode", "finish_episode", "user_exit", "next_episode"])
+# Evening-heavy viewing curve, one weight per hour of day.
+HOUR_WEIGHTS = np.array([2, 1, 1, 1, 1, 1, 2, 3, 4, 4, 4, 4, 5, 5, 5, 5, 6, 7, 9, 11, 12, 11, 8, 4], dtype=float)
+AGE_BANDS = [
+    ("YOUNG_ADULTS_EARLY", "18-24", 18, 24),
+    ("PRIME_SETTLING_FAMILY_FORMATION", "25-34", 25, 34),
+    ("ESTABLISHED_CAREER_MIDDLE_AGE", "35-49", 35, 49),
+    ("PRE_RETIREMENT_EMPTY_NESTERS", "50-64", 50, 64),
+    ("RETIREMENT_SENIOR_YEARS", "65+", 65, 85),
+]
+MARITAL = [
+    ("DEMO_MARITAL_SINGLE_NEVER_MARRIED", "Single"),
+    ("DEMO_MARITAL_MARRIED_OR_CIVIL_PARTNERSHIP", "Married or civil partnership"),
+    ("DEMO_MARITAL_DIVORCED_OR_SEPARATED", "Divorced or separated"),
+    ("DEMO_MARITAL_WIDOWED", "Widowed"),
+]
+FAMILY = [
+    ("DEMO_FAMILY_COUPLES_NO_CHILDREN", "Couple, no children"),
+    ("DEMO_FAMILY_COUPLES_WITH_DEPENDENT_CHILDREN", "Couple with dependent children"),
+    ("DEMO_FAMILY_SINGLE_PARENT_WITH_DEPENDENT_CHILDREN", "Single parent with dependent children"),
+    ("DEMO_FAMILY_SINGLE_PERSON_HOUSEHOLD", "Single person household"),
+]
+BEHAVIOURAL = [
+    "BEHAVIORAL_DIGITAL_MEDIA_CONSUMPTION_INDEX",
+    "BEHAVIORAL_FAST_FASHION_RETAIL_PROPENSITY",
+    "BEHAVIORAL_GROCERY_ONLINE_DELIVERY_USE",
+    "BEHAVIORAL_FINANCIAL_INVESTMENT_INTEREST",
+]
+FIRST_NAMES = np.array(["Olivia", "Amelia", "Isla", "Ava", "Mia", "Noah", "Oliver", "George", "Arthur", "Leo",
+                        "Harry", "Freya", "Lily", "Jack", "Muhammad", "Sophia", "Grace", "Oscar", "Theo", "Ella"])
+LAST_NAMES = np.array(["Smith", "Jones", "Taylor", "Brown", "Williams", "Wilson", "Johnson", "Davies", "Patel",
+                       "Robinson", "Wright", "Thompson", "Evans", "Walker", "White", "Roberts", "Green", "Hall"])
+VERTICALS = {
+    "Finance": ["Northwind Insurance", "Sterling Bank", "Harbour Mutual"],
+    "Beauty": ["Glow Cosmetics", "Luma Skin", "Velvet Studio"],
+    "Auto": ["Falcon Motors", "Kestrel EV", "Summit Auto"],
+    "Retail": ["Baker & Rowe", "Northfield Market", "Cobalt Outfitters"],
+    "Travel": ["Skyline Air", "Harbour Holidays", "Atlas Rail"],
+    "FMCG": ["Fresh Fields", "Brightside Foods", "Oakleaf Drinks"],
+    "Telco": ["Wave Mobile", "Fibrelink", "Orbit Broadband"],
+}
+RATE_TYPES = np.array(["CPM", "Hybrid", "CPC"])
+# Seed offsets per stream so blocks can be regenerated independently.
+STREAM_SUBSCRIBERS, STREAM_CLICKSTREAM, STREAM_CAMPAIGNS, STREAM_ADS = 1, 2, 3, 4
+
+
+def parse_scale_factor(value: str) -> float:
+    sf = float(value.lower().lstrip("sf"))
+    if sf <= 0:
+        raise argparse.ArgumentTypeError(f"scale factor must be positive, got {value!r}")
+    return sf
+
+
+def sf_label(sf: float) -> str:
+    return f"sf{sf:g}".replace(".", "_")
+
+
+def load_lads() -> pd.DataFrame:
+    lad = pd.read_csv(LAD_DISTRIBUTIONS)
+    areas = pd.read_csv(LAD_SAMPLE_AREAS)
+    areas["RESULT"] = areas["RESULT"].map(json.loads)
+    return lad.merge(areas.rename(columns={"RESULT": "AREAS"}), on="LAD_CODE", how="left")
+
+
+def _pick(probabilities: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """Row-wise categorical draw from an (n, k) matrix of (unnormalised) probabilities."""
+    cumulative = np.cumsum(probabilities, axis=1)
+    u = rng.random(len(probabilities)) * cumulative[:, -1]
+    return (cumulative < u[:, None]).sum(axis=1)
+
+
+def _block_rng(seed: int, stream: int, block: int) -> np.random.Generator:
+    return np.random.default_rng([seed, stream, block])
+
+
+def generate_subscribers(lad: pd.DataFrame, first_id: int, n: int, end_date: date, history_days: int,
+                         rng: np.random.Generator) -> Tuple[pd.DataFrame, pd.DataFrame, Dict[str, np.ndarray]]:
+    """Profiles, their demographics and the latent traits that drive their activity."""
+    weights = lad["TOTAL_POPULATION"].to_numpy(dtype=float)
+    area = lad.iloc[rng.choice(len(lad), size=n, p=weights / weights.sum())].reset_index(drop=True)
+    ids = np.arange(first_id, first_id + n)
+
+    income = area["INCOME_LEVEL"].to_numpy()
+    tier_index = np.where(
+        income == "Mid",
+        rng.choice(3, size=n, p=TIER_MIX["Mid"]),
+        rng.choice(3, size=n, p=TIER_MIX["Lower"]),
+    )
+    band = _pick(area[[c for c, *_ in AGE_BANDS]].to_numpy(dtype=float), rng)
+    low = np.array([b[2] for b in AGE_BANDS])[band]
+    high = np.array([b[3] for b in AGE_BANDS])[band]
+    age = rng.integers(low, high + 1)
+    marital = np.array([label for _, label in MARITAL])[_pick(area[[c for c, _ in MARITAL]].to_numpy(dtype=float), rng)]
+    family = np.array([label for _, label in FAMILY])[_pick(area[[c for c, _ in FAMILY]].to_numpy(dtype=float), rng)]
+
+    places = [
+        a[rng.integers(len(a))] if isinstance(a, list) and a else {"name": None, "latitude": None, "longitude": None}
+        for a in area["AREAS"]
+    ]
+    first = FIRST_NAMES[rng.integers(len(FIRST_NAMES), size=n)]
+    last = LAST_NAMES[rng.integers(len(LAST_NAMES), size=n)]
+    full_name = np.char.add(np.char.add(first, " "), last)
+    email = [f"{f.lower()}.{l.lower()}.{i}@example.co.uk" for f, l, i in zip(first, last, ids)]
+    mobile = [f"07{m:09d}" for m in rng.integers(0, 10 ** 9, size=n)]
+    ip = [f"{a}.{b}.{c}.{d}" for a, b, c, d in rng.integers(1, 255, size=(n, 4))]
+    # Sign-ups accelerate towards the present (more recent cohorts are larger).
+    tenure = (rng.exponential(history_days * 2, n) % (history_days * 6)).astype(int)
+    signup = pd.to_datetime(end_date) - pd.to_timedelta(tenure, unit="D")
+
+    profiles = pd.DataFrame({
+        "UNIQUE_ID": [f"U{i:010d}" for i in ids],
+        "PROFILE_ID": [f"P{i:010d}" for i in ids],
+        "TIER": TIERS[tier_index],
+        "FULL_NAME": full_name,
+        "EMAIL": email,
+        "USERNAME": [f"{f.lower()}{i}" for f, i in zip(first, ids)],
+        "PRIMARY_MOBILE": mobile,
+        "IP_ADDRESS": ip,
+        "SIGNUP_DATE": signup.date,
+    })
+
+    behavioural = {c: np.clip(area[c].to_numpy() + rng.normal(0, 1, n), 0, 10).round(3) for c in BEHAVIOURAL}
+    matched = rng.random(n) < DEMOGRAPHICS_MATCH_RATE
+    demographics = pd.DataFrame({
+        "EMAIL": profiles["EMAIL"],
+        "PRIMARY_MOBILE": profiles["PRIMARY_MOBILE"],
+        "IP_ADDRESS": profiles["IP_ADDRESS"],
+        "FULL_NAME": profiles["FULL_NAME"],
+        "LAD_CODE": area["LAD_CODE"],
+        "AREA_NAME": [p["name"] for p in places],
+        "LATITUDE": [None if p["latitude"] is None else round(p["latitude"] + rng.normal(0, 0.01), 5) for p in places],
+        "LONGITUDE": [None if p["longitude"] is None else round(p["longitude"] + rng.normal(0, 0.01), 5) for p in places],
+        "AGE": age,
+        "AGE_BAND": np.array([b[1] for b in AGE_BANDS])[band],
+        "INCOME_LEVEL": income,
+        "EDUCATION_LEVEL": area["EDUCATION_LEVEL"],
+        "MARITAL_STATUS": marital,
+        "FAMILY_STATUS": family,
+        **behavioural,
+    })[matched].reset_index(drop=True)
+
+    youth = (area["ADOLESCENSE_TEEN_YEARS"] + area["YOUNG_ADULTS_EARLY"]).to_numpy()
+    digital = behavioural["BEHAVIORAL_DIGITAL_MEDIA_CONSUMPTION_INDEX"]
+    traits = {
+        "unique_id": profiles["UNIQUE_ID"].to_numpy(),
+        "signup": signup.to_numpy(),
+        # Heavy-tailed activity: most subscribers are light users, a few stream daily.
+        "activity": rng.gamma(0.7, 1.0, n) * (0.3 + digital / 7.0) * (1 + youth),
+        "device": rng.choice(len(DEVICES), size=n, p=DEVICE_MIX),
+        "category": rng.choice(len(CATEGORIES), size=n, p=CATEGORY_MIX / CATEGORY_MIX.sum()),
+    }
+    return profiles, demographics, traits
+
+
+def generate_catalogue(titles: int, rng: np.random.Generator) -> Dict[str, np.ndarray]:
+    category = rng.choice(len(CATEGORIES), size=titles, p=CATEGORY_MIX / CATEGORY_MIX.sum())
+    content_type = np.where(
+        CATEGORIES[category] == "Live Events",
+        2,
+        rng.choice(len(CONTENT_TYPES), size=titles, p=CONTENT_TYPE_MIX),
+    )
+    return {
+        "content_id": np.array([f"C{i:07d}" for i in range(titles)]),
+        "category": category,
+        "content_type": content_type,
+        # Zipf-like popularity: a handful of titles draw most of the plays.
+        "popularity": 1.0 / np.arange(1, titles + 1) ** 1.1,
+    }
+
+
+def _pick_content(catalogue: Dict[str, np.ndarray], preferred: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    n = len(preferred)
+    titles = len(catalogue["content_id"])
+    weights = catalogue["popularity"] / catalogue["popularity"].sum()
+    picks = rng.choice(titles, size=n, p=weights)
+    # Re-draw a share of picks from the subscriber's preferred category to keep personas distinct.
+    by_category = {c: np.flatnonzero(catalogue["category"] == c) for c in range(len(CATEGORIES))}
+    loyal = rng.random(n) < PREFERRED_CATEGORY_SHARE
+    for c, pool in by_category.items():
+        rows = np.flatnonzero(loyal & (preferred == c))
+        if len(pool) and len(rows):
+            p = catalogue["popularity"][pool]
+            picks[rows] = pool[rng.choice(len(pool), size=len(rows), p=p / p.sum())]
+    return picks
+
+
+def _timestamps(start: np.ndarray, end: np.datetime64, rng: np.random.Generator) -> np.ndarray:
+    span_days = np.maximum((end - start).astype("timedelta64[D]").astype(int), 1)
+    day = rng.integers(0, span_days)
+    hour = rng.choice(24, size=len(start), p=HOUR_WEIGHTS / HOUR_WEIGHTS.sum())
+    second = rng.integers(0, 3600, size=len(start))
+    midnight = start.astype("datetime64[D]")
+    return midnight + day.astype("timedelta64[D]") + (hour * 3600 + second).astype("timedelta64[s]")
+
+
+def generate_clickstream(traits: Dict[str, np.ndarray], catalogue: Dict[str, np.ndarray], end_date: date,
+                         history_days: int, rng: np.random.Generator) -> pd.DataFrame:
+    end = np.datetime64(end_date + timedelta(days=1), "s")
+    window_start = end - np.timedelta64(history_days, "D")
+    start = np.maximum(traits["signup"].astype("datetime64[s]"), window_start)
+    active_days = np.maximum((end - start).astype("timedelta64[D]").astype(int), 1)
+
+    plays = rng.poisson(traits["activity"] * 0.12 * active_days)
+    others = rng.poisson(traits["activity"] * 0.2 * active_days)
+
+    # Playback: one PLAY_START and one PLAY_STOP per play.
+    owner = np.repeat(np.arange(len(plays)), plays)
+    play_ts = _timestamps(start[owner], end, rng)
+    content = _pick_content(catalogue, traits["category"][owner], rng)
+    length = np.where(catalogue["content_type"][content] == 3, 300.0, 2700.0)
+    duration = np.minimum(rng.gamma(1.5, length / 1.5 * 0.6), length * 1.5).round(1)
+    stop_reason = STOP_REASONS[rng.choice(len(STOP_REASONS), size=len(owner), p=[0.35, 0.1, 0.45, 0.1])]
+    starts = pd.DataFrame({
+        "OWNER": owner, "EVENT_TS": play_ts, "EVENT_TYPE": "PLAY_START", "CONTENT": content, "ATTRIBUTES": None,
+    })
+    stops = pd.DataFrame({
+        "OWNER": owner,
+        "EVENT_TS": play_ts + duration.astype("timedelta64[s]"),
+        "EVENT_TYPE": "PLAY_STOP",
+        "CONTENT": content,
+        "ATTRIBUTES": [json.dumps({"duration_seconds": d, "reason": r}) for d, r in zip(duration, stop_reason)],
+    })
+
+    # Browse, engagement and service events.
+    owner = np.repeat(np.arange(len(others)), others)
+    kind = rng.choice(len(OTHER_EVENTS), size=len(owner), p=[e[1] / sum(e[1] for e in OTHER_EVENTS) for e in OTHER_EVENTS])
+    other = pd.DataFrame({
+        "OWNER": owner,
+        "EVENT_TS": _timestamps(start[owner], end, rng),
+        "EVENT_TYPE": np.array([e[0] for e in OTHER_EVENTS])[kind],
+        "CONTENT": _pick_content(catalogue, traits["category"][owner], rng),
+        "ATTRIBUTES": None,
+    })
+    events = pd.concat([starts, stops, other], ignore_index=True)
+    template = np.array([e[2] for e in OTHER_EVENTS] + ["/watch/{content}"])
+    kind_index = pd.Series(np.arange(len(OTHER_EVENTS)), index=[e[0] for e in OTHER_EVENTS])
+    path_template = template[events["EVENT_TYPE"].map(kind_index).fillna(len(OTHER_EVENTS)).astype(int).to_numpy()]
+    no_content = np.isin(events["EVENT_TYPE"], ["LOGIN", "SEARCH", "CANCELLATION_SURVEY_SUBMIT"])
+
+    content_id = catalogue["content_id"][events["CONTENT"]]
+    category = CATEGORIES[catalogue["category"][events["CONTENT"]]]
+    content_type = CONTENT_TYPES[catalogue["content_type"][events["CONTENT"]]]
+    page_path = [
+        t.format(content=c, category=g.lower().replace(" & ", "-").replace(" ", "-"))
+        for t, c, g in zip(path_template, content_id, category)
+    ]
+    unique_id = traits["unique_id"][events["OWNER"]]
+    # Mostly the subscriber's main device, sometimes another one.
+    device = np.where(
+        rng.random(len(events)) < 0.8,
+        traits["device"][events["OWNER"]],
+        rng.choice(len(DEVICES), size=len(events), p=DEVICE_MIX),
+    )
+    event_ts = events["EVENT_TS"].to_numpy()
+    day = event_ts.astype("datetime64[D]").astype(str)
+    return pd.DataFrame({
+        "UNIQUE_ID": unique_id,
+        "EVENT_ID": [f"E{u[1:]}-{i:07d}" for i, u in enumerate(unique_id)],
+        "SESSION_ID": np.char.add(np.char.add(unique_id.astype(str), "-"), np.char.replace(day, "-", "")),
+        "EVENT_TS": event_ts,
+        "EVENT_TYPE": events["EVENT_TYPE"].to_numpy(),
+        "DEVICE": DEVICES[device],
+        "PAGE_PATH": page_path,
+        "CONTENT_ID": np.where(no_content, None, content_id),
+        "CONTENT_TYPE": np.where(no_content, None, content_type),
+        "CONTENT_CATEGORY": np.where(no_content, None, category),
+        "ATTRIBUTES": events["ATTRIBUTES"].to_numpy(),
+    }).sort_values("EVENT_TS", kind="stable", ignore_index=True)
+
+
+def generate_campaigns(count: int, subscribers: int, end_date: date, history_days: int,
+                       rng: np.random.Generator) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    verticals = np.array(list(VERTICALS))
+    vertical = verticals[rng.integers(len(verticals), size=count)]
+    advertiser = np.array([VERTICALS[v][rng.integers(len(VERTICALS[v]))] for v in vertical])
+    category = CATEGORIES[rng.choice(len(CATEGORIES), size=count, p=CATEGORY_MIX / CATEGORY_MIX.sum())]
+    rate_type = RATE_TYPES[rng.choice(len(RATE_TYPES), size=count, p=[0.7, 0.2, 0.1])]
+    flight = rng.integers(14, 91, size=count)
+    first_day = np.datetime64(end_date) - np.timedelta64(history_days - 1, "D")
+    start = first_day + rng.integers(0, history_days, size=count).astype("timedelta64[D]")
+    end = np.minimum(start + (flight - 1).astype("timedelta64[D]"), np.datetime64(end_date))
+    # Campaign size is log-normal: a few large national buys, many small ones.
+    daily_base = np.maximum(subscribers * rng.lognormal(-5.5, 1.0, count), 50)
+    cap = np.ceil(daily_base * rng.uniform(1.02, 1.25, count)).astype(int)
+    booked_cpm = rng.uniform(8.0, 24.0, count).round(2)
+    booked_ctr = rng.uniform(0.004, 0.02, count).round(4)
+    creatives = rng.integers(1, 7, size=count)
+    campaigns = pd.DataFrame({
+        "CAMPAIGN_ID": [f"AD_{i:05d}" for i in range(1, count + 1)],
+        "ADVERTISER_NAME": advertiser,
+        "VERTICAL": vertical,
+        "CONTENT_CATEGORY": category,
+        "RATE_TYPE": rate_type,
+        "BOOKING_START": start.astype("datetime64[D]").astype(object),
+        "BOOKING_END": end.astype("datetime64[D]").astype(object),
+        "DAILY_IMPRESSION_CAP": cap,
+        "RATE_TYPE_DETAIL": np.where(rate_type == "Hybrid", "CPM with CPC bonus", rate_type),
+        "BOOKED_CPM": booked_cpm,
+        "BOOKED_CTR": booked_ctr,
+        "CREATIVE_COUNT": creatives,
+    })
+
+    days = (end - start).astype(int) + 1
+    row = np.repeat(np.arange(count), days)
+    offset = np.concatenate([np.arange(d) for d in days]) if count else np.array([], dtype=int)
+    metric_date = start[row] + offset.astype("timedelta64[D]")
+    weekend = np.isin(pd.DatetimeIndex(metric_date).dayofweek, [5, 6])
+    impressions = np.minimum(
+        np.round(daily_base[row] * rng.lognormal(0, 0.25, len(row)) * np.where(weekend, 1.2, 1.0)),
+        cap[row],
+    )
+    clicks = rng.binomial(impressions.astype(int), np.clip(booked_ctr[row] * rng.lognormal(0, 0.3, len(row)), 0, 1))
+    cpm = (booked_cpm[row] * rng.uniform(0.9, 1.1, len(row))).round(4)
+    performance = pd.DataFrame({
+        "METRIC_DATE": metric_date.astype(object),
+        "CAMPAIGN_ID": campaigns["CAMPAIGN_ID"].to_numpy()[row],
+        "ADVERTISER_NAME": advertiser[row],
+        "VERTICAL": vertical[row],
+        "CONTENT_CATEGORY": category[row],
+        "RATE_TYPE": rate_type[row],
+        "IMPRESSIONS": impressions,
+        "CLICKS": clicks.astype(float),
+        "CTR": np.round(np.divide(clicks, impressions, out=np.zeros(len(row)), where=impressions > 0), 6),
+        "CPM": cpm,
+        "SPEND": np.round(impressions * cpm / 1000, 4),
+        "CREATIVE_COUNT": creatives[row],
+        "BOOKED_CPM": booked_cpm[row],
+        "BOOKED_CTR": booked_ctr[row],
+        "DAILY_IMPRESSION_CAP": cap[row],
+    })
+    return campaigns, performance
+
+
+def generate_ads_events(performance: pd.DataFrame, traits: Dict[str, np.ndarray], share: float, part: int,
+                        rng: np.random.Generator) -> pd.DataFrame:
+    """One subscriber block's sample of every campaign day's impressions and clicks.
+
+    The block receives ``share`` of each day's delivery. Exposure is weighted by activity
+    and doubled for subscribers whose preferred category is the campaign's, and each event
+    goes to a subscriber who had signed up by then.
+    """
+    n = len(performance)
+    delivered = np.concatenate([performance["IMPRESSIONS"].to_numpy(), performance["CLICKS"].to_numpy()])
+    counts = rng.poisson(delivered * AD_EVENT_SAMPLE_RATE * share)
+    source = np.repeat(np.tile(np.arange(n), 2), counts)
+    event_type = np.repeat(np.repeat(np.array(["IMPRESSION", "CLICK"]), n), counts)
+
+    event_date = np.array(performance["METRIC_DATE"].to_numpy()[source], dtype="datetime64[D]")
+    hour = rng.choice(24, size=len(source), p=HOUR_WEIGHTS / HOUR_WEIGHTS.sum())
+    event_ts = event_date + (hour * 3600 + rng.integers(0, 3600, size=len(source))).astype("timedelta64[s]")
+
+    # Subscribers in sign-up order, so those signed up by an event are a prefix of the cumulative weights.
+    by_signup = np.argsort(traits["signup"], kind="stable")
+    signup = traits["signup"][by_signup].astype("datetime64[s]")
+    eligible = np.searchsorted(signup, event_ts, side="right")
+    category = performance["CONTENT_CATEGORY"].to_numpy()[source]
+    category_index = pd.Index(CATEGORIES).get_indexer(category)
+    owner = np.zeros(len(source), dtype=int)
+    for c in np.unique(category_index):
+        rows = np.flatnonzero((category_index == c) & (eligible > 0))
+        weights = traits["activity"][by_signup] * np.where(traits["category"][by_signup] == c, 2.0, 1.0)
+        cumulative = np.cumsum(weights)
+        u = rng.random(len(rows)) * cumulative[eligible[rows] - 1]
+        owner[rows] = by_signup[np.minimum(np.searchsorted(cumulative, u, side="right"), eligible[rows] - 1)]
+    keep = eligible > 0
+    events = pd.DataFrame({
+        "EVENT_TS": event_ts,
+        "EVENT_DATE": event_date.astype(object),
+        "CAMPAIGN_ID": performance["CAMPAIGN_ID"].to_numpy()[source],
+        "CONTENT_CATEGORY": category,
+        "EVENT_TYPE": event_type,
+        "EVENT_WEIGHT": 1.0 / AD_EVENT_SAMPLE_RATE,
+        "UNIQUE_ID": traits["unique_id"][owner],
+        "DEVICE": DEVICES[traits["device"][owner]],
+    })[keep].sort_values("EVENT_TS", kind="stable", ignore_index=True)
+    events.insert(0, "EVENT_ID", [f"A{part:05d}-{i:08d}" for i in range(len(events))])
+    return events
+
+
+class ParquetSink:
+    """Writes <root>/<sf>/<TABLE>/part-NNNNN.parquet."""
+
+    def __init__(self, root: Path):
+        self.root = root
+
+    def begin(self, table: str) -> None:
+        directory = self.root / table
+        directory.mkdir(parents=True, exist_ok=True)
+        for stale in directory.glob("part-*.parquet"):
+            stale.unlink()
+
+    def write(self, table: str, frame: pd.DataFrame, part: int) -> None:
+        frame.to_parquet(self.root / table / f"part-{part:05d}.parquet", index=False)
+
+    def close(self) -> None:
+        pass
+
+
+class WarehouseSink:
+    """Truncates each existing table and appends blocks through a temporary load table.
+
+    The tables are emptied rather than recreated, so CLICKSTREAM_EVENTS keeps its
+    clustering key and the streams on the INGEST tables stay valid.
+    """
+
+    def __init__(self, session: Any, database: str):
+        self.session = session
+        self.database = database
+
+    def _target(self, table: str) -> str:
+        return f"{self.database}.{TABLES[table][0]}.{table}"
+
+    def begin(self, table: str) -> None:
+        self.session.sql(f"TRUNCATE TABLE {self._target(table)}").collect()
+
+    def write(self, table: str, frame: pd.DataFrame, part: int) -> None:
+        schema, columns = TABLES[table]
+        load_table = f"{table}_SCALE_LOAD"
+        self.session.write_pandas(
+            frame, load_table, database=self.database, schema=schema,
+            auto_create_table=True, overwrite=True, table_type="temporary", use_logical_type=True,
+        )
+        select = ", ".join(
+            f'TRY_PARSE_JSON("{name}")' if kind == "VARIANT" else f'"{name}"::{kind}'
+            for name, kind in columns
+        )
+        names = ", ".join(name for name, _ in columns)
+        self.session.sql(
+            f'INSERT INTO {self._target(table)} ({names}) SELECT {select} FROM {self.database}.{schema}."{load_table}"'
+        ).collect()
+
+    def close(self) -> None:
+        self.session.close()
+
+
+def generate(sf: float, sink: Any, seed: int, end_date: date, history_days: int) -> Dict[str, int]:
+    subscribers = int(round(SUBSCRIBERS_PER_SF * sf))
+    lad = load_lads()
+    counts = {table: 0 for table in TABLES}
+    for table in TABLES:
+        sink.begin(table)
+
+    catalogue = generate_catalogue(max(int(CONTENT_TITLES_PER_SF * sf ** 0.5), 200), _block_rng(seed, STREAM_CAMPAIGNS, 0))
+    # Campaigns come first: every subscriber block samples its ad events from their delivery.
+    campaigns, performance = generate_campaigns(
+        max(int(round(CAMPAIGNS_PER_SF * sf)), 1), subscribers, end_date, history_days,
+        _block_rng(seed, STREAM_CAMPAIGNS, 1),
+    )
+    for table, frame in (("AD_CAMPAIGNS", campaigns), ("AD_PERFORMANCE_EVENTS", performance)):
+        sink.write(table, frame, 0)
+        counts[table] += len(frame)
+
+    for part, first_id in enumerate(range(0, subscribers, BLOCK_SUBSCRIBERS)):
+        n = min(BLOCK_SUBSCRIBERS, subscribers - first_id)
+        profiles, demographics, traits = generate_subscribers(
+            lad, first_id, n, end_date, history_days, _block_rng(seed, STREAM_SUBSCRIBERS, part)
+        )
+        events = generate_clickstream(traits, catalogue, end_date, history_days, _block_rng(seed, STREAM_CLICKSTREAM, part))
+        ads = generate_ads_events(performance, traits, n / subscribers, part, _block_rng(seed, STREAM_ADS, part))
+        for table, frame in (("SUBSCRIBER_PROFILES", profiles), ("DEMOGRAPHICS_PROFILES", demographics),
+                             ("CLICKSTREAM_EVENTS", events), ("ADS_EVENTS", ads)):
+            sink.write(table, frame, part)
+            counts[table] += len(frame)
+        print(f"   block {part}: {first_id + n:,}/{subscribers:,} subscribers, {counts['CLICKSTREAM_EVENTS']:,} events, "
+              f"{counts['ADS_EVENTS']:,} ad events", file=sys.stderr)
+    sink.close()
+    return counts
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sf", nargs="+", type=parse_scale_factor, default=[1.0], help="Scale factors, e.g. 0.1 1 10 100")
+    parser.add_argument("--target", choices=("parquet", "warehouse"), default="parquet")
+    parser.add_argument("--output-dir", type=Path, default=Path("scale_data"), help="Parquet root (one subdirectory per SF)")
+    parser.add_argument("--database", help="Warehouse target database (required for --target warehouse)")
+    parser.add_argument("--connection", default=None, help="connections.toml entry for --target warehouse")
+    parser.add_argument("--end-date", type=date.fromisoformat, default=date.today())
+    parser.add_argument("--history-days", type=int, default=180)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+    if args.target == "warehouse" and not args.database:
+        parser.error("--database is required for --target warehouse")
+    if args.target == "warehouse" and len(args.sf) > 1:
+        parser.error("--target warehouse takes a single --sf (one database per scale factor)")
+
+    for sf in args.sf:
+        if args.target == "warehouse":
+            from snowflake.snowpark import Session
+
+            builder = Session.builder.config("connection_name", args.connection) if args.connection else Session.builder
+            sink: Any = WarehouseSink(builder.create(), args.database)
+        else:
+            sink = ParquetSink(args.output_dir / sf_label(sf))
+        print(f"-- generating {sf_label(sf).upper()}", file=sys.stderr)
+        started = time.perf_counter()
+        counts = generate(sf, sink, args.seed, args.end_date, args.history_days)
+        elapsed = time.perf_counter() - started
+        print(json.dumps({"scale_factor": sf, "rows": counts, "seconds": round(elapsed, 1)}))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
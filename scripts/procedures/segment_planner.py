@@ -0,0 +1,232 @@
+# Copyright 2026 Snowflake Inc.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Query planning for subscriber segment predicates, shared by the stored procedures.
+
+SEGMENT_PREVIEW and SEGMENT_MATERIALIZE filter a unified subscriber view whose
+columns are headline aliases (``TIER``, ``PREDICTED_LTV``, ...) or source-prefixed
+(``f_``, ``cr_``, ``ltv_``, ``bl_``, ``spe_``). ``base_sql`` plans that view per
+predicate: a referenced column is read from the wide ANALYSE.SUBSCRIBER_ATTRIBUTES
+table when that table takes it from the same source, and the source is joined
+otherwise, so ``ltv_UNIQUE_ID IS NULL`` or ``f_PERSONA`` keep their LEFT JOIN meaning.
+
+RUN_OVERLAP_QUERY filters the profile (``spe``) and behavioural log (``bl``) tables
+joined to the identity graph (``h``). ``overlap_from`` qualifies bare columns with
+the alias that owns them and joins only the sources the filter reads.
+
+setup.sql copies this file to @ANALYSE.PROCEDURE_MODULES; the procedures list it in
+their IMPORTS.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Dict, Iterable, Set, Tuple
+
+
+PREFIXES = ("f", "cr", "ltv", "bl", "spe")
+SOURCES = {
+    "f": "AME_AD_SALES_DEMO.ANALYSE.FE_SUBSCRIBER_FEATURES",
+    "cr": "AME_AD_SALES_DEMO.ANALYSE.FE_SUBSCRIBER_CHURN_RISK",
+    "ltv": "AME_AD_SALES_DEMO.ANALYSE.FE_SUBSCRIBER_LTV_SCORES",
+    "bl": "AME_AD_SALES_DEMO.HARMONIZED.AGGREGATED_BEHAVIORAL_LOGS",
+    "spe": "AME_AD_SALES_DEMO.HARMONIZED.SUBSCRIBER_PROFILE_ENRICHED",
+}
+# The SUBSCRIBER_ATTRIBUTES columns each source feeds, under the same names. The table is
+# driven by f, so its UNIQUE_ID is f's; PROFILE_ID and the profile and behaviour columns
+# f copies from spe and bl are taken from spe and bl there.
+ATTRIBUTES_TABLE = "AME_AD_SALES_DEMO.ANALYSE.SUBSCRIBER_ATTRIBUTES"
+ATTRIBUTES_COLUMNS = {
+    "f": {
+        "UNIQUE_ID", "BEHAVIOURAL_EVENTS", "CLICKSTREAM_EVENTS", "CLICKSTREAM_ACTIVE_DAYS", "DISTINCT_EVENT_TYPES",
+        "IMPRESSION_EVENTS", "CLICK_EVENTS", "IMPRESSION_UNITS", "CLICK_UNITS", "IMPRESSION_UNITS_30",
+        "CLICK_UNITS_30", "IMPRESSION_UNITS_90", "CLICK_UNITS_90", "IMPRESSION_UNITS_180", "CLICK_UNITS_180",
+        "MONETIZATION_TOTAL", "MONETIZATION_90", "MONETIZATION_180", "DAYS_SINCE_BEHAVIOUR",
+        "DAYS_SINCE_AD_ENGAGEMENT", "DAYS_SINCE_CLICKSTREAM", "AD_CLICK_RATE", "EVENTS_PER_ACTIVE_DAY",
+        "VISIT_TO_LOGIN_RATIO", "ATTRIBUTED_SPEND", "MONETIZATION_INDEX", "CONTENT_CATEGORY_VECTOR",
+        "NEGATIVE_EVENT_COUNT", "NEGATIVE_EVENT_COUNT_30", "NEGATIVE_EVENT_RATIO", "WATCH_TIME_TOTAL",
+        "WATCH_TIME_WEEKLY_AVG", "WATCH_TIME_30", "WATCH_TIME_90", "WATCH_TIME_180", "WATCH_SESSION_COUNT",
+        "WATCH_SESSION_COUNT_30", "WATCH_SESSION_COUNT_90", "WATCH_SESSION_COUNT_180",
+        "WATCH_SESSION_AVG_DURATION", "WATCH_SESSION_AVG_DURATION_30", "WATCH_SESSION_AVG_DURATION_90",
+        "WATCH_SESSION_AVG_DURATION_180", "WATCH_TIME_AVG_PER_ACTIVE_DAY", "WATCH_LONGEST_SESSION_SECONDS",
+        "WATCH_COMPLETION_RATE", "WATCH_BINGE_INDICATOR", "MAU_COUNT", "MAV_COUNT", "MAU_CURRENT_MONTH",
+        "MAV_CURRENT_MONTH", "BEHAVIOURAL_LAST_EVENT_TS", "LAST_AD_EVENT_TS", "CLICKSTREAM_LAST_EVENT_TS",
+        "FIRST_SEEN_TS", "GENERATED_TS",
+    },
+    "cr": {"PREDICTED_CHURN_PROB", "CHURN_RISK_SEGMENT", "CHURN_LABEL"},
+    "ltv": {"PREDICTED_LTV", "LTV_TARGET", "LTV_SEGMENT"},
+    "bl": {
+        "PERSONA", "PRIMARY_CONTENT_TAG", "CONTENT_CATEGORIES", "CONTENT_VIEWS_COUNT",
+        "CONTENT_VIEW_CATEGORIES", "AVG_SITE_VISITS_PER_MONTH", "LOGIN_FREQUENCY_PER_WEEK", "TOTAL_EVENTS",
+    },
+    "spe": {
+        "PROFILE_ID", "FULL_NAME", "EMAIL", "TIER", "LAD_CODE", "AREA_NAME", "LATITUDE",
+        "LONGITUDE", "AGE", "AGE_BAND", "INCOME_LEVEL", "EDUCATION_LEVEL", "MARITAL_STATUS", "FAMILY_STATUS",
+        "BEHAVIORAL_DIGITAL_MEDIA_CONSUMPTION_INDEX", "BEHAVIORAL_FAST_FASHION_RETAIL_PROPENSITY",
+        "BEHAVIORAL_GROCERY_ONLINE_DELIVERY_USE", "BEHAVIORAL_FINANCIAL_INVESTMENT_INTEREST",
+    },
+}
+ATTRIBUTES_SOURCES = {column: prefix for prefix, columns in ATTRIBUTES_COLUMNS.items() for column in columns}
+# Unprefixed columns predicates may use, and where they come from
+HEADLINE_COLUMNS = {
+    "UNIQUE_ID": ("f", "UNIQUE_ID"),
+    "TIER": ("spe", "TIER"),
+    "PERSONA": ("bl", "PERSONA"),
+    "PREDICTED_LTV": ("ltv", "PREDICTED_LTV"),
+    "PREDICTED_CHURN_PROB": ("cr", "PREDICTED_CHURN_PROB"),
+    "WATCH_TIME_30": ("f", "WATCH_TIME_30"),
+    "WATCH_TIME_90": ("f", "WATCH_TIME_90"),
+    "WATCH_TIME_180": ("f", "WATCH_TIME_180"),
+    "MAU_COUNT": ("f", "MAU_COUNT"),
+    "MAV_COUNT": ("f", "MAV_COUNT"),
+}
+
+# Overlap filters name columns of the identity graph and the sources joined to it. A bare
+# column is qualified with the first alias here that has it, so UNIQUE_ID and
+# HASHED_EMAIL resolve to the graph and need no join.
+OVERLAP_GRAPH = "AME_AD_SALES_DEMO.HARMONIZED.SUBSCRIBER_IDENTITY_GRAPH"
+OVERLAP_SOURCES = ("spe", "bl")
+OVERLAP_COLUMNS = {
+    "h": {"UNIQUE_ID", "PROFILE_ID", "HASHED_EMAIL", "HASHED_PHONE"},
+    "spe": {
+        "UNIQUE_ID", "PROFILE_ID", "FULL_NAME", "EMAIL", "USERNAME", "PRIMARY_MOBILE", "IP_ADDRESS", "TIER",
+        "CREATED_TS", "LAD_CODE", "AREA_NAME", "LATITUDE", "LONGITUDE", "AGE", "AGE_BAND", "EDUCATION_LEVEL",
+        "INCOME_LEVEL", "MARITAL_STATUS", "FAMILY_STATUS", "BEHAVIORAL_DIGITAL_MEDIA_CONSUMPTION_INDEX",
+        "BEHAVIORAL_FAST_FASHION_RETAIL_PROPENSITY", "BEHAVIORAL_GROCERY_ONLINE_DELIVERY_USE",
+        "BEHAVIORAL_FINANCIAL_INVESTMENT_INTEREST", "DEMOGRAPHICS_GENERATED_TS",
+    },
+    "bl": {
+        "UNIQUE_ID", "PERSONA", "PRIMARY_CONTENT_TAG", "CONTENT_CATEGORIES", "CONTENT_VIEWS_COUNT",
+        "CONTENT_VIEW_CATEGORIES", "CONTENT_PATHS", "AVG_SITE_VISITS_PER_MONTH", "LOGIN_FREQUENCY_PER_WEEK",
+        "TOTAL_EVENTS", "LAST_EVENT_TS",
+    },
+}
+
+PREFIXED_COLUMN = re.compile(r"\b(" + "|".join(PREFIXES) + r")_([A-Z0-9_$]+)\b", re.IGNORECASE)
+STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+SOURCE_REFERENCE = re.compile(r"\b(" + "|".join(OVERLAP_SOURCES) + r")\s*\.\s*[A-Z_]", re.IGNORECASE)
+# A name that is not qualified, a function, a cast type or a semi-structured path step.
+BARE_IDENTIFIER = re.compile(r"(?<![.\w$:])([A-Z_][A-Z0-9_$]*)\b(?!\s*[.(])", re.IGNORECASE)
+CAST = re.compile(r"::\s*[A-Z_][A-Z0-9_]*(\s*\([0-9, ]*\))?", re.IGNORECASE)
+SQL_KEYWORDS = {
+    "AND", "OR", "NOT", "IN", "IS", "NULL", "LIKE", "ILIKE", "RLIKE", "ESCAPE", "BETWEEN", "TRUE", "FALSE",
+    "CASE", "WHEN", "THEN", "ELSE", "END", "ANY", "ALL", "DATE", "TIMESTAMP", "INTERVAL",
+}
+
+BASE_SQL = """
+WITH base AS (
+  SELECT
+    {projection}
+  FROM {sources}
+)
+"""
+
+
+def referenced_columns(predicate: str) -> Dict[str, Tuple[str, str]]:
+    """Alias -> (prefix, column) for every headline or prefixed column the predicate names."""
+    text = STRING_LITERAL.sub("''", predicate)
+    columns = {
+        alias: source for alias, source in HEADLINE_COLUMNS.items()
+        if re.search(rf"\b{alias}\b", text, re.IGNORECASE)
+    }
+    for prefix, column in PREFIXED_COLUMN.findall(text):
+        columns[f"{prefix.upper()}_{column.upper()}"] = (prefix.lower(), column.upper())
+    return columns
+
+
+def _join(prefix: str, root: str) -> str:
+    return f"LEFT JOIN {SOURCES[prefix]} {prefix}\n    ON {prefix}.UNIQUE_ID = {root}.UNIQUE_ID"
+
+
+def _covered(prefix: str, column: str) -> bool:
+    return ATTRIBUTES_SOURCES.get(column) == prefix
+
+
+def _plan(columns: Dict[str, Tuple[str, str]]) -> str:
+    # Every source has one row per UNIQUE_ID, so joining only for uncovered columns never changes the rows.
+    projection = [
+        f"sa.{column} AS {alias}" if _covered(prefix, column) else f"{prefix}.{column} AS {alias}"
+        for alias, (prefix, column) in columns.items()
+    ]
+    joined = {prefix for prefix, column in columns.values() if not _covered(prefix, column)}
+    sources = [f"{ATTRIBUTES_TABLE} sa"] + [_join(p, "sa") for p in PREFIXES if p in joined]
+    return BASE_SQL.format(projection=",\n    ".join(projection), sources="\n  ".join(sources))
+
+
+def base_sql(predicate: str, headline: Iterable[str]) -> str:
+    """``WITH base AS (...)`` projecting the given headline aliases and every column the predicate reads."""
+    if '"' in predicate:
+        # Quoted identifiers are not parsed; join everything and expose every prefixed column.
+        projection = [f"sa.{column} AS {alias}" for alias, (_, column) in HEADLINE_COLUMNS.items()]
+        projection += [f"{p}.* AS {p}_*" for p in PREFIXES]
+        sources = [f"{ATTRIBUTES_TABLE} sa"] + [_join(p, "sa") for p in PREFIXES]
+        return BASE_SQL.format(projection=",\n    ".join(projection), sources="\n  ".join(sources))
+    columns = {alias: HEADLINE_COLUMNS[alias] for alias in headline}
+    columns.update(referenced_columns(predicate))
+    return _plan(columns)
+
+
+def _owner(name: str) -> str | None:
+    return next((alias for alias, columns in OVERLAP_COLUMNS.items() if name.upper() in columns), None)
+
+
+def qualify_overlap_filter(segment_filter: str) -> Tuple[str, Set[str]]:
+    """Returns the filter with bare columns qualified by their owning alias, and the sources it reads.
+
+    Names that are neither keywords nor known columns cannot be placed, so every source is
+    then reported; filters with quoted identifiers are returned unparsed with every source.
+    """
+    if '"' in segment_filter:
+        return segment_filter, set(OVERLAP_SOURCES)
+    parts = STRING_LITERAL.split(segment_filter)
+    literals = STRING_LITERAL.findall(segment_filter)
+    unknown = False
+
+    def qualify(match: re.Match) -> str:
+        name = match.group(1)
+        owner = _owner(name)
+        return f"{owner}.{name}" if owner else name
+
+    qualified = []
+    for i, part in enumerate(parts):
+        names = BARE_IDENTIFIER.findall(CAST.sub("", part))
+        unknown = unknown or any(n.upper() not in SQL_KEYWORDS and _owner(n) is None for n in names)
+        qualified.append(BARE_IDENTIFIER.sub(qualify, part))
+        if i < len(literals):
+            qualified.append(literals[i])
+    text = "".join(qualified)
+    if unknown:
+        return text, set(OVERLAP_SOURCES)
+    return text, {alias.lower() for alias in SOURCE_REFERENCE.findall(STRING_LITERAL.sub("''", text))}
+
+
+def overlap_from(segment_filter: str, partner_table: str) -> str:
+    """FROM/WHERE over the identity graph ``h`` and partner list ``p`` for an overlap filter."""
+    # Hashes come from the identity graph, so the segment and partner lookups are narrow equality joins.
+    # The graph is derived from the profile table, so the profile is only joined when the filter reads it;
+    # subscribers without behavioural logs stay excluded through a semi-join when bl is not read.
+    segment_filter, sources = qualify_overlap_filter(segment_filter)
+    lines = [f"FROM {OVERLAP_GRAPH} h"]
+    lines += [
+        f"INNER JOIN {SOURCES[alias]} {alias}\n            ON {alias}.UNIQUE_ID = h.UNIQUE_ID"
+        for alias in OVERLAP_SOURCES if alias in sources
+    ]
+    lines.append(f"LEFT JOIN {partner_table} p\n            ON p.hashed_email = h.hashed_email")
+    conditions = [segment_filter] if segment_filter else []
+    if "bl" not in sources:
+        conditions.append(f"h.UNIQUE_ID IN (SELECT UNIQUE_ID FROM {SOURCES['bl']})")
+    lines.append("WHERE " + " AND ".join(f"({c})" for c in conditions))
+    return "\n        ".join(lines)
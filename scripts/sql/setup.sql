@@ -78,6 +78,42 @@ CREATE OR REPLACE STAGE AME_AD_SALES_DEMO.ANALYSE.SEMANTIC_MODELS
 
 GRANT READ, WRITE ON STAGE AME_AD_SALES_DEMO.ANALYSE.SEMANTIC_MODELS TO ROLE AME_AD_SALES_DEMO_ADMIN;
 
+-- =============================================================================
+-- GIT REPOSITORY (Streamlit apps, semantic model and shared procedure modules)
+-- =============================================================================
+
+-- API Integration requires ACCOUNTADMIN privileges
+USE ROLE ACCOUNTADMIN;
+
+-- Create API integration for GitHub (public repo - no secrets needed)
+CREATE OR REPLACE API INTEGRATION GITHUB_API_INTEGRATION
+    API_PROVIDER = git_https_api
+    API_ALLOWED_PREFIXES = ('https://github.com/Snowflake-Labs/')
+    ENABLED = TRUE;
+
+-- Grant usage on the API integration to the demo admin role
+GRANT USAGE ON INTEGRATION GITHUB_API_INTEGRATION TO ROLE AME_AD_SALES_DEMO_ADMIN;
+
+-- Switch back to demo admin role for remaining objects
+USE ROLE AME_AD_SALES_DEMO_ADMIN;
+USE WAREHOUSE APP_WH;
+
+-- Git repository the Streamlit apps, semantic model and procedure modules are copied from
+CREATE OR REPLACE GIT REPOSITORY AME_AD_SALES_DEMO.GENERATE.SFGUIDE_MEA_REPO
+    API_INTEGRATION = GITHUB_API_INTEGRATION
+    ORIGIN = 'https://github.com/Snowflake-Labs/sfguide-mea-subscriber-analytics.git';
+
+-- Fetch latest from Git repo
+ALTER GIT REPOSITORY AME_AD_SALES_DEMO.GENERATE.SFGUIDE_MEA_REPO FETCH;
+
+-- Python modules shared by several stored procedures (listed in their IMPORTS)
+CREATE OR REPLACE STAGE AME_AD_SALES_DEMO.ANALYSE.PROCEDURE_MODULES
+    DIRECTORY = (ENABLE = TRUE);
+
+COPY FILES
+    INTO @AME_AD_SALES_DEMO.ANALYSE.PROCEDURE_MODULES/
+    FROM @AME_AD_SALES_DEMO.GENERATE.SFGUIDE_MEA_REPO/branches/main/scripts/procedures/
+    FILES = ('segment_planner.py');
 
 
 
@@ -172,7 +208,10 @@ CREATE OR REPLACE TABLE AME_AD_SALES_DEMO.INGEST.CLICKSTREAM_EVENTS (
     CONTENT_TYPE TEXT,
     CONTENT_CATEGORY TEXT,
     ATTRIBUTES VARIANT
-);
+)
+-- Apps and feature engineering filter on event time; cluster on the day so
+-- micro-partitions stay date-aligned without re-sorting within a day.
+CLUSTER BY (TO_DATE(EVENT_TS));
 
 COPY INTO AME_AD_SALES_DEMO.INGEST.CLICKSTREAM_EVENTS
 FROM (
@@ -251,6 +290,14 @@ WHERE NOT EXISTS (
     AND e.event_type = 'SIGN_UP'
 );
 
+-- The S3 extract arrives in file order, not time order. Rewrite it once in clustering
+-- key order so date filters prune from the first query instead of waiting on
+-- automatic clustering; later daily deliveries append whole days.
+INSERT OVERWRITE INTO AME_AD_SALES_DEMO.INGEST.CLICKSTREAM_EVENTS
+SELECT *
+FROM AME_AD_SALES_DEMO.INGEST.CLICKSTREAM_EVENTS
+ORDER BY EVENT_TS;
+
 -- ---------------------------------------------------------------------------
 -- 13-load-ad-campaigns-and-performance.sql
 -- ---------------------------------------------------------------------------
@@ -351,7 +398,15 @@ USE WAREHOUSE APP_WH;
 USE DATABASE AME_AD_SALES_DEMO;
 USE SCHEMA HARMONIZED;
 
-CREATE OR REPLACE TABLE AME_AD_SALES_DEMO.HARMONIZED.SUBSCRIBER_PROFILE_ENRICHED AS
+/*
+    Maintained incrementally: a refresh only recomputes subscribers whose INGEST
+    profile or matching demographic record changed since the last refresh.
+*/
+CREATE OR REPLACE DYNAMIC TABLE AME_AD_SALES_DEMO.HARMONIZED.SUBSCRIBER_PROFILE_ENRICHED
+  WAREHOUSE = APP_WH
+  TARGET_LAG = '1 hour'
+  REFRESH_MODE = INCREMENTAL
+AS
 WITH ingest_profiles AS (
     SELECT
         sp.unique_id,
@@ -453,12 +508,11 @@ SELECT
     behavioral_fast_fashion_retail_propensity,
     behavioral_grocery_online_delivery_use,
     behavioral_financial_investment_interest,
-    demographics_generated_ts,
-    CURRENT_TIMESTAMP() AS generated_ts
+    demographics_generated_ts
 FROM joined;
 
 COMMENT ON TABLE AME_AD_SALES_DEMO.HARMONIZED.SUBSCRIBER_PROFILE_ENRICHED IS
-    'Subscriber dimension combining identity attributes with demographic insight. Built from ingest identity feeds joined to shared demographic profiles via normalized email. Used as the conformed subscriber reference for harmonized, analyse and activation layers.';
+    'Subscriber dimension combining identity attributes with demographic insight. Built from ingest identity feeds joined to shared demographic profiles via normalized email. Used as the conformed subscriber reference for harmonized, analyse and activation layers. Incrementally refreshed by UNIQUE_ID.';
 
 COMMENT ON COLUMN AME_AD_SALES_DEMO.HARMONIZED.SUBSCRIBER_PROFILE_ENRICHED.UNIQUE_ID IS
     'Deterministic subscriber identifier generated in the GENERATE layer and persisted through INGEST; primary key for joining to behavioural and ad delivery facts.';
@@ -508,8 +562,6 @@ COMMENT ON COLUMN AME_AD_SALES_DEMO.HARMONIZED.SUBSCRIBER_PROFILE_ENRICHED.BEHAV
     'Gaussian-noised propensity index for financial investment interest; supports finance advertiser scenarios.';
 COMMENT ON COLUMN AME_AD_SALES_DEMO.HARMONIZED.SUBSCRIBER_PROFILE_ENRICHED.DEMOGRAPHICS_GENERATED_TS IS
     'Timestamp placeholder for demographic enrichment execution; kept for consistency with production workflows.';
-COMMENT ON COLUMN AME_AD_SALES_DEMO.HARMONIZED.SUBSCRIBER_PROFILE_ENRICHED.GENERATED_TS IS
-    'Load timestamp indicating when the harmonized subscriber profile snapshot was last regenerated.';
 
 
 SELECT
@@ -517,6 +569,49 @@ SELECT
     COUNT(*) AS "Rows generated"
 FROM AME_AD_SALES_DEMO.HARMONIZED.SUBSCRIBER_PROFILE_ENRICHED;
 
+/*
+    Identity graph: one row per subscriber with precomputed, normalised identifier hashes.
+    Clean room overlap, partner lists and activation exports join on these narrow hash
+    columns instead of re-normalising and hashing EMAIL / PRIMARY_MOBILE at query time.
+    - HASHED_EMAIL: SHA2(LOWER(TRIM(email)), 256)
+    - HASHED_PHONE: SHA2 of the E.164 digits of PRIMARY_MOBILE (UK national 0 prefix -> 44)
+    The table refreshes incrementally as SUBSCRIBER_PROFILE_ENRICHED changes and is
+    clustered on HASHED_EMAIL, the key used by overlap and partner joins.
+*/
+CREATE OR REPLACE DYNAMIC TABLE AME_AD_SALES_DEMO.HARMONIZED.SUBSCRIBER_IDENTITY_GRAPH
+  WAREHOUSE = APP_WH
+  TARGET_LAG = '1 hour'
+  REFRESH_MODE = INCREMENTAL
+  CLUSTER BY (hashed_email)
+AS
+WITH normalised AS (
+    SELECT
+        unique_id,
+        profile_id,
+        NULLIF(LOWER(TRIM(email)), '') AS email_normalised,
+        NULLIF(REGEXP_REPLACE(primary_mobile, '[^0-9]', ''), '') AS mobile_digits
+    FROM AME_AD_SALES_DEMO.HARMONIZED.SUBSCRIBER_PROFILE_ENRICHED
+)
+SELECT
+    unique_id,
+    profile_id,
+    SHA2(email_normalised, 256) AS hashed_email,
+    SHA2(
+        CASE
+            WHEN STARTSWITH(mobile_digits, '0') THEN '44' || SUBSTR(mobile_digits, 2)
+            ELSE mobile_digits
+        END,
+        256
+    ) AS hashed_phone
+FROM normalised;
+
+COMMENT ON TABLE AME_AD_SALES_DEMO.HARMONIZED.SUBSCRIBER_IDENTITY_GRAPH IS
+    'Identity graph keyed by UNIQUE_ID with normalised SHA-256 identifier hashes for clean room overlap, partner matching and activation. Incrementally refreshed from SUBSCRIBER_PROFILE_ENRICHED and clustered on HASHED_EMAIL.';
+COMMENT ON COLUMN AME_AD_SALES_DEMO.HARMONIZED.SUBSCRIBER_IDENTITY_GRAPH.HASHED_EMAIL IS
+    'SHA-256 of the lower-cased, trimmed email; NULL when no email is on file.';
+COMMENT ON COLUMN AME_AD_SALES_DEMO.HARMONIZED.SUBSCRIBER_IDENTITY_GRAPH.HASHED_PHONE IS
+    'SHA-256 of PRIMARY_MOBILE normalised to E.164 digits without the plus sign; NULL when no mobile is on file.';
+
 
 
 -- ---------------------------------------------------------------------------
@@ -536,7 +631,68 @@ SET AD_CAMPAIGN_END_DATE = CURRENT_DATE();
 */
 USE SCHEMA HARMONIZED;
 
-CREATE OR REPLACE TABLE AME_AD_SALES_DEMO.HARMONIZED.AD_PERFORMANCE_DAILY_AGG AS
+/*
+    Clickstream event counts per subscriber and content tag, the input to persona
+    inference for ad delivery. Kept as an incremental dynamic table so a new day of
+    clickstream only updates the (unique_id, content_tag) groups it touches.
+*/
+CREATE OR REPLACE DYNAMIC TABLE AME_AD_SALES_DEMO.HARMONIZED.SUBSCRIBER_CONTENT_TAG_COUNTS
+  WAREHOUSE = APP_WH
+  TARGET_LAG = '1 hour'
+  REFRESH_MODE = INCREMENTAL
+AS
+SELECT
+    ce.unique_id,
+    LOWER(
+        COALESCE(
+            NULLIF(ce.content_category, ''),
+            NULLIF(ce.content_type, ''),
+            ce.attributes:content_category::STRING,
+            ce.attributes:content_type::STRING,
+            ce.attributes:page_name::STRING,
+            ce.event_type
+        )
+    ) AS content_tag,
+    COUNT(*) AS event_count
+FROM AME_AD_SALES_DEMO.INGEST.CLICKSTREAM_EVENTS ce
+WHERE ce.unique_id IS NOT NULL
+GROUP BY 1, 2;
+
+COMMENT ON TABLE AME_AD_SALES_DEMO.HARMONIZED.SUBSCRIBER_CONTENT_TAG_COUNTS IS
+    'Clickstream event counts by subscriber and normalised content tag. Incrementally refreshed from INGEST.CLICKSTREAM_EVENTS and used to infer the dominant persona reached by ad campaigns.';
+COMMENT ON COLUMN AME_AD_SALES_DEMO.HARMONIZED.SUBSCRIBER_CONTENT_TAG_COUNTS.CONTENT_TAG IS
+    'Lower-cased content category, content type, page name or event type, in that order of preference.';
+COMMENT ON COLUMN AME_AD_SALES_DEMO.HARMONIZED.SUBSCRIBER_CONTENT_TAG_COUNTS.EVENT_COUNT IS
+    'Number of clickstream events carrying the content tag for the subscriber.';
+
+-- Persona each subscriber is counted under in ad reach sketches: the dominant content
+-- tag mapped the same way as the persona lookup in the daily aggregation below.
+CREATE OR REPLACE VIEW AME_AD_SALES_DEMO.HARMONIZED.SUBSCRIBER_AD_PERSONA AS
+SELECT
+    ps.unique_id,
+    CASE
+        WHEN ps.content_tag ILIKE '%sport%' THEN 'SPORTS_ENGAGED'
+        WHEN ps.content_tag ILIKE '%live%' THEN 'LIVE_EVENT_FOLLOWER'
+        WHEN ps.content_tag ILIKE '%kids%' OR ps.content_tag ILIKE '%family%' OR ps.content_tag ILIKE '%animation%' THEN 'FAMILY_HOUSEHOLD'
+        WHEN ps.content_tag ILIKE '%documentary%' OR ps.content_tag ILIKE '%knowledge%' OR ps.content_tag ILIKE '%docu%' THEN 'KNOWLEDGE_SEEKER'
+        WHEN ps.content_tag ILIKE '%lifestyle%' OR ps.content_tag ILIKE '%wellness%' THEN 'LIFESTYLE_MINDED'
+        WHEN ps.content_tag ILIKE '%reality%' THEN 'REALITY_FAN'
+        WHEN ps.content_tag ILIKE '%original%' OR ps.content_tag ILIKE '%drama%' THEN 'PREMIUM_DRAMA'
+        ELSE 'GENERAL_STREAMER'
+    END AS persona
+FROM AME_AD_SALES_DEMO.HARMONIZED.SUBSCRIBER_CONTENT_TAG_COUNTS ps
+QUALIFY ROW_NUMBER() OVER (
+    PARTITION BY ps.unique_id
+    ORDER BY ps.event_count DESC, ps.content_tag
+) = 1;
+
+/*
+    Backfill build over the campaign window. New INGEST deliveries are applied by
+    HARMONIZED.REFRESH_AD_PERFORMANCE (section 17) from streams on the source tables.
+*/
+CREATE OR REPLACE TABLE AME_AD_SALES_DEMO.HARMONIZED.AD_PERFORMANCE_DAILY_AGG
+CLUSTER BY (report_date, campaign_id)
+AS
 WITH params AS (
     SELECT
         TO_DATE($AD_CAMPAIGN_START_DATE) AS start_date,
@@ -574,34 +730,6 @@ base AS (
         src.content_category,
         src.rate_type
 ),
-persona_signals AS (
-    SELECT
-        ce.unique_id,
-        LOWER(
-            COALESCE(
-                NULLIF(ce.content_category, ''),
-                NULLIF(ce.content_type, ''),
-                ce.attributes:content_category::STRING,
-                ce.attributes:content_type::STRING,
-                ce.attributes:page_name::STRING,
-                ce.event_type
-            )
-        ) AS content_tag,
-        COUNT(*) AS event_count
-    FROM AME_AD_SALES_DEMO.INGEST.CLICKSTREAM_EVENTS ce
-    WHERE ce.unique_id IS NOT NULL
-    GROUP BY ce.unique_id,
-             LOWER(
-                 COALESCE(
-                     NULLIF(ce.content_category, ''),
-                     NULLIF(ce.content_type, ''),
-                     ce.attributes:content_category::STRING,
-                     ce.attributes:content_type::STRING,
-                     ce.attributes:page_name::STRING,
-                     ce.event_type
-                 )
-             )
-),
 persona_ranked AS (
     SELECT
         ps.unique_id,
@@ -611,7 +739,7 @@ persona_ranked AS (
             PARTITION BY ps.unique_id
             ORDER BY ps.event_count DESC, ps.content_tag
         ) AS rank_in_segment
-    FROM persona_signals ps
+    FROM AME_AD_SALES_DEMO.HARMONIZED.SUBSCRIBER_CONTENT_TAG_COUNTS ps
 ),
 persona_lookup AS (
     SELECT
@@ -636,7 +764,8 @@ ads_rollup AS (
         ae.campaign_id,
         ARRAY_AGG(DISTINCT COALESCE(pl.derived_persona, 'GENERAL_STREAMER')) AS persona_list,
         ARRAY_AGG(DISTINCT COALESCE(ae.device, 'UNKNOWN')) AS device_list,
-        COUNT(DISTINCT ae.unique_id) AS audience_reach
+        COUNT(DISTINCT ae.unique_id) AS audience_reach,
+        HLL_EXPORT(HLL_ACCUMULATE(ae.unique_id)) AS reach_sketch
     FROM AME_AD_SALES_DEMO.INGEST.ADS_EVENTS ae
     LEFT JOIN persona_lookup pl
       ON pl.unique_id = ae.unique_id
@@ -661,11 +790,13 @@ SELECT
     COALESCE(ar.persona_list, ARRAY_CONSTRUCT('GENERAL_STREAMER')) AS target_personas,
     COALESCE(ar.device_list, ARRAY_CONSTRUCT('UNKNOWN')) AS target_devices,
     COALESCE(ar.audience_reach, 0) AS observed_unique_subscribers,
-    CURRENT_TIMESTAMP() AS generated_ts
+    CURRENT_TIMESTAMP() AS generated_ts,
+    ar.reach_sketch
 FROM base
 LEFT JOIN ads_rollup ar
   ON base.report_date = ar.report_date
- AND base.campaign_id = ar.campaign_id;
+ AND base.campaign_id = ar.campaign_id
+ORDER BY base.report_date, base.campaign_id;
 
 COMMENT ON TABLE AME_AD_SALES_DEMO.HARMONIZED.AD_PERFORMANCE_DAILY_AGG IS
     'Daily advertising performance fact table consolidating impressions, clicks, spend, and device/persona targeting attributes. Derived from ingest events with persona inference sourced from observed clickstream behaviour. Acts as the core fact for harmonized ad analytics.';
@@ -708,6 +839,36 @@ COMMENT ON COLUMN AME_AD_SALES_DEMO.HARMONIZED.AD_PERFORMANCE_DAILY_AGG.OBSERVED
     'Distinct subscriber count reached by the campaign on report_date after deduping impression/click events.';
 COMMENT ON COLUMN AME_AD_SALES_DEMO.HARMONIZED.AD_PERFORMANCE_DAILY_AGG.GENERATED_TS IS
     'Timestamp when the harmonized daily aggregation was last regenerated.';
+COMMENT ON COLUMN AME_AD_SALES_DEMO.HARMONIZED.AD_PERFORMANCE_DAILY_AGG.REACH_SKETCH IS
+    'HLL_EXPORT state of the subscribers reached on report_date. Reach over any set of rows is HLL_ESTIMATE(HLL_COMBINE(HLL_IMPORT(reach_sketch))); summing OBSERVED_UNIQUE_SUBSCRIBERS double counts repeat viewers.';
+
+/*
+    Daily reach per inferred persona across all campaigns, as mergeable HLL sketches,
+    so persona reach over any date range is a sketch merge instead of a rescan of
+    ADS_EVENTS. Subscribers are counted under their HARMONIZED.SUBSCRIBER_AD_PERSONA
+    persona. Kept current by REFRESH_AD_PERFORMANCE and GENERATE_DAILY_DATA.
+*/
+CREATE OR REPLACE TABLE AME_AD_SALES_DEMO.HARMONIZED.AD_REACH_PERSONA_DAILY
+CLUSTER BY (report_date)
+AS
+SELECT
+    ae.event_date AS report_date,
+    COALESCE(pl.persona, 'GENERAL_STREAMER') AS persona,
+    COUNT(DISTINCT ae.campaign_id) AS campaign_count,
+    COUNT(DISTINCT ae.unique_id) AS observed_unique_subscribers,
+    CURRENT_TIMESTAMP() AS generated_ts,
+    HLL_EXPORT(HLL_ACCUMULATE(ae.unique_id)) AS reach_sketch
+FROM AME_AD_SALES_DEMO.INGEST.ADS_EVENTS ae
+LEFT JOIN AME_AD_SALES_DEMO.HARMONIZED.SUBSCRIBER_AD_PERSONA pl
+  ON pl.unique_id = ae.unique_id
+WHERE ae.event_date BETWEEN TO_DATE($AD_CAMPAIGN_START_DATE) AND TO_DATE($AD_CAMPAIGN_END_DATE)
+GROUP BY 1, 2
+ORDER BY report_date;
+
+COMMENT ON TABLE AME_AD_SALES_DEMO.HARMONIZED.AD_REACH_PERSONA_DAILY IS
+    'Daily ad reach per inferred persona with an HLL sketch of the subscribers reached; merge sketches for reach over longer windows.';
+COMMENT ON COLUMN AME_AD_SALES_DEMO.HARMONIZED.AD_REACH_PERSONA_DAILY.REACH_SKETCH IS
+    'HLL_EXPORT state of the subscribers of this persona reached on report_date by any campaign.';
 
 
 
@@ -721,7 +882,11 @@ USE DATABASE AME_AD_SALES_DEMO;
 -- Regional sales effectiveness derived entirely from INGEST-layer datasets.
 USE SCHEMA HARMONIZED;
 
-CREATE OR REPLACE TABLE AME_AD_SALES_DEMO.HARMONIZED.AD_SALES_REGION_CATEGORY_RATES AS
+CREATE OR REPLACE DYNAMIC TABLE AME_AD_SALES_DEMO.HARMONIZED.AD_SALES_REGION_CATEGORY_RATES
+  WAREHOUSE = APP_WH
+  TARGET_LAG = '1 hour'
+  REFRESH_MODE = INCREMENTAL
+AS
 WITH daily_metrics AS (
     SELECT
         metric_date AS report_date,
@@ -793,13 +958,12 @@ aggregated AS (
     GROUP BY 1, 2
 ),
 region_lookup AS (
-    SELECT
+    -- Unmatched LADs (including UNKNOWN) fall back to UNKNOWN via the COALESCEs below.
+    SELECT DISTINCT
         COALESCE(TRIM(UPPER(lad_code)), 'UNKNOWN') AS lad_code,
         COALESCE(NULLIF(TRIM(rural_urban), ''), 'UNKNOWN') AS rural_urban,
         COALESCE(NULLIF(TRIM(income_level), ''), 'UNKNOWN') AS income_level
     FROM AME_AD_SALES_DEMO.INGEST.DEMOGRAPHICS_DISTRIBUTIONS
-    UNION
-    SELECT 'UNKNOWN', 'UNKNOWN', 'UNKNOWN'
 )
 SELECT
     agg.content_category,
@@ -813,14 +977,13 @@ SELECT
     CASE WHEN agg.impressions > 0 THEN (agg.spend * 1000) / agg.impressions ELSE 0 END AS ecpm,
     agg.subscriber_touchpoints,
     agg.impressions AS sampled_impressions,
-    agg.unique_subscribers,
-    CURRENT_TIMESTAMP() AS generated_ts
+    agg.unique_subscribers
 FROM aggregated agg
 LEFT JOIN region_lookup rl
   ON rl.lad_code = agg.lad_code;
 
 COMMENT ON TABLE AME_AD_SALES_DEMO.HARMONIZED.AD_SALES_REGION_CATEGORY_RATES IS
-    'Regional ad effectiveness mart distributing campaign delivery metrics across LAD geographies using observed ad events. Supports sales planning, pricing and geo-performance analyses.';
+    'Regional ad effectiveness mart distributing campaign delivery metrics across LAD geographies using observed ad events. Supports sales planning, pricing and geo-performance analyses. Incrementally refreshed as new ad events arrive.';
 
 COMMENT ON COLUMN AME_AD_SALES_DEMO.HARMONIZED.AD_SALES_REGION_CATEGORY_RATES.CONTENT_CATEGORY IS
     'Content category dimension for the aggregated metrics (Sports, Lifestyle, etc.).';
@@ -846,8 +1009,6 @@ COMMENT ON COLUMN AME_AD_SALES_DEMO.HARMONIZED.AD_SALES_REGION_CATEGORY_RATES.SA
     'Alias for impressions retained for backwards compatibility with earlier scripts.';
 COMMENT ON COLUMN AME_AD_SALES_DEMO.HARMONIZED.AD_SALES_REGION_CATEGORY_RATES.UNIQUE_SUBSCRIBERS IS
     'Distinct subscribers estimated for the LAD via allocated ad event deduplication.';
-COMMENT ON COLUMN AME_AD_SALES_DEMO.HARMONIZED.AD_SALES_REGION_CATEGORY_RATES.GENERATED_TS IS
-    'Timestamp when the regional aggregation table was last refreshed.';
 
 
 
@@ -881,7 +1042,8 @@ WITH base AS (
         MAX(daily_impression_cap) AS peak_daily_cap,
         MAX(creative_count) AS creative_count,
         COUNT(DISTINCT report_date) AS active_days,
-        SUM(observed_unique_subscribers) AS observed_unique_subscribers
+        SUM(observed_unique_subscribers) AS observed_unique_subscribers,
+        HLL_EXPORT(HLL_COMBINE(HLL_IMPORT(reach_sketch))) AS reach_sketch
     FROM AME_AD_SALES_DEMO.HARMONIZED.AD_PERFORMANCE_DAILY_AGG
     GROUP BY
         DATE_TRUNC('MONTH', report_date),
@@ -935,7 +1097,8 @@ SELECT
     COALESCE(dr.device_list, ARRAY_CONSTRUCT()) AS target_devices,
     base.active_days,
     base.observed_unique_subscribers,
-    CURRENT_TIMESTAMP() AS generated_ts
+    CURRENT_TIMESTAMP() AS generated_ts,
+    base.reach_sketch
 FROM base
 LEFT JOIN persona_rollup pr USING (report_month, campaign_id, advertiser_name, vertical, content_category, rate_type)
 LEFT JOIN device_rollup dr USING (report_month, campaign_id, advertiser_name, vertical, content_category, rate_type);
@@ -983,11 +1146,17 @@ COMMENT ON COLUMN AME_AD_SALES_DEMO.HARMONIZED.AD_PERFORMANCE.OBSERVED_UNIQUE_SU
     'Sum of daily reach counts within the month (may over-count due to daily dedupe).';
 COMMENT ON COLUMN AME_AD_SALES_DEMO.HARMONIZED.AD_PERFORMANCE.GENERATED_TS IS
     'Timestamp when the monthly ad performance mart was refreshed.';
+COMMENT ON COLUMN AME_AD_SALES_DEMO.HARMONIZED.AD_PERFORMANCE.REACH_SKETCH IS
+    'Daily reach sketches merged over the month (HLL_EXPORT state); HLL_ESTIMATE(HLL_IMPORT(reach_sketch)) is the deduplicated monthly reach.';
 
 /*
     AD_RATES: Generalized rate card by category and LAD region.
 */
-CREATE OR REPLACE TABLE AME_AD_SALES_DEMO.HARMONIZED.AD_RATES AS
+CREATE OR REPLACE DYNAMIC TABLE AME_AD_SALES_DEMO.HARMONIZED.AD_RATES
+  WAREHOUSE = APP_WH
+  TARGET_LAG = '1 hour'
+  REFRESH_MODE = INCREMENTAL
+AS
 SELECT
     content_category,
     lad_code,
@@ -1000,8 +1169,7 @@ SELECT
     ROUND(CASE WHEN SUM(impressions) > 0 THEN (SUM(spend) * 1000) / SUM(impressions) ELSE 0 END, 4) AS ecpm,
     SUM(subscriber_touchpoints) AS subscriber_touchpoints,
     SUM(sampled_impressions) AS sampled_impressions,
-    SUM(unique_subscribers) AS unique_subscribers,
-    CURRENT_TIMESTAMP() AS generated_ts
+    SUM(unique_subscribers) AS unique_subscribers
 FROM AME_AD_SALES_DEMO.HARMONIZED.AD_SALES_REGION_CATEGORY_RATES
 GROUP BY
     content_category,
@@ -1036,13 +1204,17 @@ COMMENT ON COLUMN AME_AD_SALES_DEMO.HARMONIZED.AD_RATES.SAMPLED_IMPRESSIONS IS
     'Alias for impressions retained for compatibility.';
 COMMENT ON COLUMN AME_AD_SALES_DEMO.HARMONIZED.AD_RATES.UNIQUE_SUBSCRIBERS IS
     'Distinct subscriber count allocated to the LAD/category segment.';
-COMMENT ON COLUMN AME_AD_SALES_DEMO.HARMONIZED.AD_RATES.GENERATED_TS IS
-    'Timestamp when the aggregated rate mart was generated.';
 
 /*
     AGGREGATED_BEHAVIORAL_LOGS: Subscriber-level behavioural features.
+    Every aggregate is grouped by UNIQUE_ID, so an incremental refresh only
+    recomputes subscribers with new clickstream events.
 */
-CREATE OR REPLACE TABLE AME_AD_SALES_DEMO.HARMONIZED.AGGREGATED_BEHAVIORAL_LOGS AS
+CREATE OR REPLACE DYNAMIC TABLE AME_AD_SALES_DEMO.HARMONIZED.AGGREGATED_BEHAVIORAL_LOGS
+  WAREHOUSE = APP_WH
+  TARGET_LAG = '1 hour'
+  REFRESH_MODE = INCREMENTAL
+AS
 WITH behavior_events AS (
     SELECT
         ce.unique_id,
@@ -1212,8 +1384,7 @@ SELECT
         )
     END AS login_frequency_per_week,
     COALESCE(ec.total_events, 0) AS total_events,
-    ec.last_event_ts,
-    CURRENT_TIMESTAMP() AS generated_ts
+    ec.last_event_ts
 FROM profile_summary ps
 LEFT JOIN content_categories cc ON cc.unique_id = ps.unique_id
 LEFT JOIN content_view_counts cvc ON cvc.unique_id = ps.unique_id
@@ -1248,8 +1419,345 @@ COMMENT ON COLUMN AME_AD_SALES_DEMO.HARMONIZED.AGGREGATED_BEHAVIORAL_LOGS.TOTAL_
     'Total number of clickstream events captured across the observation window.';
 COMMENT ON COLUMN AME_AD_SALES_DEMO.HARMONIZED.AGGREGATED_BEHAVIORAL_LOGS.LAST_EVENT_TS IS
     'Timestamp of the most recent clickstream event for the subscriber.';
-COMMENT ON COLUMN AME_AD_SALES_DEMO.HARMONIZED.AGGREGATED_BEHAVIORAL_LOGS.GENERATED_TS IS
-    'Timestamp indicating when the behavioural aggregation was generated.';
+
+/*
+    Incremental maintenance for the ad performance facts.
+    AD_PERFORMANCE_DAILY_AGG and AD_PERFORMANCE also receive generated days from
+    ANALYSE.GENERATE_DAILY_DATA, so they stay regular tables. Streams capture INGEST
+    deliveries that land after the backfill above, and REFRESH_AD_PERFORMANCE merges
+    only the (report_date, campaign_id) pairs and campaign months they touch, then
+    rebuilds the dashboard rollup days and months (ANALYSE.ROLLUP_AD_*) in that window.
+*/
+CREATE OR REPLACE STREAM AME_AD_SALES_DEMO.HARMONIZED.AD_PERFORMANCE_EVENTS_STREAM
+  ON TABLE AME_AD_SALES_DEMO.INGEST.AD_PERFORMANCE_EVENTS
+  APPEND_ONLY = TRUE;
+
+CREATE OR REPLACE STREAM AME_AD_SALES_DEMO.HARMONIZED.ADS_EVENTS_STREAM
+  ON TABLE AME_AD_SALES_DEMO.INGEST.ADS_EVENTS
+  APPEND_ONLY = TRUE;
+
+CREATE OR REPLACE PROCEDURE AME_AD_SALES_DEMO.HARMONIZED.REFRESH_AD_PERFORMANCE()
+RETURNS VARIANT
+LANGUAGE PYTHON
+RUNTIME_VERSION = '3.12'
+PACKAGES = ('snowflake-snowpark-python')
+HANDLER = 'run'
+EXECUTE AS CALLER
+AS
+$$
+import json
+from snowflake.snowpark import Session
+
+DATABASE = "AME_AD_SALES_DEMO"
+DAILY_TABLE = f"{DATABASE}.HARMONIZED.AD_PERFORMANCE_DAILY_AGG"
+MONTHLY_TABLE = f"{DATABASE}.HARMONIZED.AD_PERFORMANCE"
+PERSONA_REACH_TABLE = f"{DATABASE}.HARMONIZED.AD_REACH_PERSONA_DAILY"
+PERSONA_VIEW = f"{DATABASE}.HARMONIZED.SUBSCRIBER_AD_PERSONA"
+PERFORMANCE_STREAM = f"{DATABASE}.HARMONIZED.AD_PERFORMANCE_EVENTS_STREAM"
+ADS_STREAM = f"{DATABASE}.HARMONIZED.ADS_EVENTS_STREAM"
+FEEDS_TABLE = f"{DATABASE}.ANALYSE.DAILY_DATA_FEEDS"
+KEYS_TABLE = "AD_PERFORMANCE_REFRESH_KEYS"
+DIMS = ["campaign_id", "advertiser_name", "vertical", "content_category", "rate_type"]
+DAILY_COLUMNS = [
+    "report_date", *DIMS, "impressions", "clicks", "ctr", "spend", "effective_cpm", "booked_cpm",
+    "booked_ctr", "daily_impression_cap", "creative_count", "target_personas", "target_devices",
+    "observed_unique_subscribers", "generated_ts", "reach_sketch",
+]
+MONTHLY_COLUMNS = [
+    "report_month", *DIMS, "impressions", "clicks", "ctr", "spend", "ecpm", "booked_cpm",
+    "booked_ctr", "peak_daily_cap", "creative_count", "target_personas", "target_devices",
+    "active_days", "observed_unique_subscribers", "generated_ts", "reach_sketch",
+]
+# Rollup date grain -> (rollup date column, bucket expression over the daily table).
+ROLLUP_GRAINS = {
+    "DAY": ("report_date", "report_date"),
+    "MONTH": ("report_month", "DATE_TRUNC('MONTH', report_date)"),
+}
+
+
+def _affected(rows: list) -> int:
+    return sum(int(v or 0) for v in rows[0]) if rows else 0
+
+
+def _merge(session: Session, target: str, source_sql: str, keys: list, columns: list) -> int:
+    # Descriptive dimensions can be NULL in the source, so keys compare NULL-safely.
+    on = " AND ".join(f"EQUAL_NULL(t.{k}, s.{k})" for k in keys)
+    return _affected(session.sql(f"""
+        MERGE INTO {target} t
+        USING ({source_sql}) s
+        ON {on}
+        WHEN MATCHED THEN UPDATE SET {', '.join(f'{c} = s.{c}' for c in columns if c not in keys)}
+        WHEN NOT MATCHED THEN INSERT ({', '.join(columns)}) VALUES ({', '.join(f's.{c}' for c in columns)})
+    """).collect())
+
+
+def _daily_rows_sql(first_date, last_date) -> str:
+    # Same shape as the AD_PERFORMANCE_DAILY_AGG backfill, restricted to the affected keys.
+    # The date bounds let both event tables prune on their date columns.
+    dims = ", ".join(f"src.{d}" for d in DIMS)
+    return f"""
+        WITH keys AS (
+            SELECT DISTINCT report_date, campaign_id FROM {KEYS_TABLE}
+        ),
+        base AS (
+            SELECT
+                src.metric_date AS report_date,
+                {dims},
+                SUM(src.impressions) AS impressions,
+                SUM(src.clicks) AS clicks,
+                ROUND(CASE WHEN SUM(src.impressions) > 0 THEN SUM(src.clicks) / SUM(src.impressions) ELSE 0 END, 6) AS ctr,
+                ROUND(SUM(src.spend), 4) AS spend,
+                ROUND(CASE WHEN SUM(src.impressions) > 0 THEN (SUM(src.spend) * 1000) / SUM(src.impressions) ELSE 0 END, 4) AS effective_cpm,
+                MAX(src.booked_cpm) AS booked_cpm,
+                MAX(src.booked_ctr) AS booked_ctr,
+                MAX(src.daily_impression_cap) AS daily_impression_cap,
+                MAX(src.creative_count) AS creative_count
+            FROM {DATABASE}.INGEST.AD_PERFORMANCE_EVENTS src
+            INNER JOIN keys k
+              ON k.report_date = src.metric_date
+             AND k.campaign_id = src.campaign_id
+            WHERE src.metric_date BETWEEN '{first_date}'::DATE AND '{last_date}'::DATE
+            GROUP BY src.metric_date, {dims}
+        ),
+        ads AS (
+            SELECT ae.event_date, ae.campaign_id, ae.unique_id, ae.device
+            FROM {DATABASE}.INGEST.ADS_EVENTS ae
+            INNER JOIN keys k
+              ON k.report_date = ae.event_date
+             AND k.campaign_id = ae.campaign_id
+            WHERE ae.event_date BETWEEN '{first_date}'::DATE AND '{last_date}'::DATE
+        ),
+        persona_lookup AS (
+            SELECT
+                ps.unique_id,
+                CASE
+                    WHEN ps.content_tag ILIKE '%sport%' THEN 'SPORTS_ENGAGED'
+                    WHEN ps.content_tag ILIKE '%live%' THEN 'LIVE_EVENT_FOLLOWER'
+                    WHEN ps.content_tag ILIKE '%kids%' OR ps.content_tag ILIKE '%family%' OR ps.content_tag ILIKE '%animation%' THEN 'FAMILY_HOUSEHOLD'
+                    WHEN ps.content_tag ILIKE '%documentary%' OR ps.content_tag ILIKE '%knowledge%' OR ps.content_tag ILIKE '%docu%' THEN 'KNOWLEDGE_SEEKER'
+                    WHEN ps.content_tag ILIKE '%lifestyle%' OR ps.content_tag ILIKE '%wellness%' THEN 'LIFESTYLE_MINDED'
+                    WHEN ps.content_tag ILIKE '%reality%' THEN 'REALITY_FAN'
+                    WHEN ps.content_tag ILIKE '%original%' OR ps.content_tag ILIKE '%drama%' THEN 'PREMIUM_DRAMA'
+                    ELSE 'GENERAL_STREAMER'
+                END AS derived_persona
+            FROM {DATABASE}.HARMONIZED.SUBSCRIBER_CONTENT_TAG_COUNTS ps
+            WHERE ps.unique_id IN (SELECT unique_id FROM ads)
+            QUALIFY ROW_NUMBER() OVER (
+                PARTITION BY ps.unique_id
+                ORDER BY ps.event_count DESC, ps.content_tag
+            ) = 1
+        ),
+        ads_rollup AS (
+            SELECT
+                ads.event_date AS report_date,
+                ads.campaign_id,
+                ARRAY_AGG(DISTINCT COALESCE(pl.derived_persona, 'GENERAL_STREAMER')) AS persona_list,
+                ARRAY_AGG(DISTINCT COALESCE(ads.device, 'UNKNOWN')) AS device_list,
+                COUNT(DISTINCT ads.unique_id) AS audience_reach,
+                HLL_EXPORT(HLL_ACCUMULATE(ads.unique_id)) AS reach_sketch
+            FROM ads
+            LEFT JOIN persona_lookup pl
+              ON pl.unique_id = ads.unique_id
+            GROUP BY ads.event_date, ads.campaign_id
+        )
+        SELECT
+            base.*,
+            COALESCE(ar.persona_list, ARRAY_CONSTRUCT('GENERAL_STREAMER')) AS target_personas,
+            COALESCE(ar.device_list, ARRAY_CONSTRUCT('UNKNOWN')) AS target_devices,
+            COALESCE(ar.audience_reach, 0) AS observed_unique_subscribers,
+            CURRENT_TIMESTAMP() AS generated_ts,
+            ar.reach_sketch
+        FROM base
+        LEFT JOIN ads_rollup ar
+          ON base.report_date = ar.report_date
+         AND base.campaign_id = ar.campaign_id
+    """
+
+
+def _monthly_rows_sql(first_date, last_date) -> str:
+    # Campaign months containing an affected day are re-aggregated in full from the daily
+    # table, which also holds any generated days for those months.
+    dims = ", ".join(DIMS)
+    return f"""
+        WITH months AS (
+            SELECT DISTINCT DATE_TRUNC('MONTH', report_date) AS report_month, campaign_id
+            FROM {KEYS_TABLE}
+        ),
+        source AS (
+            SELECT d.*, DATE_TRUNC('MONTH', d.report_date) AS report_month
+            FROM {DAILY_TABLE} d
+            INNER JOIN months m
+              ON m.report_month = DATE_TRUNC('MONTH', d.report_date)
+             AND m.campaign_id = d.campaign_id
+            WHERE d.report_date BETWEEN DATE_TRUNC('MONTH', '{first_date}'::DATE) AND LAST_DAY('{last_date}'::DATE)
+        ),
+        base AS (
+            SELECT
+                report_month,
+                {dims},
+                SUM(impressions) AS impressions,
+                SUM(clicks) AS clicks,
+                ROUND(CASE WHEN SUM(impressions) > 0 THEN SUM(clicks) / SUM(impressions) ELSE 0 END, 6) AS ctr,
+                SUM(spend) AS spend,
+                ROUND(CASE WHEN SUM(impressions) > 0 THEN (SUM(spend) * 1000) / SUM(impressions) ELSE 0 END, 4) AS ecpm,
+                MAX(booked_cpm) AS booked_cpm,
+                MAX(booked_ctr) AS booked_ctr,
+                MAX(daily_impression_cap) AS peak_daily_cap,
+                MAX(creative_count) AS creative_count,
+                COUNT(DISTINCT report_date) AS active_days,
+                SUM(observed_unique_subscribers) AS observed_unique_subscribers,
+                HLL_EXPORT(HLL_COMBINE(HLL_IMPORT(reach_sketch))) AS reach_sketch
+            FROM source
+            GROUP BY report_month, {dims}
+        ), persona_rollup AS (
+            SELECT report_month, {dims},
+                   ARRAY_AGG(DISTINCT COALESCE(NULLIF(persona.value::STRING, ''), 'UNKNOWN')) AS persona_list
+            FROM source, LATERAL FLATTEN(input => target_personas, outer => TRUE) persona
+            GROUP BY 1,2,3,4,5,6
+        ), device_rollup AS (
+            SELECT report_month, {dims},
+                   ARRAY_AGG(DISTINCT COALESCE(NULLIF(device.value::STRING, ''), 'UNKNOWN')) AS device_list
+            FROM source, LATERAL FLATTEN(input => target_devices, outer => TRUE) device
+            GROUP BY 1,2,3,4,5,6
+        )
+        SELECT
+            base.report_month, base.campaign_id, base.advertiser_name, base.vertical,
+            base.content_category, base.rate_type, base.impressions, base.clicks, base.ctr,
+            base.spend, base.ecpm, base.booked_cpm, base.booked_ctr, base.peak_daily_cap,
+            base.creative_count,
+            COALESCE(pr.persona_list, ARRAY_CONSTRUCT()) AS target_personas,
+            COALESCE(dr.device_list, ARRAY_CONSTRUCT()) AS target_devices,
+            base.active_days,
+            base.observed_unique_subscribers,
+            CURRENT_TIMESTAMP() AS generated_ts,
+            base.reach_sketch
+        FROM base
+        LEFT JOIN persona_rollup pr USING (report_month, {dims})
+        LEFT JOIN device_rollup dr USING (report_month, {dims})
+    """
+
+
+def _refresh_persona_reach(session: Session, first_date, last_date) -> int:
+    # Persona-day sketches span every campaign, so affected days are rebuilt from all of
+    # that day's ADS_EVENTS; delivered events replace any generated audience for the day.
+    session.sql(f"""
+        DELETE FROM {PERSONA_REACH_TABLE}
+        WHERE report_date IN (SELECT DISTINCT report_date FROM {KEYS_TABLE})
+    """).collect()
+    return _affected(session.sql(f"""
+        INSERT INTO {PERSONA_REACH_TABLE}
+        SELECT
+            ae.event_date AS report_date,
+            COALESCE(pl.persona, 'GENERAL_STREAMER') AS persona,
+            COUNT(DISTINCT ae.campaign_id) AS campaign_count,
+            COUNT(DISTINCT ae.unique_id) AS observed_unique_subscribers,
+            CURRENT_TIMESTAMP() AS generated_ts,
+            HLL_EXPORT(HLL_ACCUMULATE(ae.unique_id)) AS reach_sketch
+        FROM {DATABASE}.INGEST.ADS_EVENTS ae
+        LEFT JOIN {PERSONA_VIEW} pl
+          ON pl.unique_id = ae.unique_id
+        WHERE ae.event_date BETWEEN '{first_date}'::DATE AND '{last_date}'::DATE
+          AND ae.event_date IN (SELECT DISTINCT report_date FROM {KEYS_TABLE})
+        GROUP BY 1, 2
+        ORDER BY report_date
+    """).collect())
+
+
+def _rollup_feeds(session: Session) -> list:
+    # The dashboard cube tables are registered as AD_ROLLUP feeds of GENERATE_DAILY_DATA;
+    # their PARAMS carry the source table, grain and dimensions.
+    rows = session.sql(f"""
+        SELECT TARGET_TABLE, PARAMS
+        FROM {FEEDS_TABLE}
+        WHERE GENERATOR = 'AD_ROLLUP' AND ENABLED
+        ORDER BY FILL_ORDER
+    """).collect()
+    feeds = []
+    for row in rows:
+        params = json.loads(row["PARAMS"]) if isinstance(row["PARAMS"], str) else row["PARAMS"]
+        feeds.append((f"{DATABASE}.{row['TARGET_TABLE']}", params))
+    return feeds
+
+
+def _refresh_rollup(session: Session, target: str, params: dict, first_date, last_date) -> int:
+    # Category totals for an affected day (or month) span every campaign, so whole
+    # buckets in the window are rebuilt from the daily table merged above.
+    column, bucket = ROLLUP_GRAINS[params["date_grain"]]
+    dims = ", ".join(params["dims"])
+    first, last = f"'{first_date}'::DATE", f"'{last_date}'::DATE"
+    if params["date_grain"] == "MONTH":
+        first, last = f"DATE_TRUNC('MONTH', {first})", f"LAST_DAY({last})"
+    session.sql(f"DELETE FROM {target} WHERE {column} BETWEEN {first} AND {last}").collect()
+    return _affected(session.sql(f"""
+        INSERT INTO {target}
+        SELECT
+            {bucket} AS {column},
+            {dims},
+            COUNT(DISTINCT campaign_id) AS campaign_count,
+            SUM(impressions) AS impressions,
+            SUM(clicks) AS clicks,
+            SUM(spend) AS spend,
+            CURRENT_TIMESTAMP() AS generated_ts,
+            HLL_EXPORT(HLL_COMBINE(HLL_IMPORT(reach_sketch))) AS reach_sketch
+        FROM {DATABASE}.{params['source_table']}
+        WHERE report_date BETWEEN {first} AND {last}
+        GROUP BY {bucket}, {dims}
+        ORDER BY {column}
+    """).collect())
+
+
+def run(session: Session):
+    # DDL commits implicitly, so the key table is created before the transaction opens.
+    session.sql(f"CREATE OR REPLACE TEMPORARY TABLE {KEYS_TABLE} (report_date DATE, campaign_id STRING)").collect()
+    session.sql("BEGIN TRANSACTION").collect()
+    try:
+        # Reading both streams in one DML advances their offsets together at COMMIT.
+        session.sql(f"""
+            INSERT INTO {KEYS_TABLE}
+            SELECT metric_date, campaign_id FROM {PERFORMANCE_STREAM}
+            UNION
+            SELECT event_date, campaign_id FROM {ADS_STREAM}
+        """).collect()
+        bounds = session.sql(f"""
+            SELECT COUNT(*) AS KEYS, MIN(report_date) AS FIRST_DATE, MAX(report_date) AS LAST_DATE
+            FROM {KEYS_TABLE}
+        """).collect()[0]
+        daily_rows = monthly_rows = persona_rows = rollup_rows = 0
+        if bounds["KEYS"]:
+            first_date, last_date = bounds["FIRST_DATE"], bounds["LAST_DATE"]
+            daily_rows = _merge(
+                session, DAILY_TABLE, _daily_rows_sql(first_date, last_date),
+                ["report_date", *DIMS], DAILY_COLUMNS,
+            )
+            monthly_rows = _merge(
+                session, MONTHLY_TABLE, _monthly_rows_sql(first_date, last_date),
+                ["report_month", *DIMS], MONTHLY_COLUMNS,
+            )
+            persona_rows = _refresh_persona_reach(session, first_date, last_date)
+            for target, params in _rollup_feeds(session):
+                rollup_rows += _refresh_rollup(session, target, params, first_date, last_date)
+        session.sql("COMMIT").collect()
+    except Exception:
+        session.sql("ROLLBACK").collect()
+        raise
+
+    if not bounds["KEYS"]:
+        return {"affected_keys": 0, "daily_rows_merged": 0, "monthly_rows_merged": 0,
+                "persona_reach_rows_rebuilt": 0, "rollup_rows_rebuilt": 0,
+                "message": "No new ad delivery in INGEST."}
+    return {
+        "affected_keys": int(bounds["KEYS"]),
+        "first_date": str(bounds["FIRST_DATE"]),
+        "last_date": str(bounds["LAST_DATE"]),
+        "daily_rows_merged": daily_rows,
+        "monthly_rows_merged": monthly_rows,
+        "persona_reach_rows_rebuilt": persona_rows,
+        "rollup_rows_rebuilt": rollup_rows,
+        "message": f"Merged {daily_rows} daily and {monthly_rows} monthly rows for "
+                   f"{bounds['KEYS']} campaign days between {bounds['FIRST_DATE']} and {bounds['LAST_DATE']}; "
+                   f"rebuilt {persona_rows} persona reach and {rollup_rows} rollup rows.",
+    }
+$$;
 
 
 
@@ -1263,6 +1771,8 @@ USE SCHEMA ANALYSE;
 
 /*
     Comprehensive feature engineering pipeline aligned with docs/feature_engineering_plan.md.
+    - Rolls INGEST.CLICKSTREAM_EVENTS up once per run into FE_CLICKSTREAM_DAILY; every
+      clickstream feature, including the 30/90/180-day windows, is derived from that rollup
     - Builds shared history and wide feature tables sourced from INGEST + HARMONIZED layers
     - Materializes specialised feature sets for content attribution, clustering, churn, and LTV
     - Documents every artifact with table/column comments for lineage clarity
@@ -1276,6 +1786,107 @@ $$
 DECLARE
     run_started TIMESTAMP_NTZ := CURRENT_TIMESTAMP();
 BEGIN
+    --------------------------------------------------------------------------
+    -- Clickstream rollup (the only scan of INGEST.CLICKSTREAM_EVENTS in this run)
+    -- One row per subscriber, day and content slice (type, category, device,
+    -- content key). Watch durations are resolved here, and watch time is also
+    -- kept per hour of day for peak-hour features.
+    --------------------------------------------------------------------------
+    CREATE OR REPLACE TRANSIENT TABLE FE_CLICKSTREAM_DAILY
+    CLUSTER BY (event_date)
+    AS
+    WITH events AS (
+        SELECT
+            ce.unique_id,
+            ce.event_ts,
+            ce.event_ts::DATE AS event_date,
+            HOUR(ce.event_ts) AS event_hour,
+            ce.event_type,
+            ce.content_type,
+            ce.content_category,
+            ce.device,
+            LOWER(COALESCE(NULLIF(ce.content_category::STRING, ''),
+                           ce.attributes:content_category::STRING,
+                           ce.content_type::STRING,
+                           ce.event_type)) AS content_key,
+            -- Duration from attributes, or from the most recent PLAY_START in the session
+            CASE
+                WHEN ce.event_type = 'PLAY_STOP' THEN
+                    COALESCE(
+                        ce.attributes:duration_seconds::FLOAT,
+                        ce.attributes:duration::FLOAT,
+                        TIMESTAMPDIFF(
+                            'second',
+                            MAX(CASE WHEN ce.event_type = 'PLAY_START' THEN ce.event_ts END)
+                                OVER (PARTITION BY ce.unique_id, COALESCE(ce.session_id, '')
+                                      ORDER BY ce.event_ts
+                                      ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW),
+                            ce.event_ts
+                        )
+                    )
+            END AS duration_seconds,
+            CASE WHEN ce.event_type = 'PLAY_STOP' THEN ce.attributes:reason::STRING END AS stop_reason
+        FROM AME_AD_SALES_DEMO.INGEST.CLICKSTREAM_EVENTS ce
+    ),
+    hourly AS (
+        SELECT
+            unique_id,
+            event_date,
+            event_hour,
+            content_type,
+            content_category,
+            device,
+            content_key,
+            COUNT(*) AS event_count,
+            MIN(event_ts) AS first_event_ts,
+            MAX(event_ts) AS last_event_ts,
+            ARRAY_AGG(DISTINCT event_type) AS event_types,
+            COUNT_IF(event_type = 'PLAY_START') AS play_start_count,
+            COUNT_IF(event_type = 'PLAY_STOP') AS play_stop_count,
+            COUNT_IF(event_type = 'CLICK_CONTENT') AS content_click_count,
+            COUNT_IF(event_type = 'BROWSE_PAGE') AS browse_page_count,
+            COUNT_IF(event_type IN ('REBUFFER_EVENT','ERROR_EVENT','CANCELLATION_SURVEY_SUBMIT')) AS negative_event_count,
+            COUNT_IF(event_type = 'PLAY_STOP' AND duration_seconds IS NOT NULL) AS watch_sessions,
+            SUM(CASE WHEN event_type = 'PLAY_STOP' THEN duration_seconds END) AS watch_time_seconds,
+            MAX(CASE WHEN event_type = 'PLAY_STOP' THEN duration_seconds END) AS longest_session_seconds,
+            COUNT_IF(event_type = 'PLAY_STOP' AND duration_seconds IS NOT NULL
+                     AND stop_reason IN ('completed_episode', 'finish_episode')) AS completed_watch_sessions
+        FROM events
+        GROUP BY unique_id, event_date, event_hour, content_type, content_category, device, content_key
+    )
+    SELECT
+        event_date,
+        unique_id,
+        content_type,
+        content_category,
+        device,
+        content_key,
+        SUM(event_count) AS event_count,
+        MIN(first_event_ts) AS first_event_ts,
+        MAX(last_event_ts) AS last_event_ts,
+        ARRAY_UNION_AGG(event_types) AS event_types,
+        SUM(play_start_count) AS play_start_count,
+        SUM(play_stop_count) AS play_stop_count,
+        SUM(content_click_count) AS content_click_count,
+        SUM(browse_page_count) AS browse_page_count,
+        SUM(negative_event_count) AS negative_event_count,
+        SUM(watch_sessions) AS watch_sessions,
+        SUM(watch_time_seconds) AS watch_time_seconds,
+        MAX(longest_session_seconds) AS longest_session_seconds,
+        SUM(completed_watch_sessions) AS completed_watch_sessions,
+        OBJECT_AGG(IFF(watch_sessions > 0, event_hour::STRING, NULL), watch_time_seconds) AS watch_time_by_hour
+    FROM hourly
+    GROUP BY event_date, unique_id, content_type, content_category, device, content_key
+    ORDER BY event_date;
+
+    COMMENT ON TABLE FE_CLICKSTREAM_DAILY IS
+        'Per-subscriber, per-day clickstream rollup by content slice, rebuilt once per feature engineering run and clustered by EVENT_DATE. Source for every clickstream-derived feature table.';
+    COMMENT ON COLUMN FE_CLICKSTREAM_DAILY.CONTENT_KEY IS 'Lower-cased content category, attribute category, content type or event type used for content affinity.';
+    COMMENT ON COLUMN FE_CLICKSTREAM_DAILY.WATCH_SESSIONS IS 'PLAY_STOP events with a resolved duration.';
+    COMMENT ON COLUMN FE_CLICKSTREAM_DAILY.WATCH_TIME_SECONDS IS 'Sum of resolved PLAY_STOP durations in seconds.';
+    COMMENT ON COLUMN FE_CLICKSTREAM_DAILY.COMPLETED_WATCH_SESSIONS IS 'Watch sessions stopped with a completed_episode or finish_episode reason.';
+    COMMENT ON COLUMN FE_CLICKSTREAM_DAILY.WATCH_TIME_BY_HOUR IS 'Object of hour of day (0-23) to watch seconds, for hours with at least one watch session.';
+
     --------------------------------------------------------------------------
     -- Base history (identity + behaviour + ad engagement + clickstream)
     --------------------------------------------------------------------------
@@ -1342,137 +1953,92 @@ BEGIN
     ),
     clickstream AS (
         SELECT
-            ce.unique_id,
-            MIN(ce.event_ts) AS first_event_ts,
-            MAX(ce.event_ts) AS last_event_ts,
-            COUNT(*) AS clickstream_events,
-            COUNT(DISTINCT DATE_TRUNC('DAY', ce.event_ts)) AS active_days,
-            COUNT(DISTINCT ce.event_type) AS distinct_event_types
-        FROM AME_AD_SALES_DEMO.INGEST.CLICKSTREAM_EVENTS ce
-        GROUP BY ce.unique_id
+            cd.unique_id,
+            MIN(cd.first_event_ts) AS first_event_ts,
+            MAX(cd.last_event_ts) AS last_event_ts,
+            SUM(cd.event_count) AS clickstream_events,
+            COUNT(DISTINCT cd.event_date) AS active_days,
+            ARRAY_SIZE(ARRAY_UNION_AGG(cd.event_types)) AS distinct_event_types
+        FROM FE_CLICKSTREAM_DAILY cd
+        GROUP BY cd.unique_id
     ),
     watch_time_metrics AS (
-        WITH play_events AS (
-            SELECT
-                ce.unique_id,
-                ce.event_ts,
-                ce.event_type,
-                ce.session_id,
-                ce.content_type,
-                ce.content_category,
-                ce.device,
-                ce.attributes,
-                -- Find the most recent PLAY_START before each PLAY_STOP
-                MAX(CASE WHEN ce.event_type = 'PLAY_START' THEN ce.event_ts END) 
-                    OVER (PARTITION BY ce.unique_id, COALESCE(ce.session_id, '') 
-                          ORDER BY ce.event_ts 
-                          ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW) AS last_play_start_ts
-            FROM AME_AD_SALES_DEMO.INGEST.CLICKSTREAM_EVENTS ce
-            WHERE ce.event_type IN ('PLAY_START', 'PLAY_STOP')
-        ),
-        play_sessions AS (
-            SELECT
-                pe.unique_id,
-                pe.event_ts,
-                pe.event_type,
-                pe.session_id,
-                pe.content_type,
-                pe.content_category,
-                pe.device,
-                pe.attributes,
-                -- Extract duration_seconds from attributes, or calculate from PLAY_START to PLAY_STOP
-                CASE 
-                    WHEN pe.event_type = 'PLAY_STOP' THEN
-                        COALESCE(
-                            pe.attributes:duration_seconds::FLOAT,
-                            pe.attributes:duration::FLOAT,
-                            CASE 
-                                WHEN pe.last_play_start_ts IS NOT NULL 
-                                THEN TIMESTAMPDIFF('second', pe.last_play_start_ts, pe.event_ts)
-                                ELSE NULL
-                            END
-                        )
-                    ELSE NULL
-                END AS duration_seconds,
-                -- Extract completion reason
-                CASE 
-                    WHEN pe.event_type = 'PLAY_STOP' THEN pe.attributes:reason::STRING
-                    ELSE NULL
-                END AS stop_reason
-            FROM play_events pe
+        WITH watch_days AS (
+            SELECT *
+            FROM FE_CLICKSTREAM_DAILY
+            WHERE watch_sessions > 0
         ),
         watch_time_by_intervals AS (
             SELECT
-                ps.unique_id,
+                wd.unique_id,
                 -- Lifetime totals
-                SUM(COALESCE(ps.duration_seconds, 0)) AS watch_time_total,
-                COUNT_IF(ps.event_type = 'PLAY_STOP' AND ps.duration_seconds IS NOT NULL) AS watch_session_count,
-                MAX(ps.duration_seconds) AS watch_longest_session_seconds,
+                SUM(wd.watch_time_seconds) AS watch_time_total,
+                SUM(wd.watch_sessions) AS watch_session_count,
+                MAX(wd.longest_session_seconds) AS watch_longest_session_seconds,
                 -- Daily totals
-                SUM(CASE WHEN DATE_TRUNC('DAY', ps.event_ts) = DATE_TRUNC('DAY', CURRENT_DATE()) THEN COALESCE(ps.duration_seconds, 0) ELSE 0 END) AS watch_time_daily,
-                COUNT_IF(ps.event_type = 'PLAY_STOP' AND DATE_TRUNC('DAY', ps.event_ts) = DATE_TRUNC('DAY', CURRENT_DATE()) AND ps.duration_seconds IS NOT NULL) AS watch_session_count_daily,
+                SUM(CASE WHEN wd.event_date = CURRENT_DATE() THEN wd.watch_time_seconds ELSE 0 END) AS watch_time_daily,
+                SUM(CASE WHEN wd.event_date = CURRENT_DATE() THEN wd.watch_sessions ELSE 0 END) AS watch_session_count_daily,
                 -- Weekly totals
-                SUM(CASE WHEN DATE_TRUNC('WEEK', ps.event_ts) = DATE_TRUNC('WEEK', CURRENT_DATE()) THEN COALESCE(ps.duration_seconds, 0) ELSE 0 END) AS watch_time_weekly,
-                COUNT_IF(ps.event_type = 'PLAY_STOP' AND DATE_TRUNC('WEEK', ps.event_ts) = DATE_TRUNC('WEEK', CURRENT_DATE()) AND ps.duration_seconds IS NOT NULL) AS watch_session_count_weekly,
+                SUM(CASE WHEN DATE_TRUNC('WEEK', wd.event_date) = DATE_TRUNC('WEEK', CURRENT_DATE()) THEN wd.watch_time_seconds ELSE 0 END) AS watch_time_weekly,
+                SUM(CASE WHEN DATE_TRUNC('WEEK', wd.event_date) = DATE_TRUNC('WEEK', CURRENT_DATE()) THEN wd.watch_sessions ELSE 0 END) AS watch_session_count_weekly,
                 -- Monthly totals
-                SUM(CASE WHEN DATE_TRUNC('MONTH', ps.event_ts) = DATE_TRUNC('MONTH', CURRENT_DATE()) THEN COALESCE(ps.duration_seconds, 0) ELSE 0 END) AS watch_time_monthly,
-                COUNT_IF(ps.event_type = 'PLAY_STOP' AND DATE_TRUNC('MONTH', ps.event_ts) = DATE_TRUNC('MONTH', CURRENT_DATE()) AND ps.duration_seconds IS NOT NULL) AS watch_session_count_monthly,
+                SUM(CASE WHEN DATE_TRUNC('MONTH', wd.event_date) = DATE_TRUNC('MONTH', CURRENT_DATE()) THEN wd.watch_time_seconds ELSE 0 END) AS watch_time_monthly,
+                SUM(CASE WHEN DATE_TRUNC('MONTH', wd.event_date) = DATE_TRUNC('MONTH', CURRENT_DATE()) THEN wd.watch_sessions ELSE 0 END) AS watch_session_count_monthly,
                 -- 30-day rolling
-                SUM(CASE WHEN ps.event_ts >= DATEADD(day, -30, CURRENT_DATE()) THEN COALESCE(ps.duration_seconds, 0) ELSE 0 END) AS watch_time_30,
-                COUNT_IF(ps.event_type = 'PLAY_STOP' AND ps.event_ts >= DATEADD(day, -30, CURRENT_DATE()) AND ps.duration_seconds IS NOT NULL) AS watch_session_count_30,
+                SUM(CASE WHEN wd.event_date >= DATEADD(day, -30, CURRENT_DATE()) THEN wd.watch_time_seconds ELSE 0 END) AS watch_time_30,
+                SUM(CASE WHEN wd.event_date >= DATEADD(day, -30, CURRENT_DATE()) THEN wd.watch_sessions ELSE 0 END) AS watch_session_count_30,
                 -- 90-day rolling
-                SUM(CASE WHEN ps.event_ts >= DATEADD(day, -90, CURRENT_DATE()) THEN COALESCE(ps.duration_seconds, 0) ELSE 0 END) AS watch_time_90,
-                COUNT_IF(ps.event_type = 'PLAY_STOP' AND ps.event_ts >= DATEADD(day, -90, CURRENT_DATE()) AND ps.duration_seconds IS NOT NULL) AS watch_session_count_90,
+                SUM(CASE WHEN wd.event_date >= DATEADD(day, -90, CURRENT_DATE()) THEN wd.watch_time_seconds ELSE 0 END) AS watch_time_90,
+                SUM(CASE WHEN wd.event_date >= DATEADD(day, -90, CURRENT_DATE()) THEN wd.watch_sessions ELSE 0 END) AS watch_session_count_90,
                 -- 180-day rolling
-                SUM(CASE WHEN ps.event_ts >= DATEADD(day, -180, CURRENT_DATE()) THEN COALESCE(ps.duration_seconds, 0) ELSE 0 END) AS watch_time_180,
-                COUNT_IF(ps.event_type = 'PLAY_STOP' AND ps.event_ts >= DATEADD(day, -180, CURRENT_DATE()) AND ps.duration_seconds IS NOT NULL) AS watch_session_count_180,
+                SUM(CASE WHEN wd.event_date >= DATEADD(day, -180, CURRENT_DATE()) THEN wd.watch_time_seconds ELSE 0 END) AS watch_time_180,
+                SUM(CASE WHEN wd.event_date >= DATEADD(day, -180, CURRENT_DATE()) THEN wd.watch_sessions ELSE 0 END) AS watch_session_count_180,
                 -- Completion rate (sessions with completed_episode or finish_episode reason)
-                COUNT_IF(ps.event_type = 'PLAY_STOP' AND ps.stop_reason IN ('completed_episode', 'finish_episode')) AS watch_completed_sessions,
+                SUM(wd.completed_watch_sessions) AS watch_completed_sessions,
                 -- Active weeks count (for average calculation)
-                COUNT(DISTINCT DATE_TRUNC('WEEK', ps.event_ts)) AS active_weeks_count,
+                COUNT(DISTINCT DATE_TRUNC('WEEK', wd.event_date)) AS active_weeks_count,
                 -- Active days count (for average per day)
-                COUNT(DISTINCT DATE_TRUNC('DAY', ps.event_ts)) AS watch_active_days
-            FROM play_sessions ps
-            WHERE ps.event_type = 'PLAY_STOP' AND ps.duration_seconds IS NOT NULL
-            GROUP BY ps.unique_id
+                COUNT(DISTINCT wd.event_date) AS watch_active_days
+            FROM watch_days wd
+            GROUP BY wd.unique_id
         ),
         watch_time_by_content AS (
             SELECT
-                ps.unique_id,
+                wd.unique_id,
                 ARRAY_AGG(OBJECT_CONSTRUCT(
-                    'content_type', ps.content_type,
+                    'content_type', wd.content_type,
                     'watch_time_seconds', content_watch_time
                 )) WITHIN GROUP (ORDER BY content_watch_time DESC) AS watch_time_by_content_type
             FROM (
                 SELECT
-                    ps.unique_id,
-                    ps.content_type,
-                    SUM(COALESCE(ps.duration_seconds, 0)) AS content_watch_time
-                FROM play_sessions ps
-                WHERE ps.event_type = 'PLAY_STOP' AND ps.duration_seconds IS NOT NULL AND ps.content_type IS NOT NULL
-                GROUP BY ps.unique_id, ps.content_type
-                QUALIFY ROW_NUMBER() OVER (PARTITION BY ps.unique_id ORDER BY SUM(COALESCE(ps.duration_seconds, 0)) DESC) <= 10
-            ) ps
-            GROUP BY ps.unique_id
+                    wd.unique_id,
+                    wd.content_type,
+                    SUM(wd.watch_time_seconds) AS content_watch_time
+                FROM watch_days wd
+                WHERE wd.content_type IS NOT NULL
+                GROUP BY wd.unique_id, wd.content_type
+                QUALIFY ROW_NUMBER() OVER (PARTITION BY wd.unique_id ORDER BY SUM(wd.watch_time_seconds) DESC) <= 10
+            ) wd
+            GROUP BY wd.unique_id
         ),
         watch_time_by_device AS (
             SELECT
-                ps.unique_id,
+                wd.unique_id,
                 ARRAY_AGG(OBJECT_CONSTRUCT(
-                    'device', ps.device,
+                    'device', wd.device,
                     'watch_time_seconds', device_watch_time
                 )) WITHIN GROUP (ORDER BY device_watch_time DESC) AS watch_time_by_device_type
             FROM (
                 SELECT
-                    ps.unique_id,
-                    ps.device,
-                    SUM(COALESCE(ps.duration_seconds, 0)) AS device_watch_time
-                FROM play_sessions ps
-                WHERE ps.event_type = 'PLAY_STOP' AND ps.duration_seconds IS NOT NULL AND ps.device IS NOT NULL
-                GROUP BY ps.unique_id, ps.device
-                QUALIFY ROW_NUMBER() OVER (PARTITION BY ps.unique_id ORDER BY SUM(COALESCE(ps.duration_seconds, 0)) DESC) <= 10
-            ) ps
-            GROUP BY ps.unique_id
+                    wd.unique_id,
+                    wd.device,
+                    SUM(wd.watch_time_seconds) AS device_watch_time
+                FROM watch_days wd
+                WHERE wd.device IS NOT NULL
+                GROUP BY wd.unique_id, wd.device
+                QUALIFY ROW_NUMBER() OVER (PARTITION BY wd.unique_id ORDER BY SUM(wd.watch_time_seconds) DESC) <= 10
+            ) wd
+            GROUP BY wd.unique_id
         ),
         peak_viewing_times AS (
             SELECT
@@ -1481,41 +2047,39 @@ BEGIN
                 dow_data.watch_peak_day_of_week
             FROM (
                 SELECT
-                    ps.unique_id,
-                    HOUR(ps.event_ts) AS watch_peak_hour
-                FROM play_sessions ps
-                WHERE ps.event_type = 'PLAY_STOP' AND ps.duration_seconds IS NOT NULL
-                GROUP BY ps.unique_id, HOUR(ps.event_ts)
-                QUALIFY ROW_NUMBER() OVER (PARTITION BY ps.unique_id ORDER BY SUM(COALESCE(ps.duration_seconds, 0)) DESC) = 1
+                    wd.unique_id,
+                    hr.key::INT AS watch_peak_hour
+                FROM watch_days wd,
+                     LATERAL FLATTEN(input => wd.watch_time_by_hour) hr
+                GROUP BY wd.unique_id, hr.key::INT
+                QUALIFY ROW_NUMBER() OVER (PARTITION BY wd.unique_id ORDER BY SUM(hr.value::FLOAT) DESC) = 1
             ) hour_data
             LEFT JOIN (
                 SELECT
-                    ps.unique_id,
-                    DAYOFWEEK(ps.event_ts) - 1 AS watch_peak_day_of_week
-                FROM play_sessions ps
-                WHERE ps.event_type = 'PLAY_STOP' AND ps.duration_seconds IS NOT NULL
-                GROUP BY ps.unique_id, DAYOFWEEK(ps.event_ts)
-                QUALIFY ROW_NUMBER() OVER (PARTITION BY ps.unique_id ORDER BY SUM(COALESCE(ps.duration_seconds, 0)) DESC) = 1
+                    wd.unique_id,
+                    DAYOFWEEK(wd.event_date) - 1 AS watch_peak_day_of_week
+                FROM watch_days wd
+                GROUP BY wd.unique_id, DAYOFWEEK(wd.event_date)
+                QUALIFY ROW_NUMBER() OVER (PARTITION BY wd.unique_id ORDER BY SUM(wd.watch_time_seconds) DESC) = 1
             ) dow_data ON dow_data.unique_id = hour_data.unique_id
         ),
         binge_indicators AS (
             SELECT
-                ps.unique_id,
+                wd.unique_id,
                 MAX(CASE 
                     WHEN daily_sessions >= 3 OR daily_watch_time >= 7200 THEN 1 
                     ELSE 0 
                 END) AS watch_binge_indicator
             FROM (
                 SELECT
-                    ps.unique_id,
-                    DATE_TRUNC('DAY', ps.event_ts) AS watch_date,
-                    COUNT_IF(ps.event_type = 'PLAY_STOP' AND ps.duration_seconds IS NOT NULL) AS daily_sessions,
-                    SUM(COALESCE(ps.duration_seconds, 0)) AS daily_watch_time
-                FROM play_sessions ps
-                WHERE ps.event_type = 'PLAY_STOP' AND ps.duration_seconds IS NOT NULL
-                GROUP BY ps.unique_id, DATE_TRUNC('DAY', ps.event_ts)
-            ) ps
-            GROUP BY ps.unique_id
+                    wd.unique_id,
+                    wd.event_date,
+                    SUM(wd.watch_sessions) AS daily_sessions,
+                    SUM(wd.watch_time_seconds) AS daily_watch_time
+                FROM watch_days wd
+                GROUP BY wd.unique_id, wd.event_date
+            ) wd
+            GROUP BY wd.unique_id
         )
         SELECT
             wti.unique_id,
@@ -1603,45 +2167,45 @@ BEGIN
     ),
     negative_events AS (
         SELECT
-            ce.unique_id,
-            COUNT(*) AS negative_event_count,
-            COUNT_IF(ce.event_ts >= DATEADD(day,-30,CURRENT_TIMESTAMP())) AS negative_event_count_30
-        FROM AME_AD_SALES_DEMO.INGEST.CLICKSTREAM_EVENTS ce
-        WHERE ce.event_type IN ('REBUFFER_EVENT','ERROR_EVENT','CANCELLATION_SURVEY_SUBMIT')
-        GROUP BY ce.unique_id
+            cd.unique_id,
+            SUM(cd.negative_event_count) AS negative_event_count,
+            SUM(CASE WHEN cd.event_date >= DATEADD(day,-30,CURRENT_DATE()) THEN cd.negative_event_count ELSE 0 END) AS negative_event_count_30
+        FROM FE_CLICKSTREAM_DAILY cd
+        WHERE cd.negative_event_count > 0
+        GROUP BY cd.unique_id
     ),
     mau_mav_metrics AS (
         SELECT
-            ce.unique_id,
+            cd.unique_id,
             -- MAU: Count of distinct months with any clickstream activity
-            COUNT(DISTINCT DATE_TRUNC('MONTH', ce.event_ts)) AS mau_count,
+            COUNT(DISTINCT DATE_TRUNC('MONTH', cd.event_date)) AS mau_count,
             -- MAV: Count of distinct months with viewing activity (PLAY_START or PLAY_STOP)
             COUNT(DISTINCT CASE 
-                WHEN ce.event_type IN ('PLAY_START', 'PLAY_STOP') 
-                THEN DATE_TRUNC('MONTH', ce.event_ts) 
+                WHEN cd.play_start_count + cd.play_stop_count > 0 
+                THEN DATE_TRUNC('MONTH', cd.event_date) 
             END) AS mav_count,
             -- Current month MAU indicator (1 if active this month, 0 otherwise)
             MAX(CASE 
-                WHEN DATE_TRUNC('MONTH', ce.event_ts) = DATE_TRUNC('MONTH', CURRENT_DATE()) 
+                WHEN DATE_TRUNC('MONTH', cd.event_date) = DATE_TRUNC('MONTH', CURRENT_DATE()) 
                 THEN 1 
                 ELSE 0 
             END) AS mau_current_month,
             -- Current month MAV indicator (1 if viewed this month, 0 otherwise)
             MAX(CASE 
-                WHEN ce.event_type IN ('PLAY_START', 'PLAY_STOP') 
-                    AND DATE_TRUNC('MONTH', ce.event_ts) = DATE_TRUNC('MONTH', CURRENT_DATE()) 
+                WHEN cd.play_start_count + cd.play_stop_count > 0 
+                    AND DATE_TRUNC('MONTH', cd.event_date) = DATE_TRUNC('MONTH', CURRENT_DATE()) 
                 THEN 1 
                 ELSE 0 
             END) AS mav_current_month,
             -- Last active month (most recent month with activity)
-            MAX(DATE_TRUNC('MONTH', ce.event_ts)) AS last_active_month,
+            MAX(DATE_TRUNC('MONTH', cd.event_date))::TIMESTAMP_NTZ AS last_active_month,
             -- Last viewing month (most recent month with viewing activity)
             MAX(CASE 
-                WHEN ce.event_type IN ('PLAY_START', 'PLAY_STOP') 
-                THEN DATE_TRUNC('MONTH', ce.event_ts) 
-            END) AS last_viewing_month
-        FROM AME_AD_SALES_DEMO.INGEST.CLICKSTREAM_EVENTS ce
-        GROUP BY ce.unique_id
+                WHEN cd.play_start_count + cd.play_stop_count > 0 
+                THEN DATE_TRUNC('MONTH', cd.event_date) 
+            END)::TIMESTAMP_NTZ AS last_viewing_month
+        FROM FE_CLICKSTREAM_DAILY cd
+        GROUP BY cd.unique_id
     )
     SELECT
         se.unique_id,
@@ -1923,17 +2487,15 @@ BEGIN
         SELECT
             se.unique_id,
             se.profile_id,
-            LOWER(COALESCE(NULLIF(ce.content_category::STRING, ''),
-                           ce.attributes:content_category::STRING,
-                           ce.content_type::STRING,
-                           ce.event_type)) AS content_key,
-            COUNT(*) AS event_count,
-            SUM(CASE WHEN ce.event_ts >= DATEADD(day,-30,CURRENT_TIMESTAMP()) THEN 1 ELSE 0 END) AS event_count_30,
-            MAX(ce.event_ts) AS last_event_ts
+            cd.content_key,
+            -- A subscriber without clickstream keeps one NULL-key row counted once, as before.
+            SUM(COALESCE(cd.event_count, 1)) AS event_count,
+            SUM(CASE WHEN cd.event_date >= DATEADD(day,-30,CURRENT_DATE()) THEN cd.event_count ELSE 0 END) AS event_count_30,
+            MAX(cd.last_event_ts) AS last_event_ts
         FROM AME_AD_SALES_DEMO.HARMONIZED.SUBSCRIBER_PROFILE_ENRICHED se
-        LEFT JOIN AME_AD_SALES_DEMO.INGEST.CLICKSTREAM_EVENTS ce
-          ON ce.unique_id = se.unique_id
-        GROUP BY se.unique_id, se.profile_id, content_key
+        LEFT JOIN FE_CLICKSTREAM_DAILY cd
+          ON cd.unique_id = se.unique_id
+        GROUP BY se.unique_id, se.profile_id, cd.content_key
     ),
     ranked AS (
         SELECT
@@ -2125,71 +2687,30 @@ BEGIN
     -- Daily content views aggregation table
     --------------------------------------------------------------------------
     CREATE OR REPLACE TABLE FE_CONTENT_VIEWS_DAILY AS
-    WITH play_events AS (
-        SELECT
-            ce.unique_id,
-            DATE_TRUNC('DAY', ce.event_ts) AS view_date,
-            ce.content_type,
-            ce.content_category,
-            ce.device,
-            ce.event_type,
-            ce.event_ts,
-            ce.attributes,
-            -- Find the most recent PLAY_START before each PLAY_STOP
-            MAX(CASE WHEN ce.event_type = 'PLAY_START' THEN ce.event_ts END) 
-                OVER (PARTITION BY ce.unique_id, COALESCE(ce.session_id, '') 
-                      ORDER BY ce.event_ts 
-                      ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW) AS last_play_start_ts
-        FROM AME_AD_SALES_DEMO.INGEST.CLICKSTREAM_EVENTS ce
-        WHERE ce.event_type IN ('PLAY_START', 'PLAY_STOP', 'CLICK_CONTENT', 'BROWSE_PAGE')
-    ),
-    view_sessions AS (
-        SELECT
-            pe.unique_id,
-            pe.view_date,
-            pe.content_type,
-            pe.content_category,
-            pe.device,
-            pe.event_type,
-            -- Calculate duration for PLAY_STOP events
-            CASE 
-                WHEN pe.event_type = 'PLAY_STOP' THEN
-                    COALESCE(
-                        pe.attributes:duration_seconds::FLOAT,
-                        pe.attributes:duration::FLOAT,
-                        CASE 
-                            WHEN pe.last_play_start_ts IS NOT NULL 
-                            THEN TIMESTAMPDIFF('second', pe.last_play_start_ts, pe.event_ts)
-                            ELSE NULL
-                        END
-                    )
-                ELSE NULL
-            END AS duration_seconds
-        FROM play_events pe
-    ),
-    daily_content_views AS (
+    WITH daily_content_views AS (
         SELECT
-            vs.view_date,
-            vs.content_type,
-            vs.content_category,
-            vs.device,
+            cd.event_date::TIMESTAMP_NTZ AS view_date,
+            cd.content_type,
+            cd.content_category,
+            cd.device,
             -- View counts
-            COUNT_IF(vs.event_type = 'PLAY_START') AS play_start_count,
-            COUNT_IF(vs.event_type = 'PLAY_STOP') AS play_stop_count,
-            COUNT_IF(vs.event_type = 'CLICK_CONTENT') AS content_click_count,
-            COUNT_IF(vs.event_type = 'BROWSE_PAGE') AS browse_page_count,
-            COUNT(DISTINCT vs.unique_id) AS unique_viewers,
-            COUNT(DISTINCT CASE WHEN vs.event_type IN ('PLAY_START', 'PLAY_STOP') THEN vs.unique_id END) AS unique_active_viewers,
+            SUM(cd.play_start_count) AS play_start_count,
+            SUM(cd.play_stop_count) AS play_stop_count,
+            SUM(cd.content_click_count) AS content_click_count,
+            SUM(cd.browse_page_count) AS browse_page_count,
+            COUNT(DISTINCT cd.unique_id) AS unique_viewers,
+            COUNT(DISTINCT CASE WHEN cd.play_start_count + cd.play_stop_count > 0 THEN cd.unique_id END) AS unique_active_viewers,
             -- Watch time metrics
-            SUM(COALESCE(vs.duration_seconds, 0)) AS total_watch_time_seconds,
-            COUNT_IF(vs.event_type = 'PLAY_STOP' AND vs.duration_seconds IS NOT NULL) AS completed_sessions,
-            AVG(CASE WHEN vs.event_type = 'PLAY_STOP' AND vs.duration_seconds IS NOT NULL THEN vs.duration_seconds END) AS avg_session_duration_seconds,
-            MAX(CASE WHEN vs.event_type = 'PLAY_STOP' THEN vs.duration_seconds END) AS max_session_duration_seconds,
+            COALESCE(SUM(cd.watch_time_seconds), 0) AS total_watch_time_seconds,
+            SUM(cd.watch_sessions) AS completed_sessions,
+            SUM(cd.watch_time_seconds) / NULLIF(SUM(cd.watch_sessions), 0) AS avg_session_duration_seconds,
+            MAX(cd.longest_session_seconds) AS max_session_duration_seconds,
             -- Session metrics (count PLAY_START as sessions started, PLAY_STOP as sessions completed)
-            COUNT_IF(vs.event_type = 'PLAY_START') AS total_sessions_started,
-            COUNT_IF(vs.event_type = 'PLAY_STOP' AND vs.duration_seconds IS NOT NULL) AS total_sessions_completed
-        FROM view_sessions vs
-        GROUP BY vs.view_date, vs.content_type, vs.content_category, vs.device
+            SUM(cd.play_start_count) AS total_sessions_started,
+            SUM(cd.watch_sessions) AS total_sessions_completed
+        FROM FE_CLICKSTREAM_DAILY cd
+        WHERE cd.play_start_count + cd.play_stop_count + cd.content_click_count + cd.browse_page_count > 0
+        GROUP BY cd.event_date, cd.content_type, cd.content_category, cd.device
     )
     SELECT
         dcv.view_date,
@@ -2246,6 +2767,7 @@ BEGIN
         'procedure', 'FEATURE_ENGINEER_SUBSCRIBER_METRICS',
         'run_started', run_started,
         'run_completed', CURRENT_TIMESTAMP(),
+        'clickstream_daily_rows', (SELECT COUNT(*) FROM FE_CLICKSTREAM_DAILY),
         'history_rows', (SELECT COUNT(*) FROM FE_SUBSCRIBER_HISTORY),
         'feature_rows', (SELECT COUNT(*) FROM FE_SUBSCRIBER_FEATURES),
         'content_rows', (SELECT COUNT(*) FROM FE_SUBSCRIBER_CONTENT_FEATURES),
@@ -2286,8 +2808,42 @@ USE SCHEMA ANALYSE;
     Prototype linear regression model for subscriber LTV using Snowpark + NumPy.
     The procedure trains a simple linear model, stores coefficients for lineage,
     and materialises predicted LTV scores back into ANALYSE.FE_SUBSCRIBER_LTV_SCORES.
+
+    Both subscriber models are trained by ANALYSE.TRAIN_SUBSCRIBER_MODEL(MODEL_NAME, ...);
+    TRAIN_LINEAR_LTV_MODEL and TRAIN_LINEAR_CHURN_MODEL only pass their model name.
+    The trainer is penalized IRLS (Newton) on standardized features with an L2 (ridge)
+    penalty, driven only by the weighted Gram matrix of [1, X, y], so memory is
+    O(features^2) regardless of subscriber count. For this
+    Gaussian (ridge) model IRLS reduces to a single solve of the normal equations.
+      FIT_MODE => 'SERVER' (default) - Gram matrix (and each IRLS pass) computed by one SQL aggregate query
+      FIT_MODE => 'BATCH'            - accumulated client-side over to_pandas_batches()
+    The Gram matrix is computed once per run and also drives the drift check.
+    Only the coefficients are written from Python; predictions, residuals and
+    segments are computed set-based over the features table and MERGEd into the
+    scores table, rewriting only subscribers whose feature hash or model version changed.
+      REFRESH_MODE => 'AUTO' (default) - retrain when no model exists, the model is older
+                                         than RETRAIN_INTERVAL_DAYS or the features drifted;
+                                         otherwise rescore incrementally with stored coefficients
+      REFRESH_MODE => 'RETRAIN'        - always retrain, then rescore
+      REFRESH_MODE => 'RESCORE'        - never retrain (unless no model exists)
+    Every training run is recorded in ANALYSE.SUBSCRIBER_MODEL_REGISTRY.
 */
-CREATE OR REPLACE PROCEDURE ANALYSE.TRAIN_LINEAR_LTV_MODEL()
+CREATE TABLE IF NOT EXISTS ANALYSE.SUBSCRIBER_MODEL_REGISTRY (
+    MODEL_NAME STRING,
+    MODEL_VERSION STRING,
+    TRAINED_TS TIMESTAMP_NTZ,
+    ROW_COUNT NUMBER,
+    TRAINING_METRIC FLOAT,
+    FEATURE_STATS VARIANT
+);
+
+COMMENT ON TABLE ANALYSE.SUBSCRIBER_MODEL_REGISTRY IS
+    'One row per training run of the subscriber LTV and churn models; drives schedule- and drift-based retraining.';
+COMMENT ON COLUMN ANALYSE.SUBSCRIBER_MODEL_REGISTRY.TRAINING_METRIC IS 'In-sample training metric of the run: RMSE for LTV, mean log-loss for churn.';
+COMMENT ON COLUMN ANALYSE.SUBSCRIBER_MODEL_REGISTRY.FEATURE_STATS IS 'Per-feature mean and standard deviation of the training data, used for drift detection.';
+
+/* Shared trainer for both subscriber models; MODEL_NAME selects the spec in MODELS. */
+CREATE OR REPLACE PROCEDURE ANALYSE.TRAIN_SUBSCRIBER_MODEL(MODEL_NAME STRING, FIT_MODE STRING DEFAULT 'SERVER', REFRESH_MODE STRING DEFAULT 'AUTO')
 RETURNS VARIANT
 LANGUAGE PYTHON
 RUNTIME_VERSION = '3.12'
@@ -2296,30 +2852,217 @@ HANDLER = 'run'
 EXECUTE AS CALLER
 AS
 $$
+from datetime import datetime, timezone
+import json
+
 from snowflake.snowpark import Session
 import numpy as np
 import pandas as pd
 
-FEATURE_COLS = [
-    "TIER_INDEX",
-    "INCOME_INDEX",
-    "DIGITAL_MEDIA_INDEX",
-    "AVG_SITE_VISITS_PER_MONTH",
-    "LOGIN_FREQUENCY_PER_WEEK",
-    "AD_IMPRESSIONS_180",
-    "AD_CLICKS_180",
-    "MONETIZATION_180",
-    "ENGAGEMENT_RATIO"
-]
-TARGET_COL = "LTV_TARGET"
-
-def _prepare_dataframe(session: Session) -> pd.DataFrame:
-    df = session.table("ANALYSE.FE_SUBSCRIBER_LTV_FEATURES")
-    cols = ["UNIQUE_ID", "PROFILE_ID"] + FEATURE_COLS + [TARGET_COL]
-    pdf = df.select(cols).to_pandas()
-    if not pdf.empty:
-        pdf = pdf.fillna(0.0)
-    return pdf
+MODELS = {
+    "LTV": {
+        "features_table": "ANALYSE.FE_SUBSCRIBER_LTV_FEATURES",
+        "scores_table": "ANALYSE.FE_SUBSCRIBER_LTV_SCORES",
+        "coeffs_table": "ANALYSE.FE_SUBSCRIBER_LTV_MODEL_COEFFS",
+        "feature_cols": [
+            "TIER_INDEX",
+            "INCOME_INDEX",
+            "DIGITAL_MEDIA_INDEX",
+            "AVG_SITE_VISITS_PER_MONTH",
+            "LOGIN_FREQUENCY_PER_WEEK",
+            "AD_IMPRESSIONS_180",
+            "AD_CLICKS_180",
+            "MONETIZATION_180",
+            "ENGAGEMENT_RATIO"
+        ],
+        "target_col": "LTV_TARGET",
+        "score_schema": ["UNIQUE_ID STRING", "PROFILE_ID STRING", "LTV_TARGET FLOAT", "PREDICTED_LTV FLOAT", "RESIDUAL FLOAT", "LTV_SEGMENT STRING", "FEATURE_HASH NUMBER", "MODEL_VERSION STRING", "GENERATED_TS TIMESTAMP_NTZ"],
+        "family": "GAUSSIAN",
+        "l2_penalty": 1e-6,  # per-row ridge penalty on standardized coefficients
+        "trained_status": "trained_linear_model",
+        "metric_key": "training_rmse",
+    },
+    "CHURN": {
+        "features_table": "ANALYSE.FE_SUBSCRIBER_CHURN_FEATURES",
+        "scores_table": "ANALYSE.FE_SUBSCRIBER_CHURN_RISK",
+        "coeffs_table": "ANALYSE.FE_SUBSCRIBER_CHURN_MODEL_COEFFS",
+        "feature_cols": [
+            "TIER_INDEX",
+            "INCOME_INDEX",
+            "DIGITAL_MEDIA_INDEX",
+            "VISIT_FREQUENCY",
+            "LOGIN_FREQUENCY",
+            "AD_IMPRESSIONS_30",
+            "AD_CLICKS_30",
+            "NEGATIVE_EVENT_RATE",
+            "RECENCY_DAYS",
+            "MONETIZATION_90"
+        ],
+        "target_col": "CHURN_LABEL",
+        "score_schema": ["UNIQUE_ID STRING", "PROFILE_ID STRING", "CHURN_LABEL FLOAT", "MODEL_SCORE FLOAT", "PREDICTED_CHURN_PROB FLOAT", "CHURN_RISK_SEGMENT STRING", "FEATURE_HASH NUMBER", "MODEL_VERSION STRING", "GENERATED_TS TIMESTAMP_NTZ"],
+        "family": "BINOMIAL",
+        "l2_penalty": 1e-4,
+        "trained_status": "trained_logistic_model",
+        "metric_key": "training_log_loss",
+    },
+}
+REGISTRY_TABLE = "ANALYSE.SUBSCRIBER_MODEL_REGISTRY"
+REGISTRY_SCHEMA = ["MODEL_NAME STRING", "MODEL_VERSION STRING", "TRAINED_TS TIMESTAMP_NTZ", "ROW_COUNT NUMBER", "TRAINING_METRIC FLOAT", "FEATURE_STATS VARIANT"]
+FIT_MODES = ("SERVER", "BATCH")
+REFRESH_MODES = ("AUTO", "RETRAIN", "RESCORE")
+RETRAIN_INTERVAL_DAYS = 7
+DRIFT_THRESHOLD = 0.25  # standardized mean shift (or relative row-count change) that forces a retrain
+MAX_IRLS_ITERATIONS = 25
+IRLS_TOLERANCE = 1e-6
+
+def _column_expr(column: str) -> str:
+    return f'COALESCE("{column}", 0)::FLOAT'
+
+def _gram_server(session: Session, spec: dict) -> np.ndarray:
+    # One aggregate query over [1, X, y]: only O(features^2) sums leave the warehouse.
+    exprs = ["1.0"] + [_column_expr(c) for c in spec["feature_cols"] + [spec["target_col"]]]
+    k = len(exprs)
+    pairs = [(i, j) for i in range(k) for j in range(i, k)]
+    aggs = ", ".join(f"SUM({exprs[i]} * {exprs[j]}) AS G_{i}_{j}" for i, j in pairs)
+    row = session.sql(f"SELECT {aggs} FROM {spec['features_table']}").collect()[0]
+    gram = np.zeros((k, k))
+    for i, j in pairs:
+        gram[i, j] = gram[j, i] = float(row[f"G_{i}_{j}"] or 0.0)
+    return gram
+
+def _gram_batches(session: Session, spec: dict) -> np.ndarray:
+    # Streams feature batches and accumulates the same Gram matrix client-side.
+    cols = spec["feature_cols"] + [spec["target_col"]]
+    gram = np.zeros((len(cols) + 1, len(cols) + 1))
+    for batch in session.table(spec["features_table"]).select(cols).to_pandas_batches():
+        z = batch[cols].astype(float).fillna(0.0).to_numpy()
+        z = np.hstack([np.ones((z.shape[0], 1)), z])
+        gram += z.T @ z
+    return gram
+
+def _mean_sql(family: str, eta: str) -> str:
+    if family == "BINOMIAL":
+        return f"1 / (1 + EXP(-LEAST(GREATEST({eta}, -50), 50)))"
+    return eta
+
+def _weight_sql(family: str, mu: str) -> str:
+    return f"{mu} * (1 - {mu})" if family == "BINOMIAL" else "1.0"
+
+def _loss_sql(family: str, y: str, mu: str) -> str:
+    if family == "BINOMIAL":
+        return f"-({y} * LN(GREATEST({mu}, 1e-15)) + (1 - {y}) * LN(GREATEST(1 - {mu}, 1e-15)))"
+    return f"POWER({y} - {mu}, 2)"
+
+def _mean_np(family: str, eta: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-np.clip(eta, -50, 50))) if family == "BINOMIAL" else eta
+
+def _weight_np(family: str, mu: np.ndarray) -> np.ndarray:
+    return mu * (1.0 - mu) if family == "BINOMIAL" else np.ones_like(mu)
+
+def _loss_np(family: str, y: np.ndarray, mu: np.ndarray) -> np.ndarray:
+    if family == "BINOMIAL":
+        return -(y * np.log(np.maximum(mu, 1e-15)) + (1 - y) * np.log(np.maximum(1 - mu, 1e-15)))
+    return (y - mu) ** 2
+
+def _irls_terms_from_gram(family: str, gram: np.ndarray, beta: np.ndarray) -> tuple[np.ndarray, np.ndarray, float]:
+    # Gaussian terms at any beta, and binomial terms at beta = 0 (mu = 0.5), need no extra pass.
+    xtx, xty, yty = gram[:-1, :-1], gram[:-1, -1], gram[-1, -1]
+    if family == "BINOMIAL":
+        return 0.25 * xtx, xty - 0.5 * gram[0, :-1], float(gram[0, 0] * np.log(2.0))
+    return xtx, xty - xtx @ beta, float(yty - 2 * beta @ xty + beta @ xtx @ beta)
+
+def _irls_terms_server(session: Session, spec: dict, beta: np.ndarray) -> tuple[np.ndarray, np.ndarray, float]:
+    # One aggregate query per iteration: weighted Gram X'WX, gradient X'(y - mu) and loss.
+    family = spec["family"]
+    k = len(spec["feature_cols"]) + 1
+    pairs = [(i, j) for i in range(k) for j in range(i, k)]
+    aggs = ", ".join(
+        [f"SUM(W * Z_{i} * Z_{j}) AS H_{i}_{j}" for i, j in pairs]
+        + [f"SUM(Z_{i} * (Y - MU)) AS G_{i}" for i in range(k)]
+        + [f"SUM({_loss_sql(family, 'Y', 'MU')}) AS LOSS"]
+    )
+    z_cols = ", ".join(f"{_column_expr(c)} AS Z_{i}" for i, c in enumerate(spec["feature_cols"], start=1))
+    row = session.sql(f"""
+        SELECT {aggs}
+        FROM (
+            SELECT *, {_weight_sql(family, 'MU')} AS W
+            FROM (
+                SELECT *, {_mean_sql(family, 'ETA')} AS MU
+                FROM (
+                    SELECT 1.0 AS Z_0, {z_cols}, {_column_expr(spec['target_col'])} AS Y, ({_linear_expr(spec, beta)}) AS ETA
+                    FROM {spec['features_table']}
+                )
+            )
+        )
+    """).collect()[0]
+    hessian, gradient = np.zeros((k, k)), np.zeros(k)
+    for i, j in pairs:
+        hessian[i, j] = hessian[j, i] = float(row[f"H_{i}_{j}"] or 0.0)
+    for i in range(k):
+        gradient[i] = float(row[f"G_{i}"] or 0.0)
+    return hessian, gradient, float(row["LOSS"] or 0.0)
+
+def _irls_terms_batches(session: Session, spec: dict, beta: np.ndarray) -> tuple[np.ndarray, np.ndarray, float]:
+    # Same terms accumulated over streamed batches; memory is bounded by the batch size.
+    family = spec["family"]
+    cols = spec["feature_cols"] + [spec["target_col"]]
+    k = len(spec["feature_cols"]) + 1
+    hessian, gradient, loss = np.zeros((k, k)), np.zeros(k), 0.0
+    for batch in session.table(spec["features_table"]).select(cols).to_pandas_batches():
+        data = batch[cols].astype(float).fillna(0.0).to_numpy()
+        z = np.hstack([np.ones((data.shape[0], 1)), data[:, :-1]])
+        y = data[:, -1]
+        mu = _mean_np(family, z @ beta)
+        hessian += (z * _weight_np(family, mu)[:, None]).T @ z
+        gradient += z.T @ (y - mu)
+        loss += float(_loss_np(family, y, mu).sum())
+    return hessian, gradient, loss
+
+def _standardizer(gram: np.ndarray) -> np.ndarray:
+    # Maps [1, x] to [1, (x - mean) / std]; constant columns keep unit scale.
+    n = gram[0, 0]
+    means = gram[0, 1:-1] / n
+    stds = np.sqrt(np.maximum(np.diag(gram)[1:-1] / n - means ** 2, 0.0))
+    scales = np.where(stds > 1e-12, stds, 1.0)
+    a = np.eye(len(means) + 1)
+    a[1:, 0] = -means / scales
+    a[1:, 1:] = np.diag(1.0 / scales)
+    return a
+
+def _fit_glm(session: Session, spec: dict, gram: np.ndarray, fit_mode: str) -> tuple[np.ndarray, float, int]:
+    """Penalized IRLS (Newton) fit in standardized feature space.
+
+    Each iteration needs only the weighted Gram matrix and gradient, computed in the
+    warehouse (SERVER) or over streamed batches (BATCH), so memory is O(features^2).
+    The L2 penalty applies to standardized, non-intercept coefficients; the returned
+    coefficients are on the raw feature scale. Gaussian models converge in one step.
+    """
+    family = spec["family"]
+    n = gram[0, 0]
+    a = _standardizer(gram)
+    penalty = spec["l2_penalty"] * n * np.diag([0.0] + [1.0] * len(spec["feature_cols"]))
+    beta_std = np.zeros(len(spec["feature_cols"]) + 1)
+    for iteration in range(1, MAX_IRLS_ITERATIONS + 1):
+        beta = a.T @ beta_std
+        if family == "GAUSSIAN" or iteration == 1:
+            hessian, gradient, loss = _irls_terms_from_gram(family, gram, beta)
+        elif fit_mode == "BATCH":
+            hessian, gradient, loss = _irls_terms_batches(session, spec, beta)
+        else:
+            hessian, gradient, loss = _irls_terms_server(session, spec, beta)
+        step = np.linalg.solve(a @ hessian @ a.T + penalty, a @ gradient - penalty @ beta_std)
+        beta_std = beta_std + step
+        if np.max(np.abs(step)) < IRLS_TOLERANCE:
+            break
+    # Loss is from the last evaluated iterate, which is within tolerance of the returned one.
+    metric = loss / n if family == "BINOMIAL" else np.sqrt(max(loss, 0.0) / n)
+    return a.T @ beta_std, float(metric), iteration
+
+def _feature_stats(spec: dict, gram: np.ndarray) -> dict:
+    n = gram[0, 0]
+    means = gram[0, 1:-1] / n
+    stds = np.sqrt(np.maximum(np.diag(gram)[1:-1] / n - means ** 2, 0.0))
+    return {"mean": dict(zip(spec["feature_cols"], means.tolist())), "std": dict(zip(spec["feature_cols"], stds.tolist()))}
 
 def _resolve_table_identifiers(session: Session, table_name: str) -> tuple[str, str, str]:
     parts = [p.strip('"') for p in table_name.split('.') if p]
@@ -2344,11 +3087,12 @@ def _resolve_table_identifiers(session: Session, table_name: str) -> tuple[str,
 def _quote(identifier: str) -> str:
     return f'"{identifier}"'
 
+def _full_name(session: Session, table_name: str) -> str:
+    return '.'.join(_quote(p) for p in _resolve_table_identifiers(session, table_name))
+
 def _write_table(session: Session, table_name: str, pdf: pd.DataFrame, schema: list):
     db, schema_name, table = _resolve_table_identifiers(session, table_name)
-    full_name = '.'.join([_quote(db), _quote(schema_name), _quote(table)])
-    session.sql(f"CREATE OR REPLACE TABLE {full_name} ({', '.join(schema)})").collect()
-    session.sql(f"TRUNCATE TABLE {full_name}").collect()
+    session.sql(f"CREATE OR REPLACE TABLE {_full_name(session, table_name)} ({', '.join(schema)})").collect()
     if not pdf.empty:
         session.write_pandas(
             pdf,
@@ -2359,64 +3103,242 @@ def _write_table(session: Session, table_name: str, pdf: pd.DataFrame, schema: l
             overwrite=False
         )
 
-def run(session: Session):
-    pdf = _prepare_dataframe(session)
-    if pdf.empty:
+def _ensure_tables(session: Session, spec: dict):
+    # Score tables are only ever merged into, so downstream dynamic tables stay incremental.
+    session.sql(f"CREATE TABLE IF NOT EXISTS {_full_name(session, spec['scores_table'])} ({', '.join(spec['score_schema'])})").collect()
+    session.sql(f"CREATE TABLE IF NOT EXISTS {_full_name(session, REGISTRY_TABLE)} ({', '.join(REGISTRY_SCHEMA)})").collect()
+
+def _latest_model(session: Session, model_name: str) -> dict | None:
+    rows = session.sql(f"""
+        SELECT
+            MODEL_VERSION,
+            ROW_COUNT,
+            TRAINING_METRIC,
+            FEATURE_STATS,
+            DATEDIFF('day', TRAINED_TS, CURRENT_TIMESTAMP()) AS AGE_DAYS
+        FROM {_full_name(session, REGISTRY_TABLE)}
+        WHERE MODEL_NAME = ?
+        ORDER BY TRAINED_TS DESC
+        LIMIT 1
+    """, params=[model_name]).collect()
+    if not rows:
+        return None
+    model = rows[0].as_dict()
+    if isinstance(model["FEATURE_STATS"], str):
+        model["FEATURE_STATS"] = json.loads(model["FEATURE_STATS"])
+    return model
+
+def _load_coefficients(session: Session, spec: dict) -> np.ndarray | None:
+    coeffs = {r["FEATURE_NAME"]: r["COEFFICIENT"] for r in session.table(spec["coeffs_table"]).collect()}
+    names = ["intercept"] + spec["feature_cols"]
+    if any(coeffs.get(name) is None for name in names):
+        return None
+    return np.array([coeffs[name] for name in names], dtype=float)
+
+def _drift_score(spec: dict, stats: dict, trained_stats: dict) -> float:
+    shifts = []
+    for col in spec["feature_cols"]:
+        mean, std = trained_stats["mean"].get(col), trained_stats["std"].get(col)
+        if mean is None or std is None:
+            return float("inf")
+        shifts.append(abs(stats["mean"][col] - mean) / max(std, 1e-9))
+    return max(shifts)
+
+def _retrain_reason(spec: dict, refresh_mode: str, model: dict | None, beta: np.ndarray | None, stats: dict, row_count: int) -> str | None:
+    if refresh_mode == "RETRAIN":
+        return "forced"
+    if model is None or beta is None:
+        return "no_model"
+    if refresh_mode == "RESCORE":
+        return None
+    if model["AGE_DAYS"] >= RETRAIN_INTERVAL_DAYS:
+        return "schedule"
+    if _drift_score(spec, stats, model["FEATURE_STATS"]) > DRIFT_THRESHOLD:
+        return "feature_drift"
+    trained_rows = int(model["ROW_COUNT"])
+    if abs(row_count - trained_rows) > DRIFT_THRESHOLD * trained_rows:
+        return "row_count_drift"
+    return None
+
+def _register_model(session: Session, model_name: str, model_version: str, row_count: int, metric: float, stats: dict):
+    session.sql(f"""
+        INSERT INTO {_full_name(session, REGISTRY_TABLE)}
+            (MODEL_NAME, MODEL_VERSION, TRAINED_TS, ROW_COUNT, TRAINING_METRIC, FEATURE_STATS)
+        SELECT ?, ?, CURRENT_TIMESTAMP()::TIMESTAMP_NTZ, ?, ?, PARSE_JSON(?)
+    """, params=[model_name, model_version, row_count, metric, json.dumps(stats)]).collect()
+
+def _linear_expr(spec: dict, beta: np.ndarray) -> str:
+    # Coefficients are inlined as literals so scoring is a single set-based statement.
+    terms = [repr(float(beta[0]))] + [f"{float(b)!r} * {_column_expr(c)}" for b, c in zip(beta[1:], spec["feature_cols"])]
+    return " + ".join(terms)
+
+def _feature_hash_expr(spec: dict) -> str:
+    return f"HASH(PROFILE_ID, {', '.join(_column_expr(c) for c in spec['feature_cols'] + [spec['target_col']])})"
+
+def _affected(rows: list) -> int:
+    return sum(int(v or 0) for v in rows[0]) if rows else 0
+
+def _merge_scores(session: Session, model_name: str, spec: dict, beta: np.ndarray, model_version: str) -> dict:
+    # Only subscribers whose features changed, or who were scored by an older model, are rewritten.
+    scores = _full_name(session, spec["scores_table"])
+    cols = [c.split()[0] for c in spec["score_schema"]]
+    merged = session.sql(f"""
+        MERGE INTO {scores} t
+        USING (
+            SELECT s.*, '{model_version}' AS MODEL_VERSION, CURRENT_TIMESTAMP()::TIMESTAMP_NTZ AS GENERATED_TS
+            FROM ({SCORED_ROWS_SQL[model_name](spec, beta)}) s
+            LEFT JOIN {scores} cur
+              ON cur.UNIQUE_ID = s.UNIQUE_ID
+            WHERE cur.UNIQUE_ID IS NULL
+               OR cur.FEATURE_HASH IS DISTINCT FROM s.FEATURE_HASH
+               OR cur.MODEL_VERSION IS DISTINCT FROM '{model_version}'
+        ) s
+        ON t.UNIQUE_ID = s.UNIQUE_ID
+        WHEN MATCHED THEN UPDATE SET {', '.join(f'{c} = s.{c}' for c in cols[1:])}
+        WHEN NOT MATCHED THEN INSERT ({', '.join(cols)}) VALUES ({', '.join(f's.{c}' for c in cols)})
+    """).collect()
+    removed = session.sql(f"""
+        DELETE FROM {scores} t
+        WHERE NOT EXISTS (SELECT 1 FROM {spec['features_table']} f WHERE f.UNIQUE_ID = t.UNIQUE_ID)
+    """).collect()
+    return {"rows_rescored": _affected(merged), "rows_removed": _affected(removed)}
+
+def _ltv_scored_rows_sql(spec: dict, beta: np.ndarray) -> str:
+    # Predictions, residuals and banding never leave the warehouse.
+    return f"""
+        SELECT
+            UNIQUE_ID,
+            PROFILE_ID,
+            LTV_TARGET,
+            PREDICTED_LTV,
+            LTV_TARGET - PREDICTED_LTV AS RESIDUAL,
+            CASE
+                WHEN PREDICTED_LTV <= 50 THEN 'Low'
+                WHEN PREDICTED_LTV <= 150 THEN 'Medium'
+                ELSE 'High'
+            END::STRING AS LTV_SEGMENT,
+            FEATURE_HASH
+        FROM (
+            SELECT
+                UNIQUE_ID::STRING AS UNIQUE_ID,
+                PROFILE_ID::STRING AS PROFILE_ID,
+                {_column_expr(spec['target_col'])} AS LTV_TARGET,
+                ({_linear_expr(spec, beta)})::FLOAT AS PREDICTED_LTV,
+                {_feature_hash_expr(spec)} AS FEATURE_HASH
+            FROM {spec['features_table']}
+        )
+    """
+
+def _churn_scored_rows_sql(spec: dict, beta: np.ndarray) -> str:
+    # Linear score, logistic link and banding are computed set-based in the warehouse.
+    return f"""
+        SELECT
+            UNIQUE_ID,
+            PROFILE_ID,
+            CHURN_LABEL,
+            MODEL_SCORE,
+            PREDICTED_CHURN_PROB,
+            CASE
+                WHEN PREDICTED_CHURN_PROB <= 0.4 THEN 'Low'
+                WHEN PREDICTED_CHURN_PROB <= 0.7 THEN 'Medium'
+                ELSE 'High'
+            END::STRING AS CHURN_RISK_SEGMENT,
+            FEATURE_HASH
+        FROM (
+            SELECT
+                *,
+                {_mean_sql(spec['family'], 'MODEL_SCORE')} AS PREDICTED_CHURN_PROB
+            FROM (
+                SELECT
+                    UNIQUE_ID::STRING AS UNIQUE_ID,
+                    PROFILE_ID::STRING AS PROFILE_ID,
+                    {_column_expr(spec['target_col'])} AS CHURN_LABEL,
+                    ({_linear_expr(spec, beta)})::FLOAT AS MODEL_SCORE,
+                    {_feature_hash_expr(spec)} AS FEATURE_HASH
+                FROM {spec['features_table']}
+            )
+        )
+    """
+
+SCORED_ROWS_SQL = {"LTV": _ltv_scored_rows_sql, "CHURN": _churn_scored_rows_sql}
+
+def run(session: Session, model_name: str, fit_mode: str = "SERVER", refresh_mode: str = "AUTO"):
+    model_name = (model_name or "").upper()
+    fit_mode = (fit_mode or "SERVER").upper()
+    refresh_mode = (refresh_mode or "AUTO").upper()
+    if model_name not in MODELS:
+        raise ValueError(f"Unsupported model_name {model_name!r}; expected one of {tuple(MODELS)}")
+    if fit_mode not in FIT_MODES:
+        raise ValueError(f"Unsupported fit_mode {fit_mode!r}; expected one of {FIT_MODES}")
+    if refresh_mode not in REFRESH_MODES:
+        raise ValueError(f"Unsupported refresh_mode {refresh_mode!r}; expected one of {REFRESH_MODES}")
+    spec = MODELS[model_name]
+    _ensure_tables(session, spec)
+
+    # One pass over the features per run: the Gram matrix feeds the drift check and the fit.
+    gram = _gram_batches(session, spec) if fit_mode == "BATCH" else _gram_server(session, spec)
+    row_count = int(gram[0, 0])
+    if row_count == 0:
         _write_table(
             session,
-            "ANALYSE.FE_SUBSCRIBER_LTV_MODEL_COEFFS",
+            spec["coeffs_table"],
             pd.DataFrame(columns=["FEATURE_NAME", "COEFFICIENT"]),
             ["FEATURE_NAME STRING", "COEFFICIENT FLOAT"]
         )
+        session.sql(f"DELETE FROM {_full_name(session, spec['scores_table'])}").collect()
+        return {"status": "empty_dataset", "row_count": 0}
+
+    stats = _feature_stats(spec, gram)
+    model = _latest_model(session, model_name)
+    beta = _load_coefficients(session, spec) if model else None
+    retrain_reason = _retrain_reason(spec, refresh_mode, model, beta, stats, row_count)
+
+    if retrain_reason:
+        beta, metric, iterations = _fit_glm(session, spec, gram, fit_mode)
+        model_version = f"{model_name}_{datetime.now(timezone.utc):%Y%m%dT%H%M%S%f}"
         _write_table(
             session,
-            "ANALYSE.FE_SUBSCRIBER_LTV_SCORES",
-            pd.DataFrame(columns=["UNIQUE_ID", "PROFILE_ID", "LTV_TARGET", "PREDICTED_LTV", "RESIDUAL", "LTV_SEGMENT", "GENERATED_TS"]),
-            ["UNIQUE_ID STRING", "PROFILE_ID STRING", "LTV_TARGET FLOAT", "PREDICTED_LTV FLOAT", "RESIDUAL FLOAT", "LTV_SEGMENT STRING", "GENERATED_TS TIMESTAMP_NTZ"]
+            spec["coeffs_table"],
+            pd.DataFrame({"FEATURE_NAME": ["intercept"] + spec["feature_cols"], "COEFFICIENT": beta.tolist()}),
+            ["FEATURE_NAME STRING", "COEFFICIENT FLOAT"]
         )
-        return {"status": "empty_dataset", "row_count": 0}
+        _register_model(session, model_name, model_version, row_count, metric, stats)
+    else:
+        model_version, metric, iterations = model["MODEL_VERSION"], float(model["TRAINING_METRIC"]), 0
 
-    X = pdf[FEATURE_COLS].astype(float).to_numpy()
-    y = pdf[TARGET_COL].astype(float).to_numpy()
-    X = np.hstack([np.ones((X.shape[0], 1)), X])
-    beta, *_ = np.linalg.lstsq(X, y, rcond=None)
-
-    coeff_df = pd.DataFrame({
-        "FEATURE_NAME": ["intercept"] + FEATURE_COLS,
-        "COEFFICIENT": beta.tolist()
-    })
-    _write_table(
-        session,
-        "ANALYSE.FE_SUBSCRIBER_LTV_MODEL_COEFFS",
-        coeff_df,
-        ["FEATURE_NAME STRING", "COEFFICIENT FLOAT"]
-    )
-
-    preds = X @ beta
-    pdf["PREDICTED_LTV"] = preds
-    pdf["RESIDUAL"] = pdf[TARGET_COL] - pdf["PREDICTED_LTV"]
-    pdf["LTV_SEGMENT"] = pd.cut(
-        preds,
-        bins=[-np.inf, 50, 150, np.inf],
-        labels=["Low", "Medium", "High"]
-    )
-    pdf["GENERATED_TS"] = pd.Timestamp.utcnow()
-    scores_df = pdf[["UNIQUE_ID", "PROFILE_ID", TARGET_COL, "PREDICTED_LTV", "RESIDUAL", "LTV_SEGMENT", "GENERATED_TS"]]
-    _write_table(
-        session,
-        "ANALYSE.FE_SUBSCRIBER_LTV_SCORES",
-        scores_df,
-        ["UNIQUE_ID STRING", "PROFILE_ID STRING", "LTV_TARGET FLOAT", "PREDICTED_LTV FLOAT", "RESIDUAL FLOAT", "LTV_SEGMENT STRING", "GENERATED_TS TIMESTAMP_NTZ"]
-    )
+    changes = _merge_scores(session, model_name, spec, beta, model_version)
 
     return {
-        "status": "trained_linear_model",
-        "row_count": int(len(pdf)),
-        "features": FEATURE_COLS,
-        "coefficients": coeff_df.to_dict(orient="records")
+        "status": spec["trained_status"] if retrain_reason else "rescored_incrementally",
+        "fit_mode": fit_mode,
+        "refresh_mode": refresh_mode,
+        "retrain_reason": retrain_reason,
+        "model_version": model_version,
+        "row_count": row_count,
+        spec["metric_key"]: metric,
+        "iterations": iterations,
+        **changes,
+        "features": spec["feature_cols"],
+        "coefficients": [{"FEATURE_NAME": n, "COEFFICIENT": float(b)} for n, b in zip(["intercept"] + spec["feature_cols"], beta)]
     }
 $$;
 
+DROP PROCEDURE IF EXISTS ANALYSE.TRAIN_LINEAR_LTV_MODEL();
+DROP PROCEDURE IF EXISTS ANALYSE.TRAIN_LINEAR_LTV_MODEL(STRING);
+CREATE OR REPLACE PROCEDURE ANALYSE.TRAIN_LINEAR_LTV_MODEL(FIT_MODE STRING DEFAULT 'SERVER', REFRESH_MODE STRING DEFAULT 'AUTO')
+RETURNS VARIANT
+LANGUAGE SQL
+EXECUTE AS CALLER
+AS
+$$
+DECLARE
+  result VARIANT;
+BEGIN
+  result := (CALL ANALYSE.TRAIN_SUBSCRIBER_MODEL('LTV', :FIT_MODE, :REFRESH_MODE));
+  RETURN result;
+END;
+$$;
+
 CREATE OR REPLACE TABLE ANALYSE.FE_SUBSCRIBER_LTV_MODEL_COEFFS (
     FEATURE_NAME STRING,
     COEFFICIENT FLOAT
@@ -2429,10 +3351,13 @@ CREATE OR REPLACE TABLE ANALYSE.FE_SUBSCRIBER_LTV_SCORES (
     PREDICTED_LTV FLOAT,
     RESIDUAL FLOAT,
     LTV_SEGMENT STRING,
+    FEATURE_HASH NUMBER,
+    MODEL_VERSION STRING,
     GENERATED_TS TIMESTAMP_NTZ
 );
 
-/* Convenience wrapper for orchestration */
+/* Convenience wrapper for orchestration (REFRESH_MODE => 'AUTO': incremental rescoring,
+   full retrain only when the model is older than a week or the features have drifted) */
 CREATE OR REPLACE PROCEDURE ANALYSE.REFRESH_SUBSCRIBER_LTV()
 RETURNS VARIANT
 LANGUAGE SQL
@@ -2451,15 +3376,17 @@ CALL ANALYSE.REFRESH_SUBSCRIBER_LTV();
 
 
 COMMENT ON TABLE ANALYSE.FE_SUBSCRIBER_LTV_MODEL_COEFFS IS
-    'Linear regression coefficients (intercept + feature weights) for the current LTV prototype model.';
+    'Ridge regression coefficients (intercept + feature weights, raw feature scale) for the current LTV prototype model.';
 COMMENT ON COLUMN ANALYSE.FE_SUBSCRIBER_LTV_MODEL_COEFFS.FEATURE_NAME IS 'Feature or intercept name.';
-COMMENT ON COLUMN ANALYSE.FE_SUBSCRIBER_LTV_MODEL_COEFFS.COEFFICIENT IS 'Estimated coefficient from linear regression fit.';
+COMMENT ON COLUMN ANALYSE.FE_SUBSCRIBER_LTV_MODEL_COEFFS.COEFFICIENT IS 'Estimated coefficient from the ridge regression fit.';
 
 COMMENT ON TABLE ANALYSE.FE_SUBSCRIBER_LTV_SCORES IS
     'Predicted LTV scores generated by TRAIN_LINEAR_LTV_MODEL(); stores target, prediction, residual, segment, and timestamp per subscriber.';
-COMMENT ON COLUMN ANALYSE.FE_SUBSCRIBER_LTV_SCORES.PREDICTED_LTV IS 'Predicted LTV value from the current linear regression model.';
+COMMENT ON COLUMN ANALYSE.FE_SUBSCRIBER_LTV_SCORES.PREDICTED_LTV IS 'Predicted LTV value from the current ridge regression model.';
 COMMENT ON COLUMN ANALYSE.FE_SUBSCRIBER_LTV_SCORES.RESIDUAL IS 'Difference between target LTV and predicted LTV (useful for diagnostics).';
 COMMENT ON COLUMN ANALYSE.FE_SUBSCRIBER_LTV_SCORES.LTV_SEGMENT IS 'LTV segment classification: Low (<$50), Medium ($50-$150), High (>$150).';
+COMMENT ON COLUMN ANALYSE.FE_SUBSCRIBER_LTV_SCORES.FEATURE_HASH IS 'Hash of the profile, features and target used for the score; rows are only rescored when it changes.';
+COMMENT ON COLUMN ANALYSE.FE_SUBSCRIBER_LTV_SCORES.MODEL_VERSION IS 'Model version (see ANALYSE.SUBSCRIBER_MODEL_REGISTRY) that produced the score.';
 
 
 -- ---------------------------------------------------------------------------
@@ -2471,139 +3398,29 @@ USE DATABASE AME_AD_SALES_DEMO;
 USE SCHEMA ANALYSE;
 
 /*
-    Prototype linear regression churn model using Snowpark + NumPy.
+    Logistic regression churn model using Snowpark + NumPy.
     Produces coefficients table + churn probability per subscriber.
+    Trained by ANALYSE.TRAIN_SUBSCRIBER_MODEL('CHURN', ...), the same penalized IRLS
+    trainer as TRAIN_LINEAR_LTV_MODEL, using the binomial family; each Newton step costs one pass over the features (one aggregate
+    query for FIT_MODE => 'SERVER', one streamed pass for 'BATCH') and typically
+    converges in 5-8 passes. The training metric is the mean log-loss.
+    Scoring uses the same in-warehouse, incremental REFRESH_MODE flow (linear score,
+    logistic link and banding).
 */
-CREATE OR REPLACE PROCEDURE ANALYSE.TRAIN_LINEAR_CHURN_MODEL()
+DROP PROCEDURE IF EXISTS ANALYSE.TRAIN_LINEAR_CHURN_MODEL();
+DROP PROCEDURE IF EXISTS ANALYSE.TRAIN_LINEAR_CHURN_MODEL(STRING);
+CREATE OR REPLACE PROCEDURE ANALYSE.TRAIN_LINEAR_CHURN_MODEL(FIT_MODE STRING DEFAULT 'SERVER', REFRESH_MODE STRING DEFAULT 'AUTO')
 RETURNS VARIANT
-LANGUAGE PYTHON
-RUNTIME_VERSION = '3.12'
-PACKAGES = ('snowflake-snowpark-python', 'numpy', 'pandas')
-HANDLER = 'run'
+LANGUAGE SQL
 EXECUTE AS CALLER
 AS
 $$
-from snowflake.snowpark import Session
-import numpy as np
-import pandas as pd
-
-FEATURE_COLS = [
-    "TIER_INDEX",
-    "INCOME_INDEX",
-    "DIGITAL_MEDIA_INDEX",
-    "VISIT_FREQUENCY",
-    "LOGIN_FREQUENCY",
-    "AD_IMPRESSIONS_30",
-    "AD_CLICKS_30",
-    "NEGATIVE_EVENT_RATE",
-    "RECENCY_DAYS",
-    "MONETIZATION_90"
-]
-TARGET_COL = "CHURN_LABEL"
-
-def _prepare_dataframe(session: Session) -> pd.DataFrame:
-    df = session.table("ANALYSE.FE_SUBSCRIBER_CHURN_FEATURES")
-    cols = ["UNIQUE_ID", "PROFILE_ID"] + FEATURE_COLS + [TARGET_COL]
-    pdf = df.select(cols).to_pandas()
-    if not pdf.empty:
-        pdf = pdf.fillna(0.0)
-    return pdf
-
-def _resolve_table_identifiers(session: Session, table_name: str) -> tuple[str, str, str]:
-    parts = [p.strip('"') for p in table_name.split('.') if p]
-    if len(parts) == 1:
-        db = session.get_current_database()
-        schema = session.get_current_schema()
-        if not db or not schema:
-            raise ValueError("Current database/schema must be set when using unqualified table names")
-        db = db.strip('"')
-        schema = schema.strip('"')
-        table = parts[0]
-    elif len(parts) == 2:
-        db = session.get_current_database()
-        if not db:
-            raise ValueError("Current database must be set when table name is schema.table")
-        db = db.strip('"')
-        schema, table = parts
-    else:
-        db, schema, table = parts[-3:]
-    return db, schema, table
-
-def _quote(identifier: str) -> str:
-    return f'"{identifier}"'
-
-def _write_table(session: Session, table_name: str, pdf: pd.DataFrame, schema: list):
-    db, schema_name, table = _resolve_table_identifiers(session, table_name)
-    full_name = '.'.join([_quote(db), _quote(schema_name), _quote(table)])
-    session.sql(f"CREATE OR REPLACE TABLE {full_name} ({', '.join(schema)})").collect()
-    session.sql(f"TRUNCATE TABLE {full_name}").collect()
-    if not pdf.empty:
-        session.write_pandas(
-            pdf,
-            table,
-            database=db,
-            schema=schema_name,
-            auto_create_table=False,
-            overwrite=False
-        )
-
-def run(session: Session):
-    pdf = _prepare_dataframe(session)
-    if pdf.empty:
-        _write_table(
-            session,
-            "ANALYSE.FE_SUBSCRIBER_CHURN_MODEL_COEFFS",
-            pd.DataFrame(columns=["FEATURE_NAME", "COEFFICIENT"]),
-            ["FEATURE_NAME STRING", "COEFFICIENT FLOAT"]
-        )
-        _write_table(
-            session,
-            "ANALYSE.FE_SUBSCRIBER_CHURN_RISK",
-            pd.DataFrame(columns=["UNIQUE_ID", "PROFILE_ID", "CHURN_LABEL", "MODEL_SCORE", "PREDICTED_CHURN_PROB", "CHURN_RISK_SEGMENT", "GENERATED_TS"]),
-            ["UNIQUE_ID STRING", "PROFILE_ID STRING", "CHURN_LABEL FLOAT", "MODEL_SCORE FLOAT", "PREDICTED_CHURN_PROB FLOAT", "CHURN_RISK_SEGMENT STRING", "GENERATED_TS TIMESTAMP_NTZ"]
-        )
-        return {"status": "empty_dataset", "row_count": 0}
-
-    X = pdf[FEATURE_COLS].astype(float).to_numpy()
-    y = pdf[TARGET_COL].astype(float).to_numpy()
-    X = np.hstack([np.ones((X.shape[0], 1)), X])
-    beta, *_ = np.linalg.lstsq(X, y, rcond=None)
-
-    coeff_df = pd.DataFrame({
-        "FEATURE_NAME": ["intercept"] + FEATURE_COLS,
-        "COEFFICIENT": beta.tolist()
-    })
-    _write_table(
-        session,
-        "ANALYSE.FE_SUBSCRIBER_CHURN_MODEL_COEFFS",
-        coeff_df,
-        ["FEATURE_NAME STRING", "COEFFICIENT FLOAT"]
-    )
-
-    linear_scores = X @ beta
-    probs = 1 / (1 + np.exp(-linear_scores))
-    pdf["MODEL_SCORE"] = linear_scores
-    pdf["PREDICTED_CHURN_PROB"] = probs
-    pdf["CHURN_RISK_SEGMENT"] = pd.cut(
-        probs,
-        bins=[-np.inf, 0.4, 0.7, np.inf],
-        labels=["Low", "Medium", "High"]
-    )
-    pdf["GENERATED_TS"] = pd.Timestamp.utcnow()
-    out_df = pdf[["UNIQUE_ID", "PROFILE_ID", TARGET_COL, "MODEL_SCORE", "PREDICTED_CHURN_PROB", "CHURN_RISK_SEGMENT", "GENERATED_TS"]]
-    _write_table(
-        session,
-        "ANALYSE.FE_SUBSCRIBER_CHURN_RISK",
-        out_df,
-        ["UNIQUE_ID STRING", "PROFILE_ID STRING", "CHURN_LABEL FLOAT", "MODEL_SCORE FLOAT", "PREDICTED_CHURN_PROB FLOAT", "CHURN_RISK_SEGMENT STRING", "GENERATED_TS TIMESTAMP_NTZ"]
-    )
-
-    return {
-        "status": "trained_linear_model",
-        "row_count": int(len(pdf)),
-        "features": FEATURE_COLS,
-        "coefficients": coeff_df.to_dict(orient="records")
-    }
+DECLARE
+  result VARIANT;
+BEGIN
+  result := (CALL ANALYSE.TRAIN_SUBSCRIBER_MODEL('CHURN', :FIT_MODE, :REFRESH_MODE));
+  RETURN result;
+END;
 $$;
 
 CREATE OR REPLACE TABLE ANALYSE.FE_SUBSCRIBER_CHURN_MODEL_COEFFS (
@@ -2618,17 +3435,22 @@ CREATE OR REPLACE TABLE ANALYSE.FE_SUBSCRIBER_CHURN_RISK (
     MODEL_SCORE FLOAT,
     PREDICTED_CHURN_PROB FLOAT,
     CHURN_RISK_SEGMENT STRING,
+    FEATURE_HASH NUMBER,
+    MODEL_VERSION STRING,
     GENERATED_TS TIMESTAMP_NTZ
 );
 
 COMMENT ON TABLE ANALYSE.FE_SUBSCRIBER_CHURN_MODEL_COEFFS IS
-    'Linear regression coefficients (intercept + feature weights) for the churn-risk prototype model.';
-COMMENT ON COLUMN ANALYSE.FE_SUBSCRIBER_CHURN_MODEL_COEFFS.COEFFICIENT IS 'Estimated coefficient capturing direction and magnitude of churn impact.';
+    'Logistic regression coefficients (intercept + feature weights, raw feature scale) for the churn-risk model.';
+COMMENT ON COLUMN ANALYSE.FE_SUBSCRIBER_CHURN_MODEL_COEFFS.COEFFICIENT IS 'Log-odds coefficient capturing direction and magnitude of churn impact.';
 
 COMMENT ON TABLE ANALYSE.FE_SUBSCRIBER_CHURN_RISK IS
     'Predicted churn probabilities generated by TRAIN_LINEAR_CHURN_MODEL(). Includes model score, probability, and segment banding.';
-COMMENT ON COLUMN ANALYSE.FE_SUBSCRIBER_CHURN_RISK.PREDICTED_CHURN_PROB IS 'Sigmoid-transformed probability estimate from the linear regression model.';
+COMMENT ON COLUMN ANALYSE.FE_SUBSCRIBER_CHURN_RISK.PREDICTED_CHURN_PROB IS 'Churn probability from the logistic regression model (sigmoid of MODEL_SCORE).';
+COMMENT ON COLUMN ANALYSE.FE_SUBSCRIBER_CHURN_RISK.FEATURE_HASH IS 'Hash of the profile, features and label used for the score; rows are only rescored when it changes.';
+COMMENT ON COLUMN ANALYSE.FE_SUBSCRIBER_CHURN_RISK.MODEL_VERSION IS 'Model version (see ANALYSE.SUBSCRIBER_MODEL_REGISTRY) that produced the score.';
 
+/* Convenience wrapper for orchestration (REFRESH_MODE => 'AUTO', see REFRESH_SUBSCRIBER_LTV) */
 CREATE OR REPLACE PROCEDURE ANALYSE.REFRESH_SUBSCRIBER_CHURN_RISK()
 RETURNS VARIANT
 LANGUAGE SQL
@@ -2658,80 +3480,157 @@ USE SCHEMA DCR_ANALYSIS;
 -- Mock Data Clean Room Overlap Stored Procedure for Cortex Analyst Tooling
 -- --------------------------------------------------------------------------
 
-CREATE OR REPLACE TABLE DCR_ANALYSIS.PARTNER_X_CUSTOMERS AS
+CREATE OR REPLACE TABLE DCR_ANALYSIS.PARTNER_X_CUSTOMERS
+CLUSTER BY (hashed_email) AS
 SELECT
     spe.unique_id,
     spe.email,
-    SHA2(LOWER(TRIM(spe.email)), 256) AS hashed_email
-FROM AME_AD_SALES_DEMO.HARMONIZED.SUBSCRIBER_PROFILE_ENRICHED spe
-SAMPLE (45) SEED (42);
+    ig.hashed_email
+FROM AME_AD_SALES_DEMO.HARMONIZED.SUBSCRIBER_PROFILE_ENRICHED spe SAMPLE (45) SEED (42)
+INNER JOIN AME_AD_SALES_DEMO.HARMONIZED.SUBSCRIBER_IDENTITY_GRAPH ig
+    ON ig.unique_id = spe.unique_id;
 
-CREATE OR REPLACE PROCEDURE DCR_ANALYSIS.RUN_OVERLAP_QUERY(target_segment_sql_filter STRING)
+/*
+    Overlap sketch for RUN_OVERLAP_QUERY(..., 'FAST'). Subscriber hashes come from
+    HARMONIZED.SUBSCRIBER_IDENTITY_GRAPH, so both modes join on UNIQUE_ID / HASHED_EMAIL
+    instead of hashing every row per call.
+    - PARTNER_X_SKETCH is a fixed-rate theta sketch of the partner list: only hashes whose
+      first hex digit is '0' (1/16 of the uniformly distributed SHA-256 space). Fast overlap
+      counts segment members found in this small table and scales by 16, in the same pass
+      that sizes the segment with an HLL estimate.
+    Re-run REFRESH_OVERLAP_SKETCHES() after the partner list changes.
+*/
+CREATE OR REPLACE PROCEDURE DCR_ANALYSIS.REFRESH_OVERLAP_SKETCHES()
+RETURNS VARIANT
+LANGUAGE SQL
+EXECUTE AS CALLER
+AS
+$$
+BEGIN
+    -- The '0' prefix must match SKETCH_HEX_PREFIX in RUN_OVERLAP_QUERY.
+    CREATE OR REPLACE TABLE DCR_ANALYSIS.PARTNER_X_SKETCH AS
+    SELECT DISTINCT hashed_email
+    FROM DCR_ANALYSIS.PARTNER_X_CUSTOMERS
+    WHERE STARTSWITH(hashed_email, '0');
+
+    RETURN OBJECT_CONSTRUCT(
+        'partner_sketch_hashes', (SELECT COUNT(*) FROM DCR_ANALYSIS.PARTNER_X_SKETCH)
+    );
+END;
+$$;
+
+CALL DCR_ANALYSIS.REFRESH_OVERLAP_SKETCHES();
+
+DROP TABLE IF EXISTS DCR_ANALYSIS.SUBSCRIBER_EMAIL_HASHES;
+
+COMMENT ON TABLE DCR_ANALYSIS.PARTNER_X_SKETCH IS
+    'Theta sketch of the partner hashed-email list: the 1/16 of hashes starting with hex digit 0, used for fast overlap estimates.';
+
+DROP PROCEDURE IF EXISTS DCR_ANALYSIS.RUN_OVERLAP_QUERY(STRING);
+CREATE OR REPLACE PROCEDURE DCR_ANALYSIS.RUN_OVERLAP_QUERY(target_segment_sql_filter STRING, overlap_mode STRING DEFAULT 'EXACT')
 RETURNS VARIANT
 LANGUAGE PYTHON
 RUNTIME_VERSION = '3.12'
 PACKAGES = ('snowflake-snowpark-python')
+IMPORTS = ('@AME_AD_SALES_DEMO.ANALYSE.PROCEDURE_MODULES/segment_planner.py')
 HANDLER = 'run'
 AS
 $$
+import math
+
 from snowflake.snowpark import Session
 
+import segment_planner as planner
+
+
+OVERLAP_MODES = ('EXACT', 'FAST')
+SKETCH_HEX_PREFIX = '0'  # must match the filter in REFRESH_OVERLAP_SKETCHES
+SKETCH_SAMPLING_RATE = 16 ** -len(SKETCH_HEX_PREFIX)
+HLL_RELATIVE_ERROR = 0.0162338  # average relative error of Snowflake's HLL estimates
+ERROR_BOUND_Z = 1.96  # margins are reported as ~95% bounds
+
+def _exact_overlap(session: Session, segment_filter: str) -> dict:
+    # Segment size and overlap from a single pass over the segment.
+    row = session.sql(f"""
+        SELECT
+            COUNT(DISTINCT h.hashed_email) AS segment_cnt,
+            COUNT(DISTINCT p.hashed_email) AS overlap_cnt
+        {planner.overlap_from(segment_filter, "(SELECT DISTINCT hashed_email FROM DCR_ANALYSIS.PARTNER_X_CUSTOMERS)")}
+    """).collect()[0]
+    return {"segment_size": row.SEGMENT_CNT, "overlap_unique_ids": row.OVERLAP_CNT}
+
+
+def _fast_overlap(session: Session, segment_filter: str) -> dict:
+    # HLL segment size plus the overlap with the partner theta sketch, scaled by the sampling rate.
+    row = session.sql(f"""
+        SELECT
+            APPROX_COUNT_DISTINCT(h.hashed_email) AS segment_est,
+            COUNT(DISTINCT p.hashed_email) AS sketch_overlap_cnt
+        {planner.overlap_from(segment_filter, "DCR_ANALYSIS.PARTNER_X_SKETCH")}
+    """).collect()[0]
+    segment_est = int(row.SEGMENT_EST or 0)
+    overlap_est = min(round(int(row.SKETCH_OVERLAP_CNT or 0) / SKETCH_SAMPLING_RATE), segment_est)
+    return {
+        "segment_size": segment_est,
+        "overlap_unique_ids": overlap_est,
+        "segment_size_margin": math.ceil(ERROR_BOUND_Z * HLL_RELATIVE_ERROR * segment_est),
+        "overlap_margin": math.ceil(ERROR_BOUND_Z * math.sqrt(overlap_est * (1 - SKETCH_SAMPLING_RATE) / SKETCH_SAMPLING_RATE)),
+    }
+
+
+def run(session: Session, target_segment_sql_filter: str, overlap_mode: str = 'EXACT'):
+    mode = (overlap_mode or 'EXACT').strip().upper()
+    if mode not in OVERLAP_MODES:
+        raise ValueError(f"Unsupported overlap mode '{overlap_mode}'. Supported modes: " + ', '.join(OVERLAP_MODES))
 
-def run(session: Session, target_segment_sql_filter: str):
     trimmed_filter = (target_segment_sql_filter or '').strip()
-    where_clause = f" WHERE {trimmed_filter}" if trimmed_filter else ''
-
-    segment_query = (
-        f"""
-        WITH SUBSCRIBER_BEHAVIOR AS (
-            SELECT *, SHA2(LOWER(TRIM(spe.email)), 256) AS hashed_email
-                FROM AME_AD_SALES_DEMO.HARMONIZED.SUBSCRIBER_PROFILE_ENRICHED spe
-                INNER JOIN AME_AD_SALES_DEMO.HARMONIZED.AGGREGATED_BEHAVIORAL_LOGS bl
-                ON spe.UNIQUE_ID = bl.UNIQUE_ID
-            {where_clause}
-            )
-        SELECT COUNT(DISTINCT s.hashed_email) AS cnt
-        FROM SUBSCRIBER_BEHAVIOR s
-        """
-    )
-    total_segment = session.sql(segment_query).collect()[0].CNT
-
-    overlap_query = f"""
-        WITH SUBSCRIBER_BEHAVIOR AS (
-            SELECT *, SHA2(LOWER(TRIM(spe.email)), 256) AS hashed_email
-                FROM AME_AD_SALES_DEMO.HARMONIZED.SUBSCRIBER_PROFILE_ENRICHED spe
-                INNER JOIN AME_AD_SALES_DEMO.HARMONIZED.AGGREGATED_BEHAVIORAL_LOGS bl
-                ON spe.UNIQUE_ID = bl.UNIQUE_ID
-            {where_clause}
-            )
-        SELECT COUNT(DISTINCT s.hashed_email) AS cnt
-        FROM SUBSCRIBER_BEHAVIOR s
-        JOIN DCR_ANALYSIS.PARTNER_X_CUSTOMERS p
-          ON s.hashed_email = p.hashed_email
-    """
-    overlap_count = session.sql(overlap_query).collect()[0].CNT
+    counts = _fast_overlap(session, trimmed_filter) if mode == 'FAST' else _exact_overlap(session, trimmed_filter)
+    total_segment = counts["segment_size"]
+    overlap_count = counts["overlap_unique_ids"]
 
     total_addressable = int(-(-(overlap_count + max(total_segment - overlap_count, 0) * 0.35) // 1))
 
-    message = (
-        "The overlap between our refined segment and the client's list is "
-        f"{overlap_count:,.0f} unique IDs, giving us a total addressable campaign size of "
-        f"{total_addressable:,.0f}."
-    )
+    if mode == 'FAST':
+        message = (
+            "The estimated overlap between our refined segment and the client's list is "
+            f"{overlap_count:,.0f} (+/- {counts['overlap_margin']:,.0f}) unique IDs, giving us an "
+            f"approximate total addressable campaign size of {total_addressable:,.0f}."
+        )
+    else:
+        message = (
+            "The overlap between our refined segment and the client's list is "
+            f"{overlap_count:,.0f} unique IDs, giving us a total addressable campaign size of "
+            f"{total_addressable:,.0f}."
+        )
 
     return {
         "segment_filter": target_segment_sql_filter,
-        "segment_size": total_segment,
-        "overlap_unique_ids": overlap_count,
+        "overlap_mode": mode,
+        **counts,
         "total_addressable_size": total_addressable,
         "message": message,
     }
 $$;
 
-COMMENT ON PROCEDURE DCR_ANALYSIS.RUN_OVERLAP_QUERY(STRING) IS 'Tool Name: RUN_CLEAN_ROOM_OVERLAP | Description: Executes a secure audience overlap analysis against a designated partner Data Clean Room (DCR) to determine the size of the combined, addressable audience.';
+COMMENT ON PROCEDURE DCR_ANALYSIS.RUN_OVERLAP_QUERY(STRING, STRING) IS 'Tool Name: RUN_CLEAN_ROOM_OVERLAP | Description: Executes a secure audience overlap analysis against a designated partner Data Clean Room (DCR) to determine the size of the combined, addressable audience. OVERLAP_MODE ''EXACT'' (default) counts distinct hashed emails; ''FAST'' returns sketch-based estimates with ~95% error margins for quick what-if planning.';
 
 USE SCHEMA DCR_ANALYSIS;
 
+/*
+    Audience activation export.
+    ACTIVATE_AUDIENCE resolves a materialised segment (SEGMENT_MEMBERS snapshot) to hashed
+    identifiers from HARMONIZED.SUBSCRIBER_IDENTITY_GRAPH and unloads them to the
+    AUDIENCE_EXPORTS stage as size-bounded, compressed chunk files:
+        @ACTIVATION.AUDIENCE_EXPORTS/<channel>/<run_id>/chunk_00001.csv.gz (or .parquet)
+        @ACTIVATION.AUDIENCE_EXPORTS/<channel>/<run_id>/manifest.json
+    Chunk size and identifier columns are configured per channel; the manifest lists every
+    file with its row count so connectors (see scripts/activation/local_connector.py) can
+    consume the chunks in parallel and verify completeness.
+*/
+CREATE STAGE IF NOT EXISTS AME_AD_SALES_DEMO.ACTIVATION.AUDIENCE_EXPORTS
+    ENCRYPTION = (TYPE = 'SNOWFLAKE_SSE')
+    COMMENT = 'Hashed audience chunk files and manifests written by ACTIVATION.ACTIVATE_AUDIENCE.';
+
 CREATE OR REPLACE PROCEDURE AME_AD_SALES_DEMO.ACTIVATION.ACTIVATE_AUDIENCE(
     channel_name STRING,
     audience_payload STRING,
@@ -2745,6 +3644,8 @@ HANDLER = 'run'
 AS
 $$
 from datetime import datetime
+import json
+import math
 from snowflake.snowpark import Session
 
 
@@ -2755,6 +3656,29 @@ SUPPORTED_CHANNELS = {
     'META ADS': 'OpenFlow_MetaAds_Connector',
 }
 
+# Rows per chunk file, sized to what each connector uploads per job.
+CHANNEL_ROWS_PER_FILE = {
+    'GOOGLE ADS': 500000,
+    'AMAZON ADS': 250000,
+    'LINKEDIN ADS': 100000,
+    'META ADS': 250000,
+}
+
+# Hashed identifiers each channel accepts for matching.
+CHANNEL_IDENTIFIERS = {
+    'GOOGLE ADS': ('HASHED_EMAIL', 'HASHED_PHONE'),
+    'AMAZON ADS': ('HASHED_EMAIL', 'HASHED_PHONE'),
+    'LINKEDIN ADS': ('HASHED_EMAIL',),
+    'META ADS': ('HASHED_EMAIL', 'HASHED_PHONE'),
+}
+
+EXPORT_STAGE = '@AME_AD_SALES_DEMO.ACTIVATION.AUDIENCE_EXPORTS'
+FILE_FORMATS = {
+    'CSV': ("TYPE = CSV COMPRESSION = GZIP FIELD_OPTIONALLY_ENCLOSED_BY = NONE NULL_IF = ('')", 'csv.gz'),
+    'PARQUET': ('TYPE = PARQUET COMPRESSION = SNAPPY', 'parquet'),
+}
+MAX_CONCURRENT_UNLOADS = 4
+
 
 def _resolve_channel(channel: str) -> str:
     if not channel:
@@ -2768,34 +3692,183 @@ def _resolve_channel(channel: str) -> str:
     return normalized
 
 
+def _sql_literal(value) -> str:
+    return "'" + str(value).replace('\\', '\\\\').replace("'", "''") + "'"
+
+
+def _parse_payload(audience_payload) -> dict:
+    # Accepts a segment id or name, or a JSON object {"segment": ..., "as_of_date": ..., "format": ...}.
+    if isinstance(audience_payload, dict):
+        return dict(audience_payload)
+    text = str(audience_payload or '').strip()
+    if text.startswith('{'):
+        try:
+            return json.loads(text)
+        except ValueError:
+            pass
+    return {'segment': text}
+
+
+def _resolve_segment(session: Session, payload: dict) -> tuple:
+    segment = str(payload.get('segment') or payload.get('segment_id') or '').strip()
+    if not segment:
+        raise ValueError('Audience payload must name a segment id or segment name to activate.')
+    rows = session.sql(
+        """
+        SELECT SEGMENT_ID, NAME
+        FROM AME_AD_SALES_DEMO.APPS.SEGMENT_DEFINITIONS
+        WHERE SEGMENT_ID = ? OR UPPER(NAME) = UPPER(?)
+        ORDER BY IFF(SEGMENT_ID = ?, 0, 1)
+        LIMIT 1
+        """,
+        params=[segment, segment, segment],
+    ).collect()
+    segment_id, segment_name = (rows[0]['SEGMENT_ID'], rows[0]['NAME']) if rows else (segment, None)
+
+    as_of_date = payload.get('as_of_date')
+    snapshot = session.sql(
+        """
+        SELECT MAX(AS_OF_DATE) AS AS_OF_DATE
+        FROM AME_AD_SALES_DEMO.ANALYSE.SEGMENT_MEMBERS
+        WHERE SEGMENT_ID = ? AND (? IS NULL OR AS_OF_DATE = TRY_TO_DATE(?))
+        """,
+        params=[segment_id, as_of_date, as_of_date],
+    ).collect()[0]['AS_OF_DATE']
+    if snapshot is None:
+        raise ValueError(
+            f"No materialized members found for segment '{segment}'"
+            + (f" as of {as_of_date}" if as_of_date else '')
+            + '. Run ANALYSE.SEGMENT_MATERIALIZE first.'
+        )
+    return segment_id, segment_name, snapshot
+
+
+def _stage_audience(session: Session, table: str, segment_id: str, as_of_date, identifiers: tuple) -> int:
+    # One pass: dedupe identifiers and number rows so chunks are contiguous RN ranges.
+    columns = ', '.join(f'ig.{c}' for c in identifiers)
+    session.sql(f"""
+        CREATE OR REPLACE TEMPORARY TABLE {table} AS
+        SELECT *, ROW_NUMBER() OVER (ORDER BY HASHED_EMAIL) AS RN
+        FROM (
+            SELECT DISTINCT {columns}
+            FROM AME_AD_SALES_DEMO.ANALYSE.SEGMENT_MEMBERS sm
+            INNER JOIN AME_AD_SALES_DEMO.HARMONIZED.SUBSCRIBER_IDENTITY_GRAPH ig
+                ON ig.UNIQUE_ID = sm.UNIQUE_ID
+            WHERE sm.SEGMENT_ID = {_sql_literal(segment_id)}
+              AND sm.AS_OF_DATE = {_sql_literal(as_of_date)}::DATE
+              AND ig.HASHED_EMAIL IS NOT NULL
+        )
+        ORDER BY RN
+    """).collect()
+    return int(session.sql(f"SELECT COUNT(*) AS C FROM {table}").collect()[0]['C'])
+
+
+def _unload_chunks(session: Session, table: str, export_path: str, identifiers: tuple,
+                   total_rows: int, rows_per_file: int, file_format: str) -> list:
+    format_options, extension = FILE_FORMATS[file_format]
+    columns = ', '.join(identifiers)
+    pending, files = [], []
+    for index in range(math.ceil(total_rows / rows_per_file)):
+        name = f"chunk_{index + 1:05d}.{extension}"
+        job = session.sql(f"""
+            COPY INTO {export_path}{name}
+            FROM (
+                SELECT {columns} FROM {table}
+                WHERE RN > {index * rows_per_file} AND RN <= {(index + 1) * rows_per_file}
+            )
+            FILE_FORMAT = ({format_options})
+            HEADER = TRUE
+            SINGLE = TRUE
+            OVERWRITE = TRUE
+            MAX_FILE_SIZE = 5368709120
+        """).collect_nowait()
+        pending.append((name, job))
+        # Bound the number of in-flight unloads so large audiences do not flood the warehouse queue.
+        if len(pending) >= MAX_CONCURRENT_UNLOADS:
+            files.append(_chunk_entry(*pending.pop(0)))
+    files.extend(_chunk_entry(name, job) for name, job in pending)
+    return files
+
+
+def _chunk_entry(name: str, job) -> dict:
+    result = job.result()[0].as_dict()
+    return {
+        'file': name,
+        'rows': int(result.get('rows_unloaded', 0)),
+        'bytes': int(result.get('output_bytes', 0)),
+    }
+
+
+def _write_manifest(session: Session, export_path: str, manifest: dict):
+    session.sql(f"""
+        COPY INTO {export_path}manifest.json
+        FROM (SELECT PARSE_JSON({_sql_literal(json.dumps(manifest))}))
+        FILE_FORMAT = (TYPE = JSON COMPRESSION = NONE)
+        SINGLE = TRUE
+        OVERWRITE = TRUE
+    """).collect()
+
+
 def run(session: Session, channel_name: str, audience_payload, activation_notes: str):
     normalized_channel = _resolve_channel(channel_name)
     connector_name = SUPPORTED_CHANNELS[normalized_channel]
+    identifiers = CHANNEL_IDENTIFIERS[normalized_channel]
+    rows_per_file = CHANNEL_ROWS_PER_FILE[normalized_channel]
 
-    run_id = f"ACT_{datetime.utcnow().strftime('%Y%m%dT%H%M%SZ')}"
+    payload = _parse_payload(audience_payload)
+    file_format = str(payload.get('format') or 'CSV').upper()
+    if file_format not in FILE_FORMATS:
+        raise ValueError(f"Unsupported export format '{file_format}'. Supported formats: " + ', '.join(FILE_FORMATS))
+    segment_id, segment_name, as_of_date = _resolve_segment(session, payload)
 
-    mock_request = {
-        'connector': connector_name,
+    run_id = f"ACT_{datetime.utcnow().strftime('%Y%m%dT%H%M%S%fZ')}"
+    export_path = f"{EXPORT_STAGE}/{normalized_channel.lower().replace(' ', '_')}/{run_id}/"
+    staging_table = f"AME_AD_SALES_DEMO.ACTIVATION.{run_id}_IDS"
+
+    total_rows = _stage_audience(session, staging_table, segment_id, as_of_date, identifiers)
+    files = _unload_chunks(session, staging_table, export_path, identifiers, total_rows, rows_per_file, file_format)
+    session.sql(f"DROP TABLE IF EXISTS {staging_table}").collect()
+
+    manifest = {
+        'run_id': run_id,
         'channel': normalized_channel.title(),
-        'audience_payload': audience_payload,
+        'connector': connector_name,
+        'segment_id': segment_id,
+        'segment_name': segment_name,
+        'as_of_date': str(as_of_date),
+        'format': file_format,
+        'identifiers': list(identifiers),
+        'rows_per_file': rows_per_file,
+        'total_rows': total_rows,
+        'files': files,
         'activation_notes': activation_notes,
+        'created_at': datetime.utcnow().isoformat() + 'Z',
     }
-
-    mock_response = {
-        'status': 'QUEUED',
-        'external_job_id': f"JOB_{datetime.utcnow().strftime('%H%M%S%f')}",
-        'estimated_completion_minutes': 5,
+    _write_manifest(session, export_path, manifest)
+
+    connector_response = {
+        'status': 'STAGED' if files else 'EMPTY',
+        'export_location': export_path,
+        'manifest': f"{export_path}manifest.json",
+        'files': len(files),
+        'total_rows': total_rows,
     }
 
     return {
         'run_id': run_id,
         'channel': normalized_channel.title(),
         'connector_invoked': connector_name,
-        'request_payload': mock_request,
-        'connector_response': mock_response,
+        'request_payload': {
+            'connector': connector_name,
+            'channel': normalized_channel.title(),
+            'audience_payload': audience_payload,
+            'activation_notes': activation_notes,
+        },
+        'connector_response': connector_response,
         'message': (
-            f"Activation request for {normalized_channel.title()} has been queued via "
-            f"{connector_name}. Reference ID: {mock_response['external_job_id']}"
+            f"Staged {total_rows:,} hashed identifiers for segment {segment_name or segment_id} "
+            f"({as_of_date}) in {len(files)} {file_format} file(s) for {connector_name}. "
+            f"Manifest: {export_path}manifest.json. Reference ID: {run_id}"
         ),
     }
 $$;
@@ -2813,48 +3886,83 @@ CREATE OR REPLACE VIEW ANALYSE.V_DEFAULT_AS_OF_DATE AS
 SELECT DATE_TRUNC('DAY', MAX(event_ts)) AS AS_OF_DATE
 FROM AME_AD_SALES_DEMO.INGEST.CLICKSTREAM_EVENTS;
 
+-- Segment registry, materialised membership snapshots and per-snapshot metrics
+CREATE TABLE IF NOT EXISTS AME_AD_SALES_DEMO.APPS.SEGMENT_DEFINITIONS (
+    SEGMENT_ID STRING,
+    NAME STRING,
+    OWNER STRING,
+    TAGS ARRAY,
+    CRITERIA_JSON VARIANT,
+    SQL_PREDICATE STRING
+);
+
+CREATE TABLE IF NOT EXISTS AME_AD_SALES_DEMO.ANALYSE.SEGMENT_MEMBERS (
+    SEGMENT_ID STRING,
+    UNIQUE_ID STRING,
+    AS_OF_DATE DATE
+)
+CLUSTER BY (SEGMENT_ID, AS_OF_DATE);
+
+-- Snapshots are read and replaced by (SEGMENT_ID, AS_OF_DATE); also applies the key
+-- to tables created before it was declared.
+ALTER TABLE AME_AD_SALES_DEMO.ANALYSE.SEGMENT_MEMBERS CLUSTER BY (SEGMENT_ID, AS_OF_DATE);
+
+CREATE TABLE IF NOT EXISTS AME_AD_SALES_DEMO.ANALYSE.SEGMENT_METRICS (
+    SEGMENT_ID STRING,
+    AS_OF_DATE DATE,
+    SEGMENT_SIZE NUMBER,
+    AVG_PREDICTED_LTV FLOAT,
+    AVG_CHURN_PROB FLOAT,
+    AVG_WATCH_TIME_30 FLOAT,
+    AVG_WATCH_TIME_90 FLOAT,
+    AVG_WATCH_TIME_180 FLOAT,
+    MAU_RATE FLOAT,
+    MAV_RATE FLOAT
+);
+
 -- Unified subscriber view CTE (features + churn + ltv + behavioral + profile)
 -- NOTE: This shape is reproduced inside SPs to allow dynamic predicates
 -- Column prefixes to disambiguate: f_, cr_, ltv_, bl_, spe_
-
--- Preview segment against unified view
+-- The SPs plan the shape per predicate with scripts/procedures/segment_planner.py:
+-- a referenced column is read from the wide ANALYSE.SUBSCRIBER_ATTRIBUTES table when that
+-- table takes it from the same source; otherwise (keys, f's copies of profile and
+-- behaviour columns, unlisted columns) the source itself is LEFT JOINed.
+
+-- Preview segment against unified view. The exact count and the tier/persona
+-- distributions come from one GROUPING SETS aggregate over the whole segment; a
+-- sample of up to min(50, limit_rows) rows is fetched separately, projecting only the
+-- headline columns and the prefixed columns the predicate references.
 CREATE OR REPLACE PROCEDURE ANALYSE.SEGMENT_PREVIEW(predicate STRING, limit_rows INT)
 RETURNS VARIANT
 LANGUAGE PYTHON
 RUNTIME_VERSION = '3.12'
-PACKAGES = ('snowflake-snowpark-python','pandas')
+PACKAGES = ('snowflake-snowpark-python')
+IMPORTS = ('@AME_AD_SALES_DEMO.ANALYSE.PROCEDURE_MODULES/segment_planner.py')
 HANDLER = 'run'
 EXECUTE AS OWNER
 AS
 $$
 from snowflake.snowpark import Session
-import pandas as pd
 
-UNIFIED_SELECT = """
-WITH base AS (
-  SELECT
-    f.UNIQUE_ID,
-    -- Aliases for common, agent-friendly names
-    f.TIER AS tier,
-    f.PERSONA AS persona,
-    f.PREDICTED_LTV AS predicted_ltv,
-    cr.PREDICTED_CHURN_PROB AS predicted_churn_prob,
-    -- Prefixed columns for full filtering power
-    f.* AS f_*,
-    cr.* AS cr_*,
-    ltv.* AS ltv_*,
-    bl.* AS bl_*,
-    spe.* AS spe_*
-  FROM AME_AD_SALES_DEMO.ANALYSE.FE_SUBSCRIBER_FEATURES f
-  LEFT JOIN AME_AD_SALES_DEMO.ANALYSE.FE_SUBSCRIBER_CHURN_RISK cr
-    ON cr.UNIQUE_ID = f.UNIQUE_ID
-  LEFT JOIN AME_AD_SALES_DEMO.ANALYSE.FE_SUBSCRIBER_LTV_SCORES ltv
-    ON ltv.UNIQUE_ID = f.UNIQUE_ID
-  LEFT JOIN AME_AD_SALES_DEMO.HARMONIZED.AGGREGATED_BEHAVIORAL_LOGS bl
-    ON bl.UNIQUE_ID = f.UNIQUE_ID
-  LEFT JOIN AME_AD_SALES_DEMO.HARMONIZED.SUBSCRIBER_PROFILE_ENRICHED spe
-    ON spe.UNIQUE_ID = f.UNIQUE_ID
-)
+import segment_planner as planner
+
+SAMPLE_ROWS = 50
+# Agent-friendly headline columns returned with each sample row
+SAMPLE_COLUMNS = ("UNIQUE_ID", "TIER", "PERSONA", "PREDICTED_LTV", "PREDICTED_CHURN_PROB")
+
+DISTRIBUTION_SQL = """
+SELECT
+  GROUPING(tier) AS g_tier,
+  GROUPING(persona) AS g_persona,
+  tier,
+  persona,
+  COUNT(*) AS n
+FROM base
+WHERE {predicate}
+GROUP BY GROUPING SETS ((), (tier), (persona))
+"""
+
+SAMPLE_SQL = """
 SELECT *
 FROM base
 WHERE {predicate}
@@ -2866,20 +3974,28 @@ def _predicate_or_true(pred: str|None) -> str:
         return "TRUE"
     return pred
 
+def _distribution(rows: list, column: str, grouping: str, other: str) -> list:
+    dist = [
+        {column: r[column], "COUNT": int(r["N"])}
+        for r in rows if r[grouping] == 0 and r[other] == 1
+    ]
+    return sorted(dist, key=lambda d: d["COUNT"], reverse=True)
+
 def run(session: Session, predicate: str, limit_rows: int):
     pred = _predicate_or_true(predicate)
-    limit_n = int(limit_rows or 1000)
-    sql = UNIFIED_SELECT.format(predicate=pred, limit_rows=limit_n)
-    df = session.sql(sql).to_pandas()
-    size = int(len(df))
-    tier_dist = df['TIER'].value_counts(dropna=False).reset_index().rename(columns={'index':'TIER','TIER':'COUNT'}).to_dict(orient='records') if 'TIER' in df.columns else []
-    persona_dist = df['PERSONA'].value_counts(dropna=False).reset_index().rename(columns={'index':'PERSONA','PERSONA':'COUNT'}).to_dict(orient='records') if 'PERSONA' in df.columns else []
-    sample_rows = df.head(min(50, size)).to_dict(orient='records')
+    sample_n = min(SAMPLE_ROWS, int(limit_rows or SAMPLE_ROWS))
+
+    # The aggregate only needs the grouping columns; the sample also carries the headline columns.
+    rows = session.sql(planner.base_sql(pred, ("TIER", "PERSONA")) + DISTRIBUTION_SQL.format(predicate=pred)).collect()
+    total = next((int(r["N"]) for r in rows if r["G_TIER"] == 1 and r["G_PERSONA"] == 1), 0)
+    sample = session.sql(
+        planner.base_sql(pred, SAMPLE_COLUMNS) + SAMPLE_SQL.format(predicate=pred, limit_rows=sample_n)
+    ).collect() if total else []
     return {
-        "count": size,
-        "tier_distribution": tier_dist,
-        "persona_distribution": persona_dist,
-        "sample": sample_rows
+        "count": total,
+        "tier_distribution": _distribution(rows, "TIER", "G_TIER", "G_PERSONA"),
+        "persona_distribution": _distribution(rows, "PERSONA", "G_PERSONA", "G_TIER"),
+        "sample": [r.asDict() for r in sample]
     }
 $$;
 
@@ -2975,40 +4091,24 @@ RETURNS VARIANT
 LANGUAGE PYTHON
 RUNTIME_VERSION = '3.12'
 PACKAGES = ('snowflake-snowpark-python')
+IMPORTS = ('@AME_AD_SALES_DEMO.ANALYSE.PROCEDURE_MODULES/segment_planner.py')
 HANDLER = 'run'
 EXECUTE AS OWNER
 AS
 $$
 from snowflake.snowpark import Session
 
-UNIFIED_BASE = """
-WITH base AS (
-  SELECT
-    f.UNIQUE_ID,
-    f.TIER,
-    f.PERSONA,
-    cr.PREDICTED_CHURN_PROB,
-    ltv.PREDICTED_LTV,
-    f.WATCH_TIME_30,
-    f.WATCH_TIME_90,
-    f.WATCH_TIME_180,
-    f.MAU_COUNT,
-    f.MAV_COUNT
-  FROM AME_AD_SALES_DEMO.ANALYSE.FE_SUBSCRIBER_FEATURES f
-  LEFT JOIN AME_AD_SALES_DEMO.ANALYSE.FE_SUBSCRIBER_CHURN_RISK cr
-    ON cr.UNIQUE_ID = f.UNIQUE_ID
-  LEFT JOIN AME_AD_SALES_DEMO.ANALYSE.FE_SUBSCRIBER_LTV_SCORES ltv
-    ON ltv.UNIQUE_ID = f.UNIQUE_ID
-  LEFT JOIN AME_AD_SALES_DEMO.HARMONIZED.AGGREGATED_BEHAVIORAL_LOGS bl
-    ON bl.UNIQUE_ID = f.UNIQUE_ID
-  LEFT JOIN AME_AD_SALES_DEMO.HARMONIZED.SUBSCRIBER_PROFILE_ENRICHED spe
-    ON spe.UNIQUE_ID = f.UNIQUE_ID
-)
+import segment_planner as planner
+
+MEMBERS_SQL = """
 SELECT UNIQUE_ID
 FROM base
 WHERE {predicate}
 """
 
+def _members_sql(predicate: str) -> str:
+    return planner.base_sql(predicate, ("UNIQUE_ID",)) + MEMBERS_SQL.format(predicate=predicate)
+
 def _resolve_as_of(session: Session, as_of_date):
     if as_of_date is not None:
         return as_of_date
@@ -3022,12 +4122,12 @@ def _get_predicate(session: Session, segment_id: str) -> str:
 def run(session: Session, segment_id: str, as_of_date):
     snap_date = _resolve_as_of(session, as_of_date)
     predicate = _get_predicate(session, segment_id) or "TRUE"
-    sql = UNIFIED_BASE.format(predicate=predicate)
+    sql = _members_sql(predicate)
     ids = session.sql(sql).select("UNIQUE_ID")
     session.sql("DELETE FROM AME_AD_SALES_DEMO.ANALYSE.SEGMENT_MEMBERS WHERE SEGMENT_ID = %s AND AS_OF_DATE = %s", params=[segment_id, str(snap_date)]).collect()
     session.sql(f"""
         INSERT INTO AME_AD_SALES_DEMO.ANALYSE.SEGMENT_MEMBERS (SEGMENT_ID, UNIQUE_ID, AS_OF_DATE)
-        SELECT %s, UNIQUE_ID, %s::DATE FROM ({sql})
+        SELECT %s, UNIQUE_ID, %s::DATE FROM ({sql}) ORDER BY UNIQUE_ID
     """, params=[segment_id, str(snap_date)]).collect()
     inserted = session.sql("SELECT COUNT(*) AS C FROM AME_AD_SALES_DEMO.ANALYSE.SEGMENT_MEMBERS WHERE SEGMENT_ID = %s AND AS_OF_DATE = %s", params=[segment_id, str(snap_date)]).collect()[0]['C']
     return {"segment_id": segment_id, "as_of_date": str(snap_date), "members": int(inserted)}
@@ -3057,21 +4157,23 @@ def run(session: Session, segment_id: str, as_of_date):
 
     df = session.sql(f"""
       SELECT
-        f.UNIQUE_ID,
-        f.PREDICTED_LTV,
-        f.WATCH_TIME_30,
-        f.WATCH_TIME_90,
-        f.WATCH_TIME_180,
-        f.MAU_COUNT,
-        f.MAV_COUNT
+        sa.UNIQUE_ID,
+        sa.PREDICTED_LTV,
+        sa.PREDICTED_CHURN_PROB,
+        sa.WATCH_TIME_30,
+        sa.WATCH_TIME_90,
+        sa.WATCH_TIME_180,
+        sa.MAU_COUNT,
+        sa.MAV_COUNT
       FROM AME_AD_SALES_DEMO.ANALYSE.SEGMENT_MEMBERS sm
-      JOIN AME_AD_SALES_DEMO.ANALYSE.FE_SUBSCRIBER_FEATURES f
-        ON f.UNIQUE_ID = sm.UNIQUE_ID
+      JOIN AME_AD_SALES_DEMO.ANALYSE.SUBSCRIBER_ATTRIBUTES sa
+        ON sa.UNIQUE_ID = sm.UNIQUE_ID
       WHERE sm.SEGMENT_ID = '{segment_id}' AND sm.AS_OF_DATE = '{as_of_date}'
     """)
     size = df.count()
     agg = df.agg({
         "PREDICTED_LTV":"avg",
+        "PREDICTED_CHURN_PROB":"avg",
         "WATCH_TIME_30":"avg",
         "WATCH_TIME_90":"avg",
         "WATCH_TIME_180":"avg",
@@ -3091,7 +4193,7 @@ def run(session: Session, segment_id: str, as_of_date):
         SELECT
           '{segment_id}', '{as_of_date}'::DATE, {size},
           {agg.get('AVG(PREDICTED_LTV)', 'NULL')},
-          NULL,
+          {agg.get('AVG(PREDICTED_CHURN_PROB)', 'NULL')},
           {agg.get('AVG(WATCH_TIME_30)', 'NULL')},
           {agg.get('AVG(WATCH_TIME_90)', 'NULL')},
           {agg.get('AVG(WATCH_TIME_180)', 'NULL')},
@@ -3141,9 +4243,6 @@ GRANT USAGE ON ALL FUNCTIONS IN SCHEMA AME_AD_SALES_DEMO.ANALYSE TO ROLE ACCOUNT
 GRANT USAGE ON ALL PROCEDURES IN SCHEMA AME_AD_SALES_DEMO.ANALYSE TO ROLE AME_AD_SALES_DEMO_ADMIN;
 GRANT USAGE ON ALL PROCEDURES IN SCHEMA AME_AD_SALES_DEMO.ANALYSE TO ROLE ACCOUNTADMIN;
 
-
-
-
 -- ---------------------------------------------------------------------------
 -- 24-subscriber-attributes-dynamic-table.sql
 -- ---------------------------------------------------------------------------
@@ -3152,28 +4251,225 @@ USE WAREHOUSE APP_WH;
 USE DATABASE AME_AD_SALES_DEMO;
 USE SCHEMA ANALYSE;
 
--- Dynamic table combining subscriber features with predicted churn risk and LTV
+/*
+    SUBSCRIBER_ATTRIBUTES: one wide row per subscriber holding every segmentable column.
+    Driven by FE_SUBSCRIBER_FEATURES like the unified segment view it replaces, so it
+    holds the subscribers the feature run scored and segments never count a profile
+    that has no feature row. Profile and demographics come from
+    SUBSCRIBER_PROFILE_ENRICHED, engagement from
+    AGGREGATED_BEHAVIORAL_LOGS, and the remaining features, content affinity and model
+    scores from the ANALYSE feature tables (feature columns copied from the harmonized
+    tables are taken from the harmonized side). The segment procedures, the dashboard's
+    Subscriber Explorer, the segment builder palette and GET_SUBSCRIBER_RECOMMENDATIONS
+    read this table instead of joining the sources themselves.
+    Refreshes incrementally as profiles, behaviour and scores change; a feature
+    engineering run replaces the ANALYSE tables and so triggers a full refresh.
+    Columns are listed explicitly: a column added or renamed in a feature table must be
+    added here too, rather than changing this table's schema on the next refresh.
+    Clustered on TIER and PERSONA, the columns most segment predicates filter on.
+*/
 CREATE OR REPLACE DYNAMIC TABLE AME_AD_SALES_DEMO.ANALYSE.SUBSCRIBER_ATTRIBUTES
   WAREHOUSE = APP_WH
-  TARGET_LAG = 'DOWNSTREAM'
+  TARGET_LAG = '1 hour'
+  REFRESH_MODE = INCREMENTAL
+  CLUSTER BY (tier, persona)
 AS
 SELECT
-  f.*,
-  /* Predicted churn probability from churn risk table */
-  cr.PREDICTED_CHURN_PROB AS PREDICTED_CHURN_PROB,
-  /* Predicted LTV from scores table (aliased to avoid name collision with any existing f.PREDICTED_LTV) */
-  ltv.PREDICTED_LTV AS PREDICTED_LTV_MODEL,
-  /* Optional: expose churn label and LTV target for convenience */
-  cr.CHURN_LABEL AS CHURN_LABEL,
-  ltv.LTV_TARGET AS LTV_TARGET_GROUND_TRUTH
+  f.unique_id,
+  spe.profile_id,
+  spe.full_name,
+  spe.email,
+  spe.tier,
+  spe.lad_code,
+  spe.area_name,
+  spe.latitude,
+  spe.longitude,
+  spe.age,
+  spe.age_band,
+  spe.income_level,
+  spe.education_level,
+  spe.marital_status,
+  spe.family_status,
+  spe.behavioral_digital_media_consumption_index,
+  spe.behavioral_fast_fashion_retail_propensity,
+  spe.behavioral_grocery_online_delivery_use,
+  spe.behavioral_financial_investment_interest,
+  bl.persona,
+  bl.primary_content_tag,
+  bl.content_categories,
+  bl.content_views_count,
+  bl.content_view_categories,
+  bl.avg_site_visits_per_month,
+  bl.login_frequency_per_week,
+  bl.total_events,
+  f.behavioural_events,
+  f.clickstream_events,
+  f.clickstream_active_days,
+  f.distinct_event_types,
+  f.impression_events,
+  f.click_events,
+  f.impression_units,
+  f.click_units,
+  f.impression_units_30,
+  f.click_units_30,
+  f.impression_units_90,
+  f.click_units_90,
+  f.impression_units_180,
+  f.click_units_180,
+  f.monetization_total,
+  f.monetization_90,
+  f.monetization_180,
+  f.days_since_behaviour,
+  f.days_since_ad_engagement,
+  f.days_since_clickstream,
+  f.ad_click_rate,
+  f.events_per_active_day,
+  f.visit_to_login_ratio,
+  f.attributed_spend,
+  f.monetization_index,
+  f.content_category_vector,
+  f.negative_event_count,
+  f.negative_event_count_30,
+  f.negative_event_ratio,
+  f.watch_time_total,
+  f.watch_time_weekly_avg,
+  f.watch_time_30,
+  f.watch_time_90,
+  f.watch_time_180,
+  f.watch_session_count,
+  f.watch_session_count_30,
+  f.watch_session_count_90,
+  f.watch_session_count_180,
+  f.watch_session_avg_duration,
+  f.watch_session_avg_duration_30,
+  f.watch_session_avg_duration_90,
+  f.watch_session_avg_duration_180,
+  f.watch_time_avg_per_active_day,
+  f.watch_longest_session_seconds,
+  f.watch_completion_rate,
+  f.watch_binge_indicator,
+  f.mau_count,
+  f.mav_count,
+  f.mau_current_month,
+  f.mav_current_month,
+  f.behavioural_last_event_ts,
+  f.last_ad_event_ts,
+  f.clickstream_last_event_ts,
+  f.first_seen_ts,
+  f.generated_ts,
+  cf.primary_content_type,
+  cf.primary_content_share,
+  cf.secondary_content_type,
+  cf.secondary_content_share,
+  cf.content_event_total,
+  cf.recent_event_count_30,
+  cf.negative_event_rate,
+  cr.predicted_churn_prob,
+  cr.churn_risk_segment,
+  cr.churn_label,
+  ltv.predicted_ltv,
+  ltv.ltv_target,
+  ltv.ltv_segment
 FROM AME_AD_SALES_DEMO.ANALYSE.FE_SUBSCRIBER_FEATURES f
+LEFT JOIN AME_AD_SALES_DEMO.HARMONIZED.SUBSCRIBER_PROFILE_ENRICHED spe
+  ON spe.unique_id = f.unique_id
+LEFT JOIN AME_AD_SALES_DEMO.HARMONIZED.AGGREGATED_BEHAVIORAL_LOGS bl
+  ON bl.unique_id = f.unique_id
+LEFT JOIN AME_AD_SALES_DEMO.ANALYSE.FE_SUBSCRIBER_CONTENT_FEATURES cf
+  ON cf.unique_id = f.unique_id
 LEFT JOIN AME_AD_SALES_DEMO.ANALYSE.FE_SUBSCRIBER_CHURN_RISK cr
-  ON cr.UNIQUE_ID = f.UNIQUE_ID
+  ON cr.unique_id = f.unique_id
 LEFT JOIN AME_AD_SALES_DEMO.ANALYSE.FE_SUBSCRIBER_LTV_SCORES ltv
-  ON ltv.UNIQUE_ID = f.UNIQUE_ID;
+  ON ltv.unique_id = f.unique_id;
 
+COMMENT ON TABLE AME_AD_SALES_DEMO.ANALYSE.SUBSCRIBER_ATTRIBUTES IS
+    'Wide subscriber attribute table: profile, demographics, behaviour, features, content affinity and churn/LTV scores in one row per UNIQUE_ID. Read path for segments, the Subscriber Explorer and recommendations; incrementally refreshed and clustered by TIER, PERSONA.';
 
+-- ---------------------------------------------------------------------------
+-- 25-dashboard-rollup-cube.sql
+-- ---------------------------------------------------------------------------
+USE ROLE AME_AD_SALES_DEMO_ADMIN;
+USE WAREHOUSE APP_WH;
+USE DATABASE AME_AD_SALES_DEMO;
+USE SCHEMA ANALYSE;
 
+/*
+    Rollup cube behind the dashboard's Journeys and ad views. Each ROLLUP_* table is
+    pre-aggregated on a subset of the dashboard dimensions (persona, tier, primary
+    content type, campaign, content category, day or month) and holds only additive
+    measures and mergeable HLL reach sketches, so any coarser grouping, its
+    CTR/eCPM/average ratios and its deduplicated reach can be recomputed from it.
+    The dashboard's aggregate navigator (streamlit/aggregate_navigator.py) sends
+    each query to the smallest registered table - these rollups,
+    HARMONIZED.AD_PERFORMANCE, AD_PERFORMANCE_DAILY_AGG or AD_REACH_PERSONA_DAILY -
+    whose dimensions cover the query's grouping and filters.
+    - ROLLUP_JOURNEYS follows the feature tables as a dynamic table; a feature
+      engineering run replaces them and so triggers a full refresh.
+    - The ad rollups are backfilled here and then kept current as AD_ROLLUP feeds of
+      ANALYSE.GENERATE_DAILY_DATA (only days past the feed's watermark are rebuilt)
+      and by HARMONIZED.REFRESH_AD_PERFORMANCE for late INGEST deliveries.
+*/
+CREATE OR REPLACE DYNAMIC TABLE AME_AD_SALES_DEMO.ANALYSE.ROLLUP_JOURNEYS
+  WAREHOUSE = APP_WH
+  TARGET_LAG = '1 hour'
+  REFRESH_MODE = INCREMENTAL
+AS
+SELECT
+  h.persona,
+  h.tier,
+  COALESCE(cf.primary_content_type, 'unknown') AS primary_content_type,
+  COUNT(*) AS subscribers,
+  SUM(h.clickstream_events) AS clickstream_events,
+  SUM(h.clickstream_active_days) AS active_days,
+  SUM(h.behavioural_events) AS behavioural_events,
+  SUM(CASE WHEN h.clickstream_active_days > 0 THEN h.clickstream_events / h.clickstream_active_days END) AS events_per_active_day_sum,
+  COUNT(CASE WHEN h.clickstream_active_days > 0 THEN 1 END) AS events_per_active_day_count
+FROM AME_AD_SALES_DEMO.ANALYSE.FE_SUBSCRIBER_HISTORY h
+LEFT JOIN AME_AD_SALES_DEMO.ANALYSE.FE_SUBSCRIBER_CONTENT_FEATURES cf
+  ON cf.unique_id = h.unique_id
+GROUP BY 1, 2, 3;
+
+CREATE OR REPLACE TABLE AME_AD_SALES_DEMO.ANALYSE.ROLLUP_AD_CATEGORY_DAILY
+CLUSTER BY (report_date)
+AS
+SELECT
+    report_date,
+    content_category,
+    COUNT(DISTINCT campaign_id) AS campaign_count,
+    SUM(impressions) AS impressions,
+    SUM(clicks) AS clicks,
+    SUM(spend) AS spend,
+    CURRENT_TIMESTAMP() AS generated_ts,
+    HLL_EXPORT(HLL_COMBINE(HLL_IMPORT(reach_sketch))) AS reach_sketch
+FROM AME_AD_SALES_DEMO.HARMONIZED.AD_PERFORMANCE_DAILY_AGG
+GROUP BY report_date, content_category
+ORDER BY report_date;
+
+CREATE OR REPLACE TABLE AME_AD_SALES_DEMO.ANALYSE.ROLLUP_AD_CATEGORY_MONTHLY
+AS
+SELECT
+    DATE_TRUNC('MONTH', report_date) AS report_month,
+    content_category,
+    COUNT(DISTINCT campaign_id) AS campaign_count,
+    SUM(impressions) AS impressions,
+    SUM(clicks) AS clicks,
+    SUM(spend) AS spend,
+    CURRENT_TIMESTAMP() AS generated_ts,
+    HLL_EXPORT(HLL_COMBINE(HLL_IMPORT(reach_sketch))) AS reach_sketch
+FROM AME_AD_SALES_DEMO.HARMONIZED.AD_PERFORMANCE_DAILY_AGG
+GROUP BY DATE_TRUNC('MONTH', report_date), content_category
+ORDER BY report_month;
+
+COMMENT ON TABLE AME_AD_SALES_DEMO.ANALYSE.ROLLUP_JOURNEYS IS
+    'Journey rollup: clickstream and behavioural totals per persona, tier and primary content type. EVENTS_PER_ACTIVE_DAY_SUM / EVENTS_PER_ACTIVE_DAY_COUNT gives the per-subscriber average.';
+COMMENT ON TABLE AME_AD_SALES_DEMO.ANALYSE.ROLLUP_AD_CATEGORY_DAILY IS
+    'Ad delivery rollup per report day and content category, from HARMONIZED.AD_PERFORMANCE_DAILY_AGG. Maintained by GENERATE_DAILY_DATA and REFRESH_AD_PERFORMANCE.';
+COMMENT ON TABLE AME_AD_SALES_DEMO.ANALYSE.ROLLUP_AD_CATEGORY_MONTHLY IS
+    'Ad delivery rollup per report month and content category, from HARMONIZED.AD_PERFORMANCE_DAILY_AGG. Maintained by GENERATE_DAILY_DATA and REFRESH_AD_PERFORMANCE.';
+COMMENT ON COLUMN AME_AD_SALES_DEMO.ANALYSE.ROLLUP_AD_CATEGORY_DAILY.CAMPAIGN_COUNT IS
+    'Distinct campaigns delivering in the category that day; not additive across rows.';
+COMMENT ON COLUMN AME_AD_SALES_DEMO.ANALYSE.ROLLUP_AD_CATEGORY_MONTHLY.CAMPAIGN_COUNT IS
+    'Distinct campaigns delivering in the category that month; not additive across rows.';
 
 -- =============================================================================
 -- CREATE TABLE LINEAGE VIEWS (required for Dataset Explorer)
@@ -3230,35 +4526,184 @@ ORDER BY target_table_name;
 
 GRANT SELECT ON VIEW ACCOUNT_USAGE_CREATE_TABLE_AS_SELECT_VW TO ROLE AME_AD_SALES_DEMO_ADMIN;
 
--- =============================================================================
--- DEPLOY STREAMLIT APPS FROM GIT REPOSITORY
--- =============================================================================
+-- Partition pruning per app query shape. Statements from the Streamlit apps carry a
+-- JSON QUERY_TAG of {"app", "view", "function"} (streamlit/query_telemetry.py); setup,
+-- feature engineering, the generator and dynamic table refreshes share APP_WH but not
+-- the tag, so they are left out. Queries that differ only in literals share a
+-- parameterized hash, so each row is one app query in one view with its observed pruning.
+-- A PRUNING_RATIO close to 1 means the clustering keys are doing their job; shapes
+-- near 0 over large tables are candidates for a new filter or clustering key.
+CREATE OR REPLACE SECURE VIEW APP_QUERY_PRUNING_VW AS
+WITH app_queries AS (
+    SELECT Q.*, TRY_PARSE_JSON(Q.QUERY_TAG) AS TAG
+    FROM SNOWFLAKE.ACCOUNT_USAGE.QUERY_HISTORY Q
+    WHERE Q.DATABASE_NAME = CURRENT_DATABASE()
+      AND Q.QUERY_TYPE = 'SELECT'
+      AND Q.EXECUTION_STATUS = 'SUCCESS'
+      AND Q.PARTITIONS_TOTAL > 0
+      AND Q.START_TIME >= DATEADD('day', -14, CURRENT_TIMESTAMP())
+)
+SELECT
+    TAG:app::STRING AS APP,
+    TAG:view::STRING AS VIEW_NAME,
+    QUERY_PARAMETERIZED_HASH,
+    ANY_VALUE(TAG:function::STRING) AS FUNCTION_NAME,
+    ANY_VALUE(LEFT(QUERY_TEXT, 500)) AS SAMPLE_QUERY_TEXT,
+    COUNT(*) AS EXECUTIONS,
+    MAX(START_TIME) AS LAST_RUN,
+    SUM(PARTITIONS_SCANNED) AS PARTITIONS_SCANNED,
+    SUM(PARTITIONS_TOTAL) AS PARTITIONS_TOTAL,
+    ROUND(1 - SUM(PARTITIONS_SCANNED) / NULLIF(SUM(PARTITIONS_TOTAL), 0), 4) AS PRUNING_RATIO,
+    SUM(BYTES_SCANNED) AS BYTES_SCANNED,
+    ROUND(AVG(PERCENTAGE_SCANNED_FROM_CACHE), 4) AS AVG_PERCENTAGE_SCANNED_FROM_CACHE,
+    ROUND(MEDIAN(TOTAL_ELAPSED_TIME), 0) AS MEDIAN_ELAPSED_MS
+FROM app_queries
+WHERE TAG:app IS NOT NULL
+GROUP BY 1, 2, 3;
+
+GRANT SELECT ON VIEW APP_QUERY_PRUNING_VW TO ROLE AME_AD_SALES_DEMO_ADMIN;
+
+-- Per-app, per-view and per-table breakdown of the same, read from the query profile
+-- (operator stats) of recent tagged app queries. Unlike ACCOUNT_USAGE it has no
+-- ingestion latency, so it can be run straight after exercising an app.
+CREATE OR REPLACE PROCEDURE APP_TABLE_PRUNING_REPORT(lookback_hours INT DEFAULT 24, max_queries INT DEFAULT 200)
+RETURNS VARIANT
+LANGUAGE PYTHON
+RUNTIME_VERSION = '3.12'
+PACKAGES = ('snowflake-snowpark-python')
+HANDLER = 'run'
+EXECUTE AS CALLER
+AS
+$$
+from snowflake.snowpark import Session
 
--- API Integration requires ACCOUNTADMIN privileges
-USE ROLE ACCOUNTADMIN;
+APP_WAREHOUSE = "APP_WH"
+
+
+def _recent_app_queries(session: Session, lookback_hours: int, max_queries: int) -> list:
+    # Only statements tagged by the apps' query_telemetry; everything else on APP_WH
+    # (setup, feature engineering, the generator, dynamic table refreshes) is untagged.
+    return session.sql(f"""
+        SELECT QUERY_ID, TAG:app::STRING AS APP, TAG:view::STRING AS VIEW_NAME
+        FROM (
+            SELECT QUERY_ID, START_TIME, TRY_PARSE_JSON(QUERY_TAG) AS TAG
+            FROM TABLE(INFORMATION_SCHEMA.QUERY_HISTORY_BY_WAREHOUSE(
+                WAREHOUSE_NAME => '{APP_WAREHOUSE}',
+                END_TIME_RANGE_START => DATEADD('hour', -{int(lookback_hours)}, CURRENT_TIMESTAMP()),
+                RESULT_LIMIT => 10000))
+            WHERE DATABASE_NAME = CURRENT_DATABASE()
+              AND QUERY_TYPE = 'SELECT'
+              AND EXECUTION_STATUS = 'SUCCESS'
+        )
+        WHERE TAG:app IS NOT NULL
+        ORDER BY START_TIME DESC
+        LIMIT {int(max_queries)}
+    """).collect()
 
--- Create API integration for GitHub (public repo - no secrets needed)
-CREATE OR REPLACE API INTEGRATION GITHUB_API_INTEGRATION
-    API_PROVIDER = git_https_api
-    API_ALLOWED_PREFIXES = ('https://github.com/Snowflake-Labs/')
-    ENABLED = TRUE;
 
--- Grant usage on the API integration to the demo admin role
-GRANT USAGE ON INTEGRATION GITHUB_API_INTEGRATION TO ROLE AME_AD_SALES_DEMO_ADMIN;
+def _table_scans(session: Session, query_id: str) -> list:
+    # One row per TableScan operator; OPERATOR_STATISTICS:pruning holds the same
+    # partitions scanned/total the query profile shows for that scan.
+    return session.sql(f"""
+        SELECT
+            OPERATOR_ATTRIBUTES:table_name::STRING AS TABLE_NAME,
+            OPERATOR_STATISTICS:pruning:partitions_scanned::NUMBER AS PARTITIONS_SCANNED,
+            OPERATOR_STATISTICS:pruning:partitions_total::NUMBER AS PARTITIONS_TOTAL
+        FROM TABLE(GET_QUERY_OPERATOR_STATS('{query_id}'))
+        WHERE OPERATOR_TYPE = 'TableScan'
+    """).collect()
 
--- Switch back to demo admin role for remaining objects
+
+def run(session: Session, lookback_hours: int = 24, max_queries: int = 200):
+    tables = {}
+    skipped = 0
+    queries = _recent_app_queries(session, lookback_hours, max_queries)
+    for query in queries:
+        try:
+            scans = _table_scans(session, query["QUERY_ID"])
+        except Exception:
+            # Profiles of other users' queries, or ones past retention, are not readable.
+            skipped += 1
+            continue
+        for scan in scans:
+            key = (query["APP"], query["VIEW_NAME"], scan["TABLE_NAME"])
+            entry = tables.setdefault(key, {
+                "app": query["APP"],
+                "view": query["VIEW_NAME"],
+                "table_name": scan["TABLE_NAME"],
+                "scans": 0,
+                "partitions_scanned": 0,
+                "partitions_total": 0,
+            })
+            entry["scans"] += 1
+            entry["partitions_scanned"] += int(scan["PARTITIONS_SCANNED"] or 0)
+            entry["partitions_total"] += int(scan["PARTITIONS_TOTAL"] or 0)
+
+    report = []
+    for entry in sorted(tables.values(), key=lambda e: e["partitions_scanned"], reverse=True):
+        total = entry["partitions_total"]
+        entry["pruning_ratio"] = round(1 - entry["partitions_scanned"] / total, 4) if total else None
+        report.append(entry)
+    return {
+        "lookback_hours": lookback_hours,
+        "queries_profiled": len(queries) - skipped,
+        "queries_skipped": skipped,
+        "tables": report,
+    }
+$$;
+
+GRANT USAGE ON PROCEDURE APP_TABLE_PRUNING_REPORT(INT, INT) TO ROLE AME_AD_SALES_DEMO_ADMIN;
+
+-- =============================================================================
+-- DEPLOY STREAMLIT APPS FROM GIT REPOSITORY
+-- =============================================================================
+
+-- Git repository and API integration are created near the top of this script.
 USE ROLE AME_AD_SALES_DEMO_ADMIN;
 USE WAREHOUSE APP_WH;
 
 -- APPS schema already created and owned by AME_AD_SALES_DEMO_ADMIN (see line ~70)
 
--- Create Git repository for Streamlit app deployment
-CREATE OR REPLACE GIT REPOSITORY AME_AD_SALES_DEMO.GENERATE.SFGUIDE_MEA_REPO
-    API_INTEGRATION = GITHUB_API_INTEGRATION
-    ORIGIN = 'https://github.com/Snowflake-Labs/sfguide-mea-subscriber-analytics.git';
+-- Per-statement telemetry exported by the apps' shared query layer (query_telemetry.py).
+-- QUERY_ID joins to ACCOUNT_USAGE.QUERY_HISTORY; QUERY_TAG there carries app/view/function.
+CREATE TABLE IF NOT EXISTS AME_AD_SALES_DEMO.APPS.APP_QUERY_TELEMETRY (
+    SESSION_ID STRING,
+    RERUN_ID STRING,
+    APP STRING,
+    VIEW_NAME STRING,
+    FUNCTION_NAME STRING,
+    KIND STRING,
+    STATEMENT STRING,
+    QUERY_ID STRING,
+    STARTED_AT TIMESTAMP_TZ,
+    ELAPSED_MS FLOAT,
+    ROW_COUNT NUMBER,
+    RESULT_BYTES NUMBER,
+    CACHE_HIT BOOLEAN,
+    ERROR STRING
+);
 
--- Fetch latest from Git repo
-ALTER GIT REPOSITORY AME_AD_SALES_DEMO.GENERATE.SFGUIDE_MEA_REPO FETCH;
+COMMENT ON TABLE AME_AD_SALES_DEMO.APPS.APP_QUERY_TELEMETRY IS
+    'Client-side query telemetry from the Streamlit apps: one row per statement (KIND = query) or cached reader call (KIND = cache), with latency, result size and Streamlit cache hits per rerun.';
+
+-- Cortex Analyst SQL as generated and as run by the dashboard (analyst_rewrite.py), with both
+-- compiled plans. Compare the BYTES_ASSIGNED columns to see what the rollup rewrites save.
+CREATE TABLE IF NOT EXISTS AME_AD_SALES_DEMO.APPS.ANALYST_SQL_REWRITES (
+    LOGGED_AT TIMESTAMP_TZ,
+    REQUEST_ID STRING,
+    SOURCE_TABLE STRING,
+    ROLLUP_TABLE STRING,
+    REASON STRING,
+    ORIGINAL_STATEMENT STRING,
+    EXECUTED_STATEMENT STRING,
+    ORIGINAL_PLAN STRING,
+    EXECUTED_PLAN STRING,
+    ORIGINAL_BYTES_ASSIGNED NUMBER,
+    EXECUTED_BYTES_ASSIGNED NUMBER
+);
+
+COMMENT ON TABLE AME_AD_SALES_DEMO.APPS.ANALYST_SQL_REWRITES IS
+    'One row per Cortex Analyst statement run by the dashboard: the generated SQL, the SQL executed (rewritten to a rollup where the answer is unchanged, always LIMITed), the reason, and both SYSTEM$EXPLAIN_PLAN_JSON plans.';
 
 -- -----------------------------------------------------------------------------
 -- INGEST EXPLORER
@@ -3267,7 +4712,7 @@ CREATE STAGE IF NOT EXISTS AME_AD_SALES_DEMO.APPS.STAGE_INGEST_EXPLORER;
 
 COPY FILES INTO @AME_AD_SALES_DEMO.APPS.STAGE_INGEST_EXPLORER
     FROM @AME_AD_SALES_DEMO.GENERATE.SFGUIDE_MEA_REPO/branches/main/streamlit/
-    FILES = ('streamlit_ingest_explorer.py', 'environment.yml');
+    FILES = ('streamlit_ingest_explorer.py', 'data_freshness.py', 'query_telemetry.py', 'environment.yml');
 
 CREATE OR REPLACE STREAMLIT AME_AD_SALES_DEMO.APPS.INGEST_EXPLORER
     FROM @AME_AD_SALES_DEMO.APPS.STAGE_INGEST_EXPLORER
@@ -3282,7 +4727,7 @@ CREATE STAGE IF NOT EXISTS AME_AD_SALES_DEMO.APPS.STAGE_DATASET_EXPLORER;
 
 COPY FILES INTO @AME_AD_SALES_DEMO.APPS.STAGE_DATASET_EXPLORER
     FROM @AME_AD_SALES_DEMO.GENERATE.SFGUIDE_MEA_REPO/branches/main/streamlit/
-    FILES = ('streamlit_dataset_explorer.py', 'environment.yml');
+    FILES = ('streamlit_dataset_explorer.py', 'data_freshness.py', 'query_telemetry.py', 'environment.yml');
 
 CREATE OR REPLACE STREAMLIT AME_AD_SALES_DEMO.APPS.DATASET_EXPLORER
     FROM @AME_AD_SALES_DEMO.APPS.STAGE_DATASET_EXPLORER
@@ -3297,7 +4742,7 @@ CREATE STAGE IF NOT EXISTS AME_AD_SALES_DEMO.APPS.STAGE_DASHBOARD;
 
 COPY FILES INTO @AME_AD_SALES_DEMO.APPS.STAGE_DASHBOARD
     FROM @AME_AD_SALES_DEMO.GENERATE.SFGUIDE_MEA_REPO/branches/main/streamlit/
-    FILES = ('streamlit_dashboard.py', 'environment.yml');
+    FILES = ('streamlit_dashboard.py', 'aggregate_navigator.py', 'analyst_rewrite.py', 'data_freshness.py', 'query_telemetry.py', 'environment.yml');
 
 CREATE OR REPLACE STREAMLIT AME_AD_SALES_DEMO.APPS.DASHBOARD
     FROM @AME_AD_SALES_DEMO.APPS.STAGE_DASHBOARD
@@ -3312,7 +4757,7 @@ CREATE STAGE IF NOT EXISTS AME_AD_SALES_DEMO.APPS.STAGE_SEGMENT_BUILDER;
 
 COPY FILES INTO @AME_AD_SALES_DEMO.APPS.STAGE_SEGMENT_BUILDER
     FROM @AME_AD_SALES_DEMO.GENERATE.SFGUIDE_MEA_REPO/branches/main/streamlit/
-    FILES = ('streamlit_segment_builder.py', 'environment.yml');
+    FILES = ('streamlit_segment_builder.py', 'data_freshness.py', 'query_telemetry.py', 'environment.yml');
 
 CREATE OR REPLACE STREAMLIT AME_AD_SALES_DEMO.APPS.SEGMENT_BUILDER
     FROM @AME_AD_SALES_DEMO.APPS.STAGE_SEGMENT_BUILDER
@@ -3379,29 +4824,26 @@ $$
             'Be concise but insightful.\n\n',
             'SUBSCRIBER DATA:\n',
             (SELECT CONCAT(
-                'Profile ID: ', f.PROFILE_ID, '\n',
-                'Tier: ', f.TIER, '\n',
-                'Content Preference: ', COALESCE(cf.PRIMARY_CONTENT_TYPE, 'Unknown'), '\n',
-                'Age: ', COALESCE(f.AGE::VARCHAR, 'Unknown'), '\n',
-                'Income Level: ', COALESCE(f.INCOME_LEVEL, 'Unknown'), '\n',
-                'Monthly Site Visits: ', ROUND(f.AVG_SITE_VISITS_PER_MONTH, 1), '\n',
-                'Login Frequency/Week: ', ROUND(f.LOGIN_FREQUENCY_PER_WEEK, 1), '\n',
-                'Watch Time (30d): ', ROUND(f.WATCH_TIME_30/3600, 1), ' hours\n',
-                'Secondary Content: ', COALESCE(cf.SECONDARY_CONTENT_TYPE, 'None'), '\n',
-                'Content Categories: ', COALESCE(f.CONTENT_CATEGORY_VECTOR, 'None'), '\n',
-                'Watch Completion Rate: ', ROUND(COALESCE(f.WATCH_COMPLETION_RATE, 0) * 100, 1), '%\n',
-                'Binge Watcher: ', CASE WHEN f.WATCH_BINGE_INDICATOR = 1 THEN 'Yes' ELSE 'No' END, '\n',
-                'Negative Events (30d): ', COALESCE(f.NEGATIVE_EVENT_COUNT_30::VARCHAR, '0'), '\n',
-                'Churn Risk: ', COALESCE(cr.CHURN_RISK_SEGMENT, 'Unknown'), '\n',
-                'Churn Probability: ', ROUND(COALESCE(cr.PREDICTED_CHURN_PROB, 0) * 100, 1), '%\n',
-                'Predicted LTV: $', ROUND(COALESCE(ltv.PREDICTED_LTV, 0), 2), '\n',
-                'LTV Segment: ', COALESCE(ltv.LTV_SEGMENT, 'Unknown')
+                'Profile ID: ', sa.PROFILE_ID, '\n',
+                'Tier: ', sa.TIER, '\n',
+                'Content Preference: ', COALESCE(sa.PRIMARY_CONTENT_TYPE, 'Unknown'), '\n',
+                'Age: ', COALESCE(sa.AGE::VARCHAR, 'Unknown'), '\n',
+                'Income Level: ', COALESCE(sa.INCOME_LEVEL, 'Unknown'), '\n',
+                'Monthly Site Visits: ', ROUND(sa.AVG_SITE_VISITS_PER_MONTH, 1), '\n',
+                'Login Frequency/Week: ', ROUND(sa.LOGIN_FREQUENCY_PER_WEEK, 1), '\n',
+                'Watch Time (30d): ', ROUND(sa.WATCH_TIME_30/3600, 1), ' hours\n',
+                'Secondary Content: ', COALESCE(sa.SECONDARY_CONTENT_TYPE, 'None'), '\n',
+                'Content Categories: ', COALESCE(sa.CONTENT_CATEGORY_VECTOR, 'None'), '\n',
+                'Watch Completion Rate: ', ROUND(COALESCE(sa.WATCH_COMPLETION_RATE, 0) * 100, 1), '%\n',
+                'Binge Watcher: ', CASE WHEN sa.WATCH_BINGE_INDICATOR = 1 THEN 'Yes' ELSE 'No' END, '\n',
+                'Negative Events (30d): ', COALESCE(sa.NEGATIVE_EVENT_COUNT_30::VARCHAR, '0'), '\n',
+                'Churn Risk: ', COALESCE(sa.CHURN_RISK_SEGMENT, 'Unknown'), '\n',
+                'Churn Probability: ', ROUND(COALESCE(sa.PREDICTED_CHURN_PROB, 0) * 100, 1), '%\n',
+                'Predicted LTV: $', ROUND(COALESCE(sa.PREDICTED_LTV, 0), 2), '\n',
+                'LTV Segment: ', COALESCE(sa.LTV_SEGMENT, 'Unknown')
             )
-            FROM AME_AD_SALES_DEMO.ANALYSE.FE_SUBSCRIBER_FEATURES f
-            LEFT JOIN AME_AD_SALES_DEMO.ANALYSE.FE_SUBSCRIBER_CHURN_RISK cr ON f.UNIQUE_ID = cr.UNIQUE_ID
-            LEFT JOIN AME_AD_SALES_DEMO.ANALYSE.FE_SUBSCRIBER_LTV_SCORES ltv ON f.UNIQUE_ID = ltv.UNIQUE_ID
-            LEFT JOIN AME_AD_SALES_DEMO.ANALYSE.FE_SUBSCRIBER_CONTENT_FEATURES cf ON f.UNIQUE_ID = cf.UNIQUE_ID
-            WHERE f.PROFILE_ID = subscriber_profile_id
+            FROM AME_AD_SALES_DEMO.ANALYSE.SUBSCRIBER_ATTRIBUTES sa
+            WHERE sa.PROFILE_ID = subscriber_profile_id
             LIMIT 1),
             '\n\nRECOMMENDATION TYPE: ', recommendation_type, '\n',
             CASE 
@@ -3424,6 +4866,216 @@ COMMENT ON FUNCTION AME_AD_SALES_DEMO.ANALYSE.GET_SUBSCRIBER_RECOMMENDATIONS(VAR
 IS 'Generates AI-powered personalized recommendations for subscribers using Cortex LLM. 
     Parameters: subscriber_profile_id (e.g., SUB-000000001), recommendation_type (all, retention, upsell, content, engagement)';
 
+-- Batch counterpart of GET_SUBSCRIBER_RECOMMENDATIONS for a materialised segment snapshot.
+-- Members are bucketed by feature profile (tier, persona, content preference, income,
+-- watch-time band, churn risk and LTV segment) in one set-based join, and
+-- every bucket gets one prompt. Responses are cached in ANALYSE.RECOMMENDATION_CACHE by
+-- prompt hash and model for CACHE_TTL_HOURS, so only buckets no earlier run has asked
+-- about call the LLM; per-member results land in ANALYSE.SEGMENT_RECOMMENDATIONS.
+-- LLM_MODE 'STUB' answers without calling Cortex, for local runs and throughput benchmarks
+-- (scripts/benchmarks/bench_recommendations.py); its answers are cached under MODEL 'stub'.
+CREATE TABLE IF NOT EXISTS AME_AD_SALES_DEMO.ANALYSE.RECOMMENDATION_CACHE (
+    PROMPT_HASH STRING,
+    MODEL STRING,
+    PROMPT STRING,
+    RESPONSE STRING,
+    CREATED_AT TIMESTAMP_NTZ
+);
+
+CREATE TABLE IF NOT EXISTS AME_AD_SALES_DEMO.ANALYSE.SEGMENT_RECOMMENDATIONS (
+    SEGMENT_ID STRING,
+    AS_OF_DATE DATE,
+    RECOMMENDATION_TYPE STRING,
+    UNIQUE_ID STRING,
+    PROFILE_ID STRING,
+    PROMPT_HASH STRING,
+    RECOMMENDATION STRING,
+    GENERATED_AT TIMESTAMP_NTZ
+)
+CLUSTER BY (SEGMENT_ID, AS_OF_DATE);
+
+CREATE OR REPLACE PROCEDURE ANALYSE.SEGMENT_RECOMMENDATIONS(
+    segment_id STRING,
+    as_of_date DATE,
+    recommendation_type STRING DEFAULT 'all',
+    llm_mode STRING DEFAULT 'CORTEX'
+)
+RETURNS VARIANT
+LANGUAGE PYTHON
+RUNTIME_VERSION = '3.12'
+PACKAGES = ('snowflake-snowpark-python')
+HANDLER = 'run'
+EXECUTE AS OWNER
+AS
+$$
+from snowflake.snowpark import Session
+
+MEMBERS_TABLE = "AME_AD_SALES_DEMO.ANALYSE.SEGMENT_MEMBERS"
+ATTRIBUTES_TABLE = "AME_AD_SALES_DEMO.ANALYSE.SUBSCRIBER_ATTRIBUTES"
+CACHE_TABLE = "AME_AD_SALES_DEMO.ANALYSE.RECOMMENDATION_CACHE"
+RESULTS_TABLE = "AME_AD_SALES_DEMO.ANALYSE.SEGMENT_RECOMMENDATIONS"
+BUCKETED_TABLE = "SEGMENT_RECOMMENDATION_MEMBERS"
+BUCKETS_TABLE = "SEGMENT_RECOMMENDATION_BUCKETS"
+MODEL = "claude-4-sonnet"
+CACHE_TTL_HOURS = 168
+
+# Response expression per mode, over a bucket's PROMPT and PROMPT_HASH.
+LLM_SQL = {
+    "CORTEX": "SNOWFLAKE.CORTEX.COMPLETE('{model}', PROMPT)",
+    "STUB": "CONCAT('Stub recommendations for profile ', PROMPT_HASH)",
+}
+# MODEL value the cache is keyed on per mode, so stub answers are never served to CORTEX runs.
+CACHE_MODEL = {"CORTEX": MODEL, "STUB": "stub"}
+
+INSTRUCTIONS = (
+    "You are a personalized recommendation assistant for a media streaming platform. "
+    "Based on the subscriber profile below, which a group of subscribers share, provide actionable recommendations. "
+    "Format your response as a clear, bulleted list with specific actions. "
+    "Be concise but insightful."
+)
+FOCUS = {
+    "retention": "Focus on: Strategies to reduce churn risk and improve engagement.",
+    "upsell": "Focus on: Opportunities to upgrade tier or increase spend.",
+    "content": "Focus on: Content recommendations based on viewing patterns.",
+    "engagement": "Focus on: Ways to increase platform engagement and watch time.",
+}
+DEFAULT_FOCUS = "Provide comprehensive recommendations covering retention, engagement, and growth opportunities."
+
+# 30-day watch time bands, in hours (upper bound exclusive).
+WATCH_BANDS = ((5, "Light (under 5 hours)"), (20, "Regular (5-20 hours)"))
+HEAVY_WATCH_BAND = "Heavy (20+ hours)"
+
+def _watch_band_sql() -> str:
+    cases = " ".join(f"WHEN sa.WATCH_TIME_30 / 3600 < {hours} THEN '{label}'" for hours, label in WATCH_BANDS)
+    return f"CASE WHEN sa.WATCH_TIME_30 IS NULL THEN 'Unknown' {cases} ELSE '{HEAVY_WATCH_BAND}' END"
+
+# Bucket column -> (prompt label, expression over SUBSCRIBER_ATTRIBUTES sa). Members with
+# the same values get the same prompt, so the bucket is the unit of LLM work.
+BUCKET_COLUMNS = {
+    "TIER": ("Tier", "COALESCE(sa.TIER, 'Unknown')"),
+    "PERSONA": ("Persona", "COALESCE(sa.PERSONA, 'Unknown')"),
+    "CONTENT_PREFERENCE": ("Content Preference", "COALESCE(sa.PRIMARY_CONTENT_TYPE, 'Unknown')"),
+    "INCOME_LEVEL": ("Income Level", "COALESCE(sa.INCOME_LEVEL, 'Unknown')"),
+    "WATCH_BAND": ("Watch Time (30d)", _watch_band_sql()),
+    "CHURN_RISK": ("Churn Risk", "COALESCE(sa.CHURN_RISK_SEGMENT, 'Unknown')"),
+    "LTV_SEGMENT": ("LTV Segment", "COALESCE(sa.LTV_SEGMENT, 'Unknown')"),
+}
+
+def _literal(value: str) -> str:
+    return "'" + str(value).replace("'", "''") + "'"
+
+def _prompt_sql(recommendation_type: str) -> str:
+    parts = [_literal(INSTRUCTIONS + "\\n\\nSUBSCRIBER PROFILE:\\n")]
+    for column, (label, _) in BUCKET_COLUMNS.items():
+        parts += [_literal(f"{label}: "), column, _literal("\\n")]
+    focus = FOCUS.get(recommendation_type, DEFAULT_FOCUS)
+    parts.append(_literal(f"\\nRECOMMENDATION TYPE: {recommendation_type}\\n{focus}"))
+    return f"CONCAT({', '.join(parts)})"
+
+def _resolve_as_of(session: Session, segment_id: str, as_of_date):
+    if as_of_date is not None:
+        return as_of_date
+    rows = session.sql(f"""
+        SELECT MAX(AS_OF_DATE) AS AS_OF_DATE FROM {MEMBERS_TABLE} WHERE SEGMENT_ID = {_literal(segment_id)}
+    """).collect()
+    return rows[0]["AS_OF_DATE"] if rows else None
+
+def _bucket_members(session: Session, segment_id: str, as_of_date) -> int:
+    columns = ",\n            ".join(f"{expr} AS {column}" for column, (_, expr) in BUCKET_COLUMNS.items())
+    session.sql(f"""
+        CREATE OR REPLACE TEMPORARY TABLE {BUCKETED_TABLE} AS
+        SELECT
+            sm.UNIQUE_ID,
+            sa.PROFILE_ID,
+            {columns}
+        FROM {MEMBERS_TABLE} sm
+        JOIN {ATTRIBUTES_TABLE} sa
+          ON sa.UNIQUE_ID = sm.UNIQUE_ID
+        WHERE sm.SEGMENT_ID = {_literal(segment_id)} AND sm.AS_OF_DATE = '{as_of_date}'::DATE
+    """).collect()
+    return int(session.sql(f"SELECT COUNT(*) AS C FROM {BUCKETED_TABLE}").collect()[0]["C"])
+
+def _build_buckets(session: Session, recommendation_type: str) -> int:
+    keys = ", ".join(BUCKET_COLUMNS)
+    session.sql(f"""
+        CREATE OR REPLACE TEMPORARY TABLE {BUCKETS_TABLE} AS
+        SELECT {keys}, MEMBERS, PROMPT, MD5(PROMPT) AS PROMPT_HASH
+        FROM (
+            SELECT {keys}, COUNT(*) AS MEMBERS, {_prompt_sql(recommendation_type)} AS PROMPT
+            FROM {BUCKETED_TABLE}
+            GROUP BY {keys}
+        )
+    """).collect()
+    return int(session.sql(f"SELECT COUNT(*) AS C FROM {BUCKETS_TABLE}").collect()[0]["C"])
+
+def _fill_cache(session: Session, llm_mode: str, cache_model: str) -> int:
+    # Expired entries are dropped first so their buckets are asked again; the INSERT then
+    # calls the LLM once per bucket the cache cannot answer. Returns that number of calls.
+    session.sql(f"""
+        DELETE FROM {CACHE_TABLE}
+        WHERE DATEDIFF('hour', CREATED_AT, CURRENT_TIMESTAMP()) >= {CACHE_TTL_HOURS}
+    """).collect()
+    misses = f"""
+        SELECT PROMPT_HASH, PROMPT
+        FROM {BUCKETS_TABLE} b
+        WHERE NOT EXISTS (
+            SELECT 1 FROM {CACHE_TABLE} c
+            WHERE c.PROMPT_HASH = b.PROMPT_HASH AND c.MODEL = '{cache_model}'
+        )
+    """
+    calls = int(session.sql(f"SELECT COUNT(*) AS C FROM ({misses})").collect()[0]["C"])
+    if calls:
+        session.sql(f"""
+            INSERT INTO {CACHE_TABLE} (PROMPT_HASH, MODEL, PROMPT, RESPONSE, CREATED_AT)
+            SELECT PROMPT_HASH, '{cache_model}', PROMPT, {LLM_SQL[llm_mode].format(model=MODEL)}, CURRENT_TIMESTAMP()
+            FROM ({misses})
+        """).collect()
+    return calls
+
+def run(session: Session, segment_id: str, as_of_date, recommendation_type: str = "all", llm_mode: str = "CORTEX"):
+    recommendation_type = (recommendation_type or "all").lower()
+    llm_mode = (llm_mode or "CORTEX").upper()
+    if llm_mode not in LLM_SQL:
+        raise ValueError(f"Unsupported llm_mode {llm_mode!r}; expected one of {tuple(LLM_SQL)}")
+    snap_date = _resolve_as_of(session, segment_id, as_of_date)
+    if snap_date is None:
+        return {"segment_id": segment_id, "as_of_date": None, "members": 0, "note": "no materialised snapshot"}
+
+    members = _bucket_members(session, segment_id, snap_date)
+    buckets = _build_buckets(session, recommendation_type)
+    cache_model = CACHE_MODEL[llm_mode]
+    llm_calls = _fill_cache(session, llm_mode, cache_model)
+
+    keys = " AND ".join(f"b.{column} = m.{column}" for column in BUCKET_COLUMNS)
+    session.sql(f"""
+        DELETE FROM {RESULTS_TABLE}
+        WHERE SEGMENT_ID = {_literal(segment_id)} AND AS_OF_DATE = '{snap_date}'::DATE
+          AND RECOMMENDATION_TYPE = {_literal(recommendation_type)}
+    """).collect()
+    session.sql(f"""
+        INSERT INTO {RESULTS_TABLE}
+            (SEGMENT_ID, AS_OF_DATE, RECOMMENDATION_TYPE, UNIQUE_ID, PROFILE_ID, PROMPT_HASH, RECOMMENDATION, GENERATED_AT)
+        SELECT
+            {_literal(segment_id)}, '{snap_date}'::DATE, {_literal(recommendation_type)},
+            m.UNIQUE_ID, m.PROFILE_ID, b.PROMPT_HASH, c.RESPONSE, CURRENT_TIMESTAMP()
+        FROM {BUCKETED_TABLE} m
+        JOIN {BUCKETS_TABLE} b ON {keys}
+        JOIN {CACHE_TABLE} c ON c.PROMPT_HASH = b.PROMPT_HASH AND c.MODEL = '{cache_model}'
+        ORDER BY m.UNIQUE_ID
+    """).collect()
+    return {
+        "segment_id": segment_id,
+        "as_of_date": str(snap_date),
+        "recommendation_type": recommendation_type,
+        "llm_mode": llm_mode,
+        "members": members,
+        "buckets": buckets,
+        "cache_hits": buckets - llm_calls,
+        "llm_calls": llm_calls,
+        "message": f"{members} members in {buckets} profile buckets; {llm_calls} LLM calls, {buckets - llm_calls} served from cache.",
+    }
+$$;
+
 -- =============================================================================
 -- SNOWFLAKE INTELLIGENCE: CREATE AGENT
 -- =============================================================================
@@ -3513,91 +5165,214 @@ SHOW AGENTS IN SCHEMA SNOWFLAKE_INTELLIGENCE.AGENTS;
 -- DAILY DATA GENERATOR
 -- =============================================================================
 -- Keeps demo data fresh by generating new rows for time-series tables.
--- Fills any gap between the last data date and today so the demo never goes stale.
+-- Fills any gap between the last data date and today (or an explicit through_date,
+-- for multi-year load tests) so the demo never goes stale.
+-- Feeds, campaign templates and noise seeds live in ANALYSE.DAILY_DATA_FEEDS and
+-- ANALYSE.DAILY_DATA_CAMPAIGN_TEMPLATES; gaps are read from ANALYSE.DAILY_DATA_WATERMARKS.
+-- Noise is hashed from (seed, date, key) and new days are drawn from the last loaded
+-- day, so a given date always gets the same values. All feeds fill in one transaction,
+-- each inserting in its target's clustering key order so new days land in fresh,
+-- well-pruned micro-partitions.
 -- Three layers of freshness:
 --   1. Initial CALL at deploy time (fills gap from S3 data through today)
 --   2. Serverless task (daily, covers Snowflake Intelligence and idle periods)
---   3. Streamlit startup hooks (instant freshness on app open)
--- Idempotent — skips dates that already have data.
+--   3. Streamlit apps (cheap watermark check on open; fires this procedure as an
+--      async job only when a gap exists and shows a "refreshing" indicator)
+-- Idempotent — skips dates that already have data. Returns the inserted row counts
+-- and the tables that changed so the apps can invalidate only the affected caches.
 -- =============================================================================
 
 USE SCHEMA AME_AD_SALES_DEMO.ANALYSE;
 
-CREATE OR REPLACE PROCEDURE AME_AD_SALES_DEMO.ANALYSE.GENERATE_DAILY_DATA()
-RETURNS VARCHAR
-LANGUAGE SQL
+-- Feeds the generator keeps current. GENERATOR picks the fill strategy, SEED keys the
+-- deterministic noise and WATERMARK_SQL is only run once, to bootstrap a missing watermark.
+CREATE OR REPLACE TABLE AME_AD_SALES_DEMO.ANALYSE.DAILY_DATA_FEEDS (
+    FEED_NAME STRING,
+    TARGET_TABLE STRING,
+    GENERATOR STRING,
+    FILL_ORDER NUMBER,
+    SEED NUMBER,
+    WATERMARK_SQL STRING,
+    PARAMS VARIANT,
+    ENABLED BOOLEAN
+);
+
+INSERT INTO AME_AD_SALES_DEMO.ANALYSE.DAILY_DATA_FEEDS
+SELECT 'CONTENT_VIEWS', 'ANALYSE.FE_CONTENT_VIEWS_DAILY', 'TEMPLATE_DAY', 10, 1001,
+       'SELECT MAX(VIEW_DATE)::DATE FROM AME_AD_SALES_DEMO.ANALYSE.FE_CONTENT_VIEWS_DAILY',
+       OBJECT_CONSTRUCT('count_noise', 0.15, 'viewer_noise', 0.08, 'duration_noise', 0.10), TRUE
+UNION ALL
+SELECT 'AD_PERFORMANCE_DAILY', 'HARMONIZED.AD_PERFORMANCE_DAILY_AGG', 'CAMPAIGN_TEMPLATES', 20, 2002,
+       'SELECT MAX(REPORT_DATE) FROM AME_AD_SALES_DEMO.HARMONIZED.AD_PERFORMANCE_DAILY_AGG',
+       OBJECT_CONSTRUCT('impression_noise', 0.20, 'click_noise', 0.30, 'cpm_noise', 0.10, 'reach_noise', 0.15, 'reach_ratio', 0.55), TRUE
+UNION ALL
+SELECT 'AD_REACH_PERSONA_DAILY', 'HARMONIZED.AD_REACH_PERSONA_DAILY', 'PERSONA_REACH', 25, 2002,
+       'SELECT MAX(REPORT_DATE) FROM AME_AD_SALES_DEMO.HARMONIZED.AD_PERFORMANCE_DAILY_AGG',
+       OBJECT_CONSTRUCT('source_table', 'HARMONIZED.AD_PERFORMANCE_DAILY_AGG'), TRUE
+UNION ALL
+SELECT 'AD_PERFORMANCE_MONTHLY', 'HARMONIZED.AD_PERFORMANCE', 'MONTHLY_ROLLUP', 30, 3003,
+       'SELECT MAX(REPORT_DATE) FROM AME_AD_SALES_DEMO.HARMONIZED.AD_PERFORMANCE_DAILY_AGG',
+       OBJECT_CONSTRUCT('source_table', 'HARMONIZED.AD_PERFORMANCE_DAILY_AGG'), TRUE
+UNION ALL
+SELECT 'AD_ROLLUP_CATEGORY_DAILY', 'ANALYSE.ROLLUP_AD_CATEGORY_DAILY', 'AD_ROLLUP', 32, 3202,
+       'SELECT MAX(REPORT_DATE) FROM AME_AD_SALES_DEMO.HARMONIZED.AD_PERFORMANCE_DAILY_AGG',
+       OBJECT_CONSTRUCT('source_table', 'HARMONIZED.AD_PERFORMANCE_DAILY_AGG', 'date_grain', 'DAY',
+                        'dims', ARRAY_CONSTRUCT('content_category')), TRUE
+UNION ALL
+SELECT 'AD_ROLLUP_CATEGORY_MONTHLY', 'ANALYSE.ROLLUP_AD_CATEGORY_MONTHLY', 'AD_ROLLUP', 34, 3404,
+       'SELECT MAX(REPORT_DATE) FROM AME_AD_SALES_DEMO.HARMONIZED.AD_PERFORMANCE_DAILY_AGG',
+       OBJECT_CONSTRUCT('source_table', 'HARMONIZED.AD_PERFORMANCE_DAILY_AGG', 'date_grain', 'MONTH',
+                        'dims', ARRAY_CONSTRUCT('content_category')), TRUE
+UNION ALL
+SELECT 'CLICKSTREAM', 'INGEST.CLICKSTREAM_EVENTS', 'EVENT_REPLAY', 40, 4004,
+       'SELECT MAX(EVENT_TS)::DATE FROM AME_AD_SALES_DEMO.INGEST.CLICKSTREAM_EVENTS',
+       OBJECT_CONSTRUCT('min_keep_rate', 0.85, 'max_keep_rate', 1.0), TRUE;
+
+-- Campaigns that keep delivering past the end of the loaded data.
+CREATE OR REPLACE TABLE AME_AD_SALES_DEMO.ANALYSE.DAILY_DATA_CAMPAIGN_TEMPLATES (
+    CAMPAIGN_ID STRING,
+    ADVERTISER_NAME STRING,
+    VERTICAL STRING,
+    CONTENT_CATEGORY STRING,
+    RATE_TYPE STRING,
+    BASE_IMPRESSIONS NUMBER,
+    BASE_CLICKS NUMBER,
+    BOOKED_CPM FLOAT,
+    BOOKED_CTR FLOAT,
+    DAILY_CAP NUMBER,
+    CREATIVE_COUNT NUMBER,
+    TARGET_PERSONAS ARRAY,
+    TARGET_DEVICES ARRAY,
+    ENABLED BOOLEAN
+);
+
+INSERT INTO AME_AD_SALES_DEMO.ANALYSE.DAILY_DATA_CAMPAIGN_TEMPLATES
+SELECT 'AD_0106', 'Northwind Insurance', 'Finance', 'Family Entertainment', 'CPM',
+       580, 6, 17.41, 0.0106, 621, 4,
+       ARRAY_CONSTRUCT('PREMIUM_DRAMA','FAMILY_HOUSEHOLD','SPORTS_ENGAGED','LIFESTYLE_MINDED','REALITY_FAN','KNOWLEDGE_SEEKER'),
+       ARRAY_CONSTRUCT('Tablet','Smart TV'), TRUE
+UNION ALL
+SELECT 'AD_0200', 'Glow Cosmetics', 'Beauty', 'Sports Enthusiasts', 'CPM',
+       1350, 17, 12.00, 0.0125, 1353, 3,
+       ARRAY_CONSTRUCT('LIFESTYLE_MINDED','SPORTS_ENGAGED','REALITY_FAN'),
+       ARRAY_CONSTRUCT('Mobile','Smart TV','Web'), TRUE
+UNION ALL
+SELECT 'AD_0201', 'Falcon Motors', 'Auto', 'Premium Drama', 'Hybrid',
+       1100, 12, 17.41, 0.0106, 1112, 2,
+       ARRAY_CONSTRUCT('PREMIUM_DRAMA','SPORTS_ENGAGED','KNOWLEDGE_SEEKER'),
+       ARRAY_CONSTRUCT('Smart TV','Web'), TRUE;
+
+-- One row per feed: how far the table is filled and which loaded day new days are drawn from.
+-- Recreated with the data so a redeploy re-anchors on the freshly loaded S3 extract.
+CREATE OR REPLACE TABLE AME_AD_SALES_DEMO.ANALYSE.DAILY_DATA_WATERMARKS (
+    FEED_NAME STRING,
+    TARGET_TABLE STRING,
+    DATA_THROUGH DATE,
+    ANCHOR_DATE DATE,
+    UPDATED_TS TIMESTAMP_NTZ
+);
+
+COMMENT ON TABLE AME_AD_SALES_DEMO.ANALYSE.DAILY_DATA_FEEDS IS
+    'Configuration for ANALYSE.GENERATE_DAILY_DATA: one row per generated feed with its fill strategy, noise seed and parameters.';
+COMMENT ON TABLE AME_AD_SALES_DEMO.ANALYSE.DAILY_DATA_CAMPAIGN_TEMPLATES IS
+    'Campaign templates the daily generator extends into HARMONIZED.AD_PERFORMANCE_DAILY_AGG.';
+COMMENT ON TABLE AME_AD_SALES_DEMO.ANALYSE.DAILY_DATA_WATERMARKS IS
+    'Per-feed high-water mark maintained by ANALYSE.GENERATE_DAILY_DATA; read by the Streamlit freshness check instead of scanning the data tables.';
+
+DROP PROCEDURE IF EXISTS AME_AD_SALES_DEMO.ANALYSE.GENERATE_DAILY_DATA();
+
+CREATE OR REPLACE PROCEDURE AME_AD_SALES_DEMO.ANALYSE.GENERATE_DAILY_DATA(through_date DATE DEFAULT NULL)
+RETURNS VARIANT
+LANGUAGE PYTHON
+RUNTIME_VERSION = '3.12'
+PACKAGES = ('snowflake-snowpark-python')
+HANDLER = 'run'
 EXECUTE AS CALLER
 AS
-'
-DECLARE
-    content_max_date DATE;
-    ad_max_date DATE;
-    days_to_fill_content INTEGER;
-    days_to_fill_ad INTEGER;
-    content_rows_inserted INTEGER DEFAULT 0;
-    ad_rows_inserted INTEGER DEFAULT 0;
-BEGIN
-    content_max_date := (SELECT MAX(VIEW_DATE)::DATE FROM AME_AD_SALES_DEMO.ANALYSE.FE_CONTENT_VIEWS_DAILY);
-    ad_max_date := (SELECT MAX(REPORT_DATE) FROM AME_AD_SALES_DEMO.HARMONIZED.AD_PERFORMANCE_DAILY_AGG);
-
-    days_to_fill_content := DATEDIFF(''day'', :content_max_date, CURRENT_DATE());
-    days_to_fill_ad := DATEDIFF(''day'', :ad_max_date, CURRENT_DATE());
-
-    IF (days_to_fill_content <= 0 AND days_to_fill_ad <= 0) THEN
-        RETURN ''No gap to fill. Content data through '' || :content_max_date || '', Ad data through '' || :ad_max_date;
-    END IF;
-
-    -- =========================================================================
-    -- 1. FE_CONTENT_VIEWS_DAILY — 21 rows per day
-    -- =========================================================================
-    IF (days_to_fill_content > 0) THEN
-        INSERT INTO AME_AD_SALES_DEMO.ANALYSE.FE_CONTENT_VIEWS_DAILY
-        WITH template AS (
-            SELECT * FROM AME_AD_SALES_DEMO.ANALYSE.FE_CONTENT_VIEWS_DAILY
-            WHERE VIEW_DATE::DATE = (SELECT MAX(VIEW_DATE)::DATE FROM AME_AD_SALES_DEMO.ANALYSE.FE_CONTENT_VIEWS_DAILY)
-        ),
-        date_series AS (
-            SELECT DATEADD(''day'', ROW_NUMBER() OVER (ORDER BY SEQ4()), :content_max_date) AS gen_date
-            FROM TABLE(GENERATOR(ROWCOUNT => :days_to_fill_content))
-        ),
-        noised AS (
+$$
+from datetime import date, timedelta
+import json
+from snowflake.snowpark import Session
+
+DATABASE = "AME_AD_SALES_DEMO"
+FEEDS_TABLE = f"{DATABASE}.ANALYSE.DAILY_DATA_FEEDS"
+CAMPAIGNS_TABLE = f"{DATABASE}.ANALYSE.DAILY_DATA_CAMPAIGN_TEMPLATES"
+WATERMARKS_TABLE = f"{DATABASE}.ANALYSE.DAILY_DATA_WATERMARKS"
+PERSONA_VIEW = f"{DATABASE}.HARMONIZED.SUBSCRIBER_AD_PERSONA"
+
+# (column, noise parameter, rounded to a count)
+CONTENT_VIEW_METRICS = [
+    ("PLAY_START_COUNT", "count_noise", True),
+    ("PLAY_STOP_COUNT", "count_noise", True),
+    ("CONTENT_CLICK_COUNT", "count_noise", True),
+    ("BROWSE_PAGE_COUNT", "count_noise", True),
+    ("UNIQUE_VIEWERS", "viewer_noise", True),
+    ("UNIQUE_ACTIVE_VIEWERS", "viewer_noise", True),
+    ("TOTAL_WATCH_TIME_SECONDS", "count_noise", False),
+    ("COMPLETED_SESSIONS", "count_noise", True),
+    ("AVG_SESSION_DURATION_SECONDS", "duration_noise", False),
+    ("MAX_SESSION_DURATION_SECONDS", "duration_noise", False),
+    ("TOTAL_SESSIONS_STARTED", "count_noise", True),
+    ("TOTAL_SESSIONS_COMPLETED", "count_noise", True),
+]
+CLICKSTREAM_COLUMNS = [
+    "UNIQUE_ID", "EVENT_ID", "SESSION_ID", "EVENT_TS", "EVENT_TYPE", "DEVICE",
+    "PAGE_PATH", "CONTENT_ID", "CONTENT_TYPE", "CONTENT_CATEGORY", "ATTRIBUTES"
+]
+# Rollup date grain -> (rollup date column, bucket expression over the daily source).
+ROLLUP_GRAINS = {
+    "DAY": ("report_date", "report_date"),
+    "MONTH": ("report_month", "DATE_TRUNC('MONTH', report_date)"),
+}
+
+
+def _noise(seed: int, spread: float, *keys: str) -> str:
+    # Multiplier in [1 - spread, 1 + spread] drawn from a hash, so a feed, date and key
+    # always get the same value no matter when or in how many runs the gap is filled.
+    return f"UNIFORM({round(1 - spread, 6)}::FLOAT, {round(1 + spread, 6)}::FLOAT, HASH({seed}, {', '.join(keys)}))"
+
+
+def _date_series(after: date, days: int) -> str:
+    return f"""
+        SELECT DATEADD('day', ROW_NUMBER() OVER (ORDER BY SEQ4()), '{after}'::DATE) AS GEN_DATE
+        FROM TABLE(GENERATOR(ROWCOUNT => {int(days)}))
+    """
+
+
+def _affected(rows: list) -> int:
+    return sum(int(v or 0) for v in rows[0]) if rows else 0
+
+
+def _fill_template_day(session: Session, feed: dict, after: date, days: int) -> int:
+    # Every new day is the anchor day's content/device mix with independent noise per metric.
+    seed, params = feed["SEED"], feed["PARAMS"]
+    keys = ("d.GEN_DATE", "t.CONTENT_TYPE", "t.CONTENT_CATEGORY", "t.DEVICE")
+    metrics = []
+    for column, noise_key, is_count in CONTENT_VIEW_METRICS:
+        value = f"t.{column} * {_noise(seed, params[noise_key], *keys, repr(column))}"
+        metrics.append(
+            f"GREATEST(0, ROUND({value}))::INT AS {column}" if is_count else f"GREATEST(0, {value}) AS {column}"
+        )
+    metric_list = ",\n                ".join(metrics)
+    return _affected(session.sql(f"""
+        INSERT INTO {DATABASE}.{feed['TARGET_TABLE']}
+        WITH noised AS (
             SELECT
-                d.gen_date::TIMESTAMP_NTZ AS VIEW_DATE,
+                d.GEN_DATE::TIMESTAMP_NTZ AS VIEW_DATE,
                 t.CONTENT_TYPE,
                 t.CONTENT_CATEGORY,
                 t.DEVICE,
-                GREATEST(0, ROUND(t.PLAY_START_COUNT * UNIFORM(0.85, 1.15, RANDOM())))::INT AS PLAY_START_COUNT,
-                GREATEST(0, ROUND(t.PLAY_STOP_COUNT * UNIFORM(0.85, 1.15, RANDOM())))::INT AS PLAY_STOP_COUNT,
-                GREATEST(0, ROUND(t.CONTENT_CLICK_COUNT * UNIFORM(0.85, 1.15, RANDOM())))::INT AS CONTENT_CLICK_COUNT,
-                GREATEST(0, ROUND(t.BROWSE_PAGE_COUNT * UNIFORM(0.85, 1.15, RANDOM())))::INT AS BROWSE_PAGE_COUNT,
-                GREATEST(0, ROUND(t.UNIQUE_VIEWERS * UNIFORM(0.92, 1.08, RANDOM())))::INT AS UNIQUE_VIEWERS,
-                GREATEST(0, ROUND(t.UNIQUE_ACTIVE_VIEWERS * UNIFORM(0.92, 1.08, RANDOM())))::INT AS UNIQUE_ACTIVE_VIEWERS,
-                GREATEST(0, t.TOTAL_WATCH_TIME_SECONDS * UNIFORM(0.85, 1.15, RANDOM())) AS TOTAL_WATCH_TIME_SECONDS,
-                GREATEST(0, ROUND(t.COMPLETED_SESSIONS * UNIFORM(0.85, 1.15, RANDOM())))::INT AS COMPLETED_SESSIONS,
-                GREATEST(0, t.AVG_SESSION_DURATION_SECONDS * UNIFORM(0.90, 1.10, RANDOM())) AS AVG_SESSION_DURATION_SECONDS,
-                GREATEST(0, t.MAX_SESSION_DURATION_SECONDS * UNIFORM(0.90, 1.10, RANDOM())) AS MAX_SESSION_DURATION_SECONDS,
-                GREATEST(0, ROUND(t.TOTAL_SESSIONS_STARTED * UNIFORM(0.85, 1.15, RANDOM())))::INT AS TOTAL_SESSIONS_STARTED,
-                GREATEST(0, ROUND(t.TOTAL_SESSIONS_COMPLETED * UNIFORM(0.85, 1.15, RANDOM())))::INT AS TOTAL_SESSIONS_COMPLETED
-            FROM date_series d
-            CROSS JOIN template t
+                {metric_list}
+            FROM ({_date_series(after, days)}) d
+            CROSS JOIN {DATABASE}.{feed['TARGET_TABLE']} t
+            WHERE t.VIEW_DATE = '{feed['ANCHOR_DATE']}'::TIMESTAMP_NTZ
         )
         SELECT
             VIEW_DATE,
             CONTENT_TYPE,
             CONTENT_CATEGORY,
             DEVICE,
-            PLAY_START_COUNT,
-            PLAY_STOP_COUNT,
-            CONTENT_CLICK_COUNT,
-            BROWSE_PAGE_COUNT,
-            UNIQUE_VIEWERS,
-            UNIQUE_ACTIVE_VIEWERS,
-            TOTAL_WATCH_TIME_SECONDS,
-            COMPLETED_SESSIONS,
-            AVG_SESSION_DURATION_SECONDS,
-            MAX_SESSION_DURATION_SECONDS,
-            TOTAL_SESSIONS_STARTED,
-            TOTAL_SESSIONS_COMPLETED,
+            {', '.join(column for column, _, _ in CONTENT_VIEW_METRICS)},
             CASE WHEN TOTAL_SESSIONS_STARTED > 0
                  THEN ROUND(TOTAL_SESSIONS_COMPLETED::FLOAT / TOTAL_SESSIONS_STARTED, 6)
                  ELSE 0 END AS SESSION_COMPLETION_RATE,
@@ -3605,72 +5380,385 @@ BEGIN
                  THEN ROUND(TOTAL_WATCH_TIME_SECONDS / UNIQUE_VIEWERS, 3)
                  ELSE 0 END AS AVG_WATCH_TIME_PER_VIEWER_SECONDS,
             CURRENT_TIMESTAMP() AS GENERATED_TS
-        FROM noised;
-
-        content_rows_inserted := (days_to_fill_content * 21);
-    END IF;
-
-    -- =========================================================================
-    -- 2. AD_PERFORMANCE_DAILY_AGG — 2-3 campaigns per day
-    -- =========================================================================
-    IF (days_to_fill_ad > 0) THEN
-        INSERT INTO AME_AD_SALES_DEMO.HARMONIZED.AD_PERFORMANCE_DAILY_AGG
-        WITH campaigns AS (
-            SELECT ''AD_0106'' AS CAMPAIGN_ID, ''Northwind Insurance'' AS ADVERTISER_NAME, ''Finance'' AS VERTICAL,
-                   ''Family Entertainment'' AS CONTENT_CATEGORY, ''CPM'' AS RATE_TYPE,
-                   580 AS BASE_IMPRESSIONS, 6 AS BASE_CLICKS, 17.41 AS BOOKED_CPM, 0.0106 AS BOOKED_CTR,
-                   621 AS DAILY_CAP, 4 AS CREATIVE_COUNT,
-                   ARRAY_CONSTRUCT(''PREMIUM_DRAMA'',''FAMILY_HOUSEHOLD'',''SPORTS_ENGAGED'',''LIFESTYLE_MINDED'',''REALITY_FAN'',''KNOWLEDGE_SEEKER'') AS TARGET_PERSONAS,
-                   ARRAY_CONSTRUCT(''Tablet'',''Smart TV'') AS TARGET_DEVICES
-            UNION ALL
-            SELECT ''AD_0200'', ''Glow Cosmetics'', ''Beauty'',
-                   ''Sports Enthusiasts'', ''CPM'',
-                   1350, 17, 12.00, 0.0125,
-                   1353, 3,
-                   ARRAY_CONSTRUCT(''LIFESTYLE_MINDED'',''SPORTS_ENGAGED'',''REALITY_FAN''),
-                   ARRAY_CONSTRUCT(''Mobile'',''Smart TV'',''Web'')
-            UNION ALL
-            SELECT ''AD_0201'', ''Falcon Motors'', ''Auto'',
-                   ''Premium Drama'', ''Hybrid'',
-                   1100, 12, 17.41, 0.0106,
-                   1112, 2,
-                   ARRAY_CONSTRUCT(''PREMIUM_DRAMA'',''SPORTS_ENGAGED'',''KNOWLEDGE_SEEKER''),
-                   ARRAY_CONSTRUCT(''Smart TV'',''Web'')
+        FROM noised
+        ORDER BY VIEW_DATE
+    """).collect())
+
+
+def _audience_ctes(seed: int, deliveries_sql: str) -> str:
+    # Generated days have no ADS_EVENTS, so a campaign-day's audience is a seeded sample of
+    # the subscribers whose persona it targets, sized to OBSERVED_UNIQUE_SUBSCRIBERS.
+    # The sample depends only on the seed and the delivery row, so every generator that
+    # rebuilds it from the same rows gets the same subscribers.
+    return f"""
+        deliveries AS ({deliveries_sql}),
+        targets AS (
+            SELECT d.REPORT_DATE, d.CAMPAIGN_ID, d.OBSERVED_UNIQUE_SUBSCRIBERS, t.value::STRING AS PERSONA
+            FROM deliveries d, LATERAL FLATTEN(input => d.TARGET_PERSONAS) t
+        ),
+        eligible AS (
+            SELECT
+                t.REPORT_DATE, t.CAMPAIGN_ID, t.OBSERVED_UNIQUE_SUBSCRIBERS, p.UNIQUE_ID, p.PERSONA,
+                COUNT(*) OVER (PARTITION BY t.REPORT_DATE, t.CAMPAIGN_ID) AS ELIGIBLE_COUNT
+            FROM targets t
+            INNER JOIN {PERSONA_VIEW} p ON p.PERSONA = t.PERSONA
+        ),
+        audience AS (
+            SELECT REPORT_DATE, CAMPAIGN_ID, UNIQUE_ID, PERSONA
+            FROM eligible
+            WHERE UNIFORM(0::FLOAT, 1::FLOAT, HASH({seed}, REPORT_DATE, CAMPAIGN_ID, UNIQUE_ID))
+                  < OBSERVED_UNIQUE_SUBSCRIBERS / ELIGIBLE_COUNT
+        )"""
+
+
+def _fill_campaign_templates(session: Session, feed: dict, after: date, days: int) -> int:
+    # Impressions are drawn once per campaign-day and clicks, CTR and spend derive from
+    # them, so the generated rows stay internally consistent. The reach sketch is built
+    # from the sampled audience of each campaign-day.
+    seed, params = feed["SEED"], feed["PARAMS"]
+    keys = ("d.GEN_DATE", "c.CAMPAIGN_ID")
+    deliveries = "SELECT GEN_DATE AS REPORT_DATE, CAMPAIGN_ID, TARGET_PERSONAS, OBSERVED_UNIQUE_SUBSCRIBERS FROM drawn"
+    return _affected(session.sql(f"""
+        INSERT INTO {DATABASE}.{feed['TARGET_TABLE']}
+        WITH drawn AS (
+            SELECT
+                d.GEN_DATE,
+                c.*,
+                GREATEST(1, ROUND(c.BASE_IMPRESSIONS * {_noise(seed, params['impression_noise'], *keys, "'IMPRESSIONS'")})) AS IMPRESSIONS,
+                GREATEST(1, ROUND(c.BASE_CLICKS * {_noise(seed, params['click_noise'], *keys, "'CLICKS'")})) AS CLICKS,
+                c.BOOKED_CPM * {_noise(seed, params['cpm_noise'], *keys, "'CPM'")} AS DRAWN_CPM,
+                GREATEST(100, ROUND(c.BASE_IMPRESSIONS * {float(params['reach_ratio'])}
+                    * {_noise(seed, params['reach_noise'], *keys, "'REACH'")}))::INT AS OBSERVED_UNIQUE_SUBSCRIBERS
+            FROM ({_date_series(after, days)}) d
+            CROSS JOIN {CAMPAIGNS_TABLE} c
+            WHERE c.ENABLED
         ),
-        date_series AS (
-            SELECT DATEADD(''day'', ROW_NUMBER() OVER (ORDER BY SEQ4()), :ad_max_date) AS gen_date
-            FROM TABLE(GENERATOR(ROWCOUNT => :days_to_fill_ad))
+        {_audience_ctes(seed, deliveries)},
+        sketches AS (
+            SELECT REPORT_DATE, CAMPAIGN_ID, HLL_EXPORT(HLL_ACCUMULATE(UNIQUE_ID)) AS REACH_SKETCH
+            FROM audience
+            GROUP BY REPORT_DATE, CAMPAIGN_ID
         )
         SELECT
-            d.gen_date AS REPORT_DATE,
-            c.CAMPAIGN_ID,
-            c.ADVERTISER_NAME,
-            c.VERTICAL,
-            c.CONTENT_CATEGORY,
-            c.RATE_TYPE,
-            GREATEST(1, ROUND(c.BASE_IMPRESSIONS * UNIFORM(0.80, 1.20, RANDOM()))) AS IMPRESSIONS,
-            GREATEST(1, ROUND(c.BASE_CLICKS * UNIFORM(0.70, 1.30, RANDOM()))) AS CLICKS,
-            ROUND(GREATEST(1, ROUND(c.BASE_CLICKS * UNIFORM(0.70, 1.30, RANDOM()))) /
-                  NULLIF(GREATEST(1, ROUND(c.BASE_IMPRESSIONS * UNIFORM(0.80, 1.20, RANDOM()))), 0), 6) AS CTR,
-            ROUND(GREATEST(1, ROUND(c.BASE_IMPRESSIONS * UNIFORM(0.80, 1.20, RANDOM()))) * c.BOOKED_CPM / 1000 * UNIFORM(0.90, 1.10, RANDOM()), 4) AS SPEND,
-            ROUND(c.BOOKED_CPM * UNIFORM(0.90, 1.10, RANDOM()), 4) AS EFFECTIVE_CPM,
-            c.BOOKED_CPM,
-            c.BOOKED_CTR,
-            c.DAILY_CAP,
-            c.CREATIVE_COUNT,
-            c.TARGET_PERSONAS,
-            c.TARGET_DEVICES,
-            GREATEST(100, ROUND(c.BASE_IMPRESSIONS * 0.55 * UNIFORM(0.85, 1.15, RANDOM())))::INT AS OBSERVED_UNIQUE_SUBSCRIBERS,
-            CURRENT_TIMESTAMP() AS GENERATED_TS
-        FROM date_series d
-        CROSS JOIN campaigns c;
+            drawn.GEN_DATE AS REPORT_DATE,
+            drawn.CAMPAIGN_ID,
+            ADVERTISER_NAME,
+            VERTICAL,
+            CONTENT_CATEGORY,
+            RATE_TYPE,
+            IMPRESSIONS,
+            CLICKS,
+            ROUND(CLICKS / IMPRESSIONS, 6) AS CTR,
+            ROUND(IMPRESSIONS * DRAWN_CPM / 1000, 4) AS SPEND,
+            ROUND(DRAWN_CPM, 4) AS EFFECTIVE_CPM,
+            BOOKED_CPM,
+            BOOKED_CTR,
+            DAILY_CAP,
+            CREATIVE_COUNT,
+            TARGET_PERSONAS,
+            TARGET_DEVICES,
+            drawn.OBSERVED_UNIQUE_SUBSCRIBERS,
+            CURRENT_TIMESTAMP() AS GENERATED_TS,
+            s.REACH_SKETCH
+        FROM drawn
+        LEFT JOIN sketches s
+          ON s.REPORT_DATE = drawn.GEN_DATE
+         AND s.CAMPAIGN_ID = drawn.CAMPAIGN_ID
+        ORDER BY 1, 2
+    """).collect())
+
+
+def _fill_persona_reach(session: Session, feed: dict, after: date, days: int) -> int:
+    # Persona-day sketches for generated days, rebuilt from the generated campaign rows with
+    # the campaign feed's seed (this feed's SEED) so they merge the same sampled audiences.
+    source = f"{DATABASE}.{feed['PARAMS']['source_table']}"
+    deliveries = f"""
+        SELECT REPORT_DATE, CAMPAIGN_ID, TARGET_PERSONAS, OBSERVED_UNIQUE_SUBSCRIBERS
+        FROM {source}
+        WHERE REPORT_DATE > '{after}'::DATE
+    """
+    return _affected(session.sql(f"""
+        INSERT INTO {DATABASE}.{feed['TARGET_TABLE']}
+        WITH {_audience_ctes(feed['SEED'], deliveries)}
+        SELECT
+            REPORT_DATE,
+            PERSONA,
+            COUNT(DISTINCT CAMPAIGN_ID) AS CAMPAIGN_COUNT,
+            COUNT(DISTINCT UNIQUE_ID) AS OBSERVED_UNIQUE_SUBSCRIBERS,
+            CURRENT_TIMESTAMP() AS GENERATED_TS,
+            HLL_EXPORT(HLL_ACCUMULATE(UNIQUE_ID)) AS REACH_SKETCH
+        FROM audience
+        GROUP BY REPORT_DATE, PERSONA
+        ORDER BY REPORT_DATE
+    """).collect())
+
+
+def _fill_monthly_rollup(session: Session, feed: dict, after: date, days: int) -> int:
+    # Months touched by the new days are re-aggregated from the daily table (same shape as
+    # the HARMONIZED.AD_PERFORMANCE build); earlier months are left alone.
+    target = f"{DATABASE}.{feed['TARGET_TABLE']}"
+    source = f"{DATABASE}.{feed['PARAMS']['source_table']}"
+    first_month = (after + timedelta(days=1)).replace(day=1)
+    dims = "campaign_id, advertiser_name, vertical, content_category, rate_type"
+    session.sql(f"DELETE FROM {target} WHERE report_month >= '{first_month}'::DATE").collect()
+    return _affected(session.sql(f"""
+        INSERT INTO {target}
+        WITH source AS (
+            SELECT * FROM {source} WHERE report_date >= '{first_month}'::DATE
+        ), base AS (
+            SELECT
+                DATE_TRUNC('MONTH', report_date) AS report_month,
+                {dims},
+                SUM(impressions) AS impressions,
+                SUM(clicks) AS clicks,
+                ROUND(CASE WHEN SUM(impressions) > 0 THEN SUM(clicks) / SUM(impressions) ELSE 0 END, 6) AS ctr,
+                SUM(spend) AS spend,
+                ROUND(CASE WHEN SUM(impressions) > 0 THEN (SUM(spend) * 1000) / SUM(impressions) ELSE 0 END, 4) AS ecpm,
+                MAX(booked_cpm) AS booked_cpm,
+                MAX(booked_ctr) AS booked_ctr,
+                MAX(daily_impression_cap) AS peak_daily_cap,
+                MAX(creative_count) AS creative_count,
+                COUNT(DISTINCT report_date) AS active_days,
+                SUM(observed_unique_subscribers) AS observed_unique_subscribers,
+                HLL_EXPORT(HLL_COMBINE(HLL_IMPORT(reach_sketch))) AS reach_sketch
+            FROM source
+            GROUP BY DATE_TRUNC('MONTH', report_date), {dims}
+        ), persona_rollup AS (
+            SELECT DATE_TRUNC('MONTH', report_date) AS report_month, {dims},
+                   ARRAY_AGG(DISTINCT COALESCE(NULLIF(persona.value::STRING, ''), 'UNKNOWN')) AS persona_list
+            FROM source, LATERAL FLATTEN(input => target_personas, outer => TRUE) persona
+            GROUP BY 1,2,3,4,5,6
+        ), device_rollup AS (
+            SELECT DATE_TRUNC('MONTH', report_date) AS report_month, {dims},
+                   ARRAY_AGG(DISTINCT COALESCE(NULLIF(device.value::STRING, ''), 'UNKNOWN')) AS device_list
+            FROM source, LATERAL FLATTEN(input => target_devices, outer => TRUE) device
+            GROUP BY 1,2,3,4,5,6
+        )
+        SELECT
+            base.report_month, base.campaign_id, base.advertiser_name, base.vertical,
+            base.content_category, base.rate_type, base.impressions, base.clicks, base.ctr,
+            base.spend, base.ecpm, base.booked_cpm, base.booked_ctr, base.peak_daily_cap,
+            base.creative_count,
+            COALESCE(pr.persona_list, ARRAY_CONSTRUCT()) AS target_personas,
+            COALESCE(dr.device_list, ARRAY_CONSTRUCT()) AS target_devices,
+            base.active_days,
+            base.observed_unique_subscribers,
+            CURRENT_TIMESTAMP() AS generated_ts,
+            base.reach_sketch
+        FROM base
+        LEFT JOIN persona_rollup pr USING (report_month, {dims})
+        LEFT JOIN device_rollup dr USING (report_month, {dims})
+    """).collect())
+
+
+def _fill_ad_rollup(session: Session, feed: dict, after: date, days: int) -> int:
+    # Dashboard cube tables: rebuilt from the daily table for the new days only (the
+    # whole month for monthly grain), with the same columns as the setup backfill.
+    target = f"{DATABASE}.{feed['TARGET_TABLE']}"
+    params = feed["PARAMS"]
+    column, bucket = ROLLUP_GRAINS[params["date_grain"]]
+    dims = ", ".join(params["dims"])
+    first_day = after + timedelta(days=1)
+    if params["date_grain"] == "MONTH":
+        first_day = first_day.replace(day=1)
+    session.sql(f"DELETE FROM {target} WHERE {column} >= '{first_day}'::DATE").collect()
+    return _affected(session.sql(f"""
+        INSERT INTO {target}
+        SELECT
+            {bucket} AS {column},
+            {dims},
+            COUNT(DISTINCT campaign_id) AS campaign_count,
+            SUM(impressions) AS impressions,
+            SUM(clicks) AS clicks,
+            SUM(spend) AS spend,
+            CURRENT_TIMESTAMP() AS generated_ts,
+            HLL_EXPORT(HLL_COMBINE(HLL_IMPORT(reach_sketch))) AS reach_sketch
+        FROM {DATABASE}.{params['source_table']}
+        WHERE report_date >= '{first_day}'::DATE
+        GROUP BY {bucket}, {dims}
+        ORDER BY {column}
+    """).collect())
+
+
+def _fill_event_replay(session: Session, feed: dict, after: date, days: int) -> int:
+    # Replays the anchor day's events (minus derived SIGN_UPs) onto each new day, keeping a
+    # seeded per-day share of them so daily volume varies but reruns are identical.
+    seed, params = feed["SEED"], feed["PARAMS"]
+    target = f"{DATABASE}.{feed['TARGET_TABLE']}"
+    anchor = feed["ANCHOR_DATE"]
+    keep_rate = (
+        f"UNIFORM({float(params['min_keep_rate'])}::FLOAT, {float(params['max_keep_rate'])}::FLOAT, "
+        f"HASH({seed}, GEN_DATE))"
+    )
+    return _affected(session.sql(f"""
+        INSERT INTO {target} ({', '.join(CLICKSTREAM_COLUMNS)})
+        WITH days AS (
+            SELECT GEN_DATE, {keep_rate} AS KEEP_RATE
+            FROM ({_date_series(after, days)})
+        ), anchor_events AS (
+            SELECT *
+            FROM {target}
+            WHERE EVENT_TS >= '{anchor}'::TIMESTAMP_NTZ
+              AND EVENT_TS < DATEADD('day', 1, '{anchor}'::TIMESTAMP_NTZ)
+              AND EVENT_TYPE <> 'SIGN_UP'
+        )
+        SELECT
+            e.UNIQUE_ID,
+            'GEN' || TO_CHAR(d.GEN_DATE, 'YYYYMMDD') || '_' || e.EVENT_ID,
+            IFF(e.SESSION_ID IS NULL, NULL, 'GEN' || TO_CHAR(d.GEN_DATE, 'YYYYMMDD') || '_' || e.SESSION_ID),
+            DATEADD('day', DATEDIFF('day', '{anchor}'::DATE, d.GEN_DATE), e.EVENT_TS),
+            e.EVENT_TYPE,
+            e.DEVICE,
+            e.PAGE_PATH,
+            e.CONTENT_ID,
+            e.CONTENT_TYPE,
+            e.CONTENT_CATEGORY,
+            OBJECT_INSERT(
+                IFF(IS_OBJECT(e.ATTRIBUTES), e.ATTRIBUTES::OBJECT, OBJECT_CONSTRUCT()),
+                'source', 'generate_daily_data', TRUE
+            )
+        FROM days d
+        CROSS JOIN anchor_events e
+        WHERE UNIFORM(0::FLOAT, 1::FLOAT, HASH({seed}, d.GEN_DATE, e.EVENT_ID, e.UNIQUE_ID, e.EVENT_TS)) < d.KEEP_RATE
+        ORDER BY d.GEN_DATE, e.EVENT_TS
+    """).collect())
+
+
+GENERATORS = {
+    "TEMPLATE_DAY": _fill_template_day,
+    "CAMPAIGN_TEMPLATES": _fill_campaign_templates,
+    "PERSONA_REACH": _fill_persona_reach,
+    "MONTHLY_ROLLUP": _fill_monthly_rollup,
+    "AD_ROLLUP": _fill_ad_rollup,
+    "EVENT_REPLAY": _fill_event_replay,
+}
 
-        ad_rows_inserted := (days_to_fill_ad * 3);
-    END IF;
 
-    RETURN ''Generated '' || :content_rows_inserted || '' content view rows and '' || :ad_rows_inserted || '' ad performance rows through '' || CURRENT_DATE();
-END;
-';
+def _load_feeds(session: Session) -> list:
+    rows = session.sql(f"""
+        SELECT f.FEED_NAME, f.TARGET_TABLE, f.GENERATOR, f.SEED, f.WATERMARK_SQL, f.PARAMS,
+               w.DATA_THROUGH, w.ANCHOR_DATE
+        FROM {FEEDS_TABLE} f
+        LEFT JOIN {WATERMARKS_TABLE} w ON w.FEED_NAME = f.FEED_NAME
+        WHERE f.ENABLED
+        ORDER BY f.FILL_ORDER
+    """).collect()
+    feeds = []
+    for row in rows:
+        feed = row.as_dict()
+        if isinstance(feed["PARAMS"], str):
+            feed["PARAMS"] = json.loads(feed["PARAMS"])
+        feed["PARAMS"] = feed["PARAMS"] or {}
+        if feed["GENERATOR"] not in GENERATORS:
+            raise ValueError(f"Unknown generator {feed['GENERATOR']!r} for feed {feed['FEED_NAME']}")
+        feeds.append(feed)
+    return feeds
+
+
+def _save_watermark(session: Session, feed: dict, data_through: date):
+    session.sql(f"""
+        MERGE INTO {WATERMARKS_TABLE} t
+        USING (SELECT ? AS FEED_NAME, ? AS TARGET_TABLE, ?::DATE AS DATA_THROUGH, ?::DATE AS ANCHOR_DATE) s
+        ON t.FEED_NAME = s.FEED_NAME
+        WHEN MATCHED THEN UPDATE SET
+            TARGET_TABLE = s.TARGET_TABLE,
+            DATA_THROUGH = s.DATA_THROUGH,
+            ANCHOR_DATE = s.ANCHOR_DATE,
+            UPDATED_TS = CURRENT_TIMESTAMP()::TIMESTAMP_NTZ
+        WHEN NOT MATCHED THEN INSERT (FEED_NAME, TARGET_TABLE, DATA_THROUGH, ANCHOR_DATE, UPDATED_TS)
+            VALUES (s.FEED_NAME, s.TARGET_TABLE, s.DATA_THROUGH, s.ANCHOR_DATE, CURRENT_TIMESTAMP()::TIMESTAMP_NTZ)
+    """, params=[feed["FEED_NAME"], feed["TARGET_TABLE"], str(data_through), str(feed["ANCHOR_DATE"])]).collect()
+
+
+def _claim_watermarks(session: Session, feeds: list) -> tuple:
+    # Compare-and-set on the watermark each feed was loaded with (no row and a NULL
+    # DATA_THROUGH both mean "not anchored yet"). The MERGE locks the watermarks table
+    # until this transaction ends, so an overlapping run waits here, then matches nothing
+    # for the feeds this run advanced and skips them instead of appending the same days.
+    claimed, skipped = [], []
+    for feed in feeds:
+        result = session.sql(f"""
+            MERGE INTO {WATERMARKS_TABLE} t
+            USING (SELECT ? AS FEED_NAME, ? AS TARGET_TABLE, ?::DATE AS DATA_THROUGH) s
+            ON t.FEED_NAME = s.FEED_NAME
+            WHEN MATCHED AND EQUAL_NULL(t.DATA_THROUGH, s.DATA_THROUGH) THEN UPDATE SET
+                UPDATED_TS = CURRENT_TIMESTAMP()::TIMESTAMP_NTZ
+            WHEN NOT MATCHED AND s.DATA_THROUGH IS NULL THEN INSERT (FEED_NAME, TARGET_TABLE, UPDATED_TS)
+                VALUES (s.FEED_NAME, s.TARGET_TABLE, CURRENT_TIMESTAMP()::TIMESTAMP_NTZ)
+        """, params=[
+            feed["FEED_NAME"], feed["TARGET_TABLE"],
+            None if feed["DATA_THROUGH"] is None else str(feed["DATA_THROUGH"]),
+        ]).collect()[0]
+        (claimed if sum(result) else skipped).append(feed)
+    if claimed:
+        # Re-read under the lock so the fill starts from the committed watermark.
+        current = {
+            row["FEED_NAME"]: row
+            for row in session.sql(
+                f"SELECT FEED_NAME, DATA_THROUGH, ANCHOR_DATE FROM {WATERMARKS_TABLE} WHERE FEED_NAME IN ("
+                + ", ".join("?" for _ in claimed) + ")",
+                params=[feed["FEED_NAME"] for feed in claimed],
+            ).collect()
+        }
+        for feed in claimed:
+            feed["DATA_THROUGH"] = current[feed["FEED_NAME"]]["DATA_THROUGH"]
+            feed["ANCHOR_DATE"] = current[feed["FEED_NAME"]]["ANCHOR_DATE"]
+    return claimed, [feed["FEED_NAME"] for feed in skipped]
+
+
+def run(session: Session, through_date: date = None):
+    through = through_date or session.sql("SELECT CURRENT_DATE() AS TODAY").collect()[0]["TODAY"]
+    feeds = _load_feeds(session)
+    rows_inserted, data_through = {}, {}
+
+    # All feeds commit together, so the apps never see clickstream ahead of its aggregates.
+    session.sql("BEGIN TRANSACTION").collect()
+    try:
+        feeds, feeds_skipped = _claim_watermarks(session, feeds)
+        for feed in feeds:
+            if feed["DATA_THROUGH"] is None:
+                # First run after a deploy: one scan to find where the loaded data ends.
+                # All watermarks are read before any feed fills, so rollup feeds sourced
+                # from another feed's table do not start past the days it is about to add.
+                feed["DATA_THROUGH"] = feed["ANCHOR_DATE"] = session.sql(feed["WATERMARK_SQL"]).collect()[0][0]
+                if feed["DATA_THROUGH"] is not None:
+                    _save_watermark(session, feed, feed["DATA_THROUGH"])
+        for feed in feeds:
+            table = feed["TARGET_TABLE"]
+            if feed["DATA_THROUGH"] is None:
+                continue
+            days = (through - feed["DATA_THROUGH"]).days
+            if days > 0:
+                rows_inserted[table] = rows_inserted.get(table, 0) + GENERATORS[feed["GENERATOR"]](
+                    session, feed, feed["DATA_THROUGH"], days
+                )
+                feed["DATA_THROUGH"] = through
+                _save_watermark(session, feed, through)
+            data_through[table] = str(feed["DATA_THROUGH"])
+        session.sql("COMMIT").collect()
+    except Exception:
+        session.sql("ROLLBACK").collect()
+        raise
+
+    tables_refreshed = [table for table, count in rows_inserted.items() if count > 0]
+    total = sum(rows_inserted.values())
+    return {
+        "content_rows_inserted": rows_inserted.get("ANALYSE.FE_CONTENT_VIEWS_DAILY", 0),
+        "ad_rows_inserted": rows_inserted.get("HARMONIZED.AD_PERFORMANCE_DAILY_AGG", 0),
+        "clickstream_rows_inserted": rows_inserted.get("INGEST.CLICKSTREAM_EVENTS", 0),
+        "rows_inserted": rows_inserted,
+        "tables_refreshed": tables_refreshed,
+        "data_through": data_through,
+        "feeds_skipped": feeds_skipped,
+        "content_data_through": data_through.get("ANALYSE.FE_CONTENT_VIEWS_DAILY"),
+        "ad_data_through": data_through.get("HARMONIZED.AD_PERFORMANCE_DAILY_AGG"),
+        "message": (
+            f"Generated {total:,} rows across {len(tables_refreshed)} table(s) through {through}"
+            if tables_refreshed
+            else "No gap to fill. Data through " + ", ".join(f"{t} {d}" for t, d in data_through.items())
+        ),
+    }
+$$;
 
 -- Serverless task: runs daily at 6am UTC to keep data fresh for Snowflake Intelligence
 -- Auto-suspends after 3 consecutive failures. Near-zero cost (no-op when no gap exists).
@@ -3686,6 +5774,17 @@ CREATE OR REPLACE TASK AME_AD_SALES_DEMO.ANALYSE.DAILY_DATA_REFRESH
 
 ALTER TASK AME_AD_SALES_DEMO.ANALYSE.DAILY_DATA_REFRESH RESUME;
 
+-- Serverless task: merges new INGEST ad deliveries into the HARMONIZED ad performance facts.
+-- The WHEN clause skips runs (at no cost) until one of the streams has rows.
+CREATE OR REPLACE TASK AME_AD_SALES_DEMO.HARMONIZED.AD_PERFORMANCE_REFRESH
+  SCHEDULE = '60 MINUTE'
+  SUSPEND_TASK_AFTER_NUM_FAILURES = 3
+  WHEN SYSTEM$STREAM_HAS_DATA('AME_AD_SALES_DEMO.HARMONIZED.AD_PERFORMANCE_EVENTS_STREAM')
+    OR SYSTEM$STREAM_HAS_DATA('AME_AD_SALES_DEMO.HARMONIZED.ADS_EVENTS_STREAM')
+  AS CALL AME_AD_SALES_DEMO.HARMONIZED.REFRESH_AD_PERFORMANCE();
+
+ALTER TASK AME_AD_SALES_DEMO.HARMONIZED.AD_PERFORMANCE_REFRESH RESUME;
+
 -- Initial call at deploy time to fill any gap from S3 data through today
 CALL AME_AD_SALES_DEMO.ANALYSE.GENERATE_DAILY_DATA();
 
@@ -3710,9 +5809,11 @@ ALTER WAREHOUSE APP_WH SET WAREHOUSE_SIZE = 'X-SMALL';
 
 USE ROLE ACCOUNTADMIN;
 
--- 1. Suspend and drop the daily data refresh task
+-- 1. Suspend and drop the data refresh tasks
 ALTER TASK IF EXISTS AME_AD_SALES_DEMO.ANALYSE.DAILY_DATA_REFRESH SUSPEND;
 DROP TASK IF EXISTS AME_AD_SALES_DEMO.ANALYSE.DAILY_DATA_REFRESH;
+ALTER TASK IF EXISTS AME_AD_SALES_DEMO.HARMONIZED.AD_PERFORMANCE_REFRESH SUSPEND;
+DROP TASK IF EXISTS AME_AD_SALES_DEMO.HARMONIZED.AD_PERFORMANCE_REFRESH;
 
 -- 2. Drop the database (cascades to all schemas, tables, views, stages, 
 --    Streamlit apps, functions, procedures, git repos, secrets inside)
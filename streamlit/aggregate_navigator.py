@@ -0,0 +1,233 @@
+# Copyright 2026 Snowflake Inc.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Aggregate navigator over the dashboard rollup cube.
+
+Views describe a query as dimensions, measures and filters rather than SQL against
+a fixed table. ``aggregate_sql`` picks the smallest registered rollup (by current
+row count) whose dimensions cover everything the query groups or filters on, and
+re-aggregates it to the requested grain. Rollups hold additive measures and HLL
+reach sketches only, so ratios (CTR, eCPM, averages) are recomputed from the summed
+components and reach from the merged sketches, and come out the same from any
+table. The ``ROLLUP_*`` tables are built in setup.sql section 25; the HARMONIZED
+ad facts are registered as the finer fallbacks.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Dict, FrozenSet, Iterable, List, Mapping, Sequence, Tuple
+
+import query_telemetry as telemetry
+
+
+ROW_COUNT_TTL_SECONDS = 900
+
+# Distinct subscribers across the grouped rows: their HLL sketches merged, then estimated.
+REACH = "HLL_ESTIMATE(HLL_COMBINE(HLL_IMPORT(reach_sketch)))"
+
+# Measure -> aggregate over a rollup's additive columns.
+AD_MEASURES: Dict[str, str] = {
+    "impressions": "SUM(impressions)",
+    "clicks": "SUM(clicks)",
+    "spend": "SUM(spend)",
+    "ctr": "ROUND(DIV0(SUM(clicks), SUM(impressions)), 6)",
+    "ecpm": "ROUND(DIV0(SUM(spend) * 1000, SUM(impressions)), 4)",
+    "effective_cpm": "ROUND(DIV0(SUM(spend) * 1000, SUM(impressions)), 4)",
+    "reach": REACH,
+    "frequency": f"ROUND(DIV0(SUM(impressions), {REACH}), 2)",
+}
+AUDIENCE_MEASURES: Dict[str, str] = {
+    "reach": REACH,
+}
+JOURNEY_MEASURES: Dict[str, str] = {
+    "subscribers": "SUM(subscribers)",
+    "clickstream_events": "SUM(clickstream_events)",
+    "active_days": "SUM(active_days)",
+    "behavioural_events": "SUM(behavioural_events)",
+    "avg_events_per_active_day": "SUM(events_per_active_day_sum) / NULLIF(SUM(events_per_active_day_count), 0)",
+}
+
+CAMPAIGN_DIMENSIONS = ("campaign_id", "advertiser_name", "vertical", "content_category", "rate_type")
+MONTH_FROM_DAY = "DATE_TRUNC('MONTH', report_date)"
+
+
+@dataclass(frozen=True)
+class Rollup:
+    table: str  # "SCHEMA.TABLE"
+    dimensions: Mapping[str, str]  # dimension -> expression in this table
+    measures: Mapping[str, str]
+    # Columns a query may filter on but not group by (arrays held at the table's grain).
+    filter_columns: FrozenSet[str] = field(default_factory=frozenset)
+
+    def answers(self, dimensions: Iterable[str], measures: Iterable[str], filters: Iterable["Filter"]) -> bool:
+        filterable = set(self.dimensions) | self.filter_columns
+        return (
+            set(dimensions) <= set(self.dimensions)
+            and set(measures) <= set(self.measures)
+            and all(f.column in filterable for f in filters)
+        )
+
+
+@dataclass(frozen=True)
+class Filter:
+    column: str
+    op: str  # "in", "between" or "contains_any"
+    values: Tuple[Any, ...]
+
+
+def in_filter(column: str, values: Sequence[Any]) -> Filter:
+    return Filter(column, "in", tuple(values))
+
+
+def between_filter(column: str, start: date, end: date) -> Filter:
+    return Filter(column, "between", (start, end))
+
+
+def contains_any_filter(column: str, values: Sequence[Any]) -> Filter:
+    """Rows whose array ``column`` holds at least one of ``values``."""
+    return Filter(column, "contains_any", tuple(values))
+
+
+AD_ROLLUPS: Tuple[Rollup, ...] = (
+    Rollup(
+        "ANALYSE.ROLLUP_AD_CATEGORY_MONTHLY",
+        {"report_month": "report_month", "content_category": "content_category"},
+        AD_MEASURES,
+    ),
+    Rollup(
+        "ANALYSE.ROLLUP_AD_CATEGORY_DAILY",
+        {"report_date": "report_date", "report_month": MONTH_FROM_DAY, "content_category": "content_category"},
+        AD_MEASURES,
+    ),
+    Rollup(
+        "HARMONIZED.AD_PERFORMANCE",
+        {"report_month": "report_month", **{d: d for d in CAMPAIGN_DIMENSIONS}},
+        AD_MEASURES,
+    ),
+    Rollup(
+        "HARMONIZED.AD_PERFORMANCE_DAILY_AGG",
+        {"report_date": "report_date", "report_month": MONTH_FROM_DAY, **{d: d for d in CAMPAIGN_DIMENSIONS}},
+        AD_MEASURES,
+        frozenset({"target_personas", "target_devices"}),
+    ),
+)
+AUDIENCE_ROLLUPS: Tuple[Rollup, ...] = (
+    Rollup(
+        "HARMONIZED.AD_REACH_PERSONA_DAILY",
+        {"report_date": "report_date", "report_month": MONTH_FROM_DAY, "persona": "persona"},
+        AUDIENCE_MEASURES,
+    ),
+)
+JOURNEY_ROLLUPS: Tuple[Rollup, ...] = (
+    Rollup(
+        "ANALYSE.ROLLUP_JOURNEYS",
+        {"persona": "persona", "tier": "tier", "primary_content_type": "primary_content_type"},
+        JOURNEY_MEASURES,
+    ),
+)
+
+
+@telemetry.cached(ttl=ROW_COUNT_TTL_SECONDS, show_spinner=False)
+def rollup_row_counts(_session, db: str, tables: Tuple[str, ...]) -> Dict[str, int]:
+    """Current row counts from table metadata, keyed "SCHEMA.TABLE"; no data is scanned."""
+    names = ", ".join(f"'{t.upper()}'" for t in tables)
+    rows = telemetry.fetch_records(
+        _session,
+        f"""
+        SELECT table_schema || '.' || table_name AS TABLE_KEY, row_count AS ROW_COUNT
+        FROM {db}.INFORMATION_SCHEMA.TABLES
+        WHERE table_schema || '.' || table_name IN ({names})
+        """,
+    )
+    return {row["TABLE_KEY"]: int(row["ROW_COUNT"] or 0) for row in rows}
+
+
+def choose_rollup(
+    session,
+    db: str,
+    rollups: Sequence[Rollup],
+    dimensions: Sequence[str],
+    measures: Sequence[str] = (),
+    filters: Sequence[Filter] = (),
+) -> Rollup:
+    """Smallest rollup that can answer the query; registry order breaks ties and unknown sizes."""
+    candidates = [r for r in rollups if r.answers(dimensions, measures, filters)]
+    if not candidates:
+        raise ValueError(
+            f"No rollup answers dimensions={list(dimensions)} measures={list(measures)} "
+            f"filters={[f.column for f in filters]}"
+        )
+    try:
+        sizes = rollup_row_counts(session, db, tuple(r.table for r in rollups))
+    except Exception:
+        # Metadata is only a ranking hint; fall back to registry order (coarsest first).
+        sizes = {}
+    order = {r.table: i for i, r in enumerate(rollups)}
+    return min(candidates, key=lambda r: (sizes.get(r.table.upper(), float("inf")), order[r.table]))
+
+
+def _literal(value: Any) -> str:
+    if isinstance(value, date):
+        return f"'{value.strftime('%Y-%m-%d')}'::DATE"
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def _condition(rollup: Rollup, f: Filter) -> str:
+    expression = rollup.dimensions.get(f.column, f.column)
+    if f.op == "in":
+        return f"{expression} IN ({', '.join(_literal(v) for v in f.values)})"
+    if f.op == "between":
+        start, end = f.values
+        return f"{expression} BETWEEN {_literal(start)} AND {_literal(end)}"
+    if f.op == "contains_any":
+        return "(" + " OR ".join(f"ARRAY_CONTAINS({_literal(v)}::VARIANT, {expression})" for v in f.values) + ")"
+    raise ValueError(f"Unsupported filter op {f.op!r}")
+
+
+def aggregate_sql(
+    session,
+    db: str,
+    rollups: Sequence[Rollup],
+    dimensions: Sequence[str],
+    measures: Sequence[str] = (),
+    filters: Sequence[Filter] = (),
+) -> str:
+    """SELECT of ``dimensions`` and ``measures`` from the smallest covering rollup.
+
+    Filters without values are dropped, so views can pass unset pickers as is.
+    Ordered by the dimensions; with no measures it lists the distinct dimension
+    values, which is how the views fill their filter pickers.
+    """
+    filters = [f for f in filters if f.values]
+    rollup = choose_rollup(session, db, rollups, dimensions, measures, filters)
+    select: List[str] = [f"{rollup.dimensions[d]} AS {d}" for d in dimensions]
+    select += [f"{rollup.measures[m]} AS {m}" for m in measures]
+    where = [_condition(rollup, f) for f in filters]
+    sql = f"SELECT {', '.join(select)}\nFROM {db}.{rollup.table}"
+    if where:
+        sql += "\nWHERE " + "\n  AND ".join(where)
+    if dimensions:
+        positions = ", ".join(str(i) for i in range(1, len(dimensions) + 1))
+        sql += f"\nGROUP BY {positions}\nORDER BY {positions}"
+    return sql
+
+
+def distinct_values(session, db: str, rollups: Sequence[Rollup], dimension: str) -> List[Any]:
+    """Non-null values of one dimension, read from the smallest rollup that has it."""
+    table = telemetry.fetch_arrow(session, aggregate_sql(session, db, rollups, [dimension]))
+    return [v for v in table.column(0).to_pylist() if v is not None]
@@ -0,0 +1,251 @@
+# Copyright 2026 Snowflake Inc.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Aggregate-aware rewrite of Cortex Analyst SQL before the dashboard runs it.
+
+The analyst writes SQL against the semantic view's base tables, which for ad
+questions are the raw-grain HARMONIZED facts. ``rewrite`` parses the statement and,
+when it reads one of those facts and only groups and filters on columns a rollup
+also has, and only aggregates them in ways that re-aggregate exactly (SUM of the
+additive columns, MIN/MAX and COUNT(DISTINCT) of dimensions, merged HLL sketches),
+points it at the rollup instead. Anything else (joins, window functions, AVG,
+COUNT(*), row-level selects) runs as generated. Every statement gets a LIMIT.
+
+``log_rewrite`` records the generated and executed statements with their compiled
+plans in ``APPS.ANALYST_SQL_REWRITES``. Without sqlglot, statements are only wrapped
+in the LIMIT.
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+import pandas as pd
+
+import aggregate_navigator as nav
+import query_telemetry as telemetry
+
+try:
+    import sqlglot
+    from sqlglot import exp
+    from sqlglot.optimizer.eliminate_ctes import eliminate_ctes
+    from sqlglot.optimizer.merge_subqueries import merge_subqueries
+    from sqlglot.optimizer.qualify import qualify
+except ImportError:
+    sqlglot = None
+
+
+REWRITE_TABLE = "APPS.ANALYST_SQL_REWRITES"
+DIALECT = "snowflake"
+
+# Raw-grain fact -> rollups built from it (setup.sql section 25), tried in order.
+ROLLUP_SOURCES: Dict[str, Tuple[str, ...]] = {
+    "HARMONIZED.AD_PERFORMANCE_DAILY_AGG": ("ANALYSE.ROLLUP_AD_CATEGORY_DAILY",),
+    "HARMONIZED.AD_PERFORMANCE": ("ANALYSE.ROLLUP_AD_CATEGORY_MONTHLY",),
+}
+# Fact columns the rollups carry re-aggregatably: summed, or HLL sketches merged.
+ADDITIVE_COLUMNS = frozenset({"IMPRESSIONS", "CLICKS", "SPEND"})
+SKETCH_COLUMNS = frozenset({"REACH_SKETCH"})
+HLL_FUNCTIONS = frozenset({"HLL_ESTIMATE", "HLL_COMBINE", "HLL_IMPORT"})
+
+
+@dataclass
+class Rewrite:
+    original: str
+    statement: str  # what runs: the rollup rewrite, if any, with the safety LIMIT
+    source_table: Optional[str] = None
+    rollup_table: Optional[str] = None
+    reason: str = ""
+
+
+def _rollup_dimensions(table: str) -> FrozenSet[str]:
+    """Physical dimension columns of a registered rollup; derived ones (report_month on a daily table) are skipped."""
+    for rollup in nav.AD_ROLLUPS:
+        if rollup.table == table:
+            return frozenset(name.upper() for name, expr in rollup.dimensions.items() if name == expr)
+    return frozenset()
+
+
+def _wrap_limit(statement: str, max_rows: int) -> str:
+    body = statement.strip().rstrip(";").rstrip()
+    return f"SELECT * FROM (\n{body}\n) LIMIT {max_rows}"
+
+
+def _with_limit(tree: "exp.Query", max_rows: int) -> "exp.Query":
+    limit = tree.args.get("limit")
+    if limit is None or isinstance(limit, exp.Limit):
+        count = limit.expression if limit is not None else None
+        if isinstance(count, exp.Literal) and count.is_int and int(count.name) <= max_rows:
+            return tree
+        return tree.limit(max_rows)
+    # FETCH FIRST and friends cannot take a LIMIT alongside; cap the result from outside.
+    return exp.select("*").from_(tree.subquery()).limit(max_rows)
+
+
+def _source_key(table: "exp.Table", db: str) -> Optional[str]:
+    if not table.db or (table.catalog and table.catalog.upper() != db.upper()):
+        return None
+    return f"{table.db.upper()}.{table.name.upper()}"
+
+
+def _base_tables(tree: "exp.Query") -> List["exp.Table"]:
+    ctes = {cte.alias_or_name.upper() for cte in tree.find_all(exp.CTE)}
+    return [t for t in tree.find_all(exp.Table) if t.db or t.name.upper() not in ctes]
+
+
+def _aggregate_problem(node: "exp.AggFunc", dimensions: FrozenSet[str]) -> Optional[str]:
+    arg = node.this
+    if isinstance(node, exp.Sum) and isinstance(arg, exp.Column) and arg.name.upper() in ADDITIVE_COLUMNS:
+        return None
+    if isinstance(node, (exp.Min, exp.Max)) and isinstance(arg, exp.Column) and arg.name.upper() in dimensions:
+        return None
+    if isinstance(node, exp.Count) and isinstance(arg, exp.Distinct) and all(
+        isinstance(e, exp.Column) and e.name.upper() in dimensions for e in arg.expressions
+    ):
+        return None
+    return f"{node.sql(dialect=DIALECT)} depends on the row grain"
+
+
+def _column_problem(column: "exp.Column", dimensions: FrozenSet[str]) -> Optional[str]:
+    name = column.name.upper()
+    if name in dimensions:
+        return None
+    if name in ADDITIVE_COLUMNS:
+        return None if isinstance(column.parent, exp.Sum) else f"{name} is used outside SUM"
+    if name in SKETCH_COLUMNS:
+        imported = column.parent
+        merged = imported.parent if imported is not None else None
+        if (isinstance(imported, exp.Anonymous) and imported.name.upper() == "HLL_IMPORT"
+                and isinstance(merged, exp.Anonymous) and merged.name.upper() == "HLL_COMBINE"):
+            return None
+        return f"{name} is used outside HLL_COMBINE(HLL_IMPORT(...))"
+    return f"{name} is not in the rollup"
+
+
+def _reaggregation_problem(select: "exp.Select", dimensions: FrozenSet[str]) -> Optional[str]:
+    """Why ``select`` would give a different answer on the rollup, or None when it would not."""
+    if select.find(exp.Window):
+        return "window functions depend on the row grain"
+    for function in select.find_all(exp.Anonymous):
+        if function.name.upper() not in HLL_FUNCTIONS:
+            return f"unrecognised function {function.name}"
+    aggregates = list(select.find_all(exp.AggFunc))
+    if not (aggregates or select.args.get("group") or select.args.get("distinct")):
+        return "row-level results depend on the row grain"
+    for node in aggregates:
+        problem = _aggregate_problem(node, dimensions)
+        if problem:
+            return problem
+    # qualify() has expanded aliases used in WHERE/GROUP BY/HAVING; ORDER BY keeps them.
+    aliases = frozenset(e.alias.upper() for e in select.expressions if e.alias)
+    for column in select.find_all(exp.Column):
+        if column.name.upper() in aliases and column.find_ancestor(exp.Order) is not None:
+            continue  # its expression is checked in the select list
+        problem = _column_problem(column, dimensions)
+        if problem:
+            return problem
+    return None
+
+
+def _choose_rollup(tree: "exp.Query", db: str) -> Tuple[Optional["exp.Table"], Optional[str], str]:
+    tables = _base_tables(tree)
+    sources = [t for t in tables if _source_key(t, db) in ROLLUP_SOURCES]
+    if not sources:
+        return None, None, "no rollup is built from the tables queried"
+    if len(tables) != 1:
+        return None, None, "joins and repeated table references are not rewritten"
+    source = sources[0]
+    try:
+        # Fold the analyst's per-table CTEs into the outer SELECT so one scope can be checked.
+        flat = eliminate_ctes(merge_subqueries(qualify(
+            tree.copy(), dialect=DIALECT, quote_identifiers=False, validate_qualify_columns=False
+        )))
+    except sqlglot.errors.SqlglotError as exc:
+        return None, None, f"could not analyse: {exc}"[:200]
+    if not isinstance(flat, exp.Select) or any(s is not flat for s in flat.find_all(exp.Select)):
+        return None, None, "nested queries are not rewritten"
+    problem = ""
+    for rollup in ROLLUP_SOURCES[_source_key(source, db)]:
+        problem = _reaggregation_problem(flat, _rollup_dimensions(rollup))
+        if problem is None:
+            return source, rollup, f"answered from {rollup}"
+    return None, None, problem
+
+
+def _retarget(source: "exp.Table", db: str, rollup: str) -> None:
+    schema, name = rollup.split(".")
+    # Keep the old name as the alias so qualified column references still resolve.
+    alias = source.alias or source.name
+    source.set("catalog", exp.to_identifier(db))
+    source.set("db", exp.to_identifier(schema))
+    source.set("this", exp.to_identifier(name))
+    source.set("alias", exp.TableAlias(this=exp.to_identifier(alias)))
+
+
+def rewrite(statement: str, db: str, max_rows: int) -> Rewrite:
+    """The statement to run for ``statement``: on a rollup where the answer is unchanged, always LIMITed."""
+    if sqlglot is None:
+        return Rewrite(statement, _wrap_limit(statement, max_rows), reason="sqlglot is not installed")
+    try:
+        tree = sqlglot.parse_one(statement, read=DIALECT)
+    except sqlglot.errors.SqlglotError as exc:
+        return Rewrite(statement, _wrap_limit(statement, max_rows), reason=f"could not parse: {exc}"[:200])
+    if not isinstance(tree, exp.Query):
+        return Rewrite(statement, _wrap_limit(statement, max_rows), reason="not a query")
+    source, rollup, reason = _choose_rollup(tree, db)
+    result = Rewrite(statement, "", reason=reason)
+    if rollup is not None:
+        result.source_table, result.rollup_table = _source_key(source, db), rollup
+        _retarget(source, db, rollup)
+    result.statement = _with_limit(tree, max_rows).sql(dialect=DIALECT, pretty=True)
+    return result
+
+
+def _plan(session, sql: str) -> Tuple[Optional[str], Optional[int]]:
+    """Compiled plan JSON and its bytes assigned; compiling runs nothing on the warehouse."""
+    literal = sql.replace("\\", "\\\\").replace("'", "''")
+    rows = telemetry.fetch_records(session, f"SELECT SYSTEM$EXPLAIN_PLAN_JSON('{literal}') AS PLAN")
+    plan = rows[0]["PLAN"] if rows else None
+    stats: Dict[str, Any] = json.loads(plan).get("GlobalStats", {}) if plan else {}
+    return plan, stats.get("bytesAssigned")
+
+
+def log_rewrite(session, db: str, result: Rewrite, request_id: Optional[str] = None) -> None:
+    """Append the generated and executed statements with both plans to ``REWRITE_TABLE``."""
+    try:
+        original_plan, original_bytes = _plan(session, result.original)
+        executed_plan, executed_bytes = _plan(session, result.statement)
+        frame = pd.DataFrame([{
+            "LOGGED_AT": datetime.now(timezone.utc).isoformat(),
+            "REQUEST_ID": request_id,
+            "SOURCE_TABLE": result.source_table,
+            "ROLLUP_TABLE": result.rollup_table,
+            "REASON": result.reason,
+            "ORIGINAL_STATEMENT": result.original,
+            "EXECUTED_STATEMENT": result.statement,
+            "ORIGINAL_PLAN": original_plan,
+            "EXECUTED_PLAN": executed_plan,
+            "ORIGINAL_BYTES_ASSIGNED": original_bytes,
+            "EXECUTED_BYTES_ASSIGNED": executed_bytes,
+        }])
+        schema, table = REWRITE_TABLE.split(".")
+        session.write_pandas(frame, table, database=db, schema=schema, quote_identifiers=False)
+    except Exception:
+        # Logging must never hold up the answer; an unlogged statement still runs.
+        pass
@@ -0,0 +1,215 @@
+# Copyright 2026 Snowflake Inc.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Shared demo-data freshness check for the Streamlit apps.
+
+Apps call ``ensure_fresh_data`` once per rerun. It compares the generator's per-table
+watermarks (``ANALYSE.DAILY_DATA_WATERMARKS``) with today, and when a gap exists
+it starts ``ANALYSE.GENERATE_DAILY_DATA()`` as an async query instead of blocking the
+first render. A small polling fragment shows a "data refreshing" indicator, clears
+the caches that depend on the refreshed tables once the procedure reports back, and
+reruns the page. A failed refresh is shown as a warning toast and recorded in the
+query telemetry; it is retried after ``FAILED_RETRY_SECONDS``.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Mapping, Optional, Tuple
+
+import streamlit as st
+
+import query_telemetry as telemetry
+
+
+# Tables GENERATE_DAILY_DATA appends to, keyed the way the procedure reports them.
+WATERMARK_TABLES: Tuple[str, ...] = (
+    "ANALYSE.FE_CONTENT_VIEWS_DAILY",
+    "HARMONIZED.AD_PERFORMANCE_DAILY_AGG",
+    "HARMONIZED.AD_REACH_PERSONA_DAILY",
+    "HARMONIZED.AD_PERFORMANCE",
+    "ANALYSE.ROLLUP_AD_CATEGORY_DAILY",
+    "ANALYSE.ROLLUP_AD_CATEGORY_MONTHLY",
+    "INGEST.CLICKSTREAM_EVENTS",
+)
+
+WATERMARK_TTL_SECONDS = 900
+FAILED_RETRY_SECONDS = 3600
+POLL_INTERVAL = "5s"
+REFRESH_MESSAGE_KEY = "_data_refresh_message"
+
+
+@dataclass
+class RefreshJob:
+    database: str
+    statement: str
+    job: Any = None
+    started_at: float = field(default_factory=time.time)
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.result is not None or self.error is not None
+
+    def can_restart(self) -> bool:
+        if not self.finished:
+            return False
+        window = FAILED_RETRY_SECONDS if self.error else WATERMARK_TTL_SECONDS
+        return time.time() - self.started_at > window
+
+
+@st.cache_resource
+def _refresh_jobs() -> Dict[str, RefreshJob]:
+    """Process-wide registry so concurrent sessions share a single refresh per database."""
+    return {}
+
+
+@st.cache_resource
+def _refresh_lock() -> threading.Lock:
+    return threading.Lock()
+
+
+@telemetry.cached(ttl=WATERMARK_TTL_SECONDS, show_spinner=False)
+def get_data_watermarks(_session, db: str) -> Dict[str, Any]:
+    rows = telemetry.fetch_records(
+        _session,
+        f"""
+        SELECT TARGET_TABLE, DATA_THROUGH
+        FROM {db}.ANALYSE.DAILY_DATA_WATERMARKS
+        UNION ALL
+        SELECT 'TODAY', CURRENT_DATE()
+        """,
+    )
+    return {row["TARGET_TABLE"]: row["DATA_THROUGH"] for row in rows}
+
+
+def has_data_gap(watermarks: Mapping[str, Any]) -> bool:
+    """True when a feed the generator has anchored is behind today.
+
+    Feeds with no watermark row, or a NULL DATA_THROUGH because there was no loaded
+    data to anchor on, are skipped: the procedure cannot fill them, so counting them
+    as a gap would start a refresh on every check.
+    """
+    today = watermarks.get("TODAY")
+    return any(
+        watermarks.get(table) is not None and watermarks[table] < today
+        for table in WATERMARK_TABLES
+    )
+
+
+def _parse_result(rows: Iterable[Any]) -> Dict[str, Any]:
+    rows = list(rows)
+    if not rows:
+        return {}
+    value = rows[0][0]
+    if isinstance(value, str):
+        try:
+            return json.loads(value)
+        except ValueError:
+            return {"message": value}
+    return dict(value or {})
+
+
+def _invalidate(result: Mapping[str, Any], invalidates: Mapping[str, Iterable[Callable]]) -> None:
+    get_data_watermarks.clear()
+    for table in result.get("tables_refreshed") or []:
+        for cached_fn in invalidates.get(table, ()):
+            cached_fn.clear()
+
+
+def _start_refresh(session, db: str) -> RefreshJob:
+    refresh = RefreshJob(database=db, statement=f"CALL {db}.ANALYSE.GENERATE_DAILY_DATA()")
+    try:
+        refresh.job = session.sql(refresh.statement).collect_nowait()
+    except Exception as exc:
+        refresh.error = str(exc)
+    return refresh
+
+
+def _report(refresh: RefreshJob) -> None:
+    """Records the finished refresh and warns the session that saw it fail."""
+    telemetry.record_async(
+        refresh.statement,
+        getattr(refresh.job, "query_id", None),
+        refresh.started_at,
+        error=refresh.error,
+        function="GENERATE_DAILY_DATA",
+    )
+    if refresh.error:
+        st.toast(f"Demo data refresh failed; figures may lag. {refresh.error}", icon=":material/warning:")
+
+
+def ensure_fresh_data(
+    session,
+    db: str,
+    invalidates: Optional[Mapping[str, Iterable[Callable]]] = None,
+) -> None:
+    """Start an async refresh when the demo data is behind and render its status.
+
+    ``invalidates`` maps "SCHEMA.TABLE" names to the ``st.cache_data`` functions that
+    read them; only those caches are cleared once the refresh reports inserted rows.
+    """
+    invalidates = invalidates or {}
+    message = st.session_state.pop(REFRESH_MESSAGE_KEY, None)
+    if message:
+        st.toast(message)
+
+    jobs = _refresh_jobs()
+    refresh = jobs.get(db)
+    if refresh is None or refresh.can_restart():
+        try:
+            watermarks = get_data_watermarks(session, db)
+        except Exception:
+            return
+        if not has_data_gap(watermarks):
+            return
+        with _refresh_lock():
+            refresh = jobs.get(db)
+            if refresh is None or refresh.can_restart():
+                refresh = jobs[db] = _start_refresh(session, db)
+                if refresh.error:
+                    _report(refresh)
+
+    if not refresh.finished:
+        _render_refresh_status(db, invalidates)
+
+
+@st.fragment(run_every=POLL_INTERVAL)
+def _render_refresh_status(db: str, invalidates: Mapping[str, Iterable[Callable]]) -> None:
+    refresh = _refresh_jobs().get(db)
+    if refresh is None or refresh.finished:
+        return
+
+    if not refresh.job.is_done():
+        st.caption(":material/sync: Demo data refreshing in the background - figures may lag by a day.")
+        return
+
+    try:
+        refresh.result = _parse_result(refresh.job.result())
+    except Exception as exc:
+        refresh.error = str(exc)
+    _report(refresh)
+    if refresh.error:
+        return
+
+    _invalidate(refresh.result, invalidates)
+    if refresh.result.get("tables_refreshed"):
+        st.session_state[REFRESH_MESSAGE_KEY] = refresh.result.get("message", "Demo data refreshed.")
+        st.rerun(scope="app")
@@ -0,0 +1,313 @@
+# Copyright 2026 Snowflake Inc.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Shared query instrumentation for the Streamlit apps.
+
+Apps route every statement through ``fetch_arrow`` (or ``iter_arrow_batches``,
+``fetch_records`` and ``run_query`` built on it) and decorate their cached readers
+with ``cached`` instead of ``st.cache_data``. Results are fetched as Arrow record
+batches straight from the connector cursor, so no per-row ``Row`` objects are
+built; Arrow tables go to ``st.dataframe`` and the charts unchanged, and pandas is
+only materialised, column-wise, where an app needs pandas operations.
+
+Each statement carries a ``QUERY_TAG`` of ``{"app", "view", "function"}`` (set per
+statement, so there is no extra ``ALTER SESSION`` round trip) and is recorded with
+its client-side latency, row count, Arrow result size and query ID; cached readers
+record whether the call was served from the Streamlit cache. Statements started with
+``collect_nowait`` are recorded through ``record_async`` once they finish or fail.
+
+``begin_rerun`` starts the record for a rerun, ``set_view`` names the page being
+rendered and ``render_query_profile`` draws the sidebar panel at the end of the
+rerun. Records are buffered per process and appended to
+``APPS.APP_QUERY_TELEMETRY`` in batches; join on ``QUERY_ID`` to
+``ACCOUNT_USAGE.QUERY_HISTORY`` for warehouse-side cost and pruning.
+"""
+
+from __future__ import annotations
+
+import functools
+import json
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from uuid import uuid4
+
+import pandas as pd
+import pyarrow as pa
+import streamlit as st
+
+
+TELEMETRY_TABLE = "APPS.APP_QUERY_TELEMETRY"
+FLUSH_EVERY_RECORDS = 50
+FLUSH_EVERY_SECONDS = 60
+STATEMENT_PREVIEW_CHARS = 2000
+RERUN_STATE_KEY = "_query_telemetry_rerun"
+SESSION_ID_KEY = "_query_telemetry_session_id"
+
+# Thin per-app wrappers that should not be reported as the calling function.
+_WRAPPER_FUNCTIONS = {"run_query", "run_arrow", "compute", "wrapper", "distinct_values"}
+
+
+@dataclass
+class QueryRecord:
+    app: str
+    view_name: str
+    function_name: str
+    kind: str  # "query" or "cache"
+    statement: Optional[str] = None
+    query_id: Optional[str] = None
+    started_at: str = field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+    elapsed_ms: float = 0.0
+    row_count: Optional[int] = None
+    result_bytes: Optional[int] = None
+    cache_hit: Optional[bool] = None
+    error: Optional[str] = None
+
+
+@dataclass
+class RerunTelemetry:
+    app: str
+    session_id: str
+    rerun_id: str = field(default_factory=lambda: uuid4().hex)
+    view: str = "main"
+    records: List[QueryRecord] = field(default_factory=list)
+
+
+@dataclass
+class _ExportBuffer:
+    records: List[Dict[str, Any]] = field(default_factory=list)
+    last_flush: float = field(default_factory=time.time)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+@st.cache_resource
+def _export_buffer() -> _ExportBuffer:
+    """Process-wide buffer so exports are batched across sessions."""
+    return _ExportBuffer()
+
+
+_compute_calls = threading.local()
+
+
+def begin_rerun(app: str) -> RerunTelemetry:
+    """Start recording a rerun; call first thing in the app's ``main``."""
+    session_id = st.session_state.setdefault(SESSION_ID_KEY, uuid4().hex)
+    rerun = RerunTelemetry(app=app, session_id=session_id)
+    st.session_state[RERUN_STATE_KEY] = rerun
+    return rerun
+
+
+def set_view(view: str) -> None:
+    _current().view = view
+
+
+def _current() -> RerunTelemetry:
+    rerun = st.session_state.get(RERUN_STATE_KEY)
+    if rerun is None:
+        rerun = begin_rerun("unknown")
+    return rerun
+
+
+def _caller() -> str:
+    frame = sys._getframe(1)
+    while frame is not None:
+        name = frame.f_code.co_name
+        if frame.f_globals.get("__name__") != __name__ and name not in _WRAPPER_FUNCTIONS:
+            return name
+        frame = frame.f_back
+    return "<module>"
+
+
+def _query_tag(rerun: RerunTelemetry, function: str) -> str:
+    return json.dumps({"app": rerun.app, "view": rerun.view, "function": function}, separators=(",", ":"))
+
+
+def _record(record: QueryRecord) -> None:
+    rerun = _current()
+    rerun.records.append(record)
+    row = asdict(record)
+    row.update(rerun_id=rerun.rerun_id, session_id=rerun.session_id)
+    buffer = _export_buffer()
+    with buffer.lock:
+        buffer.records.append(row)
+
+
+def _start(sql: str, function: Optional[str]) -> QueryRecord:
+    rerun = _current()
+    return QueryRecord(
+        app=rerun.app,
+        view_name=rerun.view,
+        function_name=function or _caller(),
+        kind="query",
+        statement=sql.strip()[:STATEMENT_PREVIEW_CHARS],
+    )
+
+
+def _empty_table(cursor) -> pa.Table:
+    return pa.table({column.name: pa.array([], pa.null()) for column in cursor.description or []})
+
+
+def iter_arrow_batches(session, sql: str, function: Optional[str] = None,
+                       max_rows: Optional[int] = None) -> Iterator[pa.Table]:
+    """Stream the result as Arrow tables, one per result chunk, without building Rows.
+
+    Stops fetching once ``max_rows`` have been yielded, so a capped preview of a
+    large result only downloads the chunks it shows. The connector returns no chunks
+    for an empty result; one empty table with the statement's columns is yielded
+    instead, built from the executing cursor's description.
+    """
+    record = _start(sql, function)
+    started = time.perf_counter()
+    rows = size = 0
+    cursor = session.connection.cursor()
+    try:
+        # Tagging per statement avoids an ALTER SESSION round trip whenever the view changes.
+        cursor.execute(sql, _statement_params={"QUERY_TAG": _query_tag(_current(), record.function_name)})
+        record.query_id = cursor.sfqid
+        empty = True
+        for batch in cursor.fetch_arrow_batches():
+            empty = False
+            if max_rows is not None and rows + batch.num_rows > max_rows:
+                batch = batch.slice(0, max_rows - rows)
+            rows += batch.num_rows
+            size += batch.nbytes
+            yield batch
+            if max_rows is not None and rows >= max_rows:
+                break
+        if empty:
+            yield _empty_table(cursor)
+    except Exception as exc:
+        record.error = str(exc)[:500]
+        raise
+    finally:
+        cursor.close()
+        record.row_count = rows
+        record.result_bytes = size
+        record.elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+        _record(record)
+
+
+def fetch_arrow(session, sql: str, function: Optional[str] = None,
+                max_rows: Optional[int] = None) -> pa.Table:
+    """Whole result as one Arrow table; ``st.dataframe`` and the charts take it as is."""
+    return pa.concat_tables(list(iter_arrow_batches(session, sql, function or _caller(), max_rows)))
+
+
+def fetch_records(session, sql: str, function: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Small results as plain dicts (metadata lookups, single-row stats)."""
+    return fetch_arrow(session, sql, function or _caller()).to_pylist()
+
+
+def record_async(sql: str, query_id: Optional[str], started_at: float, error: Optional[str] = None,
+                 function: Optional[str] = None) -> None:
+    """Records an async statement once it has finished; ``started_at`` is its ``time.time()``."""
+    record = _start(sql, function)
+    record.query_id = query_id
+    record.started_at = datetime.fromtimestamp(started_at, timezone.utc).isoformat()
+    record.elapsed_ms = round((time.time() - started_at) * 1000, 1)
+    record.error = error[:500] if error else None
+    _record(record)
+
+
+def run_query(session, sql: str, function: Optional[str] = None) -> pd.DataFrame:
+    """Result as pandas, converted column-wise from Arrow."""
+    return fetch_arrow(session, sql, function or _caller()).to_pandas(split_blocks=True, self_destruct=True)
+
+
+def cached(func: Optional[Callable] = None, **cache_kwargs) -> Callable:
+    """Drop-in for ``st.cache_data`` that records a hit or miss for every call."""
+    def decorate(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def compute(*args, **kwargs):
+            _compute_calls.count = getattr(_compute_calls, "count", 0) + 1
+            return fn(*args, **kwargs)
+
+        cached_fn = st.cache_data(**cache_kwargs)(compute)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            rerun = _current()
+            before = getattr(_compute_calls, "count", 0)
+            started = time.perf_counter()
+            result = cached_fn(*args, **kwargs)
+            _record(QueryRecord(
+                app=rerun.app,
+                view_name=rerun.view,
+                function_name=fn.__name__,
+                kind="cache",
+                elapsed_ms=round((time.perf_counter() - started) * 1000, 1),
+                cache_hit=getattr(_compute_calls, "count", 0) == before,
+            ))
+            return result
+
+        wrapper.clear = cached_fn.clear
+        return wrapper
+
+    return decorate(func) if func is not None else decorate
+
+
+def _flush(session, db: str, force: bool = False) -> None:
+    buffer = _export_buffer()
+    with buffer.lock:
+        due = len(buffer.records) >= FLUSH_EVERY_RECORDS or time.time() - buffer.last_flush >= FLUSH_EVERY_SECONDS
+        if not buffer.records or not (due or force):
+            return
+        records, buffer.records = buffer.records, []
+        buffer.last_flush = time.time()
+    try:
+        frame = pd.DataFrame(records)
+        frame.columns = [c.upper() for c in frame.columns]
+        schema, table = TELEMETRY_TABLE.split(".")
+        session.write_pandas(frame, table, database=db, schema=schema, quote_identifiers=False)
+    except Exception:
+        # Telemetry must never break the app; a failed batch is dropped.
+        pass
+
+
+def render_query_profile(session, db: str) -> None:
+    """Sidebar panel listing this rerun's statements; also exports buffered records."""
+    rerun = _current()
+    queries = [r for r in rerun.records if r.kind == "query"]
+    cache_calls = [r for r in rerun.records if r.kind == "cache"]
+    with st.sidebar.expander("Query profile", expanded=False):
+        cols = st.columns(3)
+        cols[0].metric("Statements", len(queries))
+        cols[1].metric("Query time", f"{sum(r.elapsed_ms for r in queries) / 1000:.2f}s")
+        cols[2].metric("Cache hits", f"{sum(1 for r in cache_calls if r.cache_hit)}/{len(cache_calls)}")
+        if rerun.records:
+            st.dataframe(
+                pd.DataFrame([
+                    {
+                        "view": r.view_name,
+                        "function": r.function_name,
+                        "source": "cache hit" if r.cache_hit else ("cache miss" if r.kind == "cache" else "warehouse"),
+                        "ms": r.elapsed_ms,
+                        "rows": r.row_count,
+                        "bytes": r.result_bytes,
+                        "query_id": r.query_id,
+                        "error": r.error,
+                    }
+                    for r in rerun.records
+                ]),
+                hide_index=True,
+                use_container_width=True,
+            )
+        else:
+            st.caption("No statements ran in this rerun.")
+    _flush(session, db)
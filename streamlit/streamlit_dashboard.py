@@ -15,17 +15,25 @@
 
 
 import json
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 import pandas as pd
+import pyarrow as pa
 import streamlit as st
 from snowflake.snowpark.context import get_active_session
 
+import aggregate_navigator as nav
+import analyst_rewrite
+import query_telemetry as telemetry
+from data_freshness import ensure_fresh_data
+
 
 st.set_page_config(page_title="Analytics Assistant", layout="wide")
 
 SCHEMA = "ANALYSE"
 SEMANTIC_VIEW = "AME_AD_SALES_SEMANTIC_VIEW"
+# Analyst-generated SQL runs with a LIMIT of this many rows (see analyst_rewrite.py).
+ANALYST_MAX_ROWS = 10000
 
 
 @st.cache_resource
@@ -33,22 +41,16 @@ def get_session():
     return get_active_session()
 
 
-@st.cache_data(ttl=86400, show_spinner=False)
-def refresh_demo_data(_session, db):
-    try:
-        _session.sql(f"CALL {db}.ANALYSE.GENERATE_DAILY_DATA()").collect()
-    except Exception:
-        pass
-
-
 DATABASE = get_session().get_current_database().strip('"')
-refresh_demo_data(get_session(), DATABASE)
 
 
 def run_query(sql: str) -> pd.DataFrame:
-    session = get_session()
-    df = session.sql(sql).to_pandas()
-    return df
+    return telemetry.run_query(get_session(), sql)
+
+
+def run_arrow(sql: str) -> pa.Table:
+    """For results that are only displayed or charted; skips the pandas conversion."""
+    return telemetry.fetch_arrow(get_session(), sql)
 
 
 def _escape(value: str) -> str:
@@ -70,38 +72,32 @@ def render_subscriber_view():
     search_term = col1.text_input("Search (name, email, persona)")
     selected_tier = col2.multiselect(
         "Subscription Tier",
-        options=run_query(f"SELECT DISTINCT tier FROM {DATABASE}.HARMONIZED.SUBSCRIBER_PROFILE_ENRICHED ORDER BY 1")["TIER"].tolist(),
+        options=run_query(f"SELECT DISTINCT tier FROM {DATABASE}.ANALYSE.SUBSCRIBER_ATTRIBUTES ORDER BY 1")["TIER"].tolist(),
     )
     persona_options = run_query(
-        f"SELECT DISTINCT persona FROM {DATABASE}.HARMONIZED.AGGREGATED_BEHAVIORAL_LOGS ORDER BY 1"
+        f"SELECT DISTINCT persona FROM {DATABASE}.ANALYSE.SUBSCRIBER_ATTRIBUTES ORDER BY 1"
     )["PERSONA"].dropna().tolist()
     persona_filter = col3.multiselect("Persona", options=persona_options)
 
     base_sql = f"""
         SELECT
-            spe.profile_id,
-            spe.unique_id,
-            spe.full_name,
-            spe.email,
-            spe.tier,
-            abl.persona,
-            abl.avg_site_visits_per_month,
-            abl.login_frequency_per_week,
-            abl.total_events,
-            spe.lad_code,
-            spe.area_name,
-            spe.income_level,
-            spe.education_level,
-            churn.predicted_churn_prob,
-            churn.churn_risk_segment,
-            ltv.predicted_ltv
-        FROM {DATABASE}.HARMONIZED.SUBSCRIBER_PROFILE_ENRICHED spe
-        LEFT JOIN {DATABASE}.HARMONIZED.AGGREGATED_BEHAVIORAL_LOGS abl
-            ON abl.unique_id = spe.unique_id
-        LEFT JOIN {DATABASE}.ANALYSE.FE_SUBSCRIBER_CHURN_RISK churn
-            ON churn.profile_id = spe.profile_id
-        LEFT JOIN {DATABASE}.ANALYSE.FE_SUBSCRIBER_LTV_SCORES ltv
-            ON ltv.profile_id = spe.profile_id
+            profile_id,
+            unique_id,
+            full_name,
+            email,
+            tier,
+            persona,
+            avg_site_visits_per_month,
+            login_frequency_per_week,
+            total_events,
+            lad_code,
+            area_name,
+            income_level,
+            education_level,
+            predicted_churn_prob,
+            churn_risk_segment,
+            predicted_ltv
+        FROM {DATABASE}.ANALYSE.SUBSCRIBER_ATTRIBUTES
         WHERE 1 = 1
     """
 
@@ -117,58 +113,44 @@ def render_subscriber_view():
     if persona_filter:
         filters.append(f" AND persona IN {_format_in_clause(persona_filter)}")
 
-    df = run_query(base_sql + "".join(filters) + " LIMIT 500")
-    df = df.rename(columns={
-        "PREDICTED_CHURN_PROB": "churn_prob",
-        "PREDICTED_LTV": "predicted_ltv"
-    })
+    table = run_arrow(base_sql + "".join(filters) + " LIMIT 500")
+    renames = {"PREDICTED_CHURN_PROB": "churn_prob", "PREDICTED_LTV": "predicted_ltv"}
+    table = table.rename_columns([renames.get(name, name) for name in table.column_names])
 
-    st.dataframe(df, use_container_width=True)
+    st.dataframe(table, use_container_width=True)
 
     selected_profile = st.selectbox(
         "Drill-down to profile_id",
-        options=df["PROFILE_ID"].tolist() if not df.empty else [],
-        index=0 if not df.empty else None,
+        options=table.column("PROFILE_ID").to_pylist() if table.num_rows else [],
+        index=0 if table.num_rows else None,
     )
 
     if selected_profile:
         escaped_profile = _escape(selected_profile)
+        # Features, scores and targets come from the same wide row.
         detail_sql = f"""
             SELECT *
-            FROM {DATABASE}.ANALYSE.FE_SUBSCRIBER_FEATURES
-            WHERE PROFILE_ID = '{escaped_profile}'
-        """
-        detail_df = run_query(detail_sql)
-
-        ltv_sql = f"""
-            SELECT PREDICTED_LTV, LTV_TARGET
-            FROM {DATABASE}.ANALYSE.FE_SUBSCRIBER_LTV_SCORES
+            FROM {DATABASE}.ANALYSE.SUBSCRIBER_ATTRIBUTES
             WHERE PROFILE_ID = '{escaped_profile}'
         """
-        ltv_df = run_query(ltv_sql)
-
-        churn_sql = f"""
-            SELECT PREDICTED_CHURN_PROB, CHURN_RISK_SEGMENT
-            FROM {DATABASE}.ANALYSE.FE_SUBSCRIBER_CHURN_RISK
-            WHERE PROFILE_ID = '{escaped_profile}'
-        """
-        churn_df = run_query(churn_sql)
+        detail_rows = telemetry.fetch_records(get_session(), detail_sql)
 
         st.subheader("Subscriber Feature Detail")
-        st.json(detail_df.to_dict(orient="records"))
+        st.json(detail_rows)
 
         metric_cols = st.columns(2)
-        if not ltv_df.empty:
+        detail = detail_rows[0] if detail_rows else {}
+        if detail.get("PREDICTED_LTV") is not None:
             metric_cols[0].metric(
                 "Predicted LTV",
-                f"{ltv_df.iloc[0]['PREDICTED_LTV']:.2f}",
-                delta=f"Target {ltv_df.iloc[0]['LTV_TARGET']:.2f}"
+                f"{detail['PREDICTED_LTV']:.2f}",
+                delta=f"Target {detail['LTV_TARGET'] or 0:.2f}"
             )
-        if not churn_df.empty:
+        if detail.get("PREDICTED_CHURN_PROB") is not None:
             metric_cols[1].metric(
                 "Churn Probability",
-                f"{churn_df.iloc[0]['PREDICTED_CHURN_PROB']:.2%}",
-                delta=churn_df.iloc[0]['CHURN_RISK_SEGMENT']
+                f"{detail['PREDICTED_CHURN_PROB']:.2%}",
+                delta=detail["CHURN_RISK_SEGMENT"]
             )
 
 
@@ -176,17 +158,14 @@ def render_ads_performance_view():
     st.header("Ad Sales Performance")
     col1, col2, col3 = st.columns(3)
 
+    session = get_session()
     campaign_filter = col1.multiselect(
         "Campaign",
-        run_query(
-            f"SELECT DISTINCT campaign_id FROM {DATABASE}.HARMONIZED.AD_PERFORMANCE ORDER BY 1"
-        )["CAMPAIGN_ID"].tolist(),
+        nav.distinct_values(session, DATABASE, nav.AD_ROLLUPS, "campaign_id"),
     )
     category_filter = col2.multiselect(
         "Content Category",
-        run_query(
-            f"SELECT DISTINCT content_category FROM {DATABASE}.HARMONIZED.AD_PERFORMANCE ORDER BY 1"
-        )["CONTENT_CATEGORY"].tolist(),
+        nav.distinct_values(session, DATABASE, nav.AD_ROLLUPS, "content_category"),
     )
     date_range = col3.date_input(
         "Reporting Window",
@@ -194,80 +173,55 @@ def render_ads_performance_view():
         help="Filter report_month between the selected dates",
     )
 
-    sql = f"""
-        SELECT
-            report_month,
-            campaign_id,
-            advertiser_name,
-            content_category,
-            impressions,
-            clicks,
-            ctr,
-            spend,
-            ecpm
-        FROM {DATABASE}.HARMONIZED.AD_PERFORMANCE
-        WHERE 1 = 1
-    """
-    if campaign_filter:
-        sql += f" AND campaign_id IN {_format_in_clause(campaign_filter)}"
-    if category_filter:
-        sql += f" AND content_category IN {_format_in_clause(category_filter)}"
+    filters = [
+        nav.in_filter("campaign_id", campaign_filter),
+        nav.in_filter("content_category", category_filter),
+    ]
     if isinstance(date_range, tuple) and len(date_range) == 2:
         start_date, end_date = date_range
         if start_date and end_date:
-            sql += f" AND report_month BETWEEN '{start_date.strftime('%Y-%m-%d')}' AND '{end_date.strftime('%Y-%m-%d')}'"
+            filters.append(nav.between_filter("report_month", start_date, end_date))
 
-    sql += " ORDER BY report_month"
-    df = run_query(sql)
+    table = run_arrow(nav.aggregate_sql(
+        session, DATABASE, nav.AD_ROLLUPS,
+        ["report_month", "campaign_id", "advertiser_name", "content_category"],
+        ["impressions", "clicks", "ctr", "spend", "ecpm", "reach", "frequency"],
+        filters,
+    ))
 
-    if df.empty:
+    if not table.num_rows:
         st.info("No matching records for the selected filters.")
         return
 
-    st.line_chart(df.set_index("REPORT_MONTH")["ECPM"], height=300)
-    st.line_chart(df.set_index("REPORT_MONTH")["CTR"], height=300)
-    st.dataframe(df, use_container_width=True)
+    st.line_chart(table, x="REPORT_MONTH", y="ECPM", height=300)
+    st.line_chart(table, x="REPORT_MONTH", y="CTR", height=300)
+    # Without a campaign filter this is answered by the category rollup, not the campaign rows.
+    category_spend = run_arrow(nav.aggregate_sql(
+        session, DATABASE, nav.AD_ROLLUPS, ["report_month", "content_category"], ["spend"], filters,
+    ))
+    st.bar_chart(category_spend, x="REPORT_MONTH", y="SPEND", color="CONTENT_CATEGORY", height=300)
+    st.dataframe(table, use_container_width=True)
 
 
 def render_events_view():
     st.header("Journey & Ad Event Explorer")
     tab1, tab2 = st.tabs(["Clickstream Events", "Ad Events"])
+    session = get_session()
 
     with tab1:
-        persona_options = run_query(
-            f"SELECT DISTINCT persona FROM {DATABASE}.ANALYSE.FE_SUBSCRIBER_HISTORY ORDER BY 1"
-        )["PERSONA"].dropna().tolist()
-        persona_filter = st.multiselect("Persona", persona_options)
-        tier_options = run_query(
-            f"SELECT DISTINCT tier FROM {DATABASE}.ANALYSE.FE_SUBSCRIBER_HISTORY ORDER BY 1"
-        )["TIER"].dropna().tolist()
-        tier_filter = st.multiselect("Tier", tier_options)
-
-        sql = f"""
-            SELECT
-                h.persona,
-                h.tier,
-                COALESCE(cf.primary_content_type, 'unknown') AS primary_content_type,
-                SUM(h.clickstream_events) AS clickstream_events,
-                SUM(h.clickstream_active_days) AS active_days,
-                SUM(h.behavioural_events) AS behavioural_events,
-                AVG(
-                    CASE
-                        WHEN h.clickstream_active_days > 0 THEN h.clickstream_events / h.clickstream_active_days
-                        ELSE NULL
-                    END
-                ) AS avg_events_per_active_day
-            FROM {DATABASE}.ANALYSE.FE_SUBSCRIBER_HISTORY h
-            LEFT JOIN {DATABASE}.ANALYSE.FE_SUBSCRIBER_CONTENT_FEATURES cf
-                ON cf.unique_id = h.unique_id
-            WHERE 1 = 1
-        """
-        if persona_filter:
-            sql += f" AND persona IN {_format_in_clause(persona_filter)}"
-        if tier_filter:
-            sql += f" AND tier IN {_format_in_clause(tier_filter)}"
-        sql += " GROUP BY 1,2,3 ORDER BY 1,2,3"
-        df = run_query(sql)
+        persona_filter = st.multiselect(
+            "Persona", nav.distinct_values(session, DATABASE, nav.JOURNEY_ROLLUPS, "persona")
+        )
+        tier_filter = st.multiselect(
+            "Tier", nav.distinct_values(session, DATABASE, nav.JOURNEY_ROLLUPS, "tier")
+        )
+
+        df = run_query(nav.aggregate_sql(
+            session, DATABASE, nav.JOURNEY_ROLLUPS,
+            ["persona", "tier", "primary_content_type"],
+            ["clickstream_events", "active_days", "behavioural_events", "avg_events_per_active_day"],
+            [nav.in_filter("persona", persona_filter), nav.in_filter("tier", tier_filter)],
+        ))
         if df.empty:
             st.info("No journey metrics for the selected filters.")
         else:
@@ -285,11 +239,15 @@ def render_events_view():
             st.dataframe(df, use_container_width=True)
 
     with tab2:
-        campaign_filter = st.multiselect(
+        col1, col2 = st.columns([3, 1])
+        campaign_filter = col1.multiselect(
             "Campaign",
-            run_query(
-                f"SELECT DISTINCT campaign_id FROM {DATABASE}.HARMONIZED.AD_PERFORMANCE_DAILY_AGG ORDER BY 1"
-            )["CAMPAIGN_ID"].tolist(),
+            nav.distinct_values(session, DATABASE, nav.AD_ROLLUPS, "campaign_id"),
+        )
+        delivery_window = col2.date_input(
+            "Delivery Window",
+            value=None,
+            help="Filter report_date between the selected dates; reach is deduplicated over the window",
         )
         persona_filter = st.multiselect(
             "Target Persona",
@@ -299,39 +257,47 @@ def render_events_view():
                 " WHERE value IS NOT NULL ORDER BY 1"
             )["PERSONA"].tolist(),
         )
-        sql = f"""
-            SELECT
-                report_date,
-                campaign_id,
-                content_category,
-                impressions,
-                clicks,
-                ctr,
-                spend,
-                effective_cpm
-            FROM {DATABASE}.HARMONIZED.AD_PERFORMANCE_DAILY_AGG
-            WHERE 1 = 1
-        """
-        if campaign_filter:
-            sql += f" AND campaign_id IN {_format_in_clause(campaign_filter)}"
-        if persona_filter:
-            persona_conditions = " OR ".join(
-                [f"ARRAY_CONTAINS('{p}'::VARIANT, target_personas)" for p in persona_filter]
-            )
-            sql += f" AND ({persona_conditions})"
-        sql += " ORDER BY report_date"
-        df = run_query(sql)
-        if df.empty:
+        filters = [
+            nav.in_filter("campaign_id", campaign_filter),
+            nav.contains_any_filter("target_personas", persona_filter),
+        ]
+        window = []
+        if isinstance(delivery_window, tuple) and len(delivery_window) == 2 and all(delivery_window):
+            window = [nav.between_filter("report_date", *delivery_window)]
+        table = run_arrow(nav.aggregate_sql(
+            session, DATABASE, nav.AD_ROLLUPS,
+            ["report_date", "campaign_id", "content_category"],
+            ["impressions", "clicks", "ctr", "spend", "effective_cpm", "reach"],
+            filters + window,
+        ))
+        if not table.num_rows:
             st.info("No ad delivery metrics for the selected filters.")
         else:
-            metric_df = df.set_index("REPORT_DATE")
+            # Reach over the whole selection merges the daily sketches; summing daily reach
+            # would count a subscriber once for every day they were reached.
+            totals = run_arrow(nav.aggregate_sql(
+                session, DATABASE, nav.AD_ROLLUPS, [], ["impressions", "reach", "frequency"], filters + window,
+            )).to_pylist()[0]
+            metric_cols = st.columns(3)
+            metric_cols[0].metric("Impressions", f"{int(totals['IMPRESSIONS'] or 0):,}")
+            metric_cols[1].metric("Unique Reach", f"{int(totals['REACH'] or 0):,}")
+            metric_cols[2].metric("Avg Frequency", f"{float(totals['FREQUENCY'] or 0):.2f}")
+            if persona_filter:
+                st.subheader("Reach by Persona (all campaigns)")
+                st.dataframe(
+                    run_arrow(nav.aggregate_sql(
+                        session, DATABASE, nav.AUDIENCE_ROLLUPS, ["persona"], ["reach"],
+                        [nav.in_filter("persona", persona_filter)] + window,
+                    )),
+                    use_container_width=True,
+                )
             st.subheader("Impressions & Spend by Day")
-            st.line_chart(metric_df["IMPRESSIONS"], height=250)
-            st.line_chart(metric_df["SPEND"], height=250)
+            st.line_chart(table, x="REPORT_DATE", y="IMPRESSIONS", height=250)
+            st.line_chart(table, x="REPORT_DATE", y="SPEND", height=250)
             st.subheader("Effective CPM & CTR")
-            st.line_chart(metric_df["EFFECTIVE_CPM"], height=250)
-            st.line_chart(metric_df["CTR"], height=250)
-            st.dataframe(df, use_container_width=True)
+            st.line_chart(table, x="REPORT_DATE", y="EFFECTIVE_CPM", height=250)
+            st.line_chart(table, x="REPORT_DATE", y="CTR", height=250)
+            st.dataframe(table, use_container_width=True)
 
 
 def send_analyst_message(messages: List[Dict[str, Any]]) -> Dict[str, Any]:
@@ -358,7 +324,21 @@ def send_analyst_message(messages: List[Dict[str, Any]]) -> Dict[str, Any]:
         raise Exception(f"Failed request with status {resp['status']}: {resp['content']}")
 
 
-def display_analyst_content(content: List[Dict[str, str]], message_index: int = 0) -> None:
+def analyst_statement(statement: str, request_id: Optional[str] = None) -> analyst_rewrite.Rewrite:
+    """Rollup rewrite of an analyst statement, worked out and logged once per statement.
+
+    Kept out of the message content, which is sent back to the analyst as is.
+    """
+    rewrites = st.session_state.setdefault("analyst_rewrites", {})
+    if statement not in rewrites:
+        result = analyst_rewrite.rewrite(statement, DATABASE, ANALYST_MAX_ROWS)
+        analyst_rewrite.log_rewrite(get_session(), DATABASE, result, request_id)
+        rewrites[statement] = result
+    return rewrites[statement]
+
+
+def display_analyst_content(content: List[Dict[str, str]], message_index: int = 0,
+                            request_id: Optional[str] = None) -> None:
     for item in content:
         if item["type"] == "text":
             st.markdown(item["text"])
@@ -368,22 +348,31 @@ def display_analyst_content(content: List[Dict[str, str]], message_index: int =
                     if st.button(suggestion, key=f"sug_{message_index}_{suggestion_index}"):
                         st.session_state.active_suggestion = suggestion
         elif item["type"] == "sql":
+            rewrite = analyst_statement(item["statement"], request_id)
             with st.expander("SQL Query", expanded=False):
-                st.code(item["statement"], language="sql")
+                st.code(rewrite.statement, language="sql")
+                if rewrite.rollup_table:
+                    st.caption(f"Answered from {rewrite.rollup_table} instead of {rewrite.source_table}. Generated SQL:")
+                    st.code(item["statement"], language="sql")
             with st.expander("Results", expanded=True):
                 try:
-                    df = run_query(item["statement"])
-                    if len(df.index) > 1:
+                    table = telemetry.fetch_arrow(get_session(), rewrite.statement, max_rows=ANALYST_MAX_ROWS)
+                    if table.num_rows >= ANALYST_MAX_ROWS:
+                        st.caption(f"Showing the first {ANALYST_MAX_ROWS:,} rows.")
+                    if table.num_rows > 1:
                         data_tab, chart_tab = st.tabs(["Data", "Chart"])
-                        data_tab.dataframe(df, use_container_width=True)
-                        index_col = df.columns[0]
-                        numeric_cols = [c for c in df.select_dtypes(include="number").columns if c != index_col]
-                        if len(df.columns) > 1 and numeric_cols:
-                            chart_tab.bar_chart(df, x=index_col, y=numeric_cols)
+                        data_tab.dataframe(table, use_container_width=True)
+                        index_col = table.column_names[0]
+                        numeric_cols = [
+                            f.name for f in table.schema
+                            if f.name != index_col and (pa.types.is_integer(f.type) or pa.types.is_floating(f.type) or pa.types.is_decimal(f.type))
+                        ]
+                        if table.num_columns > 1 and numeric_cols:
+                            chart_tab.bar_chart(table, x=index_col, y=numeric_cols)
                         else:
                             chart_tab.info("No numeric columns available for charting")
                     else:
-                        st.dataframe(df, use_container_width=True)
+                        st.dataframe(table, use_container_width=True)
                 except Exception as e:
                     st.error(f"Error running query: {e}")
 
@@ -400,6 +389,7 @@ def render_ask_ai_view():
     
     if st.button("Clear conversation"):
         st.session_state.analyst_messages = []
+        st.session_state.analyst_rewrites = {}
         st.session_state.active_suggestion = None
         st.rerun()
     
@@ -428,7 +418,7 @@ def render_ask_ai_view():
                     if role == "user":
                         st.markdown(message["content"][0]["text"])
                     else:
-                        display_analyst_content(message["content"], message_index)
+                        display_analyst_content(message["content"], message_index, message.get("request_id"))
     
     prompt = st.chat_input("Ask a question about your subscriber data...")
     
@@ -461,20 +451,27 @@ def render_ask_ai_view():
                             "content": content,
                             "request_id": response.get("request_id")
                         })
-                        display_analyst_content(content, len(st.session_state.analyst_messages))
+                        display_analyst_content(content, len(st.session_state.analyst_messages), response.get("request_id"))
                     except Exception as e:
                         st.error(f"Error: {e}")
                         st.session_state.analyst_messages.pop()
 
 
 def main():
+    telemetry.begin_rerun("dashboard")
     st.title("Analytics Assistant")
+    # Views query on every rerun; only the rollup sizes the navigator ranks by are cached.
+    ensure_fresh_data(get_session(), DATABASE, invalidates={
+        rollup.table: [nav.rollup_row_counts]
+        for rollup in nav.AD_ROLLUPS + nav.AUDIENCE_ROLLUPS + nav.JOURNEY_ROLLUPS
+    })
     st.sidebar.write("Session obtained via get_active_session().")
 
     view = st.sidebar.radio(
         "Dashboard",
         options=["Subscribers", "Ad Performance", "Journeys & Ads", "Analytics Assistant"],
     )
+    telemetry.set_view(view)
 
     if view == "Analytics Assistant":
         render_ask_ai_view()
@@ -485,6 +482,8 @@ def main():
     else:
         render_events_view()
 
+    telemetry.render_query_profile(get_session(), DATABASE)
+
 
 if __name__ == "__main__":
     main()
@@ -31,6 +31,9 @@ from snowflake.snowpark.functions import col
 
 from typing import Any, List, Dict, Tuple, Mapping, cast
 
+import query_telemetry as telemetry
+from data_freshness import WATERMARK_TABLES, ensure_fresh_data
+
 st.set_page_config(layout="wide")
 
 st.markdown("""
@@ -54,32 +57,59 @@ st.markdown("""
 
 # We can also use Snowpark for our analyses!
 from snowflake.snowpark.context import get_active_session
-session = get_active_session()
-DATABASE = session.get_current_database().strip('"')
 
 
-@st.cache_data(ttl=86400, show_spinner=False)
-def _refresh_demo_data(db):
-    try:
-        get_active_session().sql(f"CALL {db}.ANALYSE.GENERATE_DAILY_DATA()").collect()
-    except Exception:
-        pass
+@st.cache_resource
+def get_session():
+    return get_active_session()
+
 
+DATABASE = get_session().get_current_database().strip('"')
 
-_refresh_demo_data(DATABASE)
+telemetry.begin_rerun("dataset_explorer")
 
+CATALOG_SCHEMAS = ('INGEST', 'HARMONIZED', 'ANALYSE', 'DATA_SHARING')
 MAX_COLUMNS_TO_PROFILE = 10
 
-@st.cache_data()
-def get_query_column_stats(table_name:str, columns:List[str], filter:str|None = None)->Dict[str,Dict]:
-    columns = columns[:MAX_COLUMNS_TO_PROFILE]
 
-    column_sql = f"""SELECT COLUMN_NAME, DATA_TYPE 
-        FROM {DATABASE}.INFORMATION_SCHEMA.COLUMNS 
-        WHERE TABLE_CATALOG || '.' || TABLE_SCHEMA || '.' || TABLE_NAME = '{table_name}'
-        ORDER BY ORDINAL_POSITION"""
-    column_data_types_df = session.sql(column_sql).collect()
-    column_data_types = {_.COLUMN_NAME:_.DATA_TYPE for _ in column_data_types_df }
+@telemetry.cached(show_spinner=False)
+def get_catalog_snapshot() -> Dict[str, Dict[str, Any]]:
+    """Single information_schema read shared by the lineage graph and the column profiler.
+
+    Returns a dict keyed "SCHEMA.TABLE" with the fully qualified name, the table
+    comment and the ordered column names with their data types.
+    """
+    schema_list = ', '.join(f"'{_}'" for _ in CATALOG_SCHEMAS)
+    rows = telemetry.fetch_records(get_session(), f'''SELECT t.TABLE_CATALOG AS DATABASE_NAME, t.TABLE_SCHEMA AS SCHEMA_NAME,
+            t.TABLE_NAME, t.COMMENT, c.COLUMN_NAME, c.DATA_TYPE
+        FROM {DATABASE}.INFORMATION_SCHEMA.TABLES t
+        LEFT JOIN {DATABASE}.INFORMATION_SCHEMA.COLUMNS c
+          ON c.TABLE_CATALOG = t.TABLE_CATALOG
+         AND c.TABLE_SCHEMA = t.TABLE_SCHEMA
+         AND c.TABLE_NAME = t.TABLE_NAME
+        WHERE t.TABLE_CATALOG = '{DATABASE}'
+          AND t.TABLE_SCHEMA IN ({schema_list})
+        ORDER BY t.TABLE_SCHEMA, t.TABLE_NAME, c.ORDINAL_POSITION''')
+
+    snapshot: Dict[str, Dict[str, Any]] = {}
+    for _ in rows:
+        table_key = '.'.join([_['SCHEMA_NAME'], _['TABLE_NAME']])
+        detail = snapshot.setdefault(table_key, {
+            'table_full_name': '.'.join([_['DATABASE_NAME'], _['SCHEMA_NAME'], _['TABLE_NAME']]),
+            'comment': _['COMMENT'],
+            'columns': {},
+        })
+        if _['COLUMN_NAME']:
+            detail['columns'][_['COLUMN_NAME']] = _['DATA_TYPE']
+    return snapshot
+
+
+@telemetry.cached(show_spinner=False)
+def get_query_column_stats(table_key:str, filter:str|None = None)->Dict[str,Dict]:
+    table_detail = get_catalog_snapshot()[table_key]
+    table_name = table_detail['table_full_name']
+    column_data_types = table_detail['columns']
+    columns = list(column_data_types)[:MAX_COLUMNS_TO_PROFILE]
     
     def create_column_sql(column:str)->str:
         data_type = column_data_types[column]
@@ -87,14 +117,10 @@ def get_query_column_stats(table_name:str, columns:List[str], filter:str|None =
         result = f"""
             COUNT(DISTINCT {column}) as {column}_UNIQUE,"""
         
-        if data_type in ['FLOAT','NUMBER','TIMESTAMP_LTZ','DECIMAL', 'DATE']:
+        if data_type in ['FLOAT','NUMBER','TIMESTAMP_LTZ','DECIMAL', 'DATE', 'TEXT']:
             result = result + f"""
-            (SELECT MIN({column}) FROM {table_name}) as {column}_MIN,
-            (SELECT MAX({column}) FROM {table_name}) as {column}_MAX,"""
-        if data_type in ['TEXT']:
-            result = result + f"""
-            (SELECT MIN({column}) FROM {table_name}) as {column}_MIN,
-            (SELECT MAX({column}) FROM {table_name}) as {column}_MAX,"""
+            MIN({column}) as {column}_MIN,
+            MAX({column}) as {column}_MAX,"""
         else:
             result = result + f"""
             NULL as {column}_MIN,
@@ -124,37 +150,25 @@ def get_query_column_stats(table_name:str, columns:List[str], filter:str|None =
     WHERE {filter}
     """
     
-    column_stats = session.sql(sql).collect()
+    column_stats = telemetry.fetch_records(get_session(), sql)
     column_stats_results = column_stats[0]
-    all_rows_count = column_stats_results.ALL_ROWS_COUNT
+    all_rows_count = column_stats_results['ALL_ROWS_COUNT']
     return {_:{
             'unique':column_stats_results[f'{_}_UNIQUE'], 
-            'uniqueness': column_stats_results[f'{_}_UNIQUE'] / all_rows_count,
+            'uniqueness': column_stats_results[f'{_}_UNIQUE'] / all_rows_count if all_rows_count else 0,
             'min':column_stats_results[f'{_}_MIN'], 
             'max':column_stats_results[f'{_}_MAX'], 
             'samples':column_stats_results[f'{_}_SAMPLES'], 
             'distribution':column_stats_results[f'{_}_DISTRIBUTION'], 
             } for _ in columns}
 
-@st.cache_data()
+@telemetry.cached(show_spinner=False)
 def get_table_sample(table_name:str):
-    df_sample = session.table(table_name).sample(n=30).collect()
-    return df_sample
-
+    # Arrow table; st.data_editor renders it without converting rows.
+    return telemetry.fetch_arrow(get_session(), f"SELECT * FROM {table_name} SAMPLE (30 ROWS)")
 
-@st.cache_data()
-def get_tables():
-    df_tables = session.sql(f'''SELECT TABLE_CATALOG AS DATABASE_NAME, TABLE_SCHEMA AS SCHEMA_NAME, TABLE_NAME, COMMENT
-    FROM {DATABASE}.INFORMATION_SCHEMA.TABLES 
-    WHERE TABLE_CATALOG = '{DATABASE}'
-      AND TABLE_SCHEMA IN ('INGEST','HARMONIZED', 'ANALYSE','DATA_SHARING')''').select([col(f'"{_.strip().upper()}"').alias(_.upper()) for _ in 'database_name,schema_name,table_name,comment'.split(',')]).collect()
-    
-    return {'.'.join([_.SCHEMA_NAME, _.TABLE_NAME]):{
-        'table_full_name':'.'.join([_.DATABASE_NAME, _.SCHEMA_NAME, _.TABLE_NAME]),
-        'comment': _.COMMENT
-    } for _ in df_tables}
 
-table_details = get_tables()
+table_details = get_catalog_snapshot()
 
 # --- Base64 Icon (Used for all nodes) ---
 # NOTE: Using the reliable house icon Base64 string from previous steps for visibility.
@@ -164,12 +178,11 @@ WORKING_BASE64_ICON = (
 
 
 # --- 1. Fetch Table Dependencies Dynamically ---
-st.cache_data()
+@telemetry.cached(show_spinner=False)
 def get_table_lineage_list():
-    lineage_map_df = session.sql('SELECT * FROM APPS.ACCOUNT_USAGE_CREATE_TABLE_AS_SELECT_VW').collect()
-    lineage_map = [(_.TARGET_TABLE_NAME, json.loads(_.SOURCE_TABLES)) for _ in lineage_map_df]
-    database_name = session.get_current_database().strip('"')
-    lineage_map_list = [(target_table_name.replace(f'{database_name}.', ''), [source_table_name.replace(f'{database_name}.', '') for source_table_name in source_table_names]) for target_table_name, source_table_names in lineage_map]    
+    lineage_map_df = telemetry.fetch_records(get_session(), 'SELECT * FROM APPS.ACCOUNT_USAGE_CREATE_TABLE_AS_SELECT_VW')
+    lineage_map = [(_['TARGET_TABLE_NAME'], json.loads(_['SOURCE_TABLES'])) for _ in lineage_map_df]
+    lineage_map_list = [(target_table_name.replace(f'{DATABASE}.', ''), [source_table_name.replace(f'{DATABASE}.', '') for source_table_name in source_table_names]) for target_table_name, source_table_names in lineage_map]    
     return lineage_map_list
 
 LINEAGE_MAP = get_table_lineage_list()
@@ -274,6 +287,10 @@ config = Config(
 # --- 4. Render the Component in Streamlit ---
 
 st.title("Data Explorer")
+# Any table the generator appends to can be profiled here, including ones added later.
+ensure_fresh_data(get_session(), DATABASE, invalidates={
+    table: [get_query_column_stats, get_table_sample] for table in WATERMARK_TABLES
+})
 st.subheader("Data Flow from Ingestion to Harmonized Aggregates")
 with st.container(border=True):
     return_value = agraph(
@@ -283,16 +300,16 @@ with st.container(border=True):
     )
 
 # Optional: Display the return value
-if return_value:
+if return_value and return_value in table_details:
+    telemetry.set_view(f"table:{return_value}")
     with st.container(border=True):
         st.toast(f"Table: **{return_value}**", icon=None, duration="short")
     
         table_detail = table_details[return_value]    
         table_full_name = table_detail['table_full_name']
         table_comment =  table_detail['comment']
-        columns = session.table(table_full_name).columns
     
-        stats = get_query_column_stats(table_full_name, columns, '')
+        stats = get_query_column_stats(return_value, '')
         samples = get_table_sample(table_full_name)
     
         st.subheader(table_full_name)
@@ -304,7 +321,7 @@ if return_value:
             def render_sample(sample:list)->str:
                 return ', '.join([f'{_}' for _ in sample])
                     
-            stats_samples = [render_sample(_x) for _x in [json.loads(stats[_]['samples']) for _ in stats if stats[_]['samples']]]
+            stats_samples = [render_sample(json.loads(stats[_]['samples'])) if stats[_]['samples'] else '' for _ in stats]
             editor_columns_df = pd.DataFrame(
                 {
                     'column': [_ for _ in stats],
@@ -351,4 +368,6 @@ if return_value:
                                     y_max=1.0),
                                 })    
         with tabs[1]:
-            st.data_editor(samples)
\ No newline at end of file
+            st.data_editor(samples)
+
+telemetry.render_query_profile(get_session(), DATABASE)
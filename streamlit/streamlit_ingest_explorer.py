@@ -25,6 +25,9 @@ import pandas as pd
 import streamlit as st
 from snowflake.snowpark.context import get_active_session
 
+import query_telemetry as telemetry
+from data_freshness import WATERMARK_TABLES, ensure_fresh_data
+
 
 SCHEMA = "INGEST"
 
@@ -36,24 +39,14 @@ def get_session():
     return get_active_session()
 
 
-@st.cache_data(ttl=86400, show_spinner=False)
-def refresh_demo_data(_session, db):
-    try:
-        _session.sql(f"CALL {db}.ANALYSE.GENERATE_DAILY_DATA()").collect()
-    except Exception:
-        pass
-
-
 DATABASE = get_session().get_current_database().strip('"')
-refresh_demo_data(get_session(), DATABASE)
 
 
 def run_query(sql: str) -> pd.DataFrame:
-    session = get_session()
-    return session.sql(sql).to_pandas()
+    return telemetry.run_query(get_session(), sql)
 
 
-@st.cache_data(show_spinner=False)
+@telemetry.cached(show_spinner=False)
 def get_connected_sources() -> pd.DataFrame:
     try:
         return run_query(f"SHOW STAGES IN SCHEMA {DATABASE}.{SCHEMA}")
@@ -61,7 +54,7 @@ def get_connected_sources() -> pd.DataFrame:
         return pd.DataFrame(columns=["name", "type", "url", "comment", "created_on"])
 
 
-@st.cache_data(show_spinner=False)
+@telemetry.cached(show_spinner=False)
 def get_ingest_tables() -> pd.DataFrame:
     sql = f"""
         SELECT
@@ -78,7 +71,7 @@ def get_ingest_tables() -> pd.DataFrame:
     return run_query(sql)
 
 
-@st.cache_data(show_spinner=False)
+@telemetry.cached(show_spinner=False)
 def get_table_columns(table_name: str) -> pd.DataFrame:
     sql = f"""
         SELECT column_name, data_type, is_nullable, comment
@@ -118,8 +111,8 @@ def summarize_column(table_name: str, column: str, data_type: str) -> Dict[str,
         FROM {qualified}
     """
 
-    summary_df = run_query(summary_sql)
-    summary = summary_df.iloc[0].to_dict() if not summary_df.empty else {}
+    summary_records = telemetry.fetch_records(get_session(), summary_sql)
+    summary = summary_records[0] if summary_records else {}
 
     distinct_count = summary.get("DISTINCT_COUNT") or 0
     sample_values: List[str] = []
@@ -131,8 +124,8 @@ def summarize_column(table_name: str, column: str, data_type: str) -> Dict[str,
             ORDER BY value
             LIMIT 20
         """
-        sample_df = run_query(sample_sql)
-        sample_values = sample_df["VALUE"].astype(str).tolist()
+        sample_table = telemetry.fetch_arrow(get_session(), sample_sql)
+        sample_values = [str(value) for value in sample_table.column("VALUE").to_pylist()]
 
     summary["sample_values"] = ", ".join(sample_values) if sample_values else None
     return summary
@@ -209,23 +202,32 @@ def render_table_details(table_name: str):
 
     st.markdown("#### Sample Rows")
     sample_sql = f"SELECT * FROM {qualified} LIMIT 50"
-    sample_df = run_query(sample_sql)
-    if sample_df.empty:
+    sample_table = telemetry.fetch_arrow(get_session(), sample_sql)
+    if not sample_table.num_rows:
         st.info("Table has no data.")
     else:
-        st.dataframe(sample_df, use_container_width=True)
+        st.dataframe(sample_table, use_container_width=True)
 
 
 def main():
+    telemetry.begin_rerun("ingest_explorer")
     st.title("INGEST Data Explorer")
     st.caption("Review connected sources and table metadata within the INGEST schema.")
+    ensure_fresh_data(get_session(), DATABASE, invalidates={
+        table: [get_ingest_tables, get_table_columns]
+        for table in WATERMARK_TABLES
+        if table.startswith(f"{SCHEMA}.")
+    })
 
     render_sources_section()
     st.divider()
     table = render_tables_overview()
     if table:
+        telemetry.set_view(f"table:{table}")
         render_table_details(table)
 
+    telemetry.render_query_profile(get_session(), DATABASE)
+
 
 if __name__ == "__main__":
     main()
@@ -26,6 +26,9 @@ import pandas as pd
 import streamlit as st
 from snowflake.snowpark.context import get_active_session
 
+import query_telemetry as telemetry
+from data_freshness import ensure_fresh_data
+
 try:
     from streamlit_sortables import sort_items  # type: ignore
 except Exception:  # pragma: no cover - optional dependency
@@ -41,21 +44,11 @@ def get_session():
     return get_active_session()
 
 
-@st.cache_data(ttl=86400, show_spinner=False)
-def refresh_demo_data(_session, db):
-    try:
-        _session.sql(f"CALL {db}.ANALYSE.GENERATE_DAILY_DATA()").collect()
-    except Exception:
-        pass
-
-
 DATABASE = get_session().get_current_database().strip('"')
-refresh_demo_data(get_session(), DATABASE)
 
 
 def run_query(sql: str) -> pd.DataFrame:
-    session = get_session()
-    return session.sql(sql).to_pandas()
+    return telemetry.run_query(get_session(), sql)
 
 
 @dataclass
@@ -72,10 +65,12 @@ class AttributeDefinition:
         return f"{self.source_table}.{self.name}"
 
 
+# Subscriber-level groups read the wide ANALYSE.SUBSCRIBER_ATTRIBUTES table, the same
+# read path the segment procedures use; ad interactions are campaign-level.
 ATTRIBUTE_SOURCES: Dict[str, Sequence[Dict[str, Iterable[str]]]] = {
     "Profile": (
         {
-            "table": "HARMONIZED.SUBSCRIBER_PROFILE_ENRICHED",
+            "table": "ANALYSE.SUBSCRIBER_ATTRIBUTES",
             "include": [
                 "PROFILE_ID",
                 "FULL_NAME",
@@ -90,7 +85,7 @@ ATTRIBUTE_SOURCES: Dict[str, Sequence[Dict[str, Iterable[str]]]] = {
     ),
     "Demographics": (
         {
-            "table": "DATA_SHARING.DEMOGRAPHICS_PROFILES",
+            "table": "ANALYSE.SUBSCRIBER_ATTRIBUTES",
             "include": [
                 "AGE",
                 "AGE_BAND",
@@ -105,7 +100,7 @@ ATTRIBUTE_SOURCES: Dict[str, Sequence[Dict[str, Iterable[str]]]] = {
     ),
     "Engagement": (
         {
-            "table": "HARMONIZED.AGGREGATED_BEHAVIORAL_LOGS",
+            "table": "ANALYSE.SUBSCRIBER_ATTRIBUTES",
             "include": [
                 "AVG_SITE_VISITS_PER_MONTH",
                 "LOGIN_FREQUENCY_PER_WEEK",
@@ -129,15 +124,10 @@ ATTRIBUTE_SOURCES: Dict[str, Sequence[Dict[str, Iterable[str]]]] = {
     ),
     "Model Scores": (
         {
-            "table": "ANALYSE.FE_SUBSCRIBER_CHURN_RISK",
+            "table": "ANALYSE.SUBSCRIBER_ATTRIBUTES",
             "include": [
                 "PREDICTED_CHURN_PROB",
                 "CHURN_RISK_SEGMENT",
-            ],
-        },
-        {
-            "table": "ANALYSE.FE_SUBSCRIBER_LTV_SCORES",
-            "include": [
                 "PREDICTED_LTV",
                 "LTV_TARGET",
             ],
@@ -155,19 +145,36 @@ def _parse_table_name(fully_qualified: str) -> Dict[str, str]:
     raise ValueError(f"Unexpected table reference: {fully_qualified}")
 
 
-def _information_schema_query(schema: str, table: str, database: str = DATABASE) -> str:
+def _information_schema_query(tables: Iterable[Tuple[str, str]], database: str = DATABASE) -> str:
+    names = ", ".join(f"'{schema.upper()}.{table.upper()}'" for schema, table in sorted(set(tables)))
     return (
-        f"SELECT column_name, data_type, comment"
+        f"SELECT table_schema, table_name, column_name, data_type, comment"
         f" FROM {database}.information_schema.columns"
-        f" WHERE table_schema = '{schema.upper()}'"
-        f"   AND table_name = '{table.upper()}'"
-        f" ORDER BY ordinal_position"
+        f" WHERE table_schema || '.' || table_name IN ({names})"
+        f" ORDER BY table_schema, table_name, ordinal_position"
     )
 
 
-@st.cache_data(show_spinner=False)
+def _load_columns() -> Dict[Tuple[str, str, str], pd.DataFrame]:
+    """Columns of every source table, one information_schema query per database."""
+    by_database: Dict[str, List[Tuple[str, str]]] = {}
+    for table_confs in ATTRIBUTE_SOURCES.values():
+        for table_conf in table_confs:
+            parsed = _parse_table_name(table_conf["table"])
+            by_database.setdefault(parsed.get("database", DATABASE), []).append((parsed["schema"], parsed["table"]))
+
+    columns: Dict[Tuple[str, str, str], pd.DataFrame] = {}
+    for database, tables in by_database.items():
+        cols_df = run_query(_information_schema_query(tables, database))
+        for (schema, table), table_df in cols_df.groupby(["TABLE_SCHEMA", "TABLE_NAME"], sort=False):
+            columns[(database, schema, table)] = table_df
+    return columns
+
+
+@telemetry.cached(show_spinner=False)
 def load_attribute_metadata() -> Dict[str, List[AttributeDefinition]]:
     palette: Dict[str, List[AttributeDefinition]] = {group: [] for group in ATTRIBUTE_SOURCES}
+    columns = _load_columns()
 
     for group, table_confs in ATTRIBUTE_SOURCES.items():
         for table_conf in table_confs:
@@ -180,7 +187,7 @@ def load_attribute_metadata() -> Dict[str, List[AttributeDefinition]]:
             table = parsed.get("table")
             database = parsed.get("database", DATABASE)
 
-            cols_df = run_query(_information_schema_query(schema, table, database))
+            cols_df = columns.get((database, schema.upper(), table.upper()), pd.DataFrame())
 
             for _, row in cols_df.iterrows():
                 col_name = row["COLUMN_NAME"].upper()
@@ -196,7 +203,7 @@ def load_attribute_metadata() -> Dict[str, List[AttributeDefinition]]:
                         label=display_label,
                         data_type=row["DATA_TYPE"],
                         source_table=f"{database}.{schema}.{table}",
-                        description=row.get("COMMENT"),
+                        description=row["COMMENT"] if pd.notna(row.get("COMMENT")) else None,
                     )
                 )
 
@@ -514,8 +521,10 @@ def render_metrics_panel() -> None:
 
 
 def main() -> None:
+    telemetry.begin_rerun("segment_builder")
     st.title("Audience Segment Builder")
     st.caption("Build audience definitions from harmonized & analyse datasets")
+    ensure_fresh_data(get_session(), DATABASE)
 
     palette = load_attribute_metadata()
     attribute_index = build_attribute_index(palette)
@@ -538,6 +547,8 @@ def main() -> None:
     st.divider()
     render_metrics_panel()
 
+    telemetry.render_query_profile(get_session(), DATABASE)
+
 
 if __name__ == "__main__":
     main()